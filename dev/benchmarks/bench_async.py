@@ -0,0 +1,47 @@
+"""
+Async interleaving benchmark. Runs one turn in each of many sessions at the same time, where every turn
+awaits simulated I/O, and compares the wall time to the time a single turn takes.
+
+Run from the project root:
+    python dev/benchmarks/bench_async.py [session_count]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Scene
+from interactive_engine.session_pool import SessionPool
+
+IO_SECONDS = 0.05
+
+async def on_speak(e, a, s, p):
+    # Stand-in for an LLM call or a save to disk
+    await asyncio.sleep(IO_SECONDS)
+    return "The oracle answers."
+
+async def main():
+    session_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    content = EngineContent()
+    scene = content.add_scene(Scene(name="Oracle", text="An oracle waits."))
+    scene.add_action(ActionType.SPEAK, "oracle", Action(on_action=on_speak))
+
+    pool = SessionPool(content)
+    session_ids = [pool.open_session()[0] for _ in range(session_count)]
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(pool.run_async(session_id, "speak oracle") for session_id in session_ids))
+    elapsed = time.perf_counter() - start
+
+    assert all(result == "The oracle answers." for result in results)
+    print(f"sessions:          {session_count}")
+    print(f"simulated I/O:     {IO_SECONDS * 1000:.0f} ms per turn")
+    print(f"wall time:         {elapsed * 1000:.0f} ms")
+    print(f"sequential would:  {session_count * IO_SECONDS * 1000:,.0f} ms")
+    print(f"turns/sec:         {session_count / elapsed:,.0f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
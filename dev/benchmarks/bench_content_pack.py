@@ -0,0 +1,68 @@
+"""
+Content pack benchmark. Generates a large YAML content pack, then compares a cold load (parse, validate
+and compile) with a load from the cached bundle.
+
+Run from the project root:
+    python dev/benchmarks/bench_content_pack.py [scene_count]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from interactive_engine.content_pack import load_content_pack
+
+def generate_pack(scene_count: int) -> dict:
+    """
+    Generate a ring of rooms, each with a gem to take, a locked door and a few things to look at
+
+    Args:
+        scene_count (int): The number of rooms
+
+    Returns:
+        pack (dict): The content pack
+    """
+    items = {f"gem{i}": {'name': f"Gem {i}", 'description': "A gem."} for i in range(scene_count)}
+    scenes = {}
+    for i in range(scene_count):
+        actions = [
+            {
+                'type': 'take', 'keyword': 'gem', 'text': "You take the gem.", 'give': [f"gem{i}"],
+                'set': {'gem_taken': True}, 'remove_self': True
+            },
+            {'type': 'move', 'keyword': 'door', 'outcomes': [
+                {'when': {'lacks': [f"gem{i}"]}, 'text': "The door is locked."},
+                {'move': f"room{(i + 1) % scene_count}"},
+            ]},
+        ]
+        actions.extend({'type': 'look', 'keyword': f"thing{j}", 'text': "Nothing special."} for j in range(10))
+        scenes[f"room{i}"] = {
+            'text': f"You are in room {i}.",
+            'text_rules': [{'when': {'state': {'gem_taken': True}}, 'text': f"You are in room {i}. The gem is gone."}],
+            'actions': actions,
+        }
+    return {'items': items, 'scenes': scenes}
+
+def main():
+    scene_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "pack.yaml")
+        with open(path, 'w', encoding='utf-8') as f:
+            yaml.safe_dump(generate_pack(scene_count), f, sort_keys=False)
+        print(f"scenes: {scene_count}, pack size: {os.path.getsize(path) / 1024:.0f} KiB")
+
+        start = time.perf_counter()
+        load_content_pack(path)
+        print(f"cold load (parse + validate + compile + build): {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        start = time.perf_counter()
+        load_content_pack(path)
+        print(f"cached load (bundle + build): {(time.perf_counter() - start) * 1000:.0f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Turn latency benchmark for action dispatch. Compares resolving a command through a fresh deep_merge of the
+scene, player and system actions (the old per-turn behavior) against the compiled ActionIndex used by
+InteractiveEngine.run, for scenes with an increasing number of actions.
+
+Run from the project root:
+    python dev/benchmarks/bench_dispatch.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from interactive_engine.data_classes import Action, ActionType, Scene
+from interactive_engine.engine import InteractiveEngine
+from interactive_engine.utils.get_action import get_action
+
+ACTION_COUNTS = [10, 100, 1_000, 5_000, 10_000]
+TURNS = 2_000
+
+def build_scene(action_count: int) -> Scene:
+    """
+    Build a scene with the given number of LOOK and TAKE actions
+
+    Args:
+        action_count (int): The number of actions to add
+
+    Returns:
+        scene (Scene): The generated scene
+    """
+    scene = Scene(name=f"Bench Scene {action_count}", text="A very crowded room.")
+    for i in range(action_count):
+        action_type = ActionType.LOOK if i % 2 else ActionType.TAKE
+        scene.add_action(action_type, f"thing{i}", Action(on_action=lambda e,a,s,p: "Done."))
+    return scene
+
+def main():
+    engine = InteractiveEngine()
+    print(f"{'actions':>8} {'deep_merge (us/turn)':>22} {'index (us/turn)':>18} {'speedup':>9}")
+    for action_count in ACTION_COUNTS:
+        scene = build_scene(action_count)
+        engine.set_current_scene(scene)
+        command = f"look thing{action_count - 1}"
+
+        merged_seconds = timeit.timeit(
+            lambda: get_action(command, engine.get_all_actions()).run_action(engine, scene, engine.player),
+            number=TURNS
+        )
+        index_seconds = timeit.timeit(lambda: engine.run(command), number=TURNS)
+
+        merged_us = merged_seconds / TURNS * 1_000_000
+        index_us = index_seconds / TURNS * 1_000_000
+        print(f"{action_count:>8} {merged_us:>22.2f} {index_us:>18.2f} {merged_us / index_us:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+World history benchmark. Compares forking a session against deep copying its world, and checks that
+memory stays flat while a player alternates between playing and undoing.
+
+Run from the project root:
+    python dev/benchmarks/bench_history.py [scene_count]
+"""
+import copy
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Scene
+from interactive_engine.engine import InteractiveEngine
+
+def build_content(scene_count: int) -> EngineContent:
+    """
+    Build a ring of rooms, each with a button that counts how often it was pushed
+
+    Args:
+        scene_count (int): The number of rooms
+
+    Returns:
+        content (EngineContent): The generated content
+    """
+    content = EngineContent()
+    for i in range(scene_count):
+        scene = content.add_scene(Scene(name=f"Room {i}", text=f"You are in room {i}."))
+        next_room = f"Room {(i + 1) % scene_count}"
+        scene.add_action(ActionType.MOVE, "north", Action(on_action=lambda e,a,s,p,n=next_room: e.set_current_scene(n)))
+        for j in range(20):
+            scene.add_action(ActionType.LOOK, f"thing{j}", Action(on_action=lambda e,a,s,p: "Nothing special."))
+
+        def on_push(e, a, s, p):
+            s.state['pushes'] = s.state.get('pushes', 0) + 1
+            s.text = f"The button was pushed {s.state['pushes']} times."
+            return "Click."
+        scene.add_action(ActionType.TOUCH, "button", Action(on_action=on_push))
+    return content
+
+def main():
+    scene_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    engine = InteractiveEngine(build_content(scene_count))
+    engine.start()
+    engine.run_many(["touch button", "go north"] * scene_count, output=False)
+
+    rounds = 100
+    start = time.perf_counter()
+    for _ in range(rounds):
+        branch = engine.fork()
+        branch.run("touch button")
+    fork_ms = (time.perf_counter() - start) / rounds * 1000
+
+    start = time.perf_counter()
+    copy.deepcopy([(scene.text, dict(scene.state), scene.actions) for scene in engine.session_scenes().values()])
+    deepcopy_ms = (time.perf_counter() - start) * 1000
+
+    print(f"scenes visited: {len(engine.session_scenes())}")
+    print(f"fork + one turn: {fork_ms:.3f} ms, deepcopy of the scenes: {deepcopy_ms:.1f} ms")
+
+    tracemalloc.start()
+    readings = []
+    for cycle in range(5):
+        for _ in range(100):
+            engine.run_many(["touch button", "undo"], output=False)
+        readings.append(tracemalloc.get_traced_memory()[0])
+    tracemalloc.stop()
+
+    print("memory after each 100 push/undo cycles: " + ", ".join(f"{r / 1024:.1f} KiB" for r in readings))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Inventory benchmark. Compares a plain list of items with the Inventory multiset for the checks content
+makes every turn: contains, remove and add, and looking items up by code.
+
+Run from the project root:
+    python dev/benchmarks/bench_inventory.py [item_count]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from interactive_engine.data_classes import Inventory, Item
+
+def main():
+    item_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    items = [Item(f"Item {i}", f"item{i}", "An item.") for i in range(item_count)]
+    # Content typically checks for a few items near the end of a long inventory
+    wanted = items[-10:]
+
+    as_list = list(items)
+    inventory = Inventory(items)
+
+    def list_cycle():
+        all(as_list.count(item) > 0 for item in wanted)
+        for item in wanted:
+            as_list.remove(item)
+        as_list.extend(wanted)
+        next(item for item in as_list if item.code == wanted[0].code)
+
+    def inventory_cycle():
+        all(item in inventory for item in wanted)
+        for item in wanted:
+            inventory.remove(item)
+        for item in wanted:
+            inventory.add(item)
+        inventory.get(wanted[0].code)
+
+    print(f"items held: {item_count}, items checked per cycle: {len(wanted)}")
+    for label, cycle in (("list", list_cycle), ("Inventory", inventory_cycle)):
+        number = 2000
+        seconds = min(timeit.repeat(cycle, number=number, repeat=5))
+        print(f"{label:<10} contains + remove + add + lookup by code: {seconds / number * 1e6:8.2f} us per cycle")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Data class memory benchmark. Measures how many bytes scenes, actions, items and players take, including the
+session copies every player gets of the scenes they visit. Every measurement is repeated with baseline classes
+laid out like the data classes were before they were slotted, for comparison.
+
+Run from the project root:
+    python dev/benchmarks/bench_memory.py [count]
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from interactive_engine.data_classes import Action, ActionType, Item, Player, Scene
+from utils.observable_dict import ObservableDict
+
+class BaselineAction:
+    """An action laid out like before the data classes were slotted, with an instance dictionary"""
+    def __init__(self, action_type: ActionType = ActionType.EMPTY, on_action=None, blocking: bool = False):
+        self.action_type = action_type
+        self.on_action = on_action
+        self.blocking = blocking
+
+class BaselineItem:
+    """An item with an instance dictionary"""
+    def __init__(self, name: str, code: str, description: str):
+        self.name = name
+        self.code = code
+        self.description = description
+
+class BaselinePlayer:
+    """A player with an instance dictionary, creating its own look and inventory actions"""
+    def __init__(self):
+        self.name = "You"
+        self.description = "It's you."
+        self.actions = {
+            ActionType.LOOK: {'player': BaselineAction(on_action=lambda e,a,s,p: p.description)},
+            ActionType.INVENTORY: BaselineAction(on_action=lambda e,a,s,p: p.inventory),
+        }
+        self.inventory = []
+        self._action_listeners = []
+        self._change_listener = None
+
+baseline_look_scene_action = BaselineAction(ActionType.LOOK)
+"""The "look scene" action, which scenes shared already before"""
+
+class BaselineScene:
+    """A scene with an instance dictionary, every action dictionary and its state created up front"""
+    def __init__(self, name: str, text: str):
+        self.name = name
+        self._change_listener = None
+        self._text = text
+        self.start_text = None
+        self.end_text = None
+        self.actions = {action_type: {} for action_type in (
+            ActionType.MOVE, ActionType.LOOK, ActionType.LISTEN, ActionType.SPEAK, ActionType.TOUCH,
+            ActionType.TAKE, ActionType.USE
+        )}
+        self._state = ObservableDict()
+        self._action_listeners = []
+        self.add_action(ActionType.LOOK, 'scene', baseline_look_scene_action)
+
+    def add_action(self, action_type: ActionType, keyword: str, action: BaselineAction) -> BaselineAction:
+        action.action_type = action_type
+        self.actions[action_type][keyword] = action
+        return action
+
+    def copy(self) -> 'BaselineScene':
+        scene = BaselineScene.__new__(BaselineScene)
+        scene.__dict__.update(self.__dict__)
+        scene.actions = {action_type: actions.copy() for action_type, actions in self.actions.items()}
+        scene._state = self._state.copy()
+        scene._action_listeners = []
+        return scene
+
+def measure(create, count: int) -> float:
+    """
+    Measures the average memory allocated by a callable
+
+    Args:
+        create (Callable[[int], object]): Creates one object, given its index
+        count (int): How many objects to create
+
+    Returns:
+        size (float): The average number of bytes per object
+    """
+    gc.collect()
+    tracemalloc.start()
+    objects = [create(i) for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size / count
+
+def measure_classes(action_class, item_class, player_class, scene_class, count: int) -> dict[str, float]:
+    """
+    Measures the memory taken by one set of data classes
+
+    Args:
+        action_class (type): The action class
+        item_class (type): The item class
+        player_class (type): The player class
+        scene_class (type): The scene class
+        count (int): How many objects to create per measurement
+
+    Returns:
+        sizes (dict[str, float]): The average number of bytes per object, by measurement
+    """
+    on_action = lambda e,a,s,p: "Nothing special."
+
+    def scene_with_actions(i: int):
+        scene = scene_class(f"room{i}", "A room.")
+        scene.add_action(ActionType.TAKE, "gem", action_class(on_action=on_action))
+        scene.add_action(ActionType.MOVE, "north", action_class(on_action=on_action))
+        for j in range(8):
+            scene.add_action(ActionType.LOOK, f"thing{j}", action_class(on_action=on_action))
+        return scene
+
+    templates = [scene_with_actions(i) for i in range(count)]
+
+    empty_scene = measure(lambda i: scene_class(f"room{i}", "A room."), count)
+    full_scene = measure(scene_with_actions, count)
+    return {
+        "empty scene": empty_scene,
+        "scene with 10 actions": full_scene,
+        "added action (incl. map entry)": (full_scene - empty_scene) / 10,
+        "action": measure(lambda i: action_class(on_action=on_action), count),
+        "session copy of a scene": measure(lambda i: templates[i].copy(), count),
+        "item": measure(lambda i: item_class(f"Gem {i}", f"gem{i}", "A gem."), count),
+        "player": measure(lambda i: player_class(), count),
+    }
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    baseline = measure_classes(BaselineAction, BaselineItem, BaselinePlayer, BaselineScene, count)
+    current = measure_classes(Action, Item, Player, Scene, count)
+
+    print(f"objects per measurement: {count}")
+    print(f"{'':<32} {'baseline':>14} {'current':>14}")
+    for label, size in current.items():
+        print(f"{label:<32} {baseline[label]:8.0f} bytes {size:8.0f} bytes")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Lookup cost benchmark for the CommandParser. Resolves exact, prefixed, aliased and mistyped commands
+against scenes with an increasing number of target keywords to show that lookups stay flat as content
+grows. Typo lookups are measured both with memoized word corrections and cold.
+
+Run from the project root:
+    python dev/benchmarks/bench_parser.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from interactive_engine.action_index import ActionIndex
+from interactive_engine.command_parser import CommandParser
+from interactive_engine.data_classes import Action, ActionType, Scene
+
+KEYWORD_COUNTS = [10, 100, 1_000, 10_000, 50_000]
+LOOKUPS = 20_000
+
+def main():
+    print(
+        f"{'keywords':>9} {'exact (us)':>11} {'prefix (us)':>12} {'alias (us)':>11} {'typo (us)':>10} {'cold typo (us)':>15} "
+        f"{'first build (ms)':>17} {'typo build (ms)':>16}"
+    )
+    for keyword_count in KEYWORD_COUNTS:
+        scene = Scene(name="Bench Scene", text="A very crowded room.")
+        for i in range(keyword_count):
+            scene.add_action(ActionType.LOOK, f"statue number {i:05d}", Action())
+        parser = CommandParser(ActionIndex([scene.actions]))
+
+        build_seconds = timeit.timeit(lambda: parser.parse("look statue number 00000"), number=1)
+        last = f"statue number {keyword_count - 1:05d}"
+        exact = timeit.timeit(lambda: parser.parse(f"look {last}"), number=LOOKUPS)
+        prefix = timeit.timeit(lambda: parser.parse(f"lo {last}"), number=LOOKUPS)
+        alias = timeit.timeit(lambda: parser.parse(f"x {last}"), number=LOOKUPS)
+
+        typo_build_seconds = timeit.timeit(lambda: parser.parse("loko statue nubmer 00000"), number=1)
+        typo_lookups = [f"loko statue nubmer {i % keyword_count:05d}" for i in range(LOOKUPS // 10)]
+        typo = timeit.timeit(lambda: parser.parse(typo_lookups.pop()), number=len(typo_lookups))
+        assert parser.parse("loko statue nubmer 00000").target == "statue number 00000"
+
+        def cold_typo():
+            parser._fuzzy_targets[ActionType.LOOK][1]._cache.clear()
+            parser.parse("look statue nubmer 00000")
+        cold_typo_seconds = timeit.timeit(cold_typo, number=LOOKUPS // 10)
+
+        print(
+            f"{keyword_count:>9} {exact / LOOKUPS * 1e6:>11.2f} {prefix / LOOKUPS * 1e6:>12.2f} "
+            f"{alias / LOOKUPS * 1e6:>11.2f} {typo / (LOOKUPS // 10) * 1e6:>10.2f} {cold_typo_seconds / (LOOKUPS // 10) * 1e6:>15.2f} "
+            f"{build_seconds * 1e3:>17.1f} {typo_build_seconds * 1e3:>16.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
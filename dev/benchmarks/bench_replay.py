@@ -0,0 +1,59 @@
+"""
+Bulk replay benchmark. Replays many scripted playthroughs of generated content with SessionPool.replay
+and reports turns per minute, with and without keeping the output text.
+
+Run from the project root:
+    python dev/benchmarks/bench_replay.py [script_count]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Item, Scene
+from interactive_engine.session_pool import SessionPool
+
+SCRIPT = [
+    "look scene", "take gem", "look thing1", "inv", "dance", "take gem",
+    "go north", "look scene", "take gem", "x thing2", "inventory", "go north",
+]
+
+def build_content() -> EngineContent:
+    """
+    Build a ring of ten rooms, each with a gem to take and a few things to look at
+
+    Returns:
+        content (EngineContent): The generated content
+    """
+    content = EngineContent()
+    for i in range(10):
+        scene = content.add_scene(Scene(name=f"Room {i}", text=f"You are in room {i}."))
+        next_room = f"Room {(i + 1) % 10}"
+        scene.add_action(ActionType.MOVE, "north", Action(on_action=lambda e,a,s,p,n=next_room: e.set_current_scene(n)))
+        for j in range(5):
+            scene.add_action(ActionType.LOOK, f"thing{j}", Action(on_action=lambda e,a,s,p: "Nothing special."))
+
+        item = content.add_item(Item(name="Gem", code="gem", description="A gem."))
+        def on_take(e, a, s, p, item=item):
+            p.add_inventory_items([item])
+            s.remove_action(a)
+            return "Taken."
+        scene.add_action(ActionType.TAKE, "gem", Action(on_action=on_take))
+    return content
+
+def main():
+    script_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    pool = SessionPool(build_content())
+    scripts = [SCRIPT] * script_count
+    turns = script_count * len(SCRIPT)
+
+    for output in (True, False):
+        start = time.perf_counter()
+        pool.replay(scripts, output=output)
+        elapsed = time.perf_counter() - start
+        print(f"output={output!s:<5} turns={turns:,} time={elapsed:.2f}s turns/min={turns / elapsed * 60:,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Scene bundle benchmark. Generates a very large content pack, then compares loading every scene up front
+with loading scenes lazily from the memory-mapped bundle, with and without a memory cap.
+
+Run from the project root:
+    python dev/benchmarks/bench_scene_bundle.py [scene_count]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from interactive_engine.content_pack import load_content_pack
+from interactive_engine.engine import InteractiveEngine
+
+def generate_pack(scene_count: int) -> dict:
+    """
+    Generate a ring of rooms with long descriptions, each with a gem to take and things to look at
+
+    Args:
+        scene_count (int): The number of rooms
+
+    Returns:
+        pack (dict): The content pack
+    """
+    scenes = {}
+    for i in range(scene_count):
+        actions = [
+            {'type': 'take', 'keyword': 'gem', 'text': "You take the gem.", 'set': {'gem_taken': True}, 'remove_self': True},
+            {'type': 'move', 'keyword': 'north', 'move': f"room{(i + 1) % scene_count}"},
+        ]
+        actions.extend({'type': 'look', 'keyword': f"thing{j}", 'text': f"Thing {j} of room {i}."} for j in range(10))
+        scenes[f"room{i}"] = {'text': f"You are in room {i}. " * 20, 'actions': actions}
+    return {'scenes': scenes}
+
+def measure(label: str, load) -> None:
+    """
+    Measures loading content and playing 200 turns through it
+
+    Args:
+        label (str): What is being measured
+        load (Callable[[], EngineContent]): Loads the content
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    content = load()
+    load_ms = (time.perf_counter() - start) * 1000
+
+    engine = InteractiveEngine(content)
+    engine.start()
+    start = time.perf_counter()
+    engine.run_many(["take gem", "go north"] * 100, output=False)
+    play_ms = (time.perf_counter() - start) * 1000
+
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} load: {load_ms:8.1f} ms  200 turns: {play_ms:6.1f} ms  memory: {current / 1024 / 1024:7.1f} MiB (peak {peak / 1024 / 1024:.1f} MiB)")
+
+def main():
+    scene_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "world.yaml")
+        with open(path, 'w', encoding='utf-8') as f:
+            yaml.dump(generate_pack(scene_count), f, Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper))
+
+        start = time.perf_counter()
+        load_content_pack(path)
+        print(f"scenes: {scene_count}, first load and compile: {(time.perf_counter() - start):.1f} s")
+
+        measure("eager", lambda: load_content_pack(path))
+        measure("lazy", lambda: load_content_pack(path, lazy=True))
+        measure("lazy, 64 KiB scene cap", lambda: load_content_pack(path, lazy=True, max_scene_bytes=64 * 1024))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Scheduler benchmark. Compares checking every timer each turn with the TurnScheduler heap, for a world with
+many timers of which only a few are due in any given turn.
+
+Run from the project root:
+    python dev/benchmarks/bench_scheduler.py [timer_count]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from interactive_engine.scheduler import TurnScheduler
+
+TURNS = 1000
+
+def main():
+    timer_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    callback = lambda engine: None
+    # Timers spread out over ten times as many turns as are played, so about one in ten is due
+    dues = [(i * 7919) % (TURNS * 10) + 1 for i in range(timer_count)]
+
+    def list_turns():
+        timers = list(dues)
+        for turn in range(1, TURNS + 1):
+            due = [timer for timer in timers if timer <= turn]
+            if due:
+                timers = [timer for timer in timers if timer > turn]
+
+    def scheduler_turns():
+        scheduler = TurnScheduler()
+        for due in dues:
+            scheduler.schedule(due, callback)
+        for turn in range(1, TURNS + 1):
+            if scheduler.next_due is not None and scheduler.next_due <= turn:
+                for _ in scheduler.pop_due(turn):
+                    pass
+
+    print(f"timers: {timer_count}, turns: {TURNS}")
+    for label, run in (("list scan", list_turns), ("TurnScheduler", scheduler_turns)):
+        seconds = min(timeit.repeat(run, number=1, repeat=3))
+        print(f"{label:<14} {seconds / TURNS * 1e6:8.2f} us per turn (including scheduling)")
+
+if __name__ == '__main__':
+    main()
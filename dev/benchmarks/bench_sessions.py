@@ -0,0 +1,78 @@
+"""
+Session pool benchmark. Opens many concurrent sessions on one shared EngineContent and reports the memory
+held by each session and the number of turns per second when the sessions are played round-robin.
+
+Run from the project root:
+    python dev/benchmarks/bench_sessions.py [session_count]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Item, Scene
+from interactive_engine.session_pool import SessionPool
+
+SCENE_COUNT = 50
+ACTIONS_PER_SCENE = 20
+TURN_ROUNDS = 5
+
+def build_content() -> EngineContent:
+    """
+    Build content with a ring of scenes, each with a handful of look and take actions
+
+    Returns:
+        content (EngineContent): The generated content
+    """
+    content = EngineContent()
+    for i in range(SCENE_COUNT):
+        scene = content.add_scene(Scene(name=f"Room {i}", text=f"You are in room {i}."))
+        next_room = f"Room {(i + 1) % SCENE_COUNT}"
+        scene.add_action(ActionType.MOVE, "north", Action(on_action=lambda e,a,s,p,n=next_room: e.set_current_scene(n)))
+
+        for j in range(ACTIONS_PER_SCENE):
+            scene.add_action(ActionType.LOOK, f"thing{j}", Action(on_action=lambda e,a,s,p: "Nothing special."))
+
+        item = content.add_item(Item(name=f"Gem {i}", code=f"gem{i}", description="A gem."))
+        def on_take(e, a, s, p, item=item):
+            p.add_inventory_items([item])
+            s.remove_action(a)
+            return "Taken."
+        scene.add_action(ActionType.TAKE, item.code, Action(on_action=on_take))
+    return content
+
+def main():
+    session_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    content = build_content()
+    pool = SessionPool(content)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    for _ in range(session_count):
+        pool.open_session()
+    open_seconds = time.perf_counter() - start
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    commands = ["look thing3", "take gem", "north", "look scene", "inv", "ta gem"]
+    session_ids = list(pool.session_ids())
+    turns = 0
+    start = time.perf_counter()
+    for round_number in range(TURN_ROUNDS):
+        for session_id in session_ids:
+            pool.run(session_id, commands[(turns + round_number) % len(commands)])
+            turns += 1
+    turn_seconds = time.perf_counter() - start
+
+    print(f"sessions:            {session_count}")
+    print(f"memory per session:  {(after - before) / session_count / 1024:.2f} KiB (on open, start scene copied)")
+    print(f"sessions opened/sec: {session_count / open_seconds:,.0f}")
+    print(f"turns:               {turns}")
+    print(f"turns/sec:           {turns / turn_seconds:,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Snapshot benchmark. Plays through a large generated world, then reports the snapshot size and how long
+creating and restoring it takes.
+
+Run from the project root:
+    python dev/benchmarks/bench_snapshots.py [scene_count]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Item, Scene
+from interactive_engine.engine import InteractiveEngine
+from interactive_engine.snapshots import create_snapshot, restore_snapshot
+
+def build_content(scene_count: int) -> EngineContent:
+    """
+    Build a chain of rooms, each with a gem to take and a few things to look at
+
+    Args:
+        scene_count (int): The number of rooms
+
+    Returns:
+        content (EngineContent): The generated content
+    """
+    content = EngineContent()
+    for i in range(scene_count):
+        scene = content.add_scene(Scene(name=f"Room {i}", text=f"You are in room {i}."))
+        next_room = f"Room {(i + 1) % scene_count}"
+        scene.add_action(ActionType.MOVE, "north", Action(on_action=lambda e,a,s,p,n=next_room: e.set_current_scene(n)))
+        for j in range(20):
+            scene.add_action(ActionType.LOOK, f"thing{j}", Action(on_action=lambda e,a,s,p: "Nothing special."))
+
+        item = content.add_item(Item(name="Gem", code=f"gem{i}", description="A gem."))
+        def on_take(e, a, s, p, item=item):
+            p.add_inventory_items([item])
+            s.state['gem_taken'] = True
+            s.text = "An empty room."
+            s.remove_action(a)
+            return "You take the gem."
+        scene.add_action(ActionType.TAKE, "gem", Action(on_action=on_take))
+    return content
+
+def main():
+    scene_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    content = build_content(scene_count)
+
+    engine = InteractiveEngine(content)
+    engine.start()
+    # Visit every other room and take the gem in every fourth
+    for i in range(scene_count // 2):
+        engine.run_many(["take gem", "go north", "go north"] if i % 2 == 0 else ["go north", "go north"], output=False)
+
+    rounds = 20
+    start = time.perf_counter()
+    for _ in range(rounds):
+        snapshot = create_snapshot(engine)
+    create_ms = (time.perf_counter() - start) / rounds * 1000
+
+    restored = InteractiveEngine(content)
+    restored.start()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        restore_snapshot(restored, snapshot)
+    restore_ms = (time.perf_counter() - start) / rounds * 1000
+
+    print(f"scenes: {scene_count}, visited: {len(engine.session_scenes())}, items held: {len(engine.player.inventory)}")
+    print(f"snapshot size: {len(snapshot) / 1024:.1f} KiB")
+    print(f"create: {create_ms:.2f} ms, restore: {restore_ms:.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Solver benchmark. Explores every state of a room with levers that can each be up or down (2^levers
+states), in this process and in a pool of worker processes.
+
+Run from the project root:
+    python dev/benchmarks/bench_solver.py [levers] [workers]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Scene, state_guard
+from interactive_engine.solver import SceneGoal, solve
+
+LEVERS = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+def build_content() -> EngineContent:
+    content = EngineContent()
+    hall = content.add_scene(Scene(name="Hall", text="A hall with levers."))
+    content.add_scene(Scene(name="Exit", text="You are out."))
+
+    def toggle(key):
+        def on_toggle(e, a, s, p):
+            if s.state.pop(key, False) is False:
+                s.state[key] = True
+            return "Clunk."
+        return on_toggle
+
+    for lever in range(LEVERS):
+        hall.add_action(ActionType.TOUCH, f"lever {lever}", Action(on_action=toggle(f"lever_{lever}")))
+    hall.add_action(ActionType.MOVE, "door", Action(
+        on_action=lambda e,a,s,p: e.set_current_scene("Exit"),
+        guards=[state_guard(f"lever_{lever}") for lever in range(LEVERS)]
+    ))
+    return content
+
+def main():
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    print(f"levers: {LEVERS}, states: {2 ** LEVERS + 1:,}")
+    for label, worker_count in (("in process", 0), (f"{workers} workers", workers)):
+        start = time.perf_counter()
+        result = solve(build_content, SceneGoal("Exit"), workers=worker_count)
+        seconds = time.perf_counter() - start
+        print(f"{label:<12} {seconds:7.2f}s  {result.states / seconds:10,.0f} states/s  solution: {len(result.solution)} commands")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+"""
+Load test of the WebSocket gateway. Simulated users each open a session and play turns with a random
+think time in between, and the p50 and p99 turn latency seen by the users is reported for every number
+of users. Unless a URL is given, the game is served by dev/serve.py in its own process, so the users
+don't compete with the server for its event loop. They still compete for the CPU when both run on the
+same machine, which shows in the latencies.
+
+Run from the project root:
+    python dev/benchmarks/load_websocket.py wizard_emergency:build_content [--users 1000 5000 10000] [--turns 20] [--output load.json]
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from websockets.asyncio.client import ClientConnection, connect
+from websockets.exceptions import ConnectionClosed
+
+from suite import environment
+
+RESULTS_SCHEMA = 1
+"""Version of the results format, bumped whenever its layout changes"""
+
+DEFAULT_COMMANDS = ("look scene", "inventory", "list actions", "help")
+"""Commands every game understands, played in turn by every user"""
+
+class Multiplexer:
+    """A client connection carrying the sessions of several users, matching replies to requests by their seq"""
+    def __init__(self, connection: ClientConnection):
+        self.connection = connection
+        """The connection"""
+
+        self._pending = {} # type: dict[int, asyncio.Future]
+        """The requests waiting for a reply, by seq"""
+
+        self._next_seq = 0
+        """Counter used to number the requests"""
+
+        self._reader = asyncio.create_task(self._read())
+        """The task that receives the replies"""
+
+    async def request(self, message: dict) -> dict:
+        """
+        Sends a request and waits for its reply
+
+        Args:
+            message (dict): The request, without a seq
+
+        Returns:
+            reply (dict): The first reply with the request's seq
+        """
+        self._next_seq += 1
+        seq = self._next_seq
+        future = self._pending[seq] = asyncio.get_running_loop().create_future()
+        await self.connection.send(json.dumps({**message, 'seq': seq}))
+        return await future
+
+    async def close(self) -> None:
+        """Closes the connection"""
+        await self.connection.close()
+        await self._reader
+
+    async def _read(self) -> None:
+        """Receives replies until the connection closes, then fails the requests still waiting"""
+        try:
+            async for message in self.connection:
+                reply = json.loads(message)
+                future = self._pending.pop(reply.get('seq'), None)
+                # Replies that follow the first, e.g. closed after the output of an exit, are dropped
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        except ConnectionClosed:
+            pass
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("The connection closed"))
+
+async def run_level(
+        url: str,
+        users: int,
+        users_per_connection: int,
+        turns: int,
+        think_time: float,
+        commands: list[str],
+        ramp: int,
+        seed: int
+    ) -> dict:
+    """
+    Connects a number of users, lets them play, and measures the latency of their turns
+
+    Args:
+        url (str): The URL of the gateway
+        users (int): The number of simulated users
+        users_per_connection (int): The number of users that share a connection
+        turns (int): The number of turns every user plays
+        think_time (float): The average number of seconds a user waits before each turn
+        commands (list[str]): The commands the users play in turn
+        ramp (int): The maximum number of connections and sessions opened at once
+        seed (int): The seed of the think times
+
+    Returns:
+        result (dict): The JSON result of the level
+    """
+    opening = asyncio.Semaphore(ramp)
+
+    async def open_connection() -> Multiplexer:
+        async with opening:
+            return Multiplexer(await connect(url, compression=None, open_timeout=60, ping_interval=None))
+
+    async def open_session(multiplexer: Multiplexer) -> str:
+        async with opening:
+            return (await multiplexer.request({'type': 'open'}))['session']
+
+    connect_start = time.perf_counter()
+    multiplexers = await asyncio.gather(*(open_connection() for _ in range(math.ceil(users / users_per_connection))))
+    sessions = await asyncio.gather(*(open_session(multiplexers[user // users_per_connection]) for user in range(users)))
+    connect_seconds = time.perf_counter() - connect_start
+
+    latencies = [] # type: list[float]
+    errors = 0
+
+    async def play(user: int) -> None:
+        nonlocal errors
+        multiplexer = multiplexers[user // users_per_connection]
+        rng = random.Random(f"{seed}/{user}")
+        for turn in range(turns):
+            await asyncio.sleep(rng.uniform(0, 2 * think_time))
+            start = time.perf_counter()
+            reply = await multiplexer.request({'type': 'run', 'session': sessions[user], 'command': commands[turn % len(commands)]})
+            if reply['type'] == 'output':
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+        await multiplexer.request({'type': 'close', 'session': sessions[user]})
+
+    play_start = time.perf_counter()
+    await asyncio.gather(*(play(user) for user in range(users)))
+    play_seconds = time.perf_counter() - play_start
+    await asyncio.gather(*(multiplexer.close() for multiplexer in multiplexers))
+
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [math.nan] * 99
+    return {
+        'users': users,
+        'connections': len(multiplexers),
+        'turns': len(latencies),
+        'errors': errors,
+        'connect_s': connect_seconds,
+        'turns_per_s': len(latencies) / play_seconds,
+        'p50_ms': quantiles[49] * 1000,
+        'p99_ms': quantiles[98] * 1000,
+        'max_ms': max(latencies, default=math.nan) * 1000,
+    }
+
+def raise_open_file_limit() -> None:
+    """Raises the open file limit as far as allowed, every user holds a socket. Child processes inherit it."""
+    try:
+        import resource
+    except ImportError:
+        # Windows has no such limit to raise
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+def start_server(content: str, port: int) -> tuple[subprocess.Popen, str]:
+    """
+    Serves the game with dev/serve.py and waits until it accepts WebSocket connections
+
+    Args:
+        content (str): The function that builds the content, as module:function
+        port (int): The WebSocket port, 0 to let the system pick one
+
+    Returns:
+        server (tuple[subprocess.Popen, str]): The server process and the URL of the gateway
+    """
+    serve_path = os.path.join(os.path.dirname(__file__), '..', 'serve.py')
+    process = subprocess.Popen(
+        [sys.executable, serve_path, content, '--port', '0', '--websocket-port', str(port)],
+        stderr=subprocess.PIPE, text=True
+    )
+    assert process.stderr is not None
+    for line in process.stderr:
+        sys.stderr.write(line)
+        if line.startswith("Serving on ws://"):
+            # Keep forwarding the server's errors, or it would block once the pipe is full
+            threading.Thread(target=sys.stderr.writelines, args=(process.stderr,), daemon=True).start()
+            return process, line.split()[-1]
+    process.wait()
+    raise ValueError(f"The server exited with code {process.returncode} before serving")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the WebSocket gateway")
+    parser.add_argument('content', nargs='?', help="The function that builds the content to serve, as module:function")
+    parser.add_argument('--url', help="Test a gateway that is already running instead")
+    parser.add_argument('--users', type=int, nargs='+', default=[1_000, 5_000, 10_000], help="The numbers of users to test")
+    parser.add_argument('--users-per-connection', type=int, default=1, help="Users that share a connection")
+    parser.add_argument('--turns', type=int, default=20, help="The number of turns every user plays")
+    parser.add_argument('--think-time', type=float, default=1.0, help="Average seconds a user waits before a turn")
+    parser.add_argument('--commands', default=','.join(DEFAULT_COMMANDS), help="Comma separated commands to play")
+    parser.add_argument('--ramp', type=int, default=100, help="Connections and sessions opened at once")
+    parser.add_argument('--seed', type=int, default=0, help="The seed of the think times")
+    parser.add_argument('--output', help="Write the JSON results to this file instead of stdout")
+    args = parser.parse_args()
+    if (args.content is None) == (args.url is None):
+        parser.error("Give either the content to serve or the --url of a running gateway")
+
+    raise_open_file_limit()
+    server = None # type: Optional[subprocess.Popen]
+    url = args.url
+    if url is None:
+        server, url = start_server(args.content, 0)
+
+    commands = [command.strip() for command in args.commands.split(',') if command.strip()]
+    results = []
+    try:
+        for users in args.users:
+            result = asyncio.run(run_level(
+                url, users, args.users_per_connection, args.turns, args.think_time, commands, args.ramp, args.seed
+            ))
+            results.append(result)
+            print(
+                f"{users:>7} users {result['connections']:>7} connections {result['turns_per_s']:10.1f} turns/s "
+                f"p50 {result['p50_ms']:9.2f} ms p99 {result['p99_ms']:9.2f} ms errors {result['errors']}",
+                file=sys.stderr
+            )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    settings = {
+        'users_per_connection': args.users_per_connection,
+        'turns': args.turns,
+        'think_time_s': args.think_time,
+        'commands': commands,
+    }
+    report = json.dumps({'schema': RESULTS_SCHEMA, 'environment': environment(), 'settings': settings, 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""
+Benchmark suite for the hot paths of the engine and console: running turns, resolving actions, merging
+action dictionaries and rendering the console window, each at growing sizes of synthetic content.
+Results are written as JSON, and can be compared against the results of an earlier run.
+
+Run from the project root:
+    python dev/benchmarks/suite.py [--output results.json] [--compare baseline.json] [--filter engine] [--quick]
+"""
+import argparse
+import contextlib
+import datetime
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from collections import namedtuple
+from typing import Callable, Iterator
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import synthetic
+from console.console_manager import ConsoleManager
+from interactive_engine.action_index import ActionIndex
+from interactive_engine.engine import InteractiveEngine
+from interactive_engine.instrumentation import TurnProfiler
+from interactive_engine.utils.get_action import get_action
+from utils.deep_merge import deep_merge
+
+RESULTS_SCHEMA = 1
+"""Version of the results format, bumped whenever its layout changes"""
+
+BenchmarkCase = namedtuple('BenchmarkCase', ['name', 'params', 'setup'])
+"""
+A tuple representing one benchmark at one size. The setup builds the inputs outside of the measurement and
+returns the function to time along with the number of operations one call of it performs.
+"""
+
+def engine_run_cases(quick: bool) -> Iterator[BenchmarkCase]:
+    """InteractiveEngine.run over a scripted mix of actions, moves and failing commands, with and without a profiler"""
+    sizes = [(10, 10, False), (10, 10, True), (100, 100, False)]
+    if not quick:
+        sizes += [(1_000, 100, False), (100, 5_000, False)]
+    for scene_count, actions_per_scene, profiled in sizes:
+        def setup(scene_count=scene_count, actions_per_scene=actions_per_scene, profiled=profiled):
+            engine = InteractiveEngine(synthetic.build_content(scene_count, actions_per_scene))
+            engine.start()
+            if profiled:
+                engine.profiler = TurnProfiler()
+            commands = synthetic.build_commands(actions_per_scene, 200)
+            def run():
+                for command in commands:
+                    engine.run(command)
+            return run, len(commands)
+        params = {'scenes': scene_count, 'actions_per_scene': actions_per_scene, 'profiled': profiled}
+        yield BenchmarkCase('engine.run', params, setup)
+
+def get_action_cases(quick: bool) -> Iterator[BenchmarkCase]:
+    """get_action on a merged action dictionary and on a compiled ActionIndex"""
+    for action_count in [10, 1_000] if quick else [10, 1_000, 10_000]:
+        for source in ('dict', 'index'):
+            def setup(action_count=action_count, source=source):
+                engine = InteractiveEngine(synthetic.build_content(1, action_count))
+                engine.start()
+                actions = engine.get_all_actions()
+                if source == 'index':
+                    actions = ActionIndex([engine.current_scene.actions, engine.player.actions, engine.content.system_actions])
+                commands = [f"look thing{(i * 7919) % action_count}" for i in range(100)] + ["take gem", "inventory"]
+                def run():
+                    for command in commands:
+                        get_action(command, actions)
+                return run, len(commands)
+            yield BenchmarkCase('get_action', {'actions': action_count, 'source': source}, setup)
+
+def deep_merge_cases(quick: bool) -> Iterator[BenchmarkCase]:
+    """deep_merge of three wide, partly overlapping dictionaries and of two deep trees"""
+    for width in [10, 1_000] if quick else [10, 1_000, 10_000]:
+        def setup(width=width):
+            layers = [synthetic.build_wide_dict(width, prefix) for prefix in ("scene", "player", "scene")]
+            return lambda: deep_merge(*layers), 1
+        yield BenchmarkCase('deep_merge.wide', {'width': width}, setup)
+
+    for depth in [4, 8] if quick else [4, 8, 12]:
+        def setup(depth=depth):
+            trees = [synthetic.build_deep_dict(depth, leaf=leaf) for leaf in range(2)]
+            return lambda: deep_merge(*trees), 1
+        yield BenchmarkCase('deep_merge.deep', {'depth': depth, 'fanout': 2}, setup)
+
+def console_cases(quick: bool) -> Iterator[BenchmarkCase]:
+    """ConsoleManager wrapping and window rendering at growing history sizes"""
+    console = ConsoleManager()
+    for word_count in [50, 500] if quick else [50, 500, 5_000]:
+        def setup(word_count=word_count):
+            text = synthetic.build_text(word_count)
+            return lambda: console._wrap_text_with_ansi(text, 76), 1
+        yield BenchmarkCase('console.wrap_text_with_ansi', {'words': word_count, 'width': 76}, setup)
+
+    for entry_count in [100, 1_000] if quick else [100, 1_000, 10_000]:
+        def setup(entry_count=entry_count):
+            lines = [entry.text for entry in synthetic.build_history(entry_count) if not entry.is_input]
+            def run():
+                # Clearing the terminal spawns a process, which would dwarf the rendering itself
+                with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+                    console._clear_console, clear_console = (lambda: None), console._clear_console
+                    try:
+                        console._print_console_window(lines, 80, 40)
+                    finally:
+                        console._clear_console = clear_console
+            return run, 1
+        yield BenchmarkCase('console.print_console_window', {'history': entry_count, 'width': 80, 'height': 40}, setup)
+
+SUITE = (engine_run_cases, get_action_cases, deep_merge_cases, console_cases) # type: tuple[Callable[[bool], Iterator[BenchmarkCase]], ...]
+"""Every benchmark in the suite"""
+
+def measure(case: BenchmarkCase, repeat: int) -> dict:
+    """
+    Times a benchmark case. The number of calls per measurement is calibrated to take at least 0.2
+    seconds, and the measurement is repeated to report the best and median time per operation.
+
+    Args:
+        case (BenchmarkCase): The case to time
+        repeat (int): The number of measurements
+
+    Returns:
+        result (dict): The JSON result of the case
+    """
+    run, operations = case.setup()
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    times = [seconds / (number * operations) for seconds in timer.repeat(repeat, number)]
+    return {
+        'name': case.name,
+        'params': case.params,
+        'operations': operations,
+        'number': number,
+        'repeat': repeat,
+        'min_s': min(times),
+        'median_s': statistics.median(times),
+        'ops_per_s': 1 / min(times),
+    }
+
+def environment() -> dict:
+    """Describes where the suite was run, so results from different machines and commits can be told apart"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+def case_key(result: dict) -> str:
+    """Identifies a case across runs by its name and parameters"""
+    return f"{result['name']} {json.dumps(result['params'], sort_keys=True)}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument('--output', help="Write the JSON results to this file instead of stdout")
+    parser.add_argument('--compare', help="Compare against the JSON results of an earlier run")
+    parser.add_argument('--filter', default='*', help="Only run benchmarks whose name matches this pattern")
+    parser.add_argument('--repeat', type=int, default=5, help="The number of measurements per case")
+    parser.add_argument('--quick', action='store_true', help="Only run the smaller sizes")
+    args = parser.parse_args()
+
+    pattern = args.filter if any(char in args.filter for char in '*?[') else f"*{args.filter}*"
+    baseline = {}
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = {case_key(result): result for result in json.load(f)['results']}
+
+    results = []
+    for cases in SUITE:
+        for case in cases(args.quick):
+            if not fnmatch.fnmatch(case.name, pattern):
+                continue
+            result = measure(case, args.repeat)
+            results.append(result)
+
+            line = f"{case_key(result):<72} {result['min_s'] * 1e6:12.2f} us"
+            previous = baseline.get(case_key(result))
+            if previous is not None:
+                line += f" {result['min_s'] / previous['min_s']:8.2f}x"
+            print(line, file=sys.stderr)
+
+    report = json.dumps({'schema': RESULTS_SCHEMA, 'environment': environment(), 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+if __name__ == '__main__':
+    main()
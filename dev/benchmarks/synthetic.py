@@ -0,0 +1,135 @@
+"""
+Synthetic content and input generators for the benchmark suite. Every generator is deterministic, so runs
+on different machines or commits measure the same work.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from console.console_manager import ConsoleEntry
+from console.console_styles import Colors
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Item, Scene
+
+WORDS = (
+    "the", "wizard", "tower", "crackles", "with", "arcane", "energy", "as", "a", "storm", "rolls", "over",
+    "misty", "expanse", "and", "your", "hat", "flaps", "in", "wind", "while", "distant", "bells", "ring",
+)
+"""Words that synthetic text is made of"""
+
+def build_content(scene_count: int, actions_per_scene: int) -> EngineContent:
+    """
+    Build a ring of scenes, each with a move to the next scene, a gem to take and the given number of
+    things to look at
+
+    Args:
+        scene_count (int): The number of scenes
+        actions_per_scene (int): The number of LOOK actions in each scene
+
+    Returns:
+        content (EngineContent): The generated content
+    """
+    content = EngineContent()
+    gem = content.add_item(Item(name="Gem", code="gem", description="A gem."))
+
+    def on_take(e, a, s, p):
+        p.add_inventory_items([gem])
+        s.remove_action(a)
+        return "Taken."
+
+    for i in range(scene_count):
+        scene = content.add_scene(Scene(name=f"Room {i}", text=f"You are in room {i}."), start=i == 0)
+        next_room = f"Room {(i + 1) % scene_count}"
+        scene.add_action(ActionType.MOVE, "north", Action(on_action=lambda e,a,s,p,n=next_room: e.set_current_scene(n)))
+        scene.add_action(ActionType.TAKE, "gem", Action(on_action=on_take))
+        for j in range(actions_per_scene):
+            scene.add_action(ActionType.LOOK, f"thing{j}", Action(on_action=lambda e,a,s,p: "Nothing special."))
+    return content
+
+def build_commands(actions_per_scene: int, count: int) -> list[str]:
+    """
+    Build a script for content from build_content that looks at things, takes gems, moves on, and mixes in
+    some commands that fail to parse
+
+    Args:
+        actions_per_scene (int): The number of LOOK actions in each scene of the content
+        count (int): The number of commands
+
+    Returns:
+        commands (list[str]): The commands
+    """
+    cycle = ["take gem", "inv", "look nothing", "go north", "dance"]
+    commands = []
+    for i in range(count):
+        if i % 8 < 5:
+            commands.append(f"look thing{(i * 7919) % actions_per_scene}")
+        else:
+            commands.append(cycle[i % len(cycle)])
+    return commands
+
+def build_wide_dict(width: int, prefix: str = "key") -> dict:
+    """
+    Build a flat dictionary of small dictionaries, like the actions of a scene
+
+    Args:
+        width (int): The number of keys
+        prefix (str): The prefix of the keys, so dictionaries can be built to partly overlap
+
+    Returns:
+        wide (dict): The dictionary
+    """
+    return {f"{prefix}{i}": {f"kw{j}": i * j for j in range(4)} for i in range(width)}
+
+def build_deep_dict(depth: int, fanout: int = 2, leaf: object = 0) -> dict:
+    """
+    Build a tree of nested dictionaries
+
+    Args:
+        depth (int): The number of nested levels
+        fanout (int): The number of children of every dictionary
+        leaf (object): The value at the bottom of the tree
+
+    Returns:
+        deep (dict): The dictionary
+    """
+    if depth == 0:
+        return {"leaf": leaf}
+    return {f"branch{i}": build_deep_dict(depth - 1, fanout, leaf) for i in range(fanout)}
+
+def build_text(word_count: int, styled: bool = True) -> str:
+    """
+    Build a paragraph of text, with some words styled with ANSI codes the way scene texts are
+
+    Args:
+        word_count (int): The number of words
+        styled (bool): Whether every seventh word is colored
+
+    Returns:
+        text (str): The text
+    """
+    words = []
+    for i in range(word_count):
+        word = WORDS[(i * 31) % len(WORDS)]
+        words.append(f"{Colors.GREEN}{word}{Colors.RESET}" if styled and i % 7 == 0 else word)
+    return ' '.join(words)
+
+def build_history(entry_count: int) -> list[ConsoleEntry]:
+    """
+    Build a console history of alternating inputs, scene texts and dinkus lines
+
+    Args:
+        entry_count (int): The number of entries
+
+    Returns:
+        history (list[ConsoleEntry]): The history
+    """
+    history = []
+    for i in range(entry_count):
+        if i % 3 == 0:
+            history.append(ConsoleEntry(f"look thing{i}", True, False))
+        elif i % 9 == 2:
+            history.append(ConsoleEntry('', False, True))
+        else:
+            history.append(ConsoleEntry(build_text(20 + i % 40), False, False))
+    return history
@@ -0,0 +1,53 @@
+"""
+Plays random sessions of a game to find crashes, hangs and broken invariants, and prints the shortest
+command sequence that reproduces each failure.
+
+Run from the project root:
+    python dev/fuzz.py wizard_emergency:build_content [--sessions 1000] [--turns 200] [--workers 4] [--seed 0]
+"""
+import argparse
+import importlib
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from interactive_engine.fuzzer import fuzz
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzz a game with random sessions")
+    parser.add_argument('content', help="The function that builds the content, as module:function")
+    parser.add_argument('--sessions', type=int, default=1000, help="The number of sessions to play")
+    parser.add_argument('--turns', type=int, default=200, help="The number of turns per session")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes, 0 for none")
+    parser.add_argument('--seed', type=int, default=0, help="The seed of the run")
+    parser.add_argument('--turn-timeout', type=float, default=1.0, help="Seconds a turn may take")
+    parser.add_argument('--junk-rate', type=float, default=0.2, help="The share of junk commands")
+    args = parser.parse_args()
+
+    module_name, function_name = args.content.split(':')
+    content_factory = getattr(importlib.import_module(module_name), function_name)
+
+    report = fuzz(
+        content_factory,
+        sessions=args.sessions,
+        turns=args.turns,
+        workers=args.workers,
+        seed=args.seed,
+        turn_timeout=args.turn_timeout,
+        junk_rate=args.junk_rate
+    )
+
+    print(f"sessions: {report.sessions:,}, turns: {report.turns:,}, {report.seconds:.2f}s "
+          f"({report.turns / report.seconds:,.0f} turns/s)")
+    for failure in report.failures:
+        print(f"\n{failure.kind.value}: {failure.signature}")
+        print(f"  {failure.message}")
+        print(f"  session {failure.session_seed} failed after {failure.turns} turns, reproduce with:")
+        for command in failure.commands:
+            print(f"  > {command[:80]!r}")
+    sys.exit(1 if report.failures else 0)
+
+if __name__ == '__main__':
+    main()
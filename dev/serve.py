@@ -0,0 +1,82 @@
+"""
+Serves a game to telnet clients, one session per connection, and optionally to browser clients over
+WebSocket from the same session pool. Prometheus metrics can be exposed as well.
+
+Run from the project root:
+    python dev/serve.py wizard_emergency:build_content [--host 0.0.0.0] [--port 2323] [--websocket-port 8765] [--metrics-port 9464]
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from interactive_engine.metrics import EngineMetrics, MetricsServer
+from interactive_engine.session_pool import SessionPool
+from interactive_engine.telnet_server import TelnetServer
+from interactive_engine.websocket_gateway import WebSocketGateway
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a game to telnet and WebSocket clients")
+    parser.add_argument('content', help="The function that builds the content, as module:function")
+    parser.add_argument('--host', default='127.0.0.1', help="The interface to listen on")
+    parser.add_argument('--port', type=int, default=2323, help="The port to listen on")
+    parser.add_argument('--max-connections', type=int, default=10_000, help="Connections above this are turned away")
+    parser.add_argument('--buffer-limit', type=int, default=64 * 1024, help="Bytes of unsent output per connection")
+    parser.add_argument('--drain-timeout', type=float, default=30.0, help="Seconds a client may take to read its output")
+    parser.add_argument('--idle-timeout', type=float, help="Seconds a client may stay silent, no limit by default")
+    parser.add_argument('--no-colors', action='store_true', help="Don't send ANSI styles")
+    parser.add_argument('--websocket-port', type=int, help="Serve WebSocket clients on this port as well")
+    parser.add_argument('--resume-timeout', type=float, default=300.0, help="Seconds a WebSocket session waits to be resumed")
+    parser.add_argument('--metrics-port', type=int, help="Serve Prometheus metrics on this port")
+    args = parser.parse_args()
+
+    module_name, function_name = args.content.split(':')
+    content = getattr(importlib.import_module(module_name), function_name)()
+
+    metrics = EngineMetrics() if args.metrics_port is not None else None
+    pool = SessionPool(content, setup=metrics.attach if metrics is not None else None)
+    if metrics is not None:
+        metrics.session_count = lambda: len(pool)
+        MetricsServer(metrics, args.host, args.metrics_port).start()
+
+    server = TelnetServer(
+        pool,
+        host=args.host,
+        port=args.port,
+        output_buffer_limit=args.buffer_limit,
+        drain_timeout=args.drain_timeout,
+        idle_timeout=args.idle_timeout,
+        max_connections=args.max_connections,
+        colors=not args.no_colors,
+        metrics=metrics,
+    )
+
+    gateway = None
+    if args.websocket_port is not None:
+        gateway = WebSocketGateway(
+            pool, host=args.host, port=args.websocket_port, resume_timeout=args.resume_timeout, metrics=metrics
+        )
+
+    async def serve():
+        await server.start()
+        host, port = server.address
+        print(f"Serving on telnet://{host}:{port}", file=sys.stderr)
+        if gateway is None:
+            await server.serve_forever()
+            return
+        await gateway.start()
+        host, port = gateway.address
+        print(f"Serving on ws://{host}:{port}", file=sys.stderr)
+        await asyncio.gather(server.serve_forever(), gateway.serve_forever())
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
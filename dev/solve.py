@@ -0,0 +1,47 @@
+"""
+Proves that a game can be won: explores every reachable world state and prints the shortest winning
+command sequence, along with any dead ends (states from which the game can no longer be won).
+
+Run from the project root:
+    python dev/solve.py wizard_emergency:build_content "Misty Expanse" [--workers 4] [--max-states N]
+"""
+import argparse
+import importlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from interactive_engine.solver import SceneGoal, solve
+
+def main():
+    parser = argparse.ArgumentParser(description="Prove that a game can be won")
+    parser.add_argument('content', help="The function that builds the content, as module:function")
+    parser.add_argument('goal_scenes', nargs='+', help="The scenes that win the game when entered")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes, 0 for none")
+    parser.add_argument('--max-states', type=int, default=None, help="Stop after this many states")
+    args = parser.parse_args()
+
+    module_name, function_name = args.content.split(':')
+    content_factory = getattr(importlib.import_module(module_name), function_name)
+
+    start = time.perf_counter()
+    result = solve(content_factory, SceneGoal(*args.goal_scenes), workers=args.workers, max_states=args.max_states)
+    seconds = time.perf_counter() - start
+
+    print(f"states: {result.states:,} ({'complete' if result.complete else 'stopped at --max-states'}), {seconds:.2f}s")
+    if result.solution is None:
+        print("No way to win was found.")
+    else:
+        print(f"Shortest solution ({len(result.solution)} commands):")
+        for command in result.solution:
+            print(f"  > {command}")
+
+    for dead_end in result.dead_ends:
+        print(f"Dead end: {' > '.join(dead_end) if dead_end else '(start)'}")
+    sys.exit(0 if result.solution is not None else 1)
+
+if __name__ == '__main__':
+    main()
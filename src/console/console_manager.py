@@ -2,6 +2,7 @@
 
 import os
 import re
+import sys
 from collections import namedtuple
 from typing import List, Optional
 
@@ -12,6 +13,102 @@ ConsoleEntry = namedtuple('ConsoleEntry', ['text', 'is_input', 'is_dinkus'])
 A tuple representing a console entry.
 """
 
+def wrap_text_with_ansi(text: str, width: int, strip_leading_whitespace: bool = True) -> list[str]:
+    """
+    Wraps text to the specified width while preserving ANSI escape sequences.
+    Words shorter than the width will not be broken apart.
+
+    Args:
+        text (str): The text to wrap (may contain ANSI codes).
+        width (int): The maximum visible width per line.
+        strip_leading_whitespace (bool): If True, strips leading whitespace from wrapped lines.
+
+    Returns:
+        list[str]: List of wrapped lines with ANSI codes preserved.
+    """
+    # Pattern to match ANSI escape sequences
+    ansi_pattern = re.compile(r'(\033\[[0-9;]*m)')
+
+    # Split text into segments (text and ANSI codes)
+    segments = ansi_pattern.split(text)
+
+    wrapped_lines = []
+    current_line = ''
+    current_line_visible_length = 0
+    active_styles = []  # Track currently active ANSI codes
+    skip_leading_whitespace = False  # Track if we should skip leading whitespace on this line
+
+    for segment in segments:
+        if ansi_pattern.match(segment):
+            # This is an ANSI code - add it without affecting visible length
+            current_line += segment
+            active_styles.append(segment)
+        else:
+            # This is visible text - split by words
+            words = re.split(r'(\s+)', segment)  # Split on whitespace, keeping delimiters
+
+            for word in words:
+                if not word:
+                    continue
+
+                # Skip leading whitespace at the start of a continuation line only
+                if strip_leading_whitespace and skip_leading_whitespace and current_line_visible_length == 0 and word.isspace():
+                    continue
+
+                word_length = len(word)
+
+                # If adding this word would exceed width
+                if current_line_visible_length + word_length > width:
+                    # If the word itself is longer than width, we must break it
+                    if word_length > width:
+                        # Add as much as we can to current line
+                        space_left = width - current_line_visible_length
+                        if space_left > 0:
+                            current_line += word[:space_left]
+                            word = word[space_left:]
+
+                        # Start a new line
+                        if current_line:
+                            wrapped_lines.append(current_line)
+                        current_line = ''.join(active_styles)
+                        current_line_visible_length = 0
+                        skip_leading_whitespace = True
+
+                        # Break remaining word across lines
+                        while len(word) > width:
+                            current_line += word[:width]
+                            wrapped_lines.append(current_line)
+                            word = word[width:]
+                            current_line = ''.join(active_styles)
+                            current_line_visible_length = 0
+                            skip_leading_whitespace = True
+
+                        # Add remaining part of word
+                        if word:
+                            current_line += word
+                            current_line_visible_length = len(word)
+                    else:
+                        # Word fits within width, so move to next line
+                        if current_line_visible_length > 0:
+                            wrapped_lines.append(current_line)
+                            current_line = ''.join(active_styles)
+                            current_line_visible_length = 0
+                            skip_leading_whitespace = True
+
+                        current_line += word
+                        current_line_visible_length = word_length
+                else:
+                    # Word fits on current line
+                    current_line += word
+                    current_line_visible_length += word_length
+
+    # Add the last line if it has content
+    if current_line_visible_length > 0 or current_line:
+        wrapped_lines.append(current_line)
+
+    return wrapped_lines if wrapped_lines else [text]
+
+
 class ConsoleManager:
     """
     Singleton class to manage console input/output operations and maintain a history of interactions.
@@ -46,6 +143,12 @@ class ConsoleManager:
     # Default input prompt prefix
     _input_prefix: str = '> '
 
+    # Width of the console window that was drawn last, None until one is drawn
+    _window_width: Optional[int] = None
+
+    # Number of lines printed below the bottom border of the console window that was drawn last
+    _lines_below_window: int = 0
+
     # --------- Constructor ---------
     def __new__(cls):
         """
@@ -376,6 +479,8 @@ class ConsoleManager:
         self._clear_console()
         for line in final_output:
             print(line)
+        self._window_width = width
+        self._lines_below_window = 0
 
     def _print_history_outputs(self) -> None:
         """
@@ -389,98 +494,9 @@ class ConsoleManager:
 
     def _wrap_text_with_ansi(self, text: str, width: int, strip_leading_whitespace: bool = True) -> list[str]:
         """
-        Wraps text to the specified width while preserving ANSI escape sequences.
-        Words shorter than the width will not be broken apart.
-
-        Args:
-            text (str): The text to wrap (may contain ANSI codes).
-            width (int): The maximum visible width per line.
-            strip_leading_whitespace (bool): If True, strips leading whitespace from wrapped lines.
-
-        Returns:
-            list[str]: List of wrapped lines with ANSI codes preserved.
+        Wraps text to the specified width while preserving ANSI escape sequences, see wrap_text_with_ansi.
         """
-        # Pattern to match ANSI escape sequences
-        ansi_pattern = re.compile(r'(\033\[[0-9;]*m)')
-
-        # Split text into segments (text and ANSI codes)
-        segments = ansi_pattern.split(text)
-
-        wrapped_lines = []
-        current_line = ''
-        current_line_visible_length = 0
-        active_styles = []  # Track currently active ANSI codes
-        skip_leading_whitespace = False  # Track if we should skip leading whitespace on this line
-
-        for segment in segments:
-            if ansi_pattern.match(segment):
-                # This is an ANSI code - add it without affecting visible length
-                current_line += segment
-                active_styles.append(segment)
-            else:
-                # This is visible text - split by words
-                words = re.split(r'(\s+)', segment)  # Split on whitespace, keeping delimiters
-
-                for word in words:
-                    if not word:
-                        continue
-
-                    # Skip leading whitespace at the start of a continuation line only
-                    if strip_leading_whitespace and skip_leading_whitespace and current_line_visible_length == 0 and word.isspace():
-                        continue
-
-                    word_length = len(word)
-
-                    # If adding this word would exceed width
-                    if current_line_visible_length + word_length > width:
-                        # If the word itself is longer than width, we must break it
-                        if word_length > width:
-                            # Add as much as we can to current line
-                            space_left = width - current_line_visible_length
-                            if space_left > 0:
-                                current_line += word[:space_left]
-                                word = word[space_left:]
-
-                            # Start a new line
-                            if current_line:
-                                wrapped_lines.append(current_line)
-                            current_line = ''.join(active_styles)
-                            current_line_visible_length = 0
-                            skip_leading_whitespace = True
-
-                            # Break remaining word across lines
-                            while len(word) > width:
-                                current_line += word[:width]
-                                wrapped_lines.append(current_line)
-                                word = word[width:]
-                                current_line = ''.join(active_styles)
-                                current_line_visible_length = 0
-                                skip_leading_whitespace = True
-
-                            # Add remaining part of word
-                            if word:
-                                current_line += word
-                                current_line_visible_length = len(word)
-                        else:
-                            # Word fits within width, so move to next line
-                            if current_line_visible_length > 0:
-                                wrapped_lines.append(current_line)
-                                current_line = ''.join(active_styles)
-                                current_line_visible_length = 0
-                                skip_leading_whitespace = True
-
-                            current_line += word
-                            current_line_visible_length = word_length
-                    else:
-                        # Word fits on current line
-                        current_line += word
-                        current_line_visible_length += word_length
-
-        # Add the last line if it has content
-        if current_line_visible_length > 0 or current_line:
-            wrapped_lines.append(current_line)
-
-        return wrapped_lines if wrapped_lines else [text]
+        return wrap_text_with_ansi(text, width, strip_leading_whitespace)
 
     # --------- Methods ---------
     def write(self, text: str, clear: bool = False, is_dinkus: bool = False, render: bool = True) -> None:
@@ -509,6 +525,28 @@ class ConsoleManager:
         # Record in history (after potential render so history reflects what was added)
         self._history.append(ConsoleEntry(text, False, is_dinkus))
 
+    def update_bottom_border_text(self, text: str) -> None:
+        """
+        Sets a new bottom border text and repaints only the bottom border of the console window that is on
+        screen, e.g. to update a counter without redrawing the whole window.
+
+        Args:
+            text (str): The new border text.
+        """
+        if text == self._bottom_border_text:
+            return
+        self._bottom_border_text = text
+
+        if self._window_width is None or not sys.stdout.isatty():
+            # Nothing to repaint, the text shows up the next time the window is drawn
+            return
+
+        # Save the cursor, move up to the bottom border, repaint it and restore the cursor
+        border = self._render_border_with_text(text, self._window_width)
+        lines_up = self._lines_below_window + 1
+        sys.stdout.write(f"\0337\033[{lines_up}A\r{border}\0338")
+        sys.stdout.flush()
+
     def write_empty(self, render: bool = True) -> None:
         """
         Writes an empty line to the console and records it in history.
@@ -519,12 +557,29 @@ class ConsoleManager:
         """
         self.write(" ", render=render)
 
-    def input(self, prompt: Optional[str] = None) -> str:
+    def render(self) -> None:
+        """
+        Draws the console window with the history, leaving room below it for the input line. Call it before
+        input with render set to False to do something around drawing the window, e.g. time it.
+        """
+        history_outputs = self._get_history_outputs()
+
+        # Adjust the height to account for the top border, bottom border, and two extra lines (empty line + input line)
+        console_width, console_height = self.get_console_size()
+        adjusted_height = console_height - 4
+
+        # Display previous outputs
+        lines_to_display = history_outputs[:]
+        self._print_console_window(lines_to_display, width=console_width, height=adjusted_height)
+
+    def input(self, prompt: Optional[str] = None, render: bool = True) -> str:
         """
         Prompts the user for input at the bottom of the console and records it in history
 
         Args:
             prompt (Optional[str]): Custom prompt to display. If None, uses input_prefix.
+            render (bool): If True (default), draws the console window first. If False, the window must
+                have been drawn with render.
 
         Returns:
             str: The user's input.
@@ -532,22 +587,16 @@ class ConsoleManager:
         if prompt is None:
             prompt = self.input_prefix
 
-        history_outputs = self._get_history_outputs()
-
-        # Adjust the height to account for the top border, bottom border, and two extra lines (empty line + input line)
-        console_width, console_height = self.get_console_size()
-        adjusted_height = console_height - 4
-
-        # Display previous outputs
-        lines_to_display = history_outputs[:]
-        self._print_console_window(lines_to_display, width=console_width, height=adjusted_height)
+        if render:
+            self.render()
 
         # Add an empty line between the border and the input
         # This is a special print because it takes place outside the bordered area
         print()
 
-        # Get and save the user's input
+        # Get and save the user's input. The empty line and the input line end up below the window.
         user_input = input(prompt)
+        self._lines_below_window += 2
         self._history.append(ConsoleEntry(user_input, True, False))
         return user_input
 
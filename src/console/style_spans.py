@@ -0,0 +1,92 @@
+import re
+from collections import namedtuple
+
+from console.console_styles import Codes
+
+StyleSpan = namedtuple('StyleSpan', ['start', 'end', 'styles'])
+"""
+A tuple representing a run of text with the same styles. Start and end are character offsets into the
+plain text, and the styles are names such as "bold" or "color_green", taken from the Codes they stand for.
+"""
+
+_ANSI_PATTERN = re.compile(r'\033\[([0-9;]*)m')
+"""Matches an ANSI style escape sequence, capturing its codes"""
+
+def _style_codes() -> dict[str, tuple[str, str]]:
+    """Maps every code that turns a style on to the slot it takes and the name of the style"""
+    styles = {}
+    for name, code in vars(Codes).items():
+        if name.startswith('_') or name.startswith('RESET') or name.endswith('_DEFAULT'):
+            continue
+        if name.startswith('BG_COLOR'):
+            slot = 'background'
+        elif name.startswith('COLOR'):
+            slot = 'foreground'
+        else:
+            slot = name.lower()
+        styles[code] = (slot, name.lower())
+    return styles
+
+_STYLES = _style_codes()
+"""The slot and name of every code that turns a style on. A foreground or background color replaces the one in its slot."""
+
+_RESETS = {
+    Codes.RESET_BOLD: ('bold', 'dim'),
+    Codes.RESET_ITALIC: ('italic',),
+    Codes.RESET_UNDERLINE: ('underline',),
+    Codes.RESET_BLINK: ('blink',),
+    Codes.RESET_REVERSE: ('reverse',),
+    Codes.RESET_HIDDEN: ('hidden',),
+    Codes.RESET_STRIKETHROUGH: ('strikethrough',),
+    Codes.COLOR_DEFAULT: ('foreground',),
+    Codes.BG_COLOR_DEFAULT: ('background',),
+} # type: dict[str, tuple[str, ...]]
+"""The slots every code that turns styles off clears. RESET clears all of them."""
+
+def to_style_spans(text: str) -> tuple[str, list[StyleSpan]]:
+    """
+    Splits text with ANSI styles into plain text and the spans of it that are styled, for clients that
+    style text themselves, e.g. a browser. Unknown codes are dropped.
+
+    Args:
+        text (str): The text with ANSI styles
+
+    Returns:
+        styled (tuple[str, list[StyleSpan]]): The plain text and its styled spans, in order
+    """
+    if '\033' not in text:
+        return text, []
+
+    plain = []
+    spans = [] # type: list[StyleSpan]
+    active = {} # type: dict[str, str]
+    position = 0
+    last_end = 0
+    for match in _ANSI_PATTERN.finditer(text):
+        position = _add_segment(text[last_end:match.start()], position, active, plain, spans)
+        last_end = match.end()
+        for code in (match.group(1) or Codes.RESET).split(';'):
+            if code == Codes.RESET or code == '':
+                active.clear()
+            elif code in _STYLES:
+                slot, name = _STYLES[code]
+                active[slot] = name
+            else:
+                for slot in _RESETS.get(code, ()):
+                    active.pop(slot, None)
+    _add_segment(text[last_end:], position, active, plain, spans)
+    return ''.join(plain), spans
+
+def _add_segment(segment: str, position: int, active: dict[str, str], plain: list[str], spans: list[StyleSpan]) -> int:
+    """Adds a segment of plain text and its span, merging it into the previous span if it has the same styles"""
+    if not segment:
+        return position
+    plain.append(segment)
+    end = position + len(segment)
+    if active:
+        styles = tuple(active.values())
+        if spans and spans[-1].end == position and spans[-1].styles == styles:
+            spans[-1] = spans[-1]._replace(end=end)
+        else:
+            spans.append(StyleSpan(position, end, styles))
+    return end
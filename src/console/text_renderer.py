@@ -0,0 +1,62 @@
+from console.console_manager import wrap_text_with_ansi
+from console.console_styles import Colors, remove_styles
+
+class TextRenderer:
+    """
+    Renders game output as plain scrolling text for a remote terminal, e.g. a telnet client. Unlike the
+    ConsoleManager, which redraws a bordered window on the local terminal and keeps one shared history,
+    a renderer only keeps the settings of one connection, so every connection can have its own.
+    """
+    def __init__(
+            self,
+            width: int = 80,
+            dinkus_char: str = '=',
+            dinkus_color: str = Colors.CYAN,
+            colors: bool = True,
+            newline: str = '\r\n'
+        ):
+        self.width = width
+        """The number of columns text is wrapped to"""
+
+        self.dinkus_char = dinkus_char
+        """The character used to draw dinkus lines"""
+
+        self.dinkus_color = dinkus_color
+        """The color of dinkus lines"""
+
+        self.colors = colors
+        """Whether ANSI styles are kept, some terminals can't display them"""
+
+        self.newline = newline
+        """The line separator, telnet requires CRLF"""
+
+    def render(self, text: str) -> str:
+        """
+        Wraps text to the width of the terminal, keeping its line breaks and ANSI styles
+
+        Args:
+            text (str): The text to render
+
+        Returns:
+            out (str): The rendered lines, each ending with a newline
+        """
+        if not self.colors:
+            text = remove_styles(text)
+        lines = []
+        for line in text.split('\n'):
+            lines.extend(wrap_text_with_ansi(line, self.width) if line else [''])
+        return self.newline.join(lines) + self.newline
+
+    def render_dinkus(self) -> str:
+        """
+        Renders a dinkus line of three equally spaced segments across the width of the terminal
+
+        Returns:
+            out (str): The dinkus line, ending with a newline
+        """
+        separator = '  '
+        segment = self.dinkus_char * max(1, (self.width - 2 - len(separator) * 2) // 3)
+        line = f" {segment}{separator}{segment}{separator}{segment} "
+        if self.colors:
+            line = f"{self.dinkus_color}{line}{Colors.RESET}"
+        return line + self.newline
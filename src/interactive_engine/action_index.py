@@ -0,0 +1,237 @@
+from typing import Iterator, Optional
+
+from interactive_engine.data_classes import Action, ActionType
+
+class ActionIndex:
+    """
+    Compiled dispatch index over a stack of action dictionaries (typically scene, player and system
+    actions). Layers are ordered from lowest to highest precedence and resolve exactly like
+    `deep_merge(*layers)` would, but the result is kept as a flat `(ActionType, keyword)` mapping that is
+    patched in place when a layer changes instead of being rebuilt every turn.
+    """
+    def __init__(self, layers: Optional[list[dict]] = None):
+        self._layers = list(layers) if layers else [] # type: list[dict]
+        """The action dictionaries that make up this index, lowest precedence first"""
+
+        self._direct = {} # type: dict[ActionType, Action]
+        """Actions that are triggered directly by their type (the target is ignored)"""
+
+        self._targeted = {} # type: dict[tuple[ActionType, str], Action]
+        """Actions that are triggered by a type and keyword"""
+
+        self._keywords = {} # type: dict[ActionType, set[str]]
+        """The set of resolved keywords for each action type"""
+
+        self.version = 0
+        """Incremented every time the resolved contents of the index change"""
+
+        self._type_versions = {} # type: dict[ActionType, int]
+        """The value of version when each action type last changed"""
+
+        self.rebuild()
+
+    def set_layers(self, layers: list[dict]) -> None:
+        """
+        Replaces the layers of the index and rebuilds it
+
+        Args:
+            layers (list[dict]): The action dictionaries to index, lowest precedence first
+        """
+        self._layers = list(layers)
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """
+        Rebuilds the whole index from the current layers
+        """
+        self._direct.clear()
+        self._targeted.clear()
+        self._keywords.clear()
+
+        action_types = set()
+        for layer in self._layers:
+            action_types.update(layer.keys())
+
+        self.version += 1
+        for action_type in action_types:
+            self._index_type(action_type)
+
+        # Every type changes on a rebuild, including ones that are no longer present
+        for action_type in ActionType:
+            self._type_versions[action_type] = self.version
+
+    def invalidate(self, action_type: ActionType, keyword: Optional[str] = None) -> None:
+        """
+        Patches the index after one of its layers changed. This method matches the action_listener_def
+        signature so it can be registered directly as a listener on a scene or player.
+
+        Args:
+            action_type (ActionType): The type of action that changed
+            keyword (Optional[str]): The keyword that changed, or None to re-index the whole action type
+        """
+        if keyword is None:
+            self._drop_type(action_type)
+            self._index_type(action_type)
+        else:
+            self._index_keyword(action_type, keyword)
+
+        self.version += 1
+        self._type_versions[action_type] = self.version
+
+    def type_version(self, action_type: ActionType) -> int:
+        """
+        Gets the version of the index when the given action type last changed. Useful for caches that
+        only depend on the keywords of a single action type.
+
+        Args:
+            action_type (ActionType): The type of action
+
+        Returns:
+            version (int): The version of the index when the action type last changed
+        """
+        return self._type_versions.get(action_type, 0)
+
+    def get(self, action_type: ActionType, keyword: str) -> Optional[Action]:
+        """
+        Gets the action for a type and keyword. Direct actions are returned regardless of the keyword.
+
+        Args:
+            action_type (ActionType): The type of action to get
+            keyword (str): The (lowercase) keyword of the action
+
+        Returns:
+            action (Optional[Action]): The matching action, or None if there isn't one
+        """
+        action = self._direct.get(action_type)
+        if action is None:
+            action = self._targeted.get((action_type, keyword))
+        return action
+
+    def has_type(self, action_type: ActionType) -> bool:
+        """
+        Checks if there are any actions of the given type
+
+        Args:
+            action_type (ActionType): The type of action to check for
+
+        Returns:
+            has_type (bool): True if at least one action of the type is available
+        """
+        return action_type in self._direct or bool(self._keywords.get(action_type))
+
+    def is_direct(self, action_type: ActionType) -> bool:
+        """
+        Checks if the given action type resolves to a single direct action that takes no target
+
+        Args:
+            action_type (ActionType): The type of action to check
+
+        Returns:
+            is_direct (bool): True if the action type is a direct action
+        """
+        return action_type in self._direct
+
+    def keywords(self, action_type: ActionType) -> frozenset[str]:
+        """
+        Gets all of the keywords available for an action type
+
+        Args:
+            action_type (ActionType): The type of action
+
+        Returns:
+            keywords (frozenset[str]): The available keywords, empty for direct or missing action types
+        """
+        return frozenset(self._keywords.get(action_type, ()))
+
+    def action_types(self) -> list[ActionType]:
+        """
+        Gets all action types that currently have at least one action
+
+        Returns:
+            action_types (list[ActionType]): The available action types
+        """
+        return [action_type for action_type in ActionType if self.has_type(action_type)]
+
+    def items(self) -> Iterator[tuple[ActionType, Optional[str], Action]]:
+        """
+        Iterates over every resolved action in the index
+
+        Returns:
+            items (Iterator[tuple[ActionType, Optional[str], Action]]): The type, keyword (None for direct
+                actions) and action of every entry
+        """
+        for action_type, action in self._direct.items():
+            yield action_type, None, action
+        for (action_type, keyword), action in self._targeted.items():
+            yield action_type, keyword, action
+
+    def __len__(self) -> int:
+        return len(self._direct) + len(self._targeted)
+
+    def _resolve_layers(self, action_type: ActionType) -> tuple[Optional[Action], list[dict]]:
+        """
+        Walks the layers from highest to lowest precedence to find what an action type resolves to.
+
+        Args:
+            action_type (ActionType): The type of action to resolve
+
+        Returns:
+            resolved (tuple[Optional[Action], list[dict]]): The direct action if the type resolves to one,
+                otherwise the action dictionaries that contribute keywords, highest precedence first
+        """
+        dicts = []
+        for layer in reversed(self._layers):
+            value = layer.get(action_type)
+            if value is None:
+                continue
+
+            if isinstance(value, dict):
+                dicts.append(value)
+            else:
+                # A direct action overrides everything below it, but is itself overridden by any
+                # dictionaries above it
+                if not dicts:
+                    return value, []
+                break
+
+        return None, dicts
+
+    def _drop_type(self, action_type: ActionType) -> None:
+        """Removes every entry for an action type"""
+        self._direct.pop(action_type, None)
+        for keyword in self._keywords.pop(action_type, ()):
+            del self._targeted[(action_type, keyword)]
+
+    def _index_type(self, action_type: ActionType) -> None:
+        """Adds every entry for an action type, assuming there are none yet"""
+        direct, dicts = self._resolve_layers(action_type)
+        if direct is not None:
+            self._direct[action_type] = direct
+            return
+
+        keywords = self._keywords.setdefault(action_type, set())
+        for action_dict in reversed(dicts):
+            for keyword, action in action_dict.items():
+                self._targeted[(action_type, keyword)] = action
+                keywords.add(keyword)
+
+    def _index_keyword(self, action_type: ActionType, keyword: str) -> None:
+        """Re-resolves a single keyword of an action type"""
+        direct, dicts = self._resolve_layers(action_type)
+        if direct is not None:
+            # The keyword is shadowed by a direct action, nothing to patch
+            return
+
+        action = None
+        for action_dict in dicts:
+            action = action_dict.get(keyword)
+            if action is not None:
+                break
+
+        keywords = self._keywords.setdefault(action_type, set())
+        if action is None:
+            self._targeted.pop((action_type, keyword), None)
+            keywords.discard(keyword)
+        else:
+            self._targeted[(action_type, keyword)] = action
+            keywords.add(keyword)
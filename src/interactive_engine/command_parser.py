@@ -0,0 +1,564 @@
+import itertools
+from collections import namedtuple
+from enum import Enum
+from typing import Optional
+
+from interactive_engine.action_index import ActionIndex
+from interactive_engine.data_classes import Action, ActionType
+from interactive_engine.grammar import DEFAULT_GRAMMAR, Grammar
+from interactive_engine.strings import SystemStrings
+from utils.fuzzy_index import FuzzyIndex
+from utils.prefix_trie import PrefixTrie, TrieNode
+
+DEFAULT_VERB_ALIASES = {
+    'l': ActionType.LOOK,
+    'x': ActionType.LOOK,
+    'examine': ActionType.LOOK,
+    'inspect': ActionType.LOOK,
+    'go': ActionType.MOVE,
+    'walk': ActionType.MOVE,
+    'enter': ActionType.MOVE,
+    'get': ActionType.TAKE,
+    'grab': ActionType.TAKE,
+    'pick': ActionType.TAKE,
+    'hear': ActionType.LISTEN,
+    'talk': ActionType.SPEAK,
+    'say': ActionType.SPEAK,
+    'feel': ActionType.TOUCH,
+    'i': ActionType.INVENTORY,
+    '?': ActionType.HELP,
+    'quit': ActionType.EXIT,
+    'q': ActionType.EXIT,
+} # type: dict[str, ActionType]
+"""Alternative verbs that are recognized in addition to the ActionType values themselves"""
+
+MAX_CANDIDATES = 5
+"""The maximum number of candidates reported for an ambiguous command"""
+
+SYMMETRIC_ACTION_TYPES = frozenset({ActionType.COMBINE})
+"""Action types whose pair keywords match their objects in either order ("combine a with b")"""
+
+MAX_TYPO_DISTANCE = 2
+"""The most typos that are corrected in a single word"""
+
+MAX_TYPO_COMBINATIONS = 64
+"""The maximum number of combinations of corrected words that are checked against the keywords"""
+
+SUGGESTED_ONLY_ACTION_TYPES = frozenset({
+    ActionType.HELP, ActionType.SAVE, ActionType.LOAD, ActionType.CONTINUE, ActionType.RESTART,
+    ActionType.UNDO, ActionType.LIST, ActionType.EXIT
+})
+"""
+System action types that a mistyped or shortened verb is never completed to, only suggested, as running one
+by mistake could overwrite a save, throw away progress or end the game. Their full verbs and aliases still run.
+"""
+
+def typo_distance(word: str) -> int:
+    """
+    Gets how many typos are corrected in a word of a given length. Short words are never corrected, since
+    almost any other short word is only a typo or two away.
+
+    Args:
+        word (str): The mistyped word
+
+    Returns:
+        distance (int): The largest edit distance to correct
+    """
+    if len(word) < 3:
+        return 0
+    return 1 if len(word) < 7 else MAX_TYPO_DISTANCE
+
+class ParseStatus(Enum):
+    """Enumeration of the possible outcomes of parsing a command."""
+    OK = "ok"
+    UNKNOWN_ACTION = "unknown_action"
+    AMBIGUOUS_ACTION = "ambiguous_action"
+    NO_ACTIONS_OF_TYPE = "no_actions_of_type"
+    UNKNOWN_TARGET = "unknown_target"
+    AMBIGUOUS_TARGET = "ambiguous_target"
+
+ParseResult = namedtuple(
+    'ParseResult',
+    ['status', 'action', 'action_type', 'verb', 'target', 'candidates', 'direct_object', 'indirect_object'],
+    defaults=(None, None)
+)
+"""
+A tuple representing the result of parsing a command. The action is only set when the status is OK, and
+candidates is only populated for ambiguous results. When the command resolves to a keyword, the direct and
+indirect objects of the keyword are set as well, e.g. "key" and "door" for "use the key with the door".
+"""
+
+class CommandParser:
+    """
+    Resolves raw input text to an Action using tries over the known verbs and the keywords of each action
+    type in an ActionIndex. Supports verb aliases and unambiguous prefixes ("inv", "ta hat"). Keyword
+    tries are rebuilt lazily, and only for action types whose keywords actually changed.
+
+    Targets that aren't a keyword as typed are parsed with a Grammar into a direct and an indirect object.
+    Keywords made with pair_keyword ("key on door") are indexed by their pair of objects, so any phrasing
+    of the pair resolves to them, e.g. "use the key with the door".
+
+    Verbs and targets that match nothing are corrected if they are a typo or two away from a single known
+    verb or keyword ("tkae hatt"). Targets are corrected word by word against the words of the keywords,
+    so the fuzzy indexes stay small no matter how long keywords are. They are only built once a typo needs
+    correcting.
+    """
+    _default_verbs = None # type: Optional[PrefixTrie]
+    """Verb trie for the default aliases, shared by every parser that doesn't customize its aliases"""
+
+    _default_fuzzy_verbs = None # type: Optional[FuzzyIndex]
+    """Fuzzy verb index for the default aliases, shared by every parser that doesn't customize its aliases"""
+
+    def __init__(
+            self,
+            action_index: ActionIndex,
+            verb_aliases: Optional[dict[str, ActionType]] = None,
+            correct_typos: bool = True,
+            grammar: Grammar = DEFAULT_GRAMMAR
+        ):
+        self.action_index = action_index
+        """The index of actions the parser resolves against"""
+
+        self._verb_aliases = verb_aliases
+        """Custom verb aliases, or None if this parser uses the shared default aliases"""
+
+        self._verbs = self._get_default_verbs() if verb_aliases is None else build_verb_trie(verb_aliases)
+        """Trie of every verb and verb alias, with the ActionType as the value"""
+
+        self._targets = {} # type: dict[ActionType, tuple[int, PrefixTrie]]
+        """Keyword tries for each action type, along with the index type version they were built from"""
+
+        self.grammar = grammar
+        """Splits targets into direct and indirect objects"""
+
+        self._phrases = {} # type: dict[ActionType, tuple[int, dict[tuple[str, str], str], dict[str, str]]]
+        """
+        Keywords of each action type by their pair of objects and, for keywords without an indirect object,
+        by their direct object. Stored along with the index type version they were built from.
+        """
+
+        self.correct_typos = correct_typos
+        """Whether verbs and targets that match nothing are corrected to the closest known one"""
+
+        self._fuzzy_verbs = None # type: Optional[FuzzyIndex]
+        """Fuzzy index of the custom verbs, or None if it hasn't been built yet"""
+
+        self._fuzzy_targets = {} # type: dict[ActionType, tuple[int, FuzzyIndex]]
+        """Fuzzy indexes of the keyword words for each action type, along with the index type version they were built from"""
+
+    def add_verb_alias(self, alias: str, action_type: ActionType) -> None:
+        """
+        Adds an alternative verb for an action type
+
+        Args:
+            alias (str): The alternative verb
+            action_type (ActionType): The action type the verb refers to
+        """
+        # Copy the aliases before changing them so the shared default trie is never modified
+        self._verb_aliases = dict(DEFAULT_VERB_ALIASES if self._verb_aliases is None else self._verb_aliases)
+        self._verb_aliases[alias.lower()] = action_type
+        self._verbs = build_verb_trie(self._verb_aliases)
+        self._fuzzy_verbs = None
+
+    def parse(self, in_text: str) -> ParseResult:
+        """
+        Parses an input string in a single pass over its characters. Never raises for bad input; the
+        status of the result describes what went wrong instead.
+
+        Args:
+            in_text (str): The raw input text
+
+        Returns:
+            result (ParseResult): The outcome of parsing the text
+        """
+        text = in_text.lower()
+        length = len(text)
+
+        # Skip leading whitespace
+        i = 0
+        while i < length and text[i].isspace():
+            i += 1
+
+        # Walk the verb trie until the first whitespace
+        verb_start = i
+        node = self._verbs.root # type: Optional[TrieNode]
+        while i < length and not text[i].isspace():
+            if node is not None:
+                node = node.children.get(text[i])
+            i += 1
+        verb = in_text[verb_start:i]
+
+        action_type, candidates = self._resolve_verb(node)
+        if action_type is None and not candidates and self.correct_typos:
+            action_type, candidates = self._correct_verb(text[verb_start:i])
+        if action_type is None:
+            status = ParseStatus.AMBIGUOUS_ACTION if candidates else ParseStatus.UNKNOWN_ACTION
+            return ParseResult(status, None, None, verb, '', candidates)
+
+        while i < length and text[i].isspace():
+            i += 1
+        target = in_text[i:].rstrip()
+
+        index = self.action_index
+        if index.is_direct(action_type):
+            # Direct actions ignore any target
+            return ParseResult(ParseStatus.OK, index.get(action_type, ''), action_type, verb, target, ())
+        if not index.has_type(action_type):
+            return ParseResult(ParseStatus.NO_ACTIONS_OF_TYPE, None, action_type, verb, target, ())
+
+        # Walk the keyword trie for the rest of the input, collapsing runs of whitespace
+        trie = self._get_targets(action_type)
+        node = trie.root
+        pending_space = False
+        while i < length and node is not None:
+            char = text[i]
+            i += 1
+            if char.isspace():
+                pending_space = True
+                continue
+
+            if pending_space:
+                node = node.children.get(' ')
+                pending_space = False
+                if node is None:
+                    break
+            node = node.children.get(char)
+
+        if node is None or node is trie.root:
+            return self._parse_phrase(action_type, verb, target)
+        return self._resolve_node(action_type, verb, target, trie, node)
+
+    def get_action(self, in_text: str) -> Action:
+        """
+        Parses an input string and returns the matching action
+
+        Args:
+            in_text (str): The raw input text
+
+        Returns:
+            action (Action): The matched Action, will throw an error if no single action is found
+        """
+        result = self.parse(in_text)
+        if result.status is not ParseStatus.OK:
+            raise ValueError(format_parse_error(result))
+        return result.action
+
+    @classmethod
+    def _get_default_verbs(cls) -> PrefixTrie:
+        """Gets the shared verb trie for the default aliases, building it the first time it is needed"""
+        if cls._default_verbs is None:
+            cls._default_verbs = build_verb_trie(DEFAULT_VERB_ALIASES)
+        return cls._default_verbs
+
+    def _resolve_verb(self, node: Optional[TrieNode]) -> tuple[Optional[ActionType], tuple[str, ...]]:
+        """
+        Resolves the node reached while walking the verb trie to an action type
+
+        Args:
+            node (Optional[TrieNode]): The node reached in the verb trie
+
+        Returns:
+            resolved (tuple[Optional[ActionType], tuple[str, ...]]): The resolved action type, or None
+                along with the candidate verbs if the verb is unknown, ambiguous or only completes to an
+                action type that is only suggested
+        """
+        if node is None or node is self._verbs.root:
+            return None, ()
+        if node.key is not None:
+            return node.value, ()
+
+        # Several verbs may share a prefix but refer to the same action type
+        action_types = {} # type: dict[ActionType, str]
+        for verb, action_type in self._verbs.items(node):
+            action_types.setdefault(action_type, verb)
+
+        # Prefer action types that are actually available right now
+        available = [action_type for action_type in action_types if self.action_index.has_type(action_type)]
+        resolved = None
+        if len(available) == 1:
+            resolved = available[0]
+        elif not available and len(action_types) == 1:
+            resolved = next(iter(action_types))
+        if resolved is not None:
+            # A shortened system verb is only suggested, like a mistyped one
+            if resolved in SUGGESTED_ONLY_ACTION_TYPES:
+                return None, (resolved.value,)
+            return resolved, ()
+
+        options = available or list(action_types)
+        return None, tuple(action_type.value for action_type in options[:MAX_CANDIDATES])
+
+    def _resolve_node(self, action_type: ActionType, verb: str, target: str, trie: PrefixTrie, node: TrieNode) -> ParseResult:
+        """
+        Resolves the node reached while walking a keyword trie to a keyword
+
+        Args:
+            action_type (ActionType): The type of action
+            verb (str): The verb as typed
+            target (str): The target as typed
+            trie (PrefixTrie): The keyword trie of the action type
+            node (TrieNode): The node reached in the keyword trie
+
+        Returns:
+            result (ParseResult): The matched keyword, or an ambiguous target result
+        """
+        # Exact keywords win over prefixes of longer keywords
+        match = node if node.key is not None else trie.complete(node)
+        if match is None:
+            candidates = tuple(
+                f"{action_type.value} {keyword}"
+                for keyword, _ in trie.items(node, limit=MAX_CANDIDATES)
+            )
+            return ParseResult(ParseStatus.AMBIGUOUS_TARGET, None, action_type, verb, target, candidates)
+        return self._keyword_result(action_type, verb, match.value)
+
+    def _keyword_result(self, action_type: ActionType, verb: str, keyword: str) -> ParseResult:
+        """Builds the result for a command that resolved to a keyword"""
+        phrase = self.grammar.parse_keyword(keyword)
+        return ParseResult(
+            ParseStatus.OK, self.action_index.get(action_type, keyword), action_type, verb, keyword, (),
+            phrase.direct, phrase.indirect
+        )
+
+    def _parse_phrase(self, action_type: ActionType, verb: str, target: str) -> ParseResult:
+        """
+        Resolves a target that isn't a keyword (or the prefix of one) as typed, by parsing it into a direct
+        and indirect object, and correcting typos if that fails too
+
+        Args:
+            action_type (ActionType): The type of action
+            verb (str): The verb as typed
+            target (str): The target as typed
+
+        Returns:
+            result (ParseResult): The outcome of parsing the target
+        """
+        words = target.lower().split()
+        keyword = self._match_words(action_type, words)
+        if keyword is not None:
+            return self._keyword_result(action_type, verb, keyword)
+
+        # Allow prefixes once articles and the like are dropped ("take the ha")
+        phrase = self.grammar.parse(words)
+        if phrase.indirect is None and phrase.direct and phrase.direct != ' '.join(words):
+            trie = self._get_targets(action_type)
+            node = trie.find(phrase.direct)
+            if node is not None:
+                return self._resolve_node(action_type, verb, target, trie, node)
+
+        if self.correct_typos:
+            return self._correct_target(action_type, verb, target)
+        return ParseResult(ParseStatus.UNKNOWN_TARGET, None, action_type, verb, target, ())
+
+    def _match_words(self, action_type: ActionType, words: list[str]) -> Optional[str]:
+        """
+        Finds the keyword with the same direct and indirect objects as the given words. Objects that aren't
+        known are matched by their longest known ending, so descriptive words can be left in front of a
+        noun ("the rusty key"). Two objects without a preposition between them ("key door") match a pair
+        keyword too.
+
+        Args:
+            action_type (ActionType): The type of action
+            words (list[str]): The lowercase words of the target
+
+        Returns:
+            keyword (Optional[str]): The matching keyword, or None if there isn't one
+        """
+        phrase = self.grammar.parse(words)
+        pairs, objects = self._get_phrases(action_type)
+        if phrase.indirect is not None:
+            return self._match_pair(action_type, pairs, phrase.direct, phrase.indirect)
+
+        for direct in _endings(phrase.direct):
+            keyword = objects.get(direct)
+            if keyword is not None:
+                return keyword
+
+        # Try every split of juxtaposed objects, e.g. "use key door" for "use key on door"
+        nouns = phrase.direct.split()
+        if not pairs or len(nouns) < 2:
+            return None
+        for i in range(1, len(nouns)):
+            keyword = self._match_pair(action_type, pairs, ' '.join(nouns[:i]), ' '.join(nouns[i:]))
+            if keyword is not None:
+                return keyword
+        return None
+
+    def _match_pair(self, action_type: ActionType, pairs: dict[tuple[str, str], str], direct: str, indirect: str) -> Optional[str]:
+        """Finds the pair keyword of a direct and indirect object, matching each by its longest known ending"""
+        for direct_ending in _endings(direct):
+            for indirect_ending in _endings(indirect):
+                keyword = pairs.get((direct_ending, indirect_ending))
+                if keyword is None and action_type in SYMMETRIC_ACTION_TYPES:
+                    keyword = pairs.get((indirect_ending, direct_ending))
+                if keyword is not None:
+                    return keyword
+        return None
+
+    def _get_phrases(self, action_type: ActionType) -> tuple[dict[tuple[str, str], str], dict[str, str]]:
+        """
+        Gets the keywords of an action type by their objects, rebuilding them if the keywords changed
+
+        Args:
+            action_type (ActionType): The type of action
+
+        Returns:
+            phrases (tuple[dict[tuple[str, str], str], dict[str, str]]): The keywords by their pair of
+                objects, and the keywords without an indirect object by their direct object
+        """
+        version = self.action_index.type_version(action_type)
+        cached = self._phrases.get(action_type)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+
+        pairs = {} # type: dict[tuple[str, str], str]
+        objects = {} # type: dict[str, str]
+        for keyword in sorted(self.action_index.keywords(action_type)):
+            phrase = self.grammar.parse_keyword(keyword)
+            if phrase.indirect is None:
+                objects.setdefault(phrase.direct, keyword)
+            else:
+                pairs.setdefault((phrase.direct, phrase.indirect), keyword)
+
+        self._phrases[action_type] = (version, pairs, objects)
+        return pairs, objects
+
+    def _correct_verb(self, verb: str) -> tuple[Optional[ActionType], tuple[str, ...]]:
+        """
+        Corrects a verb that matches nothing to the closest known verbs
+
+        Args:
+            verb (str): The lowercase verb
+
+        Returns:
+            resolved (tuple[Optional[ActionType], tuple[str, ...]]): The action type if the closest verbs
+                all refer to one that isn't only suggested, otherwise None along with the candidate verbs
+        """
+        if self._verb_aliases is None:
+            if CommandParser._default_fuzzy_verbs is None:
+                CommandParser._default_fuzzy_verbs = FuzzyIndex(self._verbs.items(), MAX_TYPO_DISTANCE)
+            fuzzy_verbs = CommandParser._default_fuzzy_verbs
+        else:
+            if self._fuzzy_verbs is None:
+                self._fuzzy_verbs = FuzzyIndex(self._verbs.items(), MAX_TYPO_DISTANCE)
+            fuzzy_verbs = self._fuzzy_verbs
+
+        action_types = {} # type: dict[ActionType, str]
+        for _, key, action_type in fuzzy_verbs.lookup(verb, typo_distance(verb)):
+            action_types.setdefault(action_type, key)
+
+        if len(action_types) == 1 and next(iter(action_types)) not in SUGGESTED_ONLY_ACTION_TYPES:
+            return next(iter(action_types)), ()
+        return None, tuple(action_type.value for action_type in list(action_types)[:MAX_CANDIDATES])
+
+    def _correct_target(self, action_type: ActionType, verb: str, target: str) -> ParseResult:
+        """
+        Corrects a target that matches no keyword to the closest keywords of the action type
+
+        Args:
+            action_type (ActionType): The type of action
+            verb (str): The verb as typed
+            target (str): The target as typed
+
+        Returns:
+            result (ParseResult): The corrected result, or an unknown or ambiguous target result
+        """
+        version = self.action_index.type_version(action_type)
+        cached = self._fuzzy_targets.get(action_type)
+        if cached is None or cached[0] != version:
+            keywords = self.action_index.keywords(action_type)
+            words = FuzzyIndex(
+                ((word, None) for keyword in keywords for word in keyword.lower().split()),
+                MAX_TYPO_DISTANCE
+            )
+            cached = self._fuzzy_targets[action_type] = (version, words)
+        words = cached[1]
+
+        # Find the closest known words for each word of the target, leaving articles and the like alone
+        options = [] # type: list[tuple[str, ...]]
+        for word in target.lower().split():
+            if word in words or self.grammar.is_function_word(word):
+                options.append((word,))
+                continue
+
+            matches = words.lookup(word, typo_distance(word))
+            if not matches:
+                return ParseResult(ParseStatus.UNKNOWN_TARGET, None, action_type, verb, target, ())
+            options.append(tuple(key for _, key, _ in matches))
+
+        corrected = [] # type: list[str]
+        for combination in itertools.islice(itertools.product(*options), MAX_TYPO_COMBINATIONS):
+            keyword = self._match_words(action_type, list(combination))
+            if keyword is not None and keyword not in corrected:
+                corrected.append(keyword)
+
+        if len(corrected) == 1:
+            return self._keyword_result(action_type, verb, corrected[0])
+        if corrected:
+            candidates = tuple(f"{action_type.value} {keyword}" for keyword in corrected[:MAX_CANDIDATES])
+            return ParseResult(ParseStatus.AMBIGUOUS_TARGET, None, action_type, verb, target, candidates)
+        return ParseResult(ParseStatus.UNKNOWN_TARGET, None, action_type, verb, target, ())
+
+    def _get_targets(self, action_type: ActionType) -> PrefixTrie:
+        """
+        Gets the keyword trie for an action type, rebuilding it if the keywords changed since it was built
+
+        Args:
+            action_type (ActionType): The type of action
+
+        Returns:
+            trie (PrefixTrie): The keyword trie for the action type
+        """
+        version = self.action_index.type_version(action_type)
+        cached = self._targets.get(action_type)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        trie = PrefixTrie(
+            (' '.join(keyword.lower().split()), keyword)
+            for keyword in sorted(self.action_index.keywords(action_type))
+        )
+        self._targets[action_type] = (version, trie)
+        return trie
+
+def _endings(phrase: str) -> list[str]:
+    """Gets a phrase followed by each of its endings, longest first, e.g. "rusty key" then "key"."""
+    words = phrase.split(' ')
+    return [' '.join(words[i:]) for i in range(len(words))]
+
+def build_verb_trie(verb_aliases: dict[str, ActionType]) -> PrefixTrie:
+    """
+    Builds a trie of every action type value plus the given aliases
+
+    Args:
+        verb_aliases (dict[str, ActionType]): Alternative verbs for the action types
+
+    Returns:
+        trie (PrefixTrie): Trie with the verbs as keys and their ActionType as the value
+    """
+    trie = PrefixTrie(
+        (action_type.value, action_type)
+        for action_type in ActionType
+        if action_type is not ActionType.EMPTY
+    )
+    for alias, action_type in verb_aliases.items():
+        trie.insert(alias.lower(), action_type)
+    return trie
+
+def format_parse_error(result: ParseResult) -> str:
+    """
+    Formats a failed ParseResult into a message for the player
+
+    Args:
+        result (ParseResult): The failed result
+
+    Returns:
+        message (str): The message describing why the command failed
+    """
+    if result.status is ParseStatus.UNKNOWN_ACTION:
+        return SystemStrings.MISSING_ACTION_TEXT + f" (Unknown action: {result.verb})"
+    if result.status is ParseStatus.NO_ACTIONS_OF_TYPE:
+        return SystemStrings.MISSING_ACTION_TEXT + f" (No actions of type: {result.action_type.value})"
+    if result.status is ParseStatus.UNKNOWN_TARGET:
+        return SystemStrings.MISSING_ACTION_TEXT + f" (No action found for target: {result.target})"
+    return SystemStrings.AMBIGUOUS_ACTION_TEXT.format(options=', '.join(result.candidates))
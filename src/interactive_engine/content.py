@@ -0,0 +1,302 @@
+import zlib
+from collections.abc import Mapping
+from typing import Callable, Optional
+
+from interactive_engine.data_classes import Action, ActionType, Item, Player, Scene
+from interactive_engine.scheduler import timer_callback_def
+from interactive_engine.strings import SystemStrings
+
+player_factory_def = Callable[[], Player]
+"""
+Type alias for the callable signature used to create a new player for each session.
+"""
+
+def _save(e, a, s, p) -> str:
+    """The on_action of SAVE. Sessions outside of the content's scenes or with unsaveable changes can't be saved."""
+    try:
+        return e.save()
+    except (ValueError, OSError):
+        return SystemStrings.SAVE_FAILED_TEXT
+
+def _load(e, a, s, p, latest: bool = False) -> str:
+    """The on_action of LOAD and CONTINUE. Corrupted snapshots and snapshots of other content can't be loaded."""
+    try:
+        return e.load(latest=latest)
+    except (ValueError, KeyError, OSError):
+        return SystemStrings.LOAD_FAILED_TEXT
+
+def _restart(e, a, s, p) -> str:
+    """The on_action of RESTART. Content without a start scene can't be restarted."""
+    try:
+        return e.restart()
+    except ValueError:
+        return SystemStrings.RESTART_FAILED_TEXT
+
+class EngineContent:
+    """
+    Shared, read-mostly game content: scene templates, items and system actions. Content is loaded once
+    and shared by every InteractiveEngine session created from it. Sessions never modify the scene
+    templates directly, they work on their own lazily created copies instead.
+    """
+    def __init__(self, player_factory: player_factory_def = Player):
+        self.scenes = {} # type: dict[str, Scene]|Mapping[str, Scene]
+        """
+        Scene templates, keyed by scene name. Very large content can replace this with a mapping that loads
+        scenes on demand, see scene_bundle.LazySceneMap.
+        """
+
+        self.items = {} # type: dict[str, Item]
+        """Items that can appear in the game, keyed by item code"""
+
+        self.actions = {} # type: dict[str, Action]
+        """
+        Actions that are created at runtime rather than being part of a scene template, keyed by a unique
+        code. Registering them lets snapshots refer to them.
+        """
+
+        self.timers = {} # type: dict[str, timer_callback_def]
+        """
+        Callbacks of scheduled events, keyed by a unique code. Registering them lets snapshots refer to the
+        events that are still scheduled.
+        """
+
+        self.start_scene_name = None # type: Optional[str]
+        """The name of the scene new sessions start in"""
+
+        self.player_factory = player_factory
+        """Callable used to create the player for each new session"""
+
+        self.system_actions = {
+            ActionType.HELP: Action(
+                action_type=ActionType.HELP,
+                on_action=lambda e,a,s,p: SystemStrings.HELP_TEXT
+            ),
+            ActionType.EXIT: Action(
+                action_type=ActionType.EXIT,
+                on_action=lambda e,a,s,p: SystemStrings.EXIT_TEXT
+            ),
+            ActionType.SAVE: Action(
+                action_type=ActionType.SAVE,
+                on_action=_save
+            ),
+            ActionType.LOAD: Action(
+                action_type=ActionType.LOAD,
+                on_action=_load
+            ),
+            ActionType.CONTINUE: Action(
+                action_type=ActionType.CONTINUE,
+                on_action=lambda e,a,s,p: _load(e, a, s, p, latest=True)
+            ),
+            ActionType.RESTART: Action(
+                action_type=ActionType.RESTART,
+                on_action=_restart
+            ),
+            ActionType.UNDO: Action(
+                action_type=ActionType.UNDO,
+                on_action=lambda e,a,s,p: e.undo()
+            ),
+            ActionType.LIST: {
+                'actions': Action(
+                    action_type=ActionType.LIST,
+                    on_action=lambda e,a,s,p: e.list_actions()
+                )
+            }
+        } # type: dict[ActionType, Action|dict[str, Action]]
+        """System-wide actions that are available in every scene of every session"""
+
+        self.system_actions_version = 0
+        """Incremented whenever the system actions are replaced, so sessions know to re-index them"""
+
+        self._action_refs = None # type: Optional[dict[int, tuple]]
+        """Cache mapping action ids to snapshot references, built on first use"""
+
+        self._fingerprint = None # type: Optional[int]
+        """Cached content fingerprint, built on first use"""
+
+    def add_scene(self, scene: Scene, start: bool = False) -> Scene:
+        """
+        Adds a scene template to the content
+
+        Args:
+            scene (Scene): The scene to add
+            start (bool): If True, new sessions will start in this scene. The first scene added is the
+                start scene by default.
+
+        Returns:
+            scene (Scene): The scene that was added
+        """
+        if isinstance(self.scenes, dict):
+            self.scenes[scene.name] = scene
+        else:
+            self.scenes.add_scene(scene)
+        self._invalidate_caches()
+        if start or self.start_scene_name is None:
+            self.start_scene_name = scene.name
+        return scene
+
+    def get_scene(self, name: str) -> Scene:
+        """
+        Gets a scene template by name
+
+        Args:
+            name (str): The name of the scene
+
+        Returns:
+            scene (Scene): The scene template, will throw an error if there is no scene with the name
+        """
+        scene = self.scenes.get(name)
+        if scene is None:
+            raise KeyError(f"No scene named: {name}")
+        return scene
+
+    def is_template(self, scene: Scene) -> bool:
+        """
+        Checks if a scene object is one of the shared scene templates
+
+        Args:
+            scene (Scene): The scene to check
+
+        Returns:
+            is_template (bool): True if the scene is a template owned by this content
+        """
+        return self.scenes.get(scene.name) is scene
+
+    def add_item(self, item: Item) -> Item:
+        """
+        Adds an item to the content
+
+        Args:
+            item (Item): The item to add
+
+        Returns:
+            item (Item): The item that was added
+        """
+        self.items[item.code] = item
+        self._invalidate_caches()
+        return item
+
+    def register_action(self, code: str, action: Action) -> Action:
+        """
+        Registers an action that is added to scenes at runtime, so that snapshots can refer to it
+
+        Args:
+            code (str): A code that uniquely identifies the action
+            action (Action): The action to register
+
+        Returns:
+            action (Action): The action that was registered
+        """
+        self.actions[code] = action
+        self._invalidate_caches()
+        return action
+
+    def register_timer(self, code: str, callback: timer_callback_def) -> timer_callback_def:
+        """
+        Registers the callback of scheduled events, so that snapshots can refer to the events
+
+        Args:
+            code (str): A code that uniquely identifies the callback
+            callback (timer_callback_def): The callback to register
+
+        Returns:
+            callback (timer_callback_def): The callback that was registered
+        """
+        self.timers[code] = callback
+        self._invalidate_caches()
+        return callback
+
+    def find_timer_code(self, callback: timer_callback_def) -> Optional[str]:
+        """
+        Finds the code a scheduled event callback was registered with
+
+        Args:
+            callback (timer_callback_def): The callback to find
+
+        Returns:
+            code (Optional[str]): The code, or None if the callback is not registered
+        """
+        for code, timer in self.timers.items():
+            if timer is callback:
+                return code
+        return None
+
+    def find_action_ref(self, action: Action) -> Optional[tuple]:
+        """
+        Finds a serializable reference to an action that is either registered or part of a scene template
+
+        Args:
+            action (Action): The action to find
+
+        Returns:
+            ref (Optional[tuple]): ("r", code) for registered actions, ("s", scene, type, keyword) for scene
+                template actions, or None if the action is not part of the content
+        """
+        # Actions that know their own reference, like those from content packs, need no lookup
+        ref = getattr(action.on_action, 'action_ref', None)
+        if ref is not None:
+            return ref
+
+        if self._action_refs is None:
+            refs = {}
+            # Scanning lazily loaded scenes would load all of them
+            for name, scene in (self.scenes.items() if isinstance(self.scenes, dict) else ()):
+                for action_type, actions in scene.actions.items():
+                    for keyword, scene_action in actions.items():
+                        refs.setdefault(id(scene_action), ('s', name, action_type.value, keyword))
+            # Registered actions win, since their codes are stable across content changes
+            for code, registered_action in self.actions.items():
+                refs[id(registered_action)] = ('r', code)
+            self._action_refs = refs
+
+        return self._action_refs.get(id(action))
+
+    def fingerprint(self) -> int:
+        """
+        Gets a checksum of the content's structure, used to detect snapshots made for different content
+
+        Returns:
+            fingerprint (int): The 32 bit fingerprint
+        """
+        if self._fingerprint is None:
+            parts = []
+            if isinstance(self.scenes, dict):
+                for name in sorted(self.scenes):
+                    parts.append(name)
+                    for action_type, actions in sorted(self.scenes[name].actions.items(), key=lambda i: i[0].value):
+                        parts.extend(f"{action_type.value}:{keyword}" for keyword in sorted(actions))
+            else:
+                # Lazily loaded scenes identify their contents without loading them
+                parts.append(self.scenes.fingerprint)
+            parts.extend(sorted(self.items))
+            parts.extend(sorted(self.actions))
+            parts.extend(sorted(self.timers))
+            self._fingerprint = zlib.crc32('\0'.join(parts).encode('utf-8'))
+
+        return self._fingerprint
+
+    def _invalidate_caches(self) -> None:
+        """Clears caches derived from the scenes, items, registered actions and timers"""
+        self._action_refs = None
+        self._fingerprint = None
+
+    def set_system_action(self, action: Action) -> None:
+        """
+        Sets a system-wide action that can be used in any scene of any session
+
+        Args:
+            action (Action): The action to set as a system action
+        """
+        if action.action_type is None:
+            raise ValueError("System action must have an action_type set")
+
+        self.system_actions[action.action_type] = action
+        self.system_actions_version += 1
+
+    def new_player(self) -> Player:
+        """
+        Creates the player for a new session
+
+        Returns:
+            player (Player): The new player
+        """
+        return self.player_factory()
@@ -0,0 +1,590 @@
+import hashlib
+import os
+import sys
+from typing import Optional
+
+import toml
+import yaml
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Item, Player, Scene, SceneText, TextRule
+from interactive_engine.scene_bundle import LazySceneMap, SceneBundleReader, write_scene_bundle
+
+PACK_COMPILER_VERSION = 3
+"""Version of the bundle layout, bumped whenever compile_content_pack changes its output"""
+
+PACK_CACHE_DIR = '__packcache__'
+"""Name of the directory compiled bundles are cached in, next to the content pack by default"""
+
+SCENE_ACTION_TYPES = (
+    ActionType.MOVE, ActionType.LOOK, ActionType.LISTEN, ActionType.SPEAK,
+    ActionType.TOUCH, ActionType.TAKE, ActionType.USE
+)
+"""Action types that content packs can add to scenes"""
+
+_SCENE_ACTION_TYPE_VALUES = frozenset(action_type.value for action_type in SCENE_ACTION_TYPES)
+"""The values of the action types that content packs can add to scenes, as written in packs"""
+
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+"""The fastest safe YAML loader available, libyaml's when PyYAML was built with it"""
+
+_CONDITION_KEYS = {'state', 'has', 'lacks'}
+_OUTCOME_KEYS = {
+    'when', 'text', 'set', 'unset', 'give', 'take', 'remove_self', 'add_actions', 'remove_actions',
+    'scene_text', 'move'
+}
+
+def load_content_pack(
+        path: str,
+        cache_dir: Optional[str] = None,
+        use_cache: bool = True,
+        lazy: bool = False,
+        max_scene_bytes: Optional[int] = None
+    ) -> EngineContent:
+    """
+    Loads a YAML (.yaml, .yml) or TOML (.toml) content pack. The pack is validated and compiled into a
+    bundle that is cached on disk, keyed by a hash of the pack, so later loads of an unchanged pack skip
+    parsing and validation entirely.
+
+    The cached bundle is a scene bundle with an offset index (see scene_bundle.py). With lazy set, scenes
+    are read from it through a memory map only when they are first used, and the least recently used ones
+    are evicted again once max_scene_bytes is exceeded, so even huge worlds start instantly.
+
+    Content packs look like this (in YAML):
+
+        start: cell
+        player: {name: Wizard, description: A wizard.}
+        items:
+          key: {name: Key, description: A rusty key.}
+        actions:                            # Actions that are added to scenes later on
+          stool: {type: take, keyword: stool, text: You leave the stool.}
+        scenes:
+          cell:
+            text: A dusty cell.
+            start_text: You wake up.        # Optional, also end_text
+            state: {door_open: false}       # Optional initial state
+            text_rules:                     # Optional, the text of the first rule whose state matches is shown
+              - {when: {state: {door_open: true}}, text: A dusty cell with an open door.}
+            actions:
+              - type: take
+                keyword: key
+                text: You take the key.
+                give: [key]
+                set: {key_taken: true}
+                remove_self: true
+              - type: move
+                keyword: door
+                outcomes:                   # The first outcome whose conditions are met is used
+                  - {when: {lacks: [key]}, text: The door is locked.}
+                  - {text: You leave., move: hall}
+
+    Outcomes can check the scene state and the inventory (when: state, has, lacks; unset state keys count
+    as false), and can set and unset state keys, give and take items, remove the action itself, add
+    actions from the actions section, remove actions, change the scene text and move to another scene.
+    Text rules are compiled into a SceneText, so they can only check the scene state. The scene's text is
+    shown while no rule matches, and an outcome that changes the scene text replaces the rules as well.
+
+    Args:
+        path (str): The path of the content pack
+        cache_dir (Optional[str]): Where compiled bundles are cached, defaults to a __packcache__ directory
+            next to the pack
+        use_cache (bool): If False, the pack is always compiled and the cache is left alone
+        lazy (bool): If True, scenes are loaded from the cached bundle on demand
+        max_scene_bytes (Optional[int]): When loading lazily, evict scenes once the bundle records of the
+            loaded scenes add up to more than this many bytes. None for no limit.
+
+    Returns:
+        content (EngineContent): The content, ready to start sessions with
+    """
+    if not use_cache:
+        if lazy:
+            raise ValueError("Lazy loading needs the cached bundle, use_cache must be set")
+        return build_content(compile_content_pack(_parse_pack(path), path))
+
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), PACK_CACHE_DIR)
+    stem = os.path.basename(path)
+    cache_key = _cache_key(path)
+    cache_path = os.path.join(cache_dir, f"{stem}.{cache_key}.bundle")
+
+    reader = _open_bundle(cache_path)
+    if reader is None:
+        bundle = compile_content_pack(_parse_pack(path), path)
+        if not _write_bundle(cache_dir, stem, cache_path, bundle):
+            if lazy:
+                raise ValueError(f"{path}: could not write the bundle to {cache_dir}, which lazy loading needs")
+            return build_content(bundle)
+        reader = _open_bundle(cache_path)
+        if reader is None:
+            raise ValueError(f"{cache_path}: could not read the bundle that was just written")
+
+    if lazy:
+        return _build_lazy_content(reader, max_scene_bytes, cache_key)
+
+    try:
+        head = reader.read_head()
+        bundle = {**head, 'scenes': tuple(reader.read_scene(name) for name in reader.scene_names())}
+    finally:
+        reader.close()
+    return build_content(bundle)
+
+def compile_content_pack(pack: dict, source: str = '<pack>') -> dict:
+    """
+    Validates a parsed content pack and compiles it into a bundle made only of builtin types, with every
+    reference checked and the actions pre-grouped the way scenes store them
+
+    Args:
+        pack (dict): The parsed content pack
+        source (str): The name of the pack, used in error messages
+
+    Returns:
+        bundle (dict): The compiled bundle
+    """
+    _expect(isinstance(pack, dict), source, "a content pack must be a mapping")
+    _check_keys(pack, {'start', 'player', 'items', 'actions', 'scenes'}, source)
+
+    items = _mapping(pack.get('items', {}), f"{source}: items")
+    scenes = _mapping(pack.get('scenes'), f"{source}: scenes")
+    _expect(len(scenes) > 0, f"{source}: scenes", "at least one scene is required")
+    library = _mapping(pack.get('actions', {}), f"{source}: actions")
+
+    refs = (set(items), set(scenes), set(library))
+
+    compiled_items = []
+    for code, item in items.items():
+        where = f"{source}: items.{code}"
+        item = _mapping(item, where)
+        _check_keys(item, {'name', 'description'}, where)
+        compiled_items.append((str(code), _string(item.get('name', code), f"{where}.name"), _string(item.get('description', ''), f"{where}.description")))
+
+    compiled_library = []
+    for action_id, action in library.items():
+        where = f"{source}: actions.{action_id}"
+        compiled_library.append((str(action_id), *_compile_action(_mapping(action, where), where, refs)))
+
+    compiled_scenes = []
+    for name, scene in scenes.items():
+        where = f"{source}: scenes.{name}"
+        scene = _mapping(scene, where)
+        _check_keys(scene, {'text', 'start_text', 'end_text', 'state', 'text_rules', 'actions'}, where)
+
+        state = _mapping(scene.get('state', {}), f"{where}.state")
+        text_rules = []
+        for i, rule in enumerate(_list(scene.get('text_rules', []), f"{where}.text_rules")):
+            rule_where = f"{where}.text_rules[{i}]"
+            rule = _mapping(rule, rule_where)
+            _check_keys(rule, {'when', 'text'}, rule_where)
+            when = _mapping(rule.get('when', {}), f"{rule_where}.when")
+            _expect('has' not in when and 'lacks' not in when, f"{rule_where}.when", "text rules can only check the scene state")
+            text_rules.append((
+                _compile_conditions(when, f"{rule_where}.when", refs)[0],
+                _string(rule.get('text'), f"{rule_where}.text")
+            ))
+
+        # Group the actions by type, the same way scenes store them
+        actions = {}
+        for i, action in enumerate(_list(scene.get('actions', []), f"{where}.actions")):
+            action_where = f"{where}.actions[{i}]"
+            action_type, keyword, outcomes = _compile_action(_mapping(action, action_where), action_where, refs)
+            typed_actions = actions.setdefault(action_type, {})
+            _expect(keyword not in typed_actions, action_where, f"duplicate action '{action_type} {keyword}'")
+            typed_actions[keyword] = outcomes
+
+        compiled_scenes.append((
+            str(name),
+            _string(scene.get('text'), f"{where}.text"),
+            _optional_string(scene.get('start_text'), f"{where}.start_text"),
+            _optional_string(scene.get('end_text'), f"{where}.end_text"),
+            tuple((str(key), _value(value, f"{where}.state.{key}")) for key, value in state.items()),
+            tuple(text_rules),
+            actions
+        ))
+
+    start = pack.get('start', compiled_scenes[0][0])
+    _expect(start in scenes, f"{source}: start", f"unknown scene '{start}'")
+
+    player = _mapping(pack.get('player', {}), f"{source}: player")
+    _check_keys(player, {'name', 'description'}, f"{source}: player")
+
+    return {
+        'version': PACK_COMPILER_VERSION,
+        'start': start,
+        'player': (_optional_string(player.get('name'), f"{source}: player.name"), _optional_string(player.get('description'), f"{source}: player.description")),
+        'items': tuple(compiled_items),
+        'actions': tuple(compiled_library),
+        'scenes': tuple(compiled_scenes),
+    }
+
+def build_content(bundle: dict) -> EngineContent:
+    """
+    Builds the content described by a compiled bundle
+
+    Args:
+        bundle (dict): The bundle created by compile_content_pack
+
+    Returns:
+        content (EngineContent): The content
+    """
+    builder = _ContentBuilder(bundle)
+    for record in bundle['scenes']:
+        builder.content.add_scene(builder.build_scene(record), start=(record[0] == bundle['start']))
+    return builder.content
+
+def _build_lazy_content(reader: SceneBundleReader, max_scene_bytes: Optional[int], fingerprint: str) -> EngineContent:
+    """
+    Builds content whose scenes are loaded from a scene bundle on demand
+
+    Args:
+        reader (SceneBundleReader): The bundle
+        max_scene_bytes (Optional[int]): See load_content_pack
+        fingerprint (str): Identifies the bundle contents
+
+    Returns:
+        content (EngineContent): The content
+    """
+    head = reader.read_head()
+    builder = _ContentBuilder(head)
+    builder.content.scenes = LazySceneMap(reader, builder.build_scene, max_scene_bytes, fingerprint)
+    builder.content.start_scene_name = head['start']
+    return builder.content
+
+class _ContentBuilder:
+    """Builds content, and the scenes of that content, from compiled content pack records"""
+    def __init__(self, head: dict):
+        if head.get('version') != PACK_COMPILER_VERSION:
+            raise ValueError(f"Unsupported content bundle version: {head.get('version')}")
+
+        player_name, player_description = head['player']
+        player_args = {}
+        if player_name is not None:
+            player_args['name'] = player_name
+        if player_description is not None:
+            player_args['description'] = player_description
+        self.content = EngineContent(player_factory=lambda: Player(**player_args))
+        """The content being built"""
+
+        self.items = {} # type: dict[str, Item]
+        """The content's items, keyed by code"""
+
+        for code, name, description in head['items']:
+            self.items[code] = self.content.add_item(Item(name=name, code=code, description=description))
+
+        # Shared by every action runner, so actions added from the library later on find them too
+        self.library = {} # type: dict[str, tuple[Action, str]]
+        """The registered pack actions and their keywords, keyed by id"""
+
+        for action_id, action_type, keyword, outcomes in head['actions']:
+            action = self.content.register_action(action_id, Action(
+                action_type=ActionType(action_type),
+                on_action=PackActionRunner(outcomes, self.items, self.library, ('r', action_id))
+            ))
+            self.library[action_id] = (action, keyword)
+
+    def build_scene(self, record: tuple) -> Scene:
+        """
+        Builds a scene template from its record
+
+        Args:
+            record (tuple): The compiled scene
+
+        Returns:
+            scene (Scene): The scene template
+        """
+        name, text, start_text, end_text, state, text_rules, actions = record
+        if text_rules:
+            # The scene's own text is the fallback for when no rule matches
+            text = SceneText([*(TextRule(dict(when), rule_text) for when, rule_text in text_rules), TextRule({}, text)])
+        scene = Scene(name=name, text=text, start_text=start_text, end_text=end_text)
+        scene.state.update(state)
+        for action_type, typed_actions in actions.items():
+            for keyword, outcomes in typed_actions.items():
+                scene.add_action(ActionType(action_type), keyword, Action(
+                    on_action=PackActionRunner(outcomes, self.items, self.library, ('s', name, action_type, keyword))
+                ))
+        return scene
+
+class PackActionRunner:
+    """
+    The on_action callable of actions defined in content packs. Runs the first outcome whose conditions
+    are met.
+    """
+    __slots__ = ('outcomes', 'items', 'library', 'action_ref')
+
+    def __init__(
+            self,
+            outcomes: tuple,
+            items: dict[str, Item],
+            library: dict[str, tuple[Action, str]],
+            action_ref: Optional[tuple] = None
+        ):
+        self.outcomes = outcomes
+        """The compiled outcomes of the action"""
+
+        self.items = items
+        """The content's items, keyed by code"""
+
+        self.library = library
+        """The content's registered pack actions and their keywords, keyed by id"""
+
+        self.action_ref = action_ref
+        """
+        How snapshots refer to the action, see EngineContent.find_action_ref. Lazily loaded scenes may be
+        rebuilt with new action objects, so the reference can't be looked up by identity.
+        """
+
+    def __call__(self, engine, action: Action, scene: Scene, player: Player) -> str:
+        for conditions, text, effects in self.outcomes:
+            if _conditions_met(conditions, scene, player, self.items):
+                return self._apply(effects, text, engine, action, scene, player)
+        return ''
+
+    def _apply(self, effects: tuple, text: str, engine, action: Action, scene: Scene, player: Player) -> str:
+        """
+        Applies the effects of an outcome
+
+        Returns:
+            out (str): The text to display
+        """
+        set_state, unset_state, give, take, remove_self, add_actions, remove_actions, scene_text, move = effects
+
+        for key, value in set_state:
+            scene.state[key] = value
+        for key in unset_state:
+            scene.state.pop(key, None)
+        if give:
+            player.add_inventory_items([self.items[code] for code in give])
+        if take:
+            player.remove_inventory_items([self.items[code] for code in take])
+        if remove_self:
+            scene.remove_action(action)
+        for action_id in add_actions:
+            library_action, keyword = self.library[action_id]
+            scene.add_action(library_action.action_type, keyword, library_action)
+        for action_type, keyword in remove_actions:
+            scene.remove_action(ActionType(action_type), keyword)
+        if scene_text is not None:
+            scene.text = scene_text
+
+        if move is not None:
+            scene_text_on_enter = engine.set_current_scene(move)
+            return text if text else scene_text_on_enter
+        return text
+
+def _conditions_met(conditions: tuple, scene: Scene, player: Player, items: dict[str, Item]) -> bool:
+    """
+    Checks compiled conditions against a scene and player
+
+    Args:
+        conditions (tuple): The compiled conditions
+        scene (Scene): The scene whose state is checked
+        player (Player): The player whose inventory is checked
+        items (dict[str, Item]): The content's items, keyed by code
+
+    Returns:
+        met (bool): True if every condition is met
+    """
+    state, has, lacks = conditions
+    for key, value in state:
+        if scene.state.get(key, False) != value:
+            return False
+    if has and not player.inventory_contains([items[code] for code in has]):
+        return False
+    for code in lacks:
+        if items[code] in player.inventory:
+            return False
+    return True
+
+def _compile_action(action: dict, where: str, refs: tuple) -> tuple:
+    """
+    Validates and compiles a single action
+
+    Returns:
+        action (tuple): The action type value, keyword and compiled outcomes
+    """
+    keys = {'type', 'keyword', 'outcomes'}
+    if 'outcomes' not in action:
+        keys |= _OUTCOME_KEYS
+    _check_keys(action, keys, where)
+
+    action_type_value = _string(action.get('type'), f"{where}.type").lower()
+    _check_action_type(action_type_value, f"{where}.type")
+    keyword = _string(action.get('keyword'), f"{where}.keyword").lower()
+
+    if 'outcomes' in action:
+        outcomes = _list(action['outcomes'], f"{where}.outcomes")
+        _expect(len(outcomes) > 0, f"{where}.outcomes", "at least one outcome is required")
+        compiled = tuple(_compile_outcome(_mapping(outcome, f"{where}.outcomes[{i}]"), f"{where}.outcomes[{i}]", refs) for i, outcome in enumerate(outcomes))
+    else:
+        compiled = (_compile_outcome({key: value for key, value in action.items() if key in _OUTCOME_KEYS}, where, refs),)
+
+    return action_type_value, keyword, compiled
+
+def _check_action_type(action_type_value: str, where: str) -> None:
+    """Checks that an action type can be added to and removed from scenes by content packs"""
+    _expect(
+        action_type_value in _SCENE_ACTION_TYPE_VALUES, where,
+        f"unknown action type '{action_type_value}', expected one of: {', '.join(sorted(_SCENE_ACTION_TYPE_VALUES))}"
+    )
+
+def _compile_outcome(outcome: dict, where: str, refs: tuple) -> tuple:
+    """
+    Validates and compiles a single outcome
+
+    Returns:
+        outcome (tuple): The compiled conditions, text and effects
+    """
+    item_refs, scene_refs, action_refs = refs
+    _check_keys(outcome, _OUTCOME_KEYS, where)
+
+    set_state = _mapping(outcome.get('set', {}), f"{where}.set")
+    remove_actions = []
+    for i, ref in enumerate(_list(outcome.get('remove_actions', []), f"{where}.remove_actions")):
+        ref_where = f"{where}.remove_actions[{i}]"
+        _expect(isinstance(ref, (list, tuple)) and len(ref) == 2, ref_where, "expected [type, keyword]")
+        action_type_value = _string(ref[0], ref_where).lower()
+        _check_action_type(action_type_value, ref_where)
+        remove_actions.append((action_type_value, _string(ref[1], ref_where).lower()))
+
+    move = _optional_string(outcome.get('move'), f"{where}.move")
+    _expect(move is None or move in scene_refs, f"{where}.move", f"unknown scene '{move}'")
+
+    effects = (
+        tuple((str(key), _value(value, f"{where}.set.{key}")) for key, value in set_state.items()),
+        tuple(_strings(outcome.get('unset', []), f"{where}.unset")),
+        _item_codes(outcome.get('give', []), f"{where}.give", item_refs),
+        _item_codes(outcome.get('take', []), f"{where}.take", item_refs),
+        bool(outcome.get('remove_self', False)),
+        _refs(outcome.get('add_actions', []), f"{where}.add_actions", action_refs, "action"),
+        tuple(remove_actions),
+        _optional_string(outcome.get('scene_text'), f"{where}.scene_text"),
+        move,
+    )
+    return (
+        _compile_conditions(outcome.get('when', {}), f"{where}.when", refs),
+        _string(outcome.get('text', ''), f"{where}.text"),
+        effects
+    )
+
+def _compile_conditions(conditions: dict, where: str, refs: tuple) -> tuple:
+    """
+    Validates and compiles the conditions of an outcome or text rule
+
+    Returns:
+        conditions (tuple): The compiled state, has and lacks conditions
+    """
+    item_refs = refs[0]
+    conditions = _mapping(conditions, where)
+    _check_keys(conditions, _CONDITION_KEYS, where)
+    state = _mapping(conditions.get('state', {}), f"{where}.state")
+    return (
+        tuple((str(key), _value(value, f"{where}.state.{key}")) for key, value in state.items()),
+        _item_codes(conditions.get('has', []), f"{where}.has", item_refs),
+        _item_codes(conditions.get('lacks', []), f"{where}.lacks", item_refs),
+    )
+
+def _parse_pack(path: str) -> dict:
+    """
+    Parses a content pack according to its file extension
+
+    Args:
+        path (str): The path of the pack
+
+    Returns:
+        pack (dict): The parsed pack
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    try:
+        if extension in ('.yaml', '.yml'):
+            return yaml.load(text, Loader=_YAML_LOADER)
+        if extension == '.toml':
+            return toml.loads(text)
+    except (yaml.YAMLError, toml.TomlDecodeError) as e:
+        raise ValueError(f"{path}: could not parse content pack: {e}") from e
+    raise ValueError(f"{path}: unsupported content pack format, expected .yaml, .yml or .toml")
+
+def _cache_key(path: str) -> str:
+    """Gets the cache key of a pack. Marshal data is only valid for the Python version that wrote it."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    digest.update(f"{PACK_COMPILER_VERSION}:{sys.version_info[0]}.{sys.version_info[1]}".encode('ascii'))
+    return digest.hexdigest()[:32]
+
+def _open_bundle(cache_path: str) -> Optional[SceneBundleReader]:
+    """Opens a cached bundle, returning None if it is missing, unreadable or outdated"""
+    try:
+        reader = SceneBundleReader(cache_path)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        if reader.read_head().get('version') == PACK_COMPILER_VERSION:
+            return reader
+    except (EOFError, ValueError, TypeError):
+        pass
+    reader.close()
+    return None
+
+def _write_bundle(cache_dir: str, stem: str, cache_path: str, bundle: dict) -> bool:
+    """
+    Caches a bundle as a scene bundle, replacing older bundles of the same pack. Failing to cache is not
+    an error.
+
+    Returns:
+        cached (bool): True if the bundle was written
+    """
+    head = {key: value for key, value in bundle.items() if key != 'scenes'}
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        for name in os.listdir(cache_dir):
+            if name.startswith(f"{stem}.") and name.endswith('.bundle'):
+                os.remove(os.path.join(cache_dir, name))
+        write_scene_bundle(cache_path, head, {record[0]: record for record in bundle['scenes']})
+    except OSError:
+        return False
+    return True
+
+def _expect(condition: bool, where: str, message: str) -> None:
+    """Raises a ValueError pointing at the invalid part of a pack if the condition is not met"""
+    if not condition:
+        raise ValueError(f"{where}: {message}")
+
+def _check_keys(mapping: dict, allowed: set[str], where: str) -> None:
+    """Makes sure a mapping has no unknown keys, which are most likely typos"""
+    unknown = set(mapping) - allowed
+    _expect(not unknown, where, f"unknown keys: {', '.join(sorted(map(str, unknown)))}")
+
+def _mapping(value, where: str) -> dict:
+    _expect(isinstance(value, dict), where, "expected a mapping")
+    return value
+
+def _list(value, where: str) -> list:
+    _expect(isinstance(value, list), where, "expected a list")
+    return value
+
+def _string(value, where: str) -> str:
+    _expect(isinstance(value, str), where, "expected a string")
+    return value
+
+def _optional_string(value, where: str) -> Optional[str]:
+    return None if value is None else _string(value, where)
+
+def _strings(value, where: str) -> list[str]:
+    return [_string(entry, f"{where}[{i}]") for i, entry in enumerate(_list(value, where))]
+
+def _value(value, where: str):
+    """State values must be simple values so scenes can be saved"""
+    _expect(value is None or isinstance(value, (bool, int, float, str)), where, "expected a boolean, number or string")
+    return value
+
+def _item_codes(value, where: str, item_refs: set[str]) -> tuple[str, ...]:
+    return _refs(value, where, item_refs, "item")
+
+def _refs(value, where: str, known: set[str], kind: str) -> tuple[str, ...]:
+    refs = _strings(value, where)
+    for ref in refs:
+        _expect(ref in known, where, f"unknown {kind} '{ref}'")
+    return tuple(refs)
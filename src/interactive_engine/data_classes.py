@@ -1,12 +1,17 @@
+import asyncio
+import inspect
+from collections import namedtuple
 from enum import Enum
 from functools import singledispatchmethod
-from typing import Callable, Optional
+from typing import Awaitable, Callable, Iterable, Iterator, Mapping, Optional
 
 from interactive_engine.strings import ActionStrings, PlayerStrings, SystemStrings
+from utils.observable_dict import MISSING, ObservableDict
 
-on_action_def = Callable[[object, 'Action', 'Scene', 'Player'], str]
+on_action_def = Callable[[object, 'Action', 'Scene', 'Player'], str|Awaitable[str]]
 """
-Type alias for the callable signature used for the on_action attribute in the Action class.
+Type alias for the callable signature used for the on_action attribute in the Action class. Coroutine
+functions are supported, but only when the action is run through InteractiveEngine.run_async.
 
 Args:
     object: The engine instance (not typed to avoid circular imports)
@@ -18,6 +23,27 @@ Args:
 empty_lambda = lambda engine, action, scene, player: ActionStrings.EMPTY_ACTION_TEXT
 """An "empty" lambda that matches the on_action_base signature"""
 
+action_listener_def = Callable[['ActionType', Optional[str]], None]
+"""
+Type alias for the callable signature used to observe changes to a scene or player's actions.
+
+Args:
+    ActionType: The type of action that changed
+    Optional[str]: The keyword that changed, or None if the whole action type changed
+"""
+
+change_listener_def = Callable[[object, str, object, object], None]
+"""
+Type alias for the callable signature used to observe changes to the state of a scene or player, e.g. to
+record them for undo. Listeners are called before the change is made.
+
+Args:
+    object: The Scene or Player that is changing
+    str: The kind of change, e.g. "text", "state", "action" or "inventory"
+    object: What changed within that kind, e.g. the state key
+    object: The previous value, or MISSING if there was none
+"""
+
 class ActionType(Enum):
     """Enumeration of possible action types in the interactive engine."""
     # Scene actions
@@ -35,22 +61,82 @@ class ActionType(Enum):
 
     # system actions
     HELP = "help"
-    # SAVE = "save"
-    # LOAD = "load"
-    # CONTINUE = "continue"
-    # RESTART = "restart"
+    SAVE = "save"
+    LOAD = "load"
+    CONTINUE = "continue"
+    RESTART = "restart"
+    UNDO = "undo"
     LIST = "list"
     EXIT = "exit"
 
     # Meta actions
     EMPTY = "empty"
 
+class Guard(namedtuple('Guard', ['kind', 'key', 'expected', 'fail_text'])):
+    """
+    A precondition of an action. The kind matches the kind of change reported to change listeners, so
+    every change can be traced back to the guards it affects:
+
+    - "state": The current scene's state key must equal expected. Unset keys count as False.
+    - "inventory": The player must hold the item (the key) if expected is True, or not hold it otherwise.
+
+    The fail text is shown instead of running the action, or ActionStrings.GUARD_FAILED_TEXT if it is None.
+    """
+    __slots__ = ()
+
+    def holds(self, scene: 'Scene', player: 'Player') -> bool:
+        """
+        Checks the guard against the current scene and player
+
+        Args:
+            scene (Scene): The current scene
+            player (Player): The current player
+
+        Returns:
+            holds (bool): True if the guard is met
+        """
+        if self.kind == 'state':
+            return scene.state.get(self.key, False) == self.expected
+        return (self.key in player.inventory) == self.expected
+
+def state_guard(key: str, value=True, fail_text: Optional[str] = None) -> Guard:
+    """
+    Creates a guard over the scene state, e.g. state_guard("door_open", fail_text="The door is closed.")
+
+    Args:
+        key (str): The state key
+        value (object): The value the state key must have
+        fail_text (Optional[str]): The text to show when the guard is not met
+
+    Returns:
+        guard (Guard): The guard
+    """
+    return Guard('state', key, value, fail_text)
+
+def item_guard(item: 'Item', held: bool = True, fail_text: Optional[str] = None) -> Guard:
+    """
+    Creates a guard over the player inventory
+
+    Args:
+        item (Item): The item
+        held (bool): Whether the player must hold the item or must not hold it
+        fail_text (Optional[str]): The text to show when the guard is not met
+
+    Returns:
+        guard (Guard): The guard
+    """
+    return Guard('inventory', item, held, fail_text)
+
 class Action:
     """Class representing an action in the interactive engine."""
+    __slots__ = ('action_type', 'on_action', 'blocking', 'guards')
+
     def __init__(
             self,
             action_type: ActionType = ActionType.EMPTY,
-            on_action: on_action_def = empty_lambda
+            on_action: on_action_def = empty_lambda,
+            blocking: bool = False,
+            guards: Iterable[Guard] = ()
         ):
         self.action_type = action_type
         """This action's type"""
@@ -58,25 +144,158 @@ class Action:
         self.on_action: on_action_def = on_action
         """Callable to execute when the action is performed. Returns the action text"""
 
-    def run_action(self, engine, scene: 'Scene', player: 'Player') -> str:
+        self.blocking = blocking
+        """
+        Set for plain (non-coroutine) on_action callables that block, e.g. on file or network I/O. When run
+        asynchronously, blocking actions are moved to a worker thread so they don't stall the event loop.
+        """
+
+        self.guards = tuple(guards) # type: tuple[Guard, ...]
+        """
+        Preconditions that must all be met for the action to run. The engine indexes them the first time
+        the action is listed, so they should not be replaced afterwards.
+        """
+
+    def failed_guard(self, scene: 'Scene', player: 'Player') -> Optional[Guard]:
+        """
+        Finds the first guard of the action that is not met
+
+        Args:
+            scene (Scene): The current scene
+            player (Player): The current player
+
+        Returns:
+            guard (Optional[Guard]): The failed guard, or None if the action can run
+        """
+        for guard in self.guards:
+            if not guard.holds(scene, player):
+                return guard
+        return None
+
+    def guard_text(self, scene: 'Scene', player: 'Player') -> Optional[str]:
+        """
+        Gets the text to show instead of running the action
+
+        Args:
+            scene (Scene): The current scene
+            player (Player): The current player
+
+        Returns:
+            text (Optional[str]): The fail text of the first guard that is not met, or None if the action can run
+        """
+        guard = self.failed_guard(scene, player) if self.guards else None
+        if guard is None:
+            return None
+        return guard.fail_text if guard.fail_text is not None else ActionStrings.GUARD_FAILED_TEXT
+
+    def run_action(self, engine, scene: 'Scene', player: 'Player', check_guards: bool = True) -> str:
+        """
+        Perform side-effects of running an action, unless one of its guards is not met
+
+        Args:
+            scene (Scene): The current scene
+            player (Player): The current player
+            check_guards (bool): False if the caller already checked the guards, e.g. the engine does so
+                when it starts the turn
+        """
+        if check_guards:
+            guard_text = self.guard_text(scene, player)
+            if guard_text is not None:
+                return guard_text
+
+        result = self.on_action(engine, self, scene, player)
+        if inspect.isawaitable(result):
+            # Don't leave an un-awaited coroutine behind
+            if inspect.iscoroutine(result):
+                result.close()
+            raise TypeError(f"{self} has an asynchronous on_action and must be run with run_async")
+        return result
+
+    async def run_action_async(self, engine, scene: 'Scene', player: 'Player', check_guards: bool = True) -> str:
         """
-        Perform side-effects of running an action
+        Perform side-effects of running an action without blocking the event loop. Supports both plain and
+        coroutine on_action callables.
 
         Args:
             scene (Scene): The current scene
             player (Player): The current player
+            check_guards (bool): False if the caller already checked the guards
         """
-        return self.on_action(engine, self, scene, player)
+        if check_guards:
+            guard_text = self.guard_text(scene, player)
+            if guard_text is not None:
+                return guard_text
+
+        if self.blocking:
+            # A thread can't be stopped, so a cancelled turn waits for it to finish, keeping its changes part of the turn
+            thread = asyncio.ensure_future(asyncio.to_thread(self.on_action, engine, self, scene, player))
+            try:
+                result = await asyncio.shield(thread)
+            except asyncio.CancelledError:
+                await asyncio.wait((thread,))
+                raise
+        else:
+            result = self.on_action(engine, self, scene, player)
+
+        if inspect.isawaitable(result):
+            result = await result
+        return result
 
     def __str__(self):
         return f"Action(action_type={self.action_type})"
 
+class SharedAction(Action):
+    """
+    An action shared by many scenes or players, e.g. the default "look scene" action. It can't be changed
+    once created, as a change would show up everywhere it is used.
+    """
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value) -> None:
+        if hasattr(self, name):
+            raise ValueError(f"{self} is shared and can't be changed, add a new Action instead")
+        super().__setattr__(name, value)
+
 
-empty_action = Action(ActionType.EMPTY)
+empty_action = SharedAction(ActionType.EMPTY)
 """Commonly used "empty" action instance"""
 
+def notify_action_listeners(
+        listeners: tuple[action_listener_def, ...],
+        action_type: ActionType,
+        keyword: Optional[str]
+    ) -> None:
+    """
+    Notifies action listeners that an action changed
+
+    Args:
+        listeners (tuple[action_listener_def, ...]): The listeners to notify
+        action_type (ActionType): The type of action that changed
+        keyword (Optional[str]): The keyword that changed, or None if the whole action type changed
+    """
+    for listener in listeners:
+        listener(action_type, keyword)
+
+look_player_action = SharedAction(ActionType.LOOK, on_action=lambda e,a,s,p: p.description)
+"""The default action for the player looking at themselves, shared by every player"""
+
+inventory_action = SharedAction(
+    ActionType.INVENTORY,
+    on_action=lambda e,a,s,p: PlayerStrings.INVENTORY_EMPTY_TEXT
+    if not p.inventory else
+    PlayerStrings.INVENTORY_LIST_TEXT.format(
+        items=' \n- '.join([
+            item.name if quantity == 1 else PlayerStrings.INVENTORY_STACK_TEXT.format(name=item.name, quantity=quantity)
+            for item, quantity in p.inventory.stacks()
+        ])
+    )
+)
+"""The default inventory action, shared by every player"""
+
 class Player:
     """Class representing a player. There must always be at least one player"""
+    __slots__ = ('name', 'description', 'actions', 'inventory', '_action_listeners', '_change_listener')
+
     def __init__(
             self,
             name: str = PlayerStrings.DEFAULT_NAME,
@@ -89,47 +308,171 @@ class Player:
         """The description of the player."""
 
         self.actions = {
-            # Default action for the player looking at themselves
-            ActionType.LOOK: {
-                'player': Action(
-                    on_action=lambda e,a,s,p: p.description
-                )
-            },
-            ActionType.INVENTORY: Action(
-                on_action=lambda e,a,s,p: PlayerStrings.INVENTORY_EMPTY_TEXT
-                if len(p.inventory) == 0 else
-                PlayerStrings.INVENTORY_LIST_TEXT.format(
-                    items=' \n- '.join([item.name for item in p.inventory])
-                )
-            )
+            ActionType.LOOK: {'player': look_player_action},
+            ActionType.INVENTORY: inventory_action
         }
         """
         A dictionary mapping ActionTypes to the Action objects that can be performed on this player. Typical
         action types are INVENTORY and COMBINE.
         """
 
-        self.inventory = [] # type: list[Item]
-        """The list of items the player currently has in their inventory."""
+        self.inventory = Inventory()
+        """The items the player currently has in their inventory."""
+
+        self._action_listeners = () # type: tuple[action_listener_def, ...]
+        """Callables notified whenever the player's actions change. Replaced rather than modified, so copies can share it"""
+
+        self._change_listener = None # type: Optional[change_listener_def]
+        """Callable notified before the player's actions or inventory change"""
+
+    def copy(self) -> 'Player':
+        """
+        Creates an independent copy of the player. Action and item objects are shared, but the action
+        dictionaries and inventory are not.
+
+        Returns:
+            player (Player): The copied player
+        """
+        player = Player.__new__(Player)
+        player.name = self.name
+        player.description = self.description
+        player.actions = {
+            action_type: actions.copy() if isinstance(actions, dict) else actions
+            for action_type, actions in self.actions.items()
+        }
+        player.inventory = self.inventory.copy()
+        player._action_listeners = ()
+        player._change_listener = None
+        return player
+
+    def set_change_listener(self, listener: Optional[change_listener_def]) -> None:
+        """
+        Sets the callable notified before the player's actions or inventory change through the player's
+        methods
+
+        Args:
+            listener (Optional[change_listener_def]): The listener, or None to stop observing changes
+        """
+        self._change_listener = listener
+
+    def revert_change(self, kind: str, key, old) -> None:
+        """
+        Reverts a change previously reported to the change listener
+
+        Args:
+            kind (str): The kind of change
+            key (object): What changed within that kind
+            old (object): The value to restore, or MISSING to remove it
+        """
+        if kind == 'inventory':
+            self.inventory.set_count(key, old)
+        elif kind == 'action':
+            if old is MISSING:
+                self.actions.pop(key, None)
+            else:
+                self.actions[key] = old
+            notify_action_listeners(self._action_listeners, key, None)
+
+    def _record_action_change(self, action_type: ActionType) -> None:
+        """Reports the current actions of a type to the change listener, before they change"""
+        if self._change_listener is not None:
+            actions = self.actions.get(action_type, MISSING)
+            self._change_listener(self, 'action', action_type, actions.copy() if isinstance(actions, dict) else actions)
+
+    def add_action(self, action_type: ActionType, keyword: Optional[str], action: Action) -> Action:
+        """
+        Adds an action to the player
+
+        Args:
+            action_type (ActionType): The type of action to add
+            keyword (Optional[str]): The keyword to trigger the action, or None for a direct action that
+                takes no target
+            action (Action): The action to add
+
+        Returns:
+            action (Action): The action that was added
+        """
+        if action.action_type is not action_type:
+            action.action_type = action_type
+        self._record_action_change(action_type)
+
+        if keyword is None:
+            self.actions[action_type] = action
+        else:
+            actions = self.actions.get(action_type)
+            if not isinstance(actions, dict):
+                actions = self.actions[action_type] = {}
+            actions[keyword] = action
+
+        notify_action_listeners(self._action_listeners, action_type, None)
+        return action
+
+    def remove_action(self, action_type: ActionType, keyword: Optional[str] = None) -> None:
+        """
+        Removes an action from the player
+
+        Args:
+            action_type (ActionType): The type of action to remove
+            keyword (Optional[str]): The keyword of the action to remove, or None to remove every action
+                of the given type
+        """
+        self._record_action_change(action_type)
+        if keyword is None:
+            self.actions.pop(action_type, None)
+        else:
+            actions = self.actions.get(action_type)
+            if isinstance(actions, dict):
+                actions.pop(keyword, None)
+
+        notify_action_listeners(self._action_listeners, action_type, None)
+
+    def add_action_listener(self, listener: action_listener_def) -> None:
+        """
+        Registers a callable to be notified whenever the player's actions change
+
+        Args:
+            listener (action_listener_def): The listener to register
+        """
+        self._action_listeners += (listener,)
 
-    def add_inventory_items(self, items: list['Item']):
+    def remove_action_listener(self, listener: action_listener_def) -> None:
+        """
+        Unregisters a previously registered action listener
+
+        Args:
+            listener (action_listener_def): The listener to unregister
+        """
+        listeners = list(self._action_listeners)
+        if listener in listeners:
+            listeners.remove(listener)
+            self._action_listeners = tuple(listeners)
+
+    def add_inventory_items(self, items: list['Item'], quantity: int = 1):
         """
         Adds items to the player's inventory
 
         Args:
             items (list[Item]): The items to add
+            quantity (int): How many of each item to add
         """
-        self.inventory.extend(items)
+        for item in items:
+            if self._change_listener is not None:
+                self._change_listener(self, 'inventory', item, self.inventory.count(item))
+            self.inventory.add(item, quantity)
 
-    def remove_inventory_items(self, items: list['Item']):
+    def remove_inventory_items(self, items: list['Item'], quantity: int = 1):
         """
-        Removes items from the player's inventory
+        Removes items from the player's inventory. Items the player doesn't have are ignored.
 
         Args:
             items (list[Item]): The items to remove
+            quantity (int): How many of each item to remove
         """
         for item in items:
             if item in self.inventory:
-                self.inventory.remove(item)
+                if self._change_listener is not None:
+                    self._change_listener(self, 'inventory', item, self.inventory.count(item))
+                self.inventory.remove(item, quantity)
 
     def inventory_contains(self, items: list['Item']) -> bool:
         """
@@ -141,10 +484,12 @@ class Player:
         Returns:
             contains (bool): True if the item is in the inventory, False otherwise
         """
-        return all(self.inventory.count(item) > 0 for item in items)
+        return all(item in self.inventory for item in items)
 
 class Item:
     """Class representing an item that a player can put into their inventory."""
+    __slots__ = ('name', 'code', 'description')
+
     def __init__(self, name: str, code: str, description: str):
         self.name = name
         """The name of the item."""
@@ -155,22 +500,226 @@ class Item:
         self.description = description
         """The description of the item"""
 
+class Inventory:
+    """
+    A multiset of items, backed by a counter of stack quantities and an index of items by code. Checking,
+    adding and removing items are constant time. Stacks are kept in the order they were first added, for
+    display. Item codes are expected to be unique; get returns the most recently added item for a code.
+    """
+    __slots__ = ('_counts', '_codes', '_total')
+
+    def __init__(self, items: Iterable[Item] = ()):
+        self._counts = {} # type: dict[Item, int]
+        """The quantity of each item stack, in the order the stacks were added"""
+
+        self._codes = {} # type: dict[str, Item]
+        """Index of the held items by code"""
+
+        self._total = 0
+        """The total quantity of every stack"""
+
+        for item in items:
+            self.add(item)
+
+    def add(self, item: Item, quantity: int = 1) -> None:
+        """
+        Adds items to a stack, creating the stack if needed
+
+        Args:
+            item (Item): The item to add
+            quantity (int): How many to add
+        """
+        if quantity < 1:
+            raise ValueError(f"Quantity must be at least 1: {quantity}")
+        self._counts[item] = self._counts.get(item, 0) + quantity
+        self._codes[item.code] = item
+        self._total += quantity
+
+    def remove(self, item: Item, quantity: int = 1) -> int:
+        """
+        Removes items from a stack, removing the stack once it is empty
+
+        Args:
+            item (Item): The item to remove
+            quantity (int): How many to remove
+
+        Returns:
+            removed (int): How many were actually removed, at most the quantity held
+        """
+        held = self._counts.get(item, 0)
+        removed = min(held, quantity)
+        if removed:
+            self.set_count(item, held - removed)
+        return removed
+
+    def set_count(self, item: Item, quantity: int) -> None:
+        """
+        Sets the quantity of a stack. A quantity of 0 removes the stack, a new stack is added at the end.
+
+        Args:
+            item (Item): The item of the stack
+            quantity (int): The new quantity
+        """
+        held = self._counts.get(item, 0)
+        if quantity > 0:
+            self._counts[item] = quantity
+            self._codes[item.code] = item
+        elif held:
+            del self._counts[item]
+            if self._codes.get(item.code) is item:
+                del self._codes[item.code]
+        self._total += max(quantity, 0) - held
+
+    def count(self, item: Item) -> int:
+        """
+        Gets the quantity of an item
+
+        Args:
+            item (Item): The item
+
+        Returns:
+            quantity (int): The quantity held, 0 if the item isn't held
+        """
+        return self._counts.get(item, 0)
+
+    def get(self, code: str) -> Optional[Item]:
+        """
+        Gets a held item by its code
+
+        Args:
+            code (str): The code of the item
+
+        Returns:
+            item (Optional[Item]): The held item, or None if no item with the code is held
+        """
+        return self._codes.get(code)
+
+    def stacks(self) -> Iterator[tuple[Item, int]]:
+        """
+        Iterates over the item stacks in the order they were added
+
+        Returns:
+            stacks (Iterator[tuple[Item, int]]): Each item and its quantity
+        """
+        return iter(self._counts.items())
+
+    def copy(self) -> 'Inventory':
+        """
+        Creates an independent copy of the inventory. Item objects are shared.
+
+        Returns:
+            inventory (Inventory): The copied inventory
+        """
+        inventory = Inventory.__new__(Inventory)
+        inventory._counts = self._counts.copy()
+        inventory._codes = self._codes.copy()
+        inventory._total = self._total
+        return inventory
+
+    def __contains__(self, item: Item) -> bool:
+        return item in self._counts
+
+    def __iter__(self) -> Iterator[Item]:
+        """Iterates over every single item, repeating items once for each in their stack"""
+        for item, quantity in self._counts.items():
+            for _ in range(quantity):
+                yield item
+
+    def __len__(self) -> int:
+        """The total quantity of items held"""
+        return self._total
+
+    def __repr__(self) -> str:
+        return f"Inventory({', '.join(f'{item.code}x{quantity}' for item, quantity in self._counts.items())})"
+
+TextRule = namedtuple('TextRule', ['when', 'text'])
+"""
+A tuple representing one option of a SceneText part. The rule applies when every state key in the when
+dictionary has the given value, where unset keys count as False. A rule with an empty when dictionary
+always applies.
+"""
+
+class SceneText:
+    """
+    Scene text derived from the scene's state, declared as a template rather than assigned by every action
+    that changes the state. The text is made of parts joined by the separator. Each part is either a plain
+    string, or a list of TextRules of which the first that applies is used; the part is left out if none
+    apply. Scenes only render the text again when one of the state keys the rules depend on changes.
+    """
+    __slots__ = ('parts', 'separator', 'dependencies')
+
+    def __init__(self, *parts: str|Iterable[TextRule], separator: str = ' '):
+        self.parts = tuple(
+            part if isinstance(part, str) else tuple(TextRule(dict(rule.when), rule.text) for rule in part)
+            for part in parts
+        ) # type: tuple[str|tuple[TextRule, ...], ...]
+        """The parts of the text"""
+
+        self.separator = separator
+        """Placed between the parts"""
+
+        self.dependencies = frozenset(
+            key for part in self.parts if not isinstance(part, str) for rule in part for key in rule.when
+        )
+        """The state keys the text depends on"""
+
+    def render(self, state: Mapping) -> str:
+        """
+        Renders the text for a scene state
+
+        Args:
+            state (Mapping): The scene state
+
+        Returns:
+            text (str): The text
+        """
+        texts = []
+        for part in self.parts:
+            if isinstance(part, str):
+                texts.append(part)
+                continue
+
+            for rule in part:
+                if all(state.get(key, False) == value for key, value in rule.when.items()):
+                    texts.append(rule.text)
+                    break
+        return self.separator.join(texts)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, SceneText) and (self.parts, self.separator) == (other.parts, other.separator)
+
+    def __hash__(self) -> int:
+        return hash((self.separator, len(self.parts)))
+
+look_scene_action = SharedAction(ActionType.LOOK, on_action=lambda e,a,s,p: s.text)
+"""The default "look scene" action, shared by every scene"""
+
 class Scene:
     """
     A single continuous play-space that the user can explore via allowed actions that represents a
     particular state of the game world
     """
+    __slots__ = (
+        'name', '_change_listener', '_text', '_rendered', 'start_text', 'end_text', 'actions', '_state',
+        '_action_listeners'
+    )
+
     def __init__(
             self,
-            name: str, text: str,
+            name: str, text: str|SceneText,
             start_text: Optional[str] = None,
             end_text: Optional[str] = None,
         ):
         self.name = name
         """The name of the scene"""
 
-        self.text = text
-        """The text description of the scene"""
+        self._change_listener = None # type: Optional[change_listener_def]
+        """Callable notified before the scene's text, state or actions change"""
+
+        self._text = text
+
+        self._rendered = None # type: Optional[str]
+        """The text rendered from a SceneText, None if it needs rendering"""
 
         self.start_text = start_text
         """Optional text to display when the player first enters the scene"""
@@ -178,29 +727,137 @@ class Scene:
         self.end_text = end_text
         """Optional text to display when the player leaves the scene"""
 
+        # Start with the "look scene" action. The dictionaries of other action types are only created
+        # once an action of that type is added
         self.actions = {
-            ActionType.MOVE: {},
-            ActionType.LOOK: {},
-            ActionType.LISTEN: {},
-            ActionType.SPEAK: {},
-            ActionType.TOUCH: {},
-            ActionType.TAKE: {},
-            ActionType.USE: {},
+            ActionType.LOOK: {'scene': look_scene_action},
         } # type: dict[ActionType, dict[str, Action]]
         """
         A dictionary mapping ActionTypes to the Action objects that can be performed on this scene. Typical
-        action types are MOVE, LOOK, LISTEN, SPEAK, TOUCH, TAKE, and USE.
+        action types are MOVE, LOOK, LISTEN, SPEAK, TOUCH, TAKE, and USE. Types without actions may be
+        missing.
         """
 
-        self.state = {}
-        """A dictionary representing arbitrary state information for the scene."""
+        self._state = None # type: Optional[ObservableDict]
+        """The scene state, only created once it is used"""
 
-        # Add the "look scene" action by default
-        self.add_action(
-            action_type=ActionType.LOOK,
-            keyword='scene',
-            action=Action(on_action=lambda e,a,s,p: s.text)
-        )
+        self._action_listeners = () # type: tuple[action_listener_def, ...]
+        """Callables notified whenever the scene's actions change. Replaced rather than modified, so copies can share it"""
+
+    @property
+    def text(self) -> str:
+        """
+        The text description of the scene. Can be set to a plain string, or to a SceneText that is rendered
+        from the scene state.
+        """
+        text = self._text
+        if isinstance(text, str):
+            return text
+
+        if self._rendered is None:
+            self._rendered = text.render(self._state or {})
+        return self._rendered
+
+    @text.setter
+    def text(self, text: str|SceneText) -> None:
+        if self._change_listener is not None:
+            self._change_listener(self, 'text', None, self._text)
+        self._text = text
+        self._rendered = None
+        self._observe_state()
+
+    @property
+    def text_source(self) -> str|SceneText:
+        """The text as it was set, either a plain string or the SceneText the text is rendered from"""
+        return self._text
+
+    @property
+    def state(self) -> ObservableDict:
+        """
+        A dictionary representing arbitrary state information for the scene. Changes to it are reported to
+        the change listener.
+        """
+        if self._state is None:
+            self._state = ObservableDict()
+            self._observe_state()
+        return self._state
+
+    @state.setter
+    def state(self, state: dict) -> None:
+        if self._change_listener is not None:
+            self._change_listener(self, 'state', None, self.state)
+        self._state = ObservableDict(state)
+        self._rendered = None
+        self._observe_state()
+
+    def _observe_state(self) -> None:
+        """Observes the state only while something depends on its changes, so plain scenes pay nothing"""
+        if self._state is not None:
+            observed = self._change_listener is not None or not isinstance(self._text, str)
+            self._state.on_change = self._state_changed if observed else None
+
+    def _state_changed(self, key, old) -> None:
+        """Renders the text again if it depends on the changed key, and reports the change to the change listener"""
+        if self._rendered is not None and key in self._text.dependencies:
+            self._rendered = None
+        if self._change_listener is not None:
+            self._change_listener(self, 'state', key, old)
+
+    def set_change_listener(self, listener: Optional[change_listener_def]) -> None:
+        """
+        Sets the callable notified before the scene's text, state or actions change
+
+        Args:
+            listener (Optional[change_listener_def]): The listener, or None to stop observing changes
+        """
+        self._change_listener = listener
+        self._observe_state()
+
+    def revert_change(self, kind: str, key, old) -> None:
+        """
+        Reverts a change previously reported to the change listener
+
+        Args:
+            kind (str): The kind of change
+            key (object): What changed within that kind
+            old (object): The value to restore, or MISSING to remove it
+        """
+        if kind == 'text':
+            self.text = old
+        elif kind == 'state':
+            if key is None:
+                self.state = old
+            elif old is MISSING:
+                self.state.pop(key, None)
+            else:
+                self.state[key] = old
+        elif kind == 'action':
+            action_type, keyword = key
+            if old is MISSING:
+                self.remove_action(action_type, keyword)
+            else:
+                self.add_action(action_type, keyword, old)
+
+    def copy(self) -> 'Scene':
+        """
+        Creates an independent copy of the scene that can be modified without affecting the original.
+        Action objects are shared, but the action dictionaries, state and text are not.
+
+        Returns:
+            scene (Scene): The copied scene
+        """
+        scene = Scene.__new__(Scene)
+        scene.name = self.name
+        scene._change_listener = None
+        scene._text = self._text
+        scene._rendered = self._rendered
+        scene.start_text = self.start_text
+        scene.end_text = self.end_text
+        scene.actions = {action_type: actions.copy() for action_type, actions in self.actions.items()}
+        scene._state = self._state.copy() if self._state else None
+        scene._observe_state()
+        scene._action_listeners = ()
+        return scene
 
     def add_action(self, action_type: ActionType, keyword: str, action: Action):
         """
@@ -214,11 +871,19 @@ class Scene:
         Returns:
             action (Action): The action that was added
         """
-        # Set the type in the action, for convenience
-        action.action_type = action_type
+        # Set the type in the action, for convenience. Shared actions can only be added with their own type.
+        if action.action_type is not action_type:
+            action.action_type = action_type
+
+        actions = self.actions.get(action_type)
+        if self._change_listener is not None:
+            self._change_listener(self, 'action', (action_type, keyword), MISSING if actions is None else actions.get(keyword, MISSING))
 
         # Save the action in the action dictionary
-        self.actions[action_type][keyword] = action
+        if actions is None:
+            actions = self.actions[action_type] = {}
+        actions[keyword] = action
+        notify_action_listeners(self._action_listeners, action_type, keyword)
 
         return action
 
@@ -235,8 +900,12 @@ class Scene:
             action_type (ActionType): The type of action to remove
             keyword (str): The keyword of the action to remove
         """
-        if keyword in self.actions[action_type]:
-            del self.actions[action_type][keyword]
+        actions = self.actions.get(action_type)
+        if actions is not None and keyword in actions:
+            if self._change_listener is not None:
+                self._change_listener(self, 'action', (action_type, keyword), actions[keyword])
+            del actions[keyword]
+            notify_action_listeners(self._action_listeners, action_type, keyword)
 
     @remove_action.register(Action)
     def _(self, action: Action):
@@ -246,6 +915,31 @@ class Scene:
         Args:
             action (Action): The action instance to remove
         """
-        for keyword, act in list(self.actions[action.action_type].items()):
+        actions = self.actions.get(action.action_type, {})
+        for keyword, act in list(actions.items()):
             if act == action:
-                del self.actions[action.action_type][keyword]
+                if self._change_listener is not None:
+                    self._change_listener(self, 'action', (action.action_type, keyword), act)
+                del actions[keyword]
+                notify_action_listeners(self._action_listeners, action.action_type, keyword)
+
+    def add_action_listener(self, listener: action_listener_def) -> None:
+        """
+        Registers a callable to be notified whenever the scene's actions change
+
+        Args:
+            listener (action_listener_def): The listener to register
+        """
+        self._action_listeners += (listener,)
+
+    def remove_action_listener(self, listener: action_listener_def) -> None:
+        """
+        Unregisters a previously registered action listener
+
+        Args:
+            listener (action_listener_def): The listener to unregister
+        """
+        listeners = list(self._action_listeners)
+        if listener in listeners:
+            listeners.remove(listener)
+            self._action_listeners = tuple(listeners)
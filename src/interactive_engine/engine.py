@@ -1,93 +1,307 @@
-from typing import Callable, Optional
+import asyncio
+from collections import namedtuple
+from time import perf_counter
+from typing import Awaitable, Callable, Iterable, Iterator, Optional
 
 from console.console_styles import Colors
-from interactive_engine.utils.get_action import get_action
+from interactive_engine.action_index import ActionIndex
+from interactive_engine.command_parser import CommandParser, ParseStatus, format_parse_error
+from interactive_engine.content import EngineContent
 from utils.deep_merge import deep_merge
-from interactive_engine.data_classes import Action, ActionType, Player, Scene, empty_action
+from interactive_engine.data_classes import Action, ActionType, Player, Scene
+from interactive_engine.events import (
+    ActionFailedEvent, EventBus, EventType, ItemEvent, SceneEvent, StateEvent, TurnEvent, emit, emit_async,
+    event_listener_def
+)
+from interactive_engine.guard_index import GuardIndex
+from interactive_engine.instrumentation import TurnProfiler
+from interactive_engine.scheduler import TurnScheduler, timer_callback_def
+from interactive_engine.snapshots import SnapshotStore, create_snapshot, restore_snapshot
 from interactive_engine.strings import SceneStrings, SystemStrings
+from interactive_engine.world_history import CLOCK_TARGET, WORLD_TARGET, WorldChange, WorldHistory
+from utils.observable_dict import MISSING
 
-on_exit_def = Callable[[], None]
+on_exit_def = Callable[[], None|Awaitable[None]]
 """
-Type alias for the callable signature used when setting an "on exit" method.
+Type alias for the callable signature used when setting an "on exit" method. Coroutine functions are
+awaited when the exit action is run through run_async.
+"""
+
+UNTIMED_ACTION_TYPES = frozenset({
+    ActionType.HELP, ActionType.SAVE, ActionType.LOAD, ActionType.CONTINUE, ActionType.RESTART,
+    ActionType.UNDO, ActionType.LIST, ActionType.EXIT
+})
+"""Action types that don't take a turn, so they don't count against the action budget"""
+
+TurnResult = namedtuple('TurnResult', ['status', 'action_type', 'text'])
+"""
+A compact tuple representing the outcome of a single turn run through run_many. The status is a
+ParseStatus, and the text is None when output was not requested.
 """
 
 class InteractiveEngine:
     """
-    Core class for the Interactive Engine itself. This is a singleton that handles the processing for all
-    actions and gameplay states
+    Core class for the Interactive Engine itself. Each instance is a single game session that handles the
+    processing for all actions and gameplay states of one player. Any number of sessions can share the
+    same EngineContent, which holds the scene templates and system actions.
+
+    Every change a turn makes to the session's world is recorded, so turns can be undone, and sessions
+    can be forked into independent "what-if" branches that share unchanged scenes until they are written.
     """
-    _on_exit = lambda: None
+    def __init__(
+            self,
+            content: Optional[EngineContent] = None,
+            max_undo: int = 100,
+            action_budget: Optional[int] = None
+        ):
+        self.content = content if content is not None else EngineContent()
+        """The shared content this session plays through"""
+
+        self.current_scene = None # type: Optional[Scene]
+        """The current scene the player is in. Will only be None before the game starts."""
+
+        self._player = self.content.new_player() # type: Player
 
-    _instance = None
+        self._scenes = {} # type: dict[str, Scene]
+        """This session's copies of the content scene templates, created the first time they are used"""
 
-    _system_actions = {
-        ActionType.HELP: Action(
-            action_type=ActionType.HELP,
-            on_action=lambda e,a,s,p: SystemStrings.HELP_TEXT
-        ),
-        ActionType.EXIT: Action(
-            action_type=ActionType.EXIT,
-            on_action=lambda e,a,s,p: SystemStrings.EXIT_TEXT
-        ),
-        ActionType.LIST: {
-            'actions': empty_action
-        }
-    }
+        self._shared_scenes = set() # type: set[str]
+        """Names of scene copies that are shared with a forked session and must be copied before use"""
 
-    def __new__(cls):
+        self.history = WorldHistory(max_undo)
+        """The recorded changes of the most recent turns, used to undo them"""
+
+        self.turn = 0
         """
-        Ensures only one instance of InteractiveEngine exists (Singleton pattern).
+        The number of turns taken. Actions of the UNTIMED_ACTION_TYPES and actions that were refused don't
+        take a turn. Undoing a turn turns the counter back as well.
         """
-        if not cls._instance:
-            cls._instance = super(InteractiveEngine, cls).__new__(cls)
-        return cls._instance
 
-    def __init__(self):
-        self.current_scene = None # type: Optional[Scene]
-        """The current scene the player is in. Will only be None before the game starts."""
+        self.action_budget = action_budget
+        """
+        The number of turns the player may take, or None for no limit. Once they are used up, only actions
+        of the UNTIMED_ACTION_TYPES can be run, e.g. to undo, load or restart.
+        """
 
-        self.player = Player() # type: Player
-        """The player"""
-
-        # Set the "list actions" action to something nice and dynamic
-        def list_actions() -> str:
-            """
-            Generate a string that lists all available actions, the action type and code (if applicable).
-            """
-            all_actions = self.get_all_actions()
-            action_lines = []
-            for action_type, actions in all_actions.items():
-                if isinstance(actions, dict):
-                    for keyword, action in actions.items():
-                        action_lines.append(f"- {Colors.GREEN}{action_type.value.lower()} {keyword.lower()}{Colors.RESET}")
-                else:
-                    action_lines.append(f"- {Colors.GREEN}{action_type.value.lower()}{Colors.RESET}")
-            return "Available actions:\n" + "\n".join(action_lines)
-
-        self._system_actions[ActionType.LIST]['actions'] = Action(
-            action_type=ActionType.LIST,
-            on_action=lambda e,a,s,p: list_actions()
-        )
+        self.scheduler = TurnScheduler()
+        """Delayed and recurring events, see schedule"""
+
+        self.events = EventBus()
+        """The listeners of this session's events, e.g. for analytics, autosaves or achievements"""
+
+        self._on_exit_listener = None # type: Optional[event_listener_def]
+        """The EXIT listener added through on_exit"""
+
+        self._world_changes = {} # type: dict[tuple[Scene|Player, str, object], object]
+        """
+        The first previous value of every item and state change of the current turn that event listeners
+        wait for, keyed by (owner, kind, key). They are reported as events when the turn ends.
+        """
+
+        self._collecting_changes = False
+        """Whether a turn is collecting world changes, which doesn't depend on the history being recorded"""
+
+        self._turn_lock = None # type: Optional[asyncio.Lock]
+        """Lock that keeps asynchronous turns of this session from overlapping, created on first use"""
+
+        self._action_index = ActionIndex()
+        """Compiled dispatch index over the current scene, player and system actions"""
+
+        self._system_actions_version = self.content.system_actions_version
+        """The content system actions version the dispatch index was built from"""
+
+        self._guard_index = GuardIndex()
+        """Which guarded actions are available, kept up to date from the recorded changes"""
+
+        self._player.add_action_listener(self._action_index.invalidate)
+        self._player.set_change_listener(self._record_change)
+        self.scheduler.set_change_listener(self._record_change)
+
+        self.parser = CommandParser(self._action_index)
+        """Parser that resolves input text to actions, including verb aliases and prefixes"""
+
+        self.snapshot_store = SnapshotStore()
+        """Where the save and load actions keep their snapshots. Replace it to save to disk."""
+
+        self.profiler = None # type: Optional[TurnProfiler]
+        """Set to a TurnProfiler to time the phases of every turn, however it is run. Forks aren't profiled."""
+
+    @property
+    def _system_actions(self) -> dict:
+        """
+        Gets the system actions shared by every session using the same content
+
+        Returns:
+            system_actions (dict): The system actions
+        """
+        return self.content.system_actions
+
+    @property
+    def actions_remaining(self) -> Optional[int]:
+        """
+        Gets the number of turns left in the action budget
+
+        Returns:
+            actions_remaining (Optional[int]): The number of turns left, or None if there is no budget
+        """
+        if self.action_budget is None:
+            return None
+        return max(self.action_budget - self.turn, 0)
+
+    def schedule(self, delay: int, callback: timer_callback_def, interval: Optional[int] = None) -> int:
+        """
+        Schedules an event, e.g. engine.schedule(5, guard_returns) for "in 5 turns the guard returns". The
+        callback runs at the end of the turn it is due in, and its text is shown after the action text.
+        Scheduled events are undone along with the turns that changed them. Snapshots save them if the
+        callback is registered with EngineContent.register_timer.
+
+        Args:
+            delay (int): In how many turns the event happens. When scheduled during a turn, that turn
+                counts as the first.
+            callback (timer_callback_def): What happens when the event is due
+            interval (Optional[int]): The number of turns between recurrences, None for a one-off event
+
+        Returns:
+            event_id (int): The id of the event, for engine.scheduler.cancel
+        """
+        if delay < 1:
+            raise ValueError(f"Events must be scheduled at least 1 turn ahead, got {delay}")
+        return self.scheduler.schedule(self.turn + delay, callback, interval)
+
+    @property
+    def player(self) -> Player:
+        """
+        Gets the player
+
+        Returns:
+            player (Player): The player
+        """
+        return self._player
+
+    @player.setter
+    def player(self, player: Player) -> None:
+        """
+        Sets the player and re-indexes the available actions
+
+        Args:
+            player (Player): The new player
+        """
+        self._player.remove_action_listener(self._action_index.invalidate)
+        self._player.set_change_listener(None)
+        self._player = player
+        self._player.add_action_listener(self._action_index.invalidate)
+        self._player.set_change_listener(self._record_change)
+        self._reindex_actions()
+
+    def _reindex_actions(self) -> None:
+        """
+        Rebuilds the dispatch index from the current scene, player and system actions. This only needs
+        to happen when one of those objects is swapped out, since changes made through their add/remove
+        methods patch the index directly.
+        """
+        self._system_actions_version = self.content.system_actions_version
+        self._guard_index.set_world(self.current_scene, self._player)
+        if not self.current_scene:
+            self._action_index.set_layers([])
+            return
+
+        self._action_index.set_layers([
+            self.current_scene.actions,
+            self._player.actions,
+            self._system_actions
+        ])
 
     def on_exit(self, on_exit: on_exit_def) -> None:
         """
-        Set a callable to be executed when the engine detects an "exit" action.
+        Set a callable to be executed when the engine detects an "exit" action. This replaces the callable
+        set before, other EXIT listeners of the event bus are kept.
+        """
+        if self._on_exit_listener is not None:
+            self.events.unsubscribe(EventType.EXIT, self._on_exit_listener)
+        self._on_exit_listener = lambda event: on_exit()
+        self.events.subscribe(EventType.EXIT, self._on_exit_listener)
+
+    def start(self) -> str:
+        """
+        Starts the session in the content's start scene
+
+        Returns:
+            out (str): The text to display upon entering the start scene
         """
-        self._on_exit = on_exit
+        if self.content.start_scene_name is None:
+            raise ValueError("Content has no start scene")
 
-    def set_current_scene(self, scene: Scene) -> str:
+        return self.set_current_scene(self.content.start_scene_name)
+
+    def get_scene(self, name: str) -> Scene:
+        """
+        Gets this session's copy of a content scene, creating it the first time it is used
+
+        Args:
+            name (str): The name of the scene
+
+        Returns:
+            scene (Scene): The session's copy of the scene
+        """
+        scene = self._scenes.get(name)
+        if scene is None:
+            scene = self._scenes[name] = self.content.get_scene(name).copy()
+            scene.set_change_listener(self._record_change)
+        elif name in self._shared_scenes:
+            scene = self._own_scene(scene)
+        return scene
+
+    def _own_scene(self, scene: Scene) -> Scene:
+        """
+        Replaces a scene copy that is shared with a forked session by a copy of its own
+
+        Args:
+            scene (Scene): The shared scene copy
+
+        Returns:
+            scene (Scene): This session's own copy of the scene
+        """
+        self._shared_scenes.discard(scene.name)
+        owned_scene = self._scenes[scene.name] = scene.copy()
+        owned_scene.set_change_listener(self._record_change)
+
+        if self.current_scene is scene:
+            scene.remove_action_listener(self._action_index.invalidate)
+            self.current_scene = owned_scene
+            owned_scene.add_action_listener(self._action_index.invalidate)
+            self._reindex_actions()
+        return owned_scene
+
+    def set_current_scene(self, scene: Scene|str) -> str:
         """
         Sets the current scene of the game and returns the start scene text (or the regular scene text
-        if no start text is available).
+        if no start text is available). Content scene templates (or their names) are swapped out for this
+        session's copy of the scene.
 
         Args:
-            scene (Scene): The scene to set as the current scene
+            scene (Scene|str): The scene to set as the current scene, or the name of a content scene
 
         Returns:
             out (str): The text to display upon entering the current scene
         """
-        # Set the current scene
+        if isinstance(scene, str):
+            scene = self.get_scene(scene)
+        elif self.content.is_template(scene):
+            scene = self.get_scene(scene.name)
+
+        # Set the current scene, moving the index listener over to the new scene
+        previous_scene = self.current_scene
+        if previous_scene:
+            self._emit_scene_leave()
+            previous_scene.remove_action_listener(self._action_index.invalidate)
         self.current_scene = scene
+        scene.add_action_listener(self._action_index.invalidate)
+        scene.set_change_listener(self._record_change)
+        self._reindex_actions()
+
+        listeners = self.events.listeners[EventType.SCENE_ENTER]
+        if listeners and scene is not previous_scene:
+            emit(listeners, SceneEvent(self, scene))
 
         # Build the output text
         out_text = ''
@@ -98,17 +312,443 @@ class InteractiveEngine:
 
         return out_text
 
+    def is_session_scene(self, scene: Scene) -> bool:
+        """
+        Checks if a scene is this session's copy of a content scene
+
+        Args:
+            scene (Scene): The scene to check
+
+        Returns:
+            is_session_scene (bool): True if the scene is one of this session's scene copies
+        """
+        return self._scenes.get(scene.name) is scene
+
+    def session_scenes(self) -> dict[str, Scene]:
+        """
+        Gets this session's copies of the content scenes that have been used so far
+
+        Returns:
+            scenes (dict[str, Scene]): The scene copies, keyed by scene name
+        """
+        return self._scenes
+
+    def replace_world(self, scenes: dict[str, Scene], player: Player, current_scene_name: str) -> str:
+        """
+        Replaces the whole state of the session, e.g. when a snapshot is restored. Scenes that are not
+        provided are recreated from the content the next time they are used. When this happens during a
+        turn, the previous world is kept in the history so the turn can still be undone.
+
+        Args:
+            scenes (dict[str, Scene]): The session's scene copies, keyed by scene name
+            player (Player): The new player
+            current_scene_name (str): The name of the scene to continue in
+
+        Returns:
+            out (str): The text to display upon entering the current scene
+        """
+        if self.history.recording:
+            self.history.record(WORLD_TARGET, 'world', None, (self._scenes, self._player))
+        else:
+            # The recorded turns belong to the old world
+            self.history.clear()
+        self._set_world(scenes, set(), player)
+        return self.set_current_scene(current_scene_name)
+
+    def _set_world(self, scenes: dict[str, Scene], shared_scenes: set[str], player: Player) -> None:
+        """
+        Swaps out the session's scene copies and player. The current scene must be set afterwards.
+
+        Args:
+            scenes (dict[str, Scene]): The session's scene copies, keyed by scene name
+            shared_scenes (set[str]): The names of the scene copies that must be copied before use
+            player (Player): The new player
+        """
+        if self.current_scene:
+            self._emit_scene_leave()
+            self.current_scene.remove_action_listener(self._action_index.invalidate)
+            self.current_scene = None
+
+        for scene in scenes.values():
+            scene.set_change_listener(self._record_change)
+        self._scenes = scenes
+        self._shared_scenes = shared_scenes
+        self.player = player
+
+    def fork(self) -> 'InteractiveEngine':
+        """
+        Creates an independent "what-if" branch of this session, including its undo history. Scenes are
+        shared between both sessions until one of them uses a scene again, so forking costs next to
+        nothing no matter how large the world is. Scenes that are not part of the content are not copied.
+        The branch starts without event listeners, since those of this session report to it, e.g. a
+        TurnTracer with its session id.
+
+        Returns:
+            branch (InteractiveEngine): The new session
+        """
+        branch = InteractiveEngine(self.content, self.history.max_turns)
+        branch.history = self.history.copy()
+        branch.turn = self.turn
+        branch.action_budget = self.action_budget
+        branch.scheduler = self.scheduler.copy()
+        branch.scheduler.set_change_listener(branch._record_change)
+
+        self._shared_scenes.update(self._scenes)
+        branch._set_world(dict(self._scenes), set(self._scenes), self._player.copy())
+        if self.current_scene:
+            branch.set_current_scene(self._scene_ref(self.current_scene))
+        return branch
+
+    def save(self, slot: str = 'quicksave') -> str:
+        """
+        Saves a snapshot of the session to the snapshot store
+
+        Args:
+            slot (str): The slot to save to
+
+        Returns:
+            out (str): The text to display after saving
+        """
+        self.snapshot_store.save(slot, create_snapshot(self))
+        return SystemStrings.SAVE_TEXT
+
+    def load(self, slot: str = 'quicksave', latest: bool = False) -> str:
+        """
+        Restores the session from a snapshot in the snapshot store
+
+        Args:
+            slot (str): The slot to load from
+            latest (bool): If True, the most recently saved slot is loaded instead
+
+        Returns:
+            out (str): The text to display after loading
+        """
+        if latest:
+            slot = self.snapshot_store.latest()
+        snapshot = self.snapshot_store.load(slot) if slot is not None else None
+        if snapshot is None:
+            return SystemStrings.NO_SAVE_TEXT
+
+        restore_snapshot(self, snapshot)
+        return f"{SystemStrings.LOAD_TEXT}{SceneStrings.SCENE_DESCRIPTION_TRANSITION}{self.current_scene.text}"
+
+    def restart(self) -> str:
+        """
+        Restarts the session from the content's start scene, discarding all progress, including the turn
+        counter and scheduled events
+
+        Returns:
+            out (str): The text to display upon entering the start scene
+        """
+        if self.content.start_scene_name is None:
+            raise ValueError("Content has no start scene")
+
+        self.scheduler.clear()
+        self.turn = 0
+        return self.replace_world({}, self.content.new_player(), self.content.start_scene_name)
+
+    def undo(self) -> str:
+        """
+        Undoes the most recent turn that changed the world
+
+        Returns:
+            out (str): The text to display after undoing
+        """
+        # Undoing is not itself a turn that can be undone, and reverting isn't reported as changes
+        self.history.cancel_turn()
+        self._collecting_changes = False
+        turn = self.history.pop()
+        if turn is None:
+            return SystemStrings.NOTHING_TO_UNDO_TEXT
+
+        for change in reversed(turn.changes):
+            self._revert_change(change)
+        self.turn = turn.turn
+        self.set_current_scene(turn.scene_name)
+
+        return f"{SystemStrings.UNDO_TEXT}{SceneStrings.SCENE_DESCRIPTION_TRANSITION}{self.current_scene.text}"
+
+    def _revert_change(self, change: WorldChange) -> None:
+        """
+        Reverts a single recorded change
+
+        Args:
+            change (WorldChange): The change to revert
+        """
+        if change.target is None:
+            # Reverted inventory changes aren't reported to the change listener
+            self._guard_index.invalidate(change.kind, change.key)
+            self._player.revert_change(change.kind, change.key, change.old)
+        elif change.target == CLOCK_TARGET:
+            self.scheduler.revert_change(change.kind, change.key, change.old)
+        elif change.target == WORLD_TARGET:
+            # Other branches may still hold the old scene copies, so they are copied before use
+            scenes, player = change.old
+            self._set_world(dict(scenes), set(scenes), player)
+        elif isinstance(change.target, str):
+            self.get_scene(change.target).revert_change(change.kind, change.key, change.old)
+        else:
+            change.target.revert_change(change.kind, change.key, change.old)
+
+    def _record_change(self, owner: Scene|Player, kind: str, key, old) -> None:
+        """
+        Records a change to the session's world in the history, see change_listener_def. Changes to the
+        current scene or player also update the availability of the guarded actions.
+
+        Args:
+            owner (Scene|Player): The scene or player that is changing
+            kind (str): The kind of change
+            key (object): What changed within that kind
+            old (object): The value before the change
+        """
+        if owner is self._player or owner is self.current_scene:
+            self._guard_index.invalidate(kind, key)
+
+        if not self._collecting_changes:
+            return
+
+        if self.history.recording:
+            if owner is self._player:
+                target = None
+            elif owner is self.scheduler:
+                target = CLOCK_TARGET
+            else:
+                target = self._scene_ref(owner)
+            self.history.record(target, kind, key, old)
+
+        # Events are reported even when there is no undo history to record in
+        listeners = self.events.listeners
+        if (
+            kind == 'state' and listeners[EventType.STATE_CHANGED]
+            or kind == 'inventory' and (listeners[EventType.ITEM_ADDED] or listeners[EventType.ITEM_REMOVED])
+        ):
+            self._world_changes.setdefault((owner, kind, key), old)
+
+    def _emit_scene_leave(self) -> None:
+        """Reports leaving the current scene to the listeners"""
+        listeners = self.events.listeners[EventType.SCENE_LEAVE]
+        if listeners:
+            emit(listeners, SceneEvent(self, self.current_scene))
+
+    def _emit_world_changes(self) -> None:
+        """Reports the net item and state changes of the turn to the listeners"""
+        changes, self._world_changes = self._world_changes, {}
+        listeners = self.events.listeners
+        for (owner, kind, key), old in changes.items():
+            if kind == 'inventory':
+                quantity = owner.inventory.count(key) - old
+                if quantity > 0 and listeners[EventType.ITEM_ADDED]:
+                    emit(listeners[EventType.ITEM_ADDED], ItemEvent(self, key, quantity))
+                elif quantity < 0 and listeners[EventType.ITEM_REMOVED]:
+                    emit(listeners[EventType.ITEM_REMOVED], ItemEvent(self, key, -quantity))
+            elif key is None:
+                # The whole state was replaced
+                state = owner.state
+                for state_key in {**old, **state}:
+                    self._emit_state_change(owner, state_key, old.get(state_key, MISSING), state.get(state_key, MISSING))
+            else:
+                self._emit_state_change(owner, key, old, owner.state.get(key, MISSING))
+
+    def _emit_state_change(self, scene: Scene, key, old, new) -> None:
+        """Reports a state change to the listeners, unless the value ended up unchanged"""
+        if old != new:
+            emit(self.events.listeners[EventType.STATE_CHANGED], StateEvent(self, scene, key, old, new))
+
+    def _scene_ref(self, scene: Scene) -> Scene|str:
+        """
+        Gets a reference to a scene that stays valid when scene copies are swapped out
+
+        Args:
+            scene (Scene): The scene
+
+        Returns:
+            ref (Scene|str): The scene name for session scene copies, otherwise the scene itself
+        """
+        return scene.name if self._scenes.get(scene.name) is scene else scene
+
+    def _begin_turn(self) -> None:
+        """Prepares the session for running an action and starts recording its changes"""
+        if self.current_scene.name in self._shared_scenes and self.is_session_scene(self.current_scene):
+            self._own_scene(self.current_scene)
+        self.history.begin_turn(self._scene_ref(self.current_scene), self.turn)
+        self._collecting_changes = True
+
+    def _end_turn(self) -> None:
+        """Stops recording the changes of the turn"""
+        self.history.end_turn(self._scene_ref(self.current_scene) if self.current_scene else None)
+        self._collecting_changes = False
+        if self._world_changes:
+            self._emit_world_changes()
+
+    def _start_turn(self, command: str, action: Action, timing: Optional[list] = None) -> Optional[str]:
+        """
+        Starts a turn, reports it to the listeners and checks if the action may run. Every way of running
+        a turn goes through _start_turn and _complete_turn, so they all behave and are profiled the same.
+
+        Args:
+            command (str): The action string of the turn
+            action (Action): The action about to run
+            timing (Optional[list]): The profiler's start of the turn followed by the times the phases
+                ended, which the turn's phases are added to, or None if the turn isn't profiled
+
+        Returns:
+            refusal (Optional[str]): The text to show instead of running the action, None if it can run
+        """
+        if timing is not None:
+            timing.append(perf_counter())
+        self._begin_turn()
+        listeners = self.events.listeners
+        if listeners[EventType.TURN_START]:
+            emit(listeners[EventType.TURN_START], TurnEvent(self, command, action, None))
+
+        # The guards are only checked here, the action is then run with check_guards=False
+        if (self.action_budget is not None and self.turn >= self.action_budget
+                and action.action_type not in UNTIMED_ACTION_TYPES):
+            refusal = SystemStrings.OUT_OF_ACTIONS_TEXT
+        else:
+            refusal = action.guard_text(self.current_scene, self._player) if action.guards else None
+        if timing is not None:
+            timing.append(perf_counter())
+        return refusal
+
+    def _complete_turn(
+            self,
+            command: str,
+            action: Action,
+            text: str,
+            refused: bool,
+            keyword: Optional[str],
+            timing: Optional[list]
+        ) -> str:
+        """
+        Completes a turn started with _start_turn once its action ran: runs the scheduled events that are
+        due, stops recording the turn and reports its end to the listeners and the profiler
+
+        Args:
+            command (str): The action string of the turn
+            action (Action): The action of the turn
+            text (str): The action text, or the refusal if the action didn't run
+            refused (bool): True if the action didn't run
+            keyword (Optional[str]): The keyword the action was resolved by, None for actions triggered by their type
+            timing (Optional[list]): The timing passed to _start_turn
+
+        Returns:
+            out (str): The text of the turn
+        """
+        if timing is not None:
+            timing.append(perf_counter())
+        try:
+            if not refused:
+                text = self._advance_clock(action, text)
+        finally:
+            if timing is not None:
+                timing.append(perf_counter())
+            self._end_turn()
+        self._finish_turn(command, action, text, refused, keyword)
+        if timing is not None:
+            timing.append(perf_counter())
+            self.profiler.end_turn(timing[0], tuple(timing[1:]), None if refused else action.action_type, keyword)
+        return text
+
+    def _advance_clock(self, action: Action, text: str) -> str:
+        """
+        Counts the turn an action ran in and runs the scheduled events that are due
+
+        Args:
+            action (Action): The action that ran
+            text (str): The action text
+
+        Returns:
+            out (str): The action text followed by the texts of the events
+        """
+        if action.action_type in UNTIMED_ACTION_TYPES:
+            return text
+
+        self.turn += 1
+        next_due = self.scheduler.next_due
+        if next_due is None or next_due > self.turn:
+            return text
+
+        texts = [text] if text else []
+        for event in self.scheduler.pop_due(self.turn):
+            event_text = event.callback(self)
+            if event_text:
+                texts.append(event_text)
+        return '\n\n'.join(texts)
+
+    def _finish_turn(
+            self,
+            command: str,
+            action: Action,
+            text: str,
+            refused: bool,
+            keyword: Optional[str] = None
+        ) -> None:
+        """
+        Reports the end of a turn to the listeners
+
+        Args:
+            command (str): The action string of the turn
+            action (Action): The action of the turn
+            text (str): The text of the turn
+            refused (bool): True if the action didn't run, e.g. because one of its guards was not met
+            keyword (Optional[str]): The keyword the action was resolved by, None for actions triggered by their type
+        """
+        listeners = self.events.listeners
+        if refused and listeners[EventType.ACTION_FAILED]:
+            emit(listeners[EventType.ACTION_FAILED], ActionFailedEvent(self, command, action, text))
+        if listeners[EventType.TURN_END]:
+            emit(listeners[EventType.TURN_END], TurnEvent(self, command, action, text, keyword))
+
+    def _action_failed(self, command: str, text: str) -> None:
+        """Reports a command that couldn't be resolved to an action to the listeners"""
+        listeners = self.events.listeners[EventType.ACTION_FAILED]
+        if listeners:
+            emit(listeners, ActionFailedEvent(self, command, None, text))
+
     def set_system_action(self, action: Action) -> None:
         """
-        Sets a system-wide action that can be used in any scene
+        Sets a system-wide action that can be used in any scene. System actions live in the shared content,
+        so this affects every session using the same content.
 
         Args:
             action (Action): The action to set as a system action
         """
-        if action.action_type is None:
-            raise ValueError("System action must have an action_type set")
+        self.content.set_system_action(action)
+        self._reindex_actions()
+
+    def list_actions(self) -> str:
+        """
+        Generate a string that lists all available actions, the action type and code (if applicable).
+        Actions whose guards are not met are left out.
+
+        Returns:
+            out (str): The list of available actions
+        """
+        action_lines = []
+        for action_type, keyword, _ in self.available_actions():
+            if keyword is not None:
+                action_lines.append(f"- {Colors.GREEN}{action_type.value.lower()} {keyword.lower()}{Colors.RESET}")
+            else:
+                action_lines.append(f"- {Colors.GREEN}{action_type.value.lower()}{Colors.RESET}")
+        return "Available actions:\n" + "\n".join(action_lines)
 
-        self._system_actions[action.action_type] = action
+    def available_actions(self) -> Iterator[tuple[ActionType, Optional[str], Action]]:
+        """
+        Iterates over the actions the player can currently run, leaving out actions whose guards are not met
+
+        Returns:
+            actions (Iterator[tuple[ActionType, Optional[str], Action]]): The type, keyword and action of
+                every available action. The keyword is None for actions that are triggered by their type.
+        """
+        is_available = self._guard_index.is_available
+        for action_type, actions in self.get_all_actions().items():
+            if isinstance(actions, dict):
+                for keyword, action in actions.items():
+                    if is_available(action):
+                        yield action_type, keyword, action
+            elif is_available(actions):
+                yield action_type, None, actions
 
     def get_all_actions(self) -> dict:
         """
@@ -127,25 +767,183 @@ class InteractiveEngine:
             self._system_actions
         )
 
-    def run(self, run_str: str) -> str:
+    def _resolve_action(self, run_str: str) -> tuple[Optional[Action], str, Optional[str]]:
         """
-        Run a given action string through the engine and return the resulting text
+        Resolve an action string to the action to run
+
+        Args:
+            run_str (str): The action string
+
+        Returns:
+            resolved (tuple[Optional[Action], str, Optional[str]]): The action to run, or None along with the
+                text to return if no action could be resolved, and the keyword of the action, which is None
+                for actions that are triggered by their type
         """
-        # Try to find an action matching the action_str and target_str in the current scene
         if not self.current_scene:
             # This should never ever happen if the engine is used correctly
-            return "FATAL ERROR: No current scene set in engine."
+            return None, "FATAL ERROR: No current scene set in engine.", None
+
+        # Pick up system actions that were replaced through another session
+        if self._system_actions_version != self.content.system_actions_version:
+            self._reindex_actions()
+
+        # Try to find an action matching the action_str and target_str in the current scene
+        result = self.parser.parse(run_str)
+        if result.status is not ParseStatus.OK:
+            return None, format_parse_error(result), None
+        return result.action, '', None if self._action_index.is_direct(result.action_type) else result.target
 
-        current_scene = self.current_scene
-        all_actions = self.get_all_actions()
+    def run(self, run_str: str) -> str:
+        """
+        Run a given action string through the engine and return the resulting text
+        """
+        timing = None if self.profiler is None else [self.profiler.start_turn()]
+        action, error_text, keyword = self._resolve_action(run_str)
+        if action is None:
+            self._action_failed(run_str, error_text)
+            if timing is not None:
+                self.profiler.end_turn(timing[0], None)
+            return error_text
+
+        listeners = self.events.listeners[EventType.EXIT]
+        if listeners and action.action_type == ActionType.EXIT:
+            emit(listeners, TurnEvent(self, run_str, action, None))
+
+        refusal = self._start_turn(run_str, action, timing)
+        if refusal is not None:
+            return self._complete_turn(run_str, action, refusal, True, keyword, timing)
+        try:
+            text = action.run_action(self, self.current_scene, self.player, check_guards=False)
+        except BaseException:
+            self._end_turn()
+            raise
+        return self._complete_turn(run_str, action, text, False, keyword, timing)
+
+    def run_many(self, commands: Iterable[str], output: bool = True) -> list[TurnResult]:
+        """
+        Run a sequence of action strings through the engine, e.g. for scripted playthroughs. This keeps the
+        dispatch state warm between turns and, when output is not needed, skips formatting error messages
+        and keeping the action text.
+
+        Args:
+            commands (Iterable[str]): The action strings to run, in order
+            output (bool): If False, the text of each TurnResult is None
+
+        Returns:
+            results (list[TurnResult]): The outcome of each turn
+        """
+        results = []
+        append = results.append
+        parse = self.parser.parse
+        listeners = self.events.listeners
+        for command in commands:
+            if not self.current_scene:
+                append(TurnResult(None, None, "FATAL ERROR: No current scene set in engine." if output else None))
+                continue
+            if self._system_actions_version != self.content.system_actions_version:
+                self._reindex_actions()
+
+            profiler = self.profiler
+            timing = None if profiler is None else [profiler.start_turn()]
+            result = parse(command)
+            if result.status is not ParseStatus.OK:
+                error_text = format_parse_error(result) if output or listeners[EventType.ACTION_FAILED] else None
+                self._action_failed(command, error_text)
+                if timing is not None:
+                    profiler.end_turn(timing[0], None)
+                append(TurnResult(result.status, result.action_type, error_text if output else None))
+                continue
+
+            action = result.action
+            if listeners[EventType.EXIT] and action.action_type == ActionType.EXIT:
+                emit(listeners[EventType.EXIT], TurnEvent(self, command, action, None))
+
+            # The keyword is only worked out for those that report it
+            keyword = None
+            if (listeners[EventType.TURN_END] or timing is not None) and not self._action_index.is_direct(result.action_type):
+                keyword = result.target
+
+            refusal = self._start_turn(command, action, timing)
+            if refusal is not None:
+                text = self._complete_turn(command, action, refusal, True, keyword, timing)
+            else:
+                try:
+                    text = action.run_action(self, self.current_scene, self._player, check_guards=False)
+                except BaseException:
+                    self._end_turn()
+                    raise
+                text = self._complete_turn(command, action, text, False, keyword, timing)
+            append(TurnResult(ParseStatus.OK, action.action_type, text if output else None))
+
+        return results
+
+    async def run_async(self, run_str: str, timeout: Optional[float] = None) -> str:
+        """
+        Run a given action string through the engine without blocking the event loop and return the
+        resulting text. Coroutine on_action callables are awaited and blocking actions run in a worker
+        thread. Turns of the same session never overlap. Cancelling the calling task cancels the turn.
+        A blocking action can't be stopped once its thread runs, so when its turn times out or is cancelled,
+        the text is returned right away but the next turn of the session waits until the thread is done. Its
+        changes are recorded as part of the cancelled turn, so they can still be undone.
+
+        Args:
+            run_str (str): The action string to run
+            timeout (Optional[float]): Maximum number of seconds the turn may take
+
+        Returns:
+            out (str): The resulting text, or SystemStrings.ACTION_TIMEOUT_TEXT if the turn timed out
+        """
+        if self._turn_lock is None:
+            self._turn_lock = asyncio.Lock()
+
+        await self._turn_lock.acquire()
+        turn = asyncio.ensure_future(self._run_turn_async(run_str))
+        # The lock is held until the turn is completely done, which may be after it timed out
+        turn.add_done_callback(self._release_turn_lock)
         try:
-            action = get_action(run_str, all_actions)
-        except ValueError as e:
-            return str(e)
+            done, _ = await asyncio.wait((turn,), timeout=timeout)
+        except asyncio.CancelledError:
+            turn.cancel()
+            raise
+        if not done:
+            turn.cancel()
+            return SystemStrings.ACTION_TIMEOUT_TEXT
+        return turn.result()
+
+    def _release_turn_lock(self, turn: asyncio.Future) -> None:
+        """Releases the turn lock once an asynchronous turn is done, retrieving errors of turns that timed out"""
+        if not turn.cancelled():
+            turn.exception()
+        self._turn_lock.release()
 
-        # Handle exit action special case
-        if action.action_type == ActionType.EXIT:
-            self._on_exit()
+    async def _run_turn_async(self, run_str: str) -> str:
+        """
+        Runs a single asynchronous turn
+
+        Args:
+            run_str (str): The action string to run
+
+        Returns:
+            out (str): The resulting text
+        """
+        timing = None if self.profiler is None else [self.profiler.start_turn()]
+        action, error_text, keyword = self._resolve_action(run_str)
+        if action is None:
+            self._action_failed(run_str, error_text)
+            if timing is not None:
+                self.profiler.end_turn(timing[0], None)
+            return error_text
 
-        # Return the action text
-        return action.run_action(self, current_scene, self.player)
+        listeners = self.events.listeners[EventType.EXIT]
+        if listeners and action.action_type == ActionType.EXIT:
+            await emit_async(listeners, TurnEvent(self, run_str, action, None))
+
+        refusal = self._start_turn(run_str, action, timing)
+        if refusal is not None:
+            return self._complete_turn(run_str, action, refusal, True, keyword, timing)
+        try:
+            text = await action.run_action_async(self, self.current_scene, self.player, check_guards=False)
+        except BaseException:
+            self._end_turn()
+            raise
+        return self._complete_turn(run_str, action, text, False, keyword, timing)
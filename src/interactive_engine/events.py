@@ -0,0 +1,136 @@
+import inspect
+from collections import namedtuple
+from enum import Enum
+from typing import Awaitable, Callable
+
+class EventType(Enum):
+    """Enumeration of the events a session reports to its event bus."""
+    TURN_START = "turn_start"
+    TURN_END = "turn_end"
+    SCENE_ENTER = "scene_enter"
+    SCENE_LEAVE = "scene_leave"
+    ITEM_ADDED = "item_added"
+    ITEM_REMOVED = "item_removed"
+    STATE_CHANGED = "state_changed"
+    ACTION_FAILED = "action_failed"
+    EXIT = "exit"
+
+TurnEvent = namedtuple('TurnEvent', ['engine', 'command', 'action', 'text', 'keyword'], defaults=(None,))
+"""
+The event of TURN_START, TURN_END and EXIT. The text is the action text, None until the turn has ended.
+The keyword the action was resolved by is only reported on TURN_END, and is None for actions triggered by
+their type. EXIT is reported before the exit action runs.
+"""
+
+SceneEvent = namedtuple('SceneEvent', ['engine', 'scene'])
+"""The event of SCENE_ENTER and SCENE_LEAVE"""
+
+ItemEvent = namedtuple('ItemEvent', ['engine', 'item', 'quantity'])
+"""The event of ITEM_ADDED and ITEM_REMOVED. The quantity is how many were added or removed."""
+
+StateEvent = namedtuple('StateEvent', ['engine', 'scene', 'key', 'old', 'new'])
+"""The event of STATE_CHANGED. Unset values are MISSING."""
+
+ActionFailedEvent = namedtuple('ActionFailedEvent', ['engine', 'command', 'action', 'text'])
+"""
+The event of ACTION_FAILED, reported when a command can't be resolved to an action (the action is None)
+or the action is refused, e.g. because one of its guards is not met or the action budget is used up. The
+text is what is shown to the player instead.
+"""
+
+EVENT_TUPLES = {
+    EventType.TURN_START: TurnEvent,
+    EventType.TURN_END: TurnEvent,
+    EventType.SCENE_ENTER: SceneEvent,
+    EventType.SCENE_LEAVE: SceneEvent,
+    EventType.ITEM_ADDED: ItemEvent,
+    EventType.ITEM_REMOVED: ItemEvent,
+    EventType.STATE_CHANGED: StateEvent,
+    EventType.ACTION_FAILED: ActionFailedEvent,
+    EventType.EXIT: TurnEvent,
+}
+"""The tuple type of the event each event type's listeners are called with"""
+
+event_listener_def = Callable[[tuple], None|Awaitable[None]]
+"""
+Type alias for the callable signature used for event listeners. Only EXIT listeners may be coroutine
+functions, and only when the session is run through InteractiveEngine.run_async.
+
+Args:
+    tuple: The event, see EVENT_TUPLES
+"""
+
+def emit(listeners: tuple[event_listener_def, ...], event: tuple) -> None:
+    """
+    Calls listeners with an event. Callers check that there are listeners before creating the event, so
+    events nobody listens to are never created.
+
+    Args:
+        listeners (tuple[event_listener_def, ...]): The listeners of the event type
+        event (tuple): The event
+    """
+    for listener in listeners:
+        listener(event)
+
+async def emit_async(listeners: tuple[event_listener_def, ...], event: tuple) -> None:
+    """
+    Calls listeners with an event, awaiting the ones that are coroutine functions
+
+    Args:
+        listeners (tuple[event_listener_def, ...]): The listeners of the event type
+        event (tuple): The event
+    """
+    for listener in listeners:
+        result = listener(event)
+        if inspect.isawaitable(result):
+            await result
+
+class EventBus:
+    """
+    The listeners of a session's events. The listeners of each event type are kept in a tuple that is
+    replaced rather than modified when listeners are added or removed, so dispatching an event is a single
+    dictionary lookup and an event type without listeners costs nothing but that lookup.
+    """
+    __slots__ = ('listeners',)
+
+    def __init__(self):
+        self.listeners = {event_type: () for event_type in EventType} # type: dict[EventType, tuple[event_listener_def, ...]]
+        """The listeners of every event type. Read-only, use subscribe and unsubscribe to change them."""
+
+    def subscribe(self, event_type: EventType, listener: event_listener_def) -> event_listener_def:
+        """
+        Adds a listener for an event type
+
+        Args:
+            event_type (EventType): The event type
+            listener (event_listener_def): The listener
+
+        Returns:
+            listener (event_listener_def): The listener, so this can be used as a decorator
+        """
+        self.listeners[event_type] += (listener,)
+        return listener
+
+    def unsubscribe(self, event_type: EventType, listener: event_listener_def) -> None:
+        """
+        Removes a listener for an event type. Listeners that aren't subscribed are ignored.
+
+        Args:
+            event_type (EventType): The event type
+            listener (event_listener_def): The listener
+        """
+        listeners = list(self.listeners[event_type])
+        if listener in listeners:
+            listeners.remove(listener)
+            self.listeners[event_type] = tuple(listeners)
+
+    def copy(self) -> 'EventBus':
+        """
+        Creates a bus with the same listeners
+
+        Returns:
+            bus (EventBus): The copy
+        """
+        bus = EventBus()
+        bus.listeners.update(self.listeners)
+        return bus
@@ -0,0 +1,427 @@
+import random
+import signal
+import threading
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+from typing import Callable, Iterable, Optional
+
+from interactive_engine.command_parser import DEFAULT_VERB_ALIASES, ParseStatus
+from interactive_engine.content import EngineContent
+from interactive_engine.engine import InteractiveEngine
+from interactive_engine.grammar import DEFAULT_ARTICLES, DEFAULT_PREPOSITIONS
+from interactive_engine.snapshots import create_snapshot, restore_snapshot, state_digest
+
+invariant_def = Callable[[InteractiveEngine], Optional[str]]
+"""
+Type alias for the callable signature used to check a session after every fuzzed turn. It must be
+picklable, e.g. a module level function, so it can be sent to the worker processes.
+
+Args:
+    InteractiveEngine: The session to check
+
+Returns:
+    Optional[str]: A description of what is wrong, or None if the session is fine
+"""
+
+class FailureKind(Enum):
+    """Enumeration of the ways a fuzzed session can fail."""
+    EXCEPTION = "exception"
+    TIMEOUT = "timeout"
+    INVARIANT = "invariant"
+
+FuzzFailure = namedtuple('FuzzFailure', ['kind', 'signature', 'message', 'session_seed', 'commands', 'turns'])
+"""
+A tuple representing a distinct failure found by the fuzzer. The signature identifies the failure, e.g. the
+exception type and where it was raised, and failures with the same signature are only reported once. The
+commands are the minimized command sequence that reproduces the failure in a new session, and turns is
+how many turns the session had run when it failed.
+"""
+
+FuzzReport = namedtuple('FuzzReport', ['sessions', 'turns', 'seconds', 'failures'])
+"""
+A tuple representing the outcome of a fuzzing run: the number of sessions and turns played, the wall
+clock seconds they took and the distinct failures that were found.
+"""
+
+class TurnTimeout(Exception):
+    """Raised inside a fuzzed turn that runs longer than the turn timeout, e.g. because of an infinite loop"""
+
+JUNK_INPUTS = (
+    "", " ", "\t\n", "\x00", "\x1b[2J", "?" * 3, "...", "🧙‍♂️ 🔥", "ＴＡＫＥ ＨＡＴ", "use", "use on", "on on on",
+    "use the the", "take a", "combine with", "look at at the", "'; DROP TABLE saves; --", "%s%s%n", "{}", "None",
+    "-1", "9" * 40, "x" * 10000, "take " + "hat " * 500,
+)
+"""Fixed inputs that are known to be awkward for parsers"""
+
+class CommandGenerator:
+    """
+    Generates fuzzed commands for a session. Most commands are sampled from the actions that are currently
+    available, some of them mangled the way players mistype them, and the rest are adversarial junk made
+    from fixed awkward inputs, random characters and misplaced grammar words.
+    """
+    def __init__(self, rng: random.Random, junk_rate: float = 0.2, mangle_rate: float = 0.2):
+        self.rng = rng
+        """The random source, seeded per session so every session can be replayed"""
+
+        self.junk_rate = junk_rate
+        """The share of commands that are junk"""
+
+        self.mangle_rate = mangle_rate
+        """The share of the available commands that are mangled"""
+
+        self._grammar_words = sorted(DEFAULT_ARTICLES | DEFAULT_PREPOSITIONS | set(DEFAULT_VERB_ALIASES))
+        """Words the parser treats specially, to put in the wrong places"""
+
+    def next_command(self, engine: InteractiveEngine) -> str:
+        """
+        Generates the next command for a session
+
+        Args:
+            engine (InteractiveEngine): The session in its current state
+
+        Returns:
+            command (str): The command
+        """
+        rng = self.rng
+        commands = [
+            action_type.value if keyword is None else f"{action_type.value} {keyword}"
+            for action_type, keyword, _ in engine.available_actions()
+        ]
+        if not commands or rng.random() < self.junk_rate:
+            return self._junk(commands)
+
+        command = rng.choice(commands)
+        if rng.random() < self.mangle_rate:
+            command = self._mangle(command)
+        return command
+
+    def _mangle(self, command: str) -> str:
+        """Mistypes a valid command"""
+        rng = self.rng
+        words = command.split()
+        mangle = rng.randrange(6)
+        if mangle == 0:
+            return command.upper()
+        if mangle == 1:
+            return f"  {'  '.join(words)}  "
+        if mangle == 2:
+            return command[:rng.randrange(1, len(command) + 1)]
+        if mangle == 3:
+            words.insert(rng.randrange(1, len(words) + 1), rng.choice(self._grammar_words))
+            return ' '.join(words)
+        if mangle == 4:
+            index = rng.randrange(len(command))
+            return command[:index] + command[index + 1:]
+        return ' '.join(reversed(words))
+
+    def _junk(self, commands: list[str]) -> str:
+        """Generates adversarial input"""
+        rng = self.rng
+        junk = rng.randrange(4)
+        if junk == 0:
+            return rng.choice(JUNK_INPUTS)
+        if junk == 1:
+            return ''.join(chr(rng.randrange(1, 0x3000)) for _ in range(rng.randrange(1, 40)))
+        if junk == 2:
+            return ' '.join(rng.choice(self._grammar_words) for _ in range(rng.randrange(1, 6)))
+        # Words of different commands glued together
+        words = [word for command in rng.sample(commands, min(len(commands), 3)) for word in command.split()]
+        rng.shuffle(words)
+        return ' '.join(words[:rng.randrange(1, len(words) + 1)]) if words else ''
+
+def scene_invariant(engine: InteractiveEngine) -> Optional[str]:
+    """Checks that the session is in its own copy of a content scene"""
+    scene = engine.current_scene
+    if scene is None:
+        return "No current scene"
+    if scene.name not in engine.content.scenes:
+        return f"Current scene is not a content scene: {scene.name}"
+    if not engine.is_session_scene(scene):
+        return f"Current scene is not the session's copy: {scene.name}"
+    return None
+
+def inventory_invariant(engine: InteractiveEngine) -> Optional[str]:
+    """Checks that every inventory stack is positive, indexed by its code and counted in the total"""
+    inventory = engine.player.inventory
+    total = 0
+    for item, quantity in inventory.stacks():
+        if quantity < 1:
+            return f"Inventory stack of {item.code} has quantity {quantity}"
+        if inventory.get(item.code) is None:
+            return f"Inventory item is not indexed by its code: {item.code}"
+        total += quantity
+    if total != len(inventory):
+        return f"Inventory total is {len(inventory)}, but its stacks add up to {total}"
+    return None
+
+def clock_invariant(engine: InteractiveEngine) -> Optional[str]:
+    """Checks that the turn counter stays within the action budget"""
+    if engine.turn < 0:
+        return f"Turn counter is negative: {engine.turn}"
+    if engine.action_budget is not None and engine.turn > engine.action_budget:
+        return f"Turn {engine.turn} is over the action budget of {engine.action_budget}"
+    return None
+
+def action_invariant(engine: InteractiveEngine) -> Optional[str]:
+    """Checks that every available action can be run by typing its command"""
+    for action_type, keyword, action in engine.available_actions():
+        command = action_type.value if keyword is None else f"{action_type.value} {keyword}"
+        result = engine.parser.parse(command)
+        if result.status is not ParseStatus.OK or result.action is not action:
+            return f"Available command doesn't resolve to its action: {command!r} ({result.status.value})"
+    return None
+
+def snapshot_invariant(engine: InteractiveEngine) -> Optional[str]:
+    """Checks that restoring a snapshot of the session in a new session gives the same state"""
+    snapshot = create_snapshot(engine)
+    restored = InteractiveEngine(engine.content, max_undo=0)
+    restore_snapshot(restored, snapshot)
+    if state_digest(create_snapshot(restored)) != state_digest(snapshot):
+        return "Restoring a snapshot changes the state"
+    return None
+
+DEFAULT_INVARIANTS = (scene_invariant, inventory_invariant, clock_invariant, action_invariant, snapshot_invariant)
+"""The invariants checked after every fuzzed turn unless others are given"""
+
+def _raise_timeout(signum, frame):
+    raise TurnTimeout()
+
+class _SessionRunner:
+    """Plays fuzzed sessions and replays command sequences, in the main process or in a worker process"""
+    def __init__(
+            self,
+            content: EngineContent,
+            invariants: Iterable[invariant_def],
+            turn_timeout: float,
+            junk_rate: float
+        ):
+        self.content = content
+        """The content being fuzzed"""
+
+        self.invariants = tuple(invariants)
+        """The invariants checked after every turn"""
+
+        self.turn_timeout = turn_timeout
+        """The number of seconds a turn may take"""
+
+        self.junk_rate = junk_rate
+        """The share of commands that are junk"""
+
+        self._interrupts = hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+        """
+        Whether turns can be interrupted with a timer signal. Where they can't, turns that take too long are
+        still reported once they finish, but a turn that never finishes hangs the fuzzer.
+        """
+
+    def _run_turn(self, engine: InteractiveEngine, command: str) -> Optional[tuple[FailureKind, str, str]]:
+        """
+        Runs one turn and checks the invariants
+
+        Returns:
+            failure (Optional[tuple[FailureKind, str, str]]): The kind, signature and message of the failure,
+                or None if the turn succeeded
+        """
+        start = time.perf_counter()
+        if self._interrupts:
+            previous = signal.signal(signal.SIGALRM, _raise_timeout)
+            signal.setitimer(signal.ITIMER_REAL, self.turn_timeout)
+        try:
+            engine.run(command)
+        except TurnTimeout:
+            return FailureKind.TIMEOUT, "timeout", f"Turn took longer than {self.turn_timeout}s"
+        except Exception as e:
+            frame = traceback.extract_tb(e.__traceback__)[-1]
+            return FailureKind.EXCEPTION, f"{type(e).__name__} at {frame.filename}:{frame.lineno}", repr(e)
+        finally:
+            if self._interrupts:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, previous)
+        if time.perf_counter() - start > self.turn_timeout:
+            return FailureKind.TIMEOUT, "timeout", f"Turn took longer than {self.turn_timeout}s"
+
+        for invariant in self.invariants:
+            try:
+                message = invariant(engine)
+            except Exception as e:
+                message = f"{invariant.__name__} raised {e!r}"
+            if message is not None:
+                return FailureKind.INVARIANT, f"{invariant.__name__}: {message}", message
+        return None
+
+    def replay(self, commands: Iterable[str]) -> Optional[str]:
+        """
+        Replays a command sequence in a new session
+
+        Args:
+            commands (Iterable[str]): The commands
+
+        Returns:
+            signature (Optional[str]): The signature of the first failure, or None if there was none
+        """
+        engine = InteractiveEngine(self.content)
+        engine.start()
+        for command in commands:
+            failure = self._run_turn(engine, command)
+            if failure is not None:
+                return failure[1]
+        return None
+
+    def minimize(self, commands: list[str], signature: str, max_replays: int) -> tuple[str, ...]:
+        """
+        Shrinks a failing command sequence by delta debugging: chunks of the sequence are removed for as
+        long as the rest still fails the same way, with ever smaller chunks
+
+        Args:
+            commands (list[str]): The failing commands, the last one failed
+            signature (str): The signature of the failure
+            max_replays (int): The maximum number of sequences to replay
+
+        Returns:
+            commands (tuple[str, ...]): The shortest failing sequence found
+        """
+        chunks = 2
+        while len(commands) > 1 and max_replays > 0:
+            size = -(-len(commands) // chunks)
+            for start in range(0, len(commands), size):
+                rest = commands[:start] + commands[start + size:]
+                max_replays -= 1
+                if self.replay(rest) == signature:
+                    commands = rest
+                    chunks = max(chunks - 1, 2)
+                    break
+                if max_replays <= 0:
+                    break
+            else:
+                if chunks >= len(commands):
+                    break
+                chunks = min(chunks * 2, len(commands))
+        return tuple(commands)
+
+    def play(self, session_seed: str, turns: int) -> tuple[int, Optional[FuzzFailure]]:
+        """
+        Plays a fuzzed session until it fails or has played all of its turns
+
+        Args:
+            session_seed (str): The seed of the session
+            turns (int): The number of turns to play
+
+        Returns:
+            outcome (tuple[int, Optional[FuzzFailure]]): The number of turns played and the failure, if any
+        """
+        generator = CommandGenerator(random.Random(session_seed), self.junk_rate)
+        engine = InteractiveEngine(self.content)
+        engine.start()
+        commands = []
+        for turn in range(1, turns + 1):
+            command = generator.next_command(engine)
+            commands.append(command)
+            failure = self._run_turn(engine, command)
+            if failure is not None:
+                kind, signature, message = failure
+                return turn, FuzzFailure(kind, signature, message, session_seed, tuple(commands), turn)
+        return turns, None
+
+    def play_sessions(
+            self,
+            seeds: list[str],
+            turns: int,
+            minimize: bool,
+            max_replays: int
+        ) -> tuple[int, list[FuzzFailure]]:
+        """
+        Plays several fuzzed sessions, minimizing only the first failure of each signature
+
+        Returns:
+            outcome (tuple[int, list[FuzzFailure]]): The number of turns played and the distinct failures
+        """
+        played = 0
+        failures = {} # type: dict[str, FuzzFailure]
+        for session_seed in seeds:
+            session_turns, failure = self.play(session_seed, turns)
+            played += session_turns
+            if failure is not None and failure.signature not in failures:
+                if minimize:
+                    commands = self.minimize(list(failure.commands), failure.signature, max_replays)
+                    failure = failure._replace(commands=commands)
+                failures[failure.signature] = failure
+        return played, list(failures.values())
+
+_worker_runner = None # type: Optional[_SessionRunner]
+"""The session runner of a worker process, created by _init_worker"""
+
+def _init_worker(content_factory: Callable[[], EngineContent], *args) -> None:
+    """Builds the content once per worker process"""
+    global _worker_runner
+    _worker_runner = _SessionRunner(content_factory(), *args)
+
+def _play_in_worker(*args) -> tuple[int, list[FuzzFailure]]:
+    """Plays sessions in a worker process, see _SessionRunner.play_sessions"""
+    return _worker_runner.play_sessions(*args)
+
+def fuzz(
+        content_factory: Callable[[], EngineContent],
+        sessions: int = 100,
+        turns: int = 200,
+        workers: int = 0,
+        seed: int = 0,
+        invariants: Iterable[invariant_def] = DEFAULT_INVARIANTS,
+        turn_timeout: float = 1.0,
+        junk_rate: float = 0.2,
+        minimize: bool = True,
+        max_replays: int = 500
+    ) -> FuzzReport:
+    """
+    Plays random sessions of a game to find crashes, hangs and broken invariants. Each session plays the
+    given number of turns from the start scene, with commands sampled from the available actions and mixed
+    with junk input, and is checked after every turn. A session ends at its first failure, which is then
+    minimized to a short command sequence that reproduces it.
+
+    Every session has its own seed, derived from the run's seed and the session's number, so a run finds
+    the same failures no matter how many workers share it. Turns that run longer than the turn timeout
+    are interrupted where the platform allows it.
+
+    Args:
+        content_factory (Callable[[], EngineContent]): Builds the content, e.g. wizard_emergency.build_content.
+            Must be picklable when workers are used, since every worker process builds its own content.
+        sessions (int): The number of sessions to play
+        turns (int): The number of turns per session
+        workers (int): The number of worker processes to play in, 0 to play in this process
+        seed (int): The seed of the run
+        invariants (Iterable[invariant_def]): The checks to run after every turn
+        turn_timeout (float): The number of seconds a turn may take before it counts as a hang
+        junk_rate (float): The share of commands that are junk instead of available actions
+        minimize (bool): Whether to minimize the command sequences of failures
+        max_replays (int): The maximum number of sequences replayed to minimize each failure
+
+    Returns:
+        report (FuzzReport): The number of turns played, how long they took and the distinct failures
+    """
+    invariants = tuple(invariants)
+    seeds = [f"{seed}/{session}" for session in range(sessions)]
+    start = time.perf_counter()
+    if workers:
+        batch_size = max(1, -(-sessions // (workers * 4)))
+        batches = [seeds[index:index + batch_size] for index in range(0, sessions, batch_size)]
+        with ProcessPoolExecutor(
+                workers,
+                initializer=_init_worker,
+                initargs=(content_factory, invariants, turn_timeout, junk_rate)
+            ) as executor:
+            outcomes = list(executor.map(
+                _play_in_worker, batches, *([value] * len(batches) for value in (turns, minimize, max_replays))
+            ))
+    else:
+        runner = _SessionRunner(content_factory(), invariants, turn_timeout, junk_rate)
+        outcomes = [runner.play_sessions(seeds, turns, minimize, max_replays)]
+    seconds = time.perf_counter() - start
+
+    played = 0
+    failures = {} # type: dict[str, FuzzFailure]
+    for batch_turns, batch_failures in outcomes:
+        played += batch_turns
+        for failure in batch_failures:
+            failures.setdefault(failure.signature, failure)
+    return FuzzReport(sessions, played, seconds, tuple(failures.values()))
@@ -0,0 +1,125 @@
+from collections import namedtuple
+from typing import Iterable, Optional
+
+DEFAULT_ARTICLES = frozenset({'a', 'an', 'the', 'some'})
+"""Words that are ignored wherever they appear in a noun phrase"""
+
+DEFAULT_STOP_WORDS = frozenset({'please', 'my', 'your', 'this', 'that'})
+"""Other filler words that are ignored wherever they appear"""
+
+DEFAULT_PREPOSITIONS = frozenset({
+    'on', 'onto', 'upon', 'with', 'using', 'to', 'into', 'in', 'at', 'through', 'against', 'under', 'from',
+})
+"""Words that separate the direct object of a command from its indirect object"""
+
+DEFAULT_PAIR_PREPOSITION = 'on'
+"""The preposition used by pair_keyword"""
+
+GrammarPhrase = namedtuple('GrammarPhrase', ['direct', 'preposition', 'indirect'])
+"""
+A tuple representing the objects of a command or keyword, e.g. ("rusty key", "on", "door") for "the rusty
+key on the door". Objects are lowercase words joined by single spaces. The preposition and indirect object
+are None if there is no indirect object.
+"""
+
+def pair_keyword(item: str, target: str, preposition: str = DEFAULT_PAIR_PREPOSITION) -> str:
+    """
+    Builds the keyword of an action that takes both a direct and an indirect object, e.g. "key on door"
+    for using a key on a door. Any phrasing of the pair resolves to the action, e.g. "use the key with the
+    door", so content only needs to register each pair once.
+
+    Args:
+        item (str): The direct object, typically an item code
+        target (str): The indirect object
+        preposition (str): The preposition placed between them in the keyword
+
+    Returns:
+        keyword (str): The keyword
+    """
+    return f"{item} {preposition} {target}"
+
+class Grammar:
+    """
+    Splits the target of a command into a direct and indirect object, e.g. "the key on the old door" into
+    "key" and "old door". Articles and stop words are dropped, and the first preposition that follows a
+    direct object separates it from the indirect object. Prepositions in front of the direct object are
+    dropped too ("look at the door"). Every word is classified with a single dictionary lookup.
+    """
+    _ARTICLE = 0
+    _PREPOSITION = 1
+
+    def __init__(
+            self,
+            articles: Iterable[str] = DEFAULT_ARTICLES,
+            stop_words: Iterable[str] = DEFAULT_STOP_WORDS,
+            prepositions: Iterable[str] = DEFAULT_PREPOSITIONS
+        ):
+        self._word_classes = {} # type: dict[str, int]
+        """The class of every function word, words that aren't in here are part of a noun phrase"""
+
+        for word in articles:
+            self._word_classes[word.lower()] = Grammar._ARTICLE
+        for word in stop_words:
+            self._word_classes[word.lower()] = Grammar._ARTICLE
+        for word in prepositions:
+            self._word_classes[word.lower()] = Grammar._PREPOSITION
+
+        self._keyword_phrases = {} # type: dict[str, GrammarPhrase]
+        """Parsed keywords. Keywords come from content rather than player input, so this stays small."""
+
+    def parse(self, words: Iterable[str]) -> GrammarPhrase:
+        """
+        Parses the words of a command's target
+
+        Args:
+            words (Iterable[str]): The lowercase words of the target
+
+        Returns:
+            phrase (GrammarPhrase): The direct and indirect objects. The direct object is an empty string
+                if the words contain no noun at all.
+        """
+        direct = [] # type: list[str]
+        indirect = None # type: Optional[list[str]]
+        preposition = None # type: Optional[str]
+        for word in words:
+            word_class = self._word_classes.get(word)
+            if word_class is None:
+                (direct if indirect is None else indirect).append(word)
+            elif word_class == Grammar._PREPOSITION and indirect is None and direct:
+                preposition = word
+                indirect = []
+
+        if not indirect:
+            # A dangling preposition ("use key on") has no indirect object
+            return GrammarPhrase(' '.join(direct), None, None)
+        return GrammarPhrase(' '.join(direct), preposition, ' '.join(indirect))
+
+    def parse_keyword(self, keyword: str) -> GrammarPhrase:
+        """
+        Parses an action keyword, e.g. to find out if it is a pair_keyword
+
+        Args:
+            keyword (str): The keyword
+
+        Returns:
+            phrase (GrammarPhrase): The direct and indirect objects of the keyword
+        """
+        phrase = self._keyword_phrases.get(keyword)
+        if phrase is None:
+            phrase = self._keyword_phrases[keyword] = self.parse(keyword.lower().split())
+        return phrase
+
+    def is_function_word(self, word: str) -> bool:
+        """
+        Checks if a word is an article, stop word or preposition rather than part of a noun phrase
+
+        Args:
+            word (str): The lowercase word
+
+        Returns:
+            is_function_word (bool): True if the word is a function word
+        """
+        return word in self._word_classes
+
+DEFAULT_GRAMMAR = Grammar()
+"""The grammar shared by every parser that doesn't customize it"""
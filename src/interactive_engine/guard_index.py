@@ -0,0 +1,85 @@
+from typing import Optional
+
+from interactive_engine.data_classes import Action, Player, Scene
+
+class GuardIndex:
+    """
+    Keeps track of which guarded actions are currently available. Every guard is indexed by the state key
+    or item it checks, so a change to the world only marks the actions gated by that key for re-evaluation
+    instead of evaluating every guard each turn. Marked actions are evaluated again the next time their
+    availability is asked for, so changes that happen before the change listener is notified are fine.
+
+    Actions are indexed the first time they are asked about, and the index is cleared whenever the scene
+    or player is swapped out.
+    """
+    def __init__(self):
+        self._scene = None # type: Optional[Scene]
+        """The scene state guards are checked against"""
+
+        self._player = None # type: Optional[Player]
+        """The player inventory guards are checked against"""
+
+        self._dependents = {} # type: dict[tuple[str, object], set[Action]]
+        """The indexed actions gated by each (kind, key) pair, e.g. ("state", "door_open")"""
+
+        self._indexed = set() # type: set[Action]
+        """The guarded actions whose guards are in the index"""
+
+        self._available = {} # type: dict[Action, bool]
+        """The known availability of indexed actions. Actions that need evaluating again are missing."""
+
+    def set_world(self, scene: Optional[Scene], player: Optional[Player]) -> None:
+        """
+        Sets the scene and player guards are checked against and clears the index
+
+        Args:
+            scene (Optional[Scene]): The current scene
+            player (Optional[Player]): The current player
+        """
+        self._scene = scene
+        self._player = player
+        self._dependents.clear()
+        self._indexed.clear()
+        self._available.clear()
+
+    def invalidate(self, kind: str, key) -> None:
+        """
+        Marks the actions gated by a changed state key or item for re-evaluation. The arguments match those
+        reported to change listeners, and kinds of change that no guard checks are ignored.
+
+        Args:
+            kind (str): The kind of change, e.g. "state" or "inventory"
+            key (object): The state key or item that changed. A state key of None means the whole state
+                was replaced.
+        """
+        if kind == 'state' and key is None:
+            for (dependent_kind, _), actions in self._dependents.items():
+                if dependent_kind == 'state':
+                    for action in actions:
+                        self._available.pop(action, None)
+            return
+
+        for action in self._dependents.get((kind, key), ()):
+            self._available.pop(action, None)
+
+    def is_available(self, action: Action) -> bool:
+        """
+        Checks if all guards of an action are currently met
+
+        Args:
+            action (Action): The action to check
+
+        Returns:
+            available (bool): True if the action can run
+        """
+        if not action.guards:
+            return True
+
+        available = self._available.get(action)
+        if available is None:
+            if action not in self._indexed:
+                self._indexed.add(action)
+                for guard in action.guards:
+                    self._dependents.setdefault((guard.kind, guard.key), set()).add(action)
+            available = self._available[action] = action.failed_guard(self._scene, self._player) is None
+        return available
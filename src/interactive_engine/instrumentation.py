@@ -0,0 +1,292 @@
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Iterator, Optional
+
+from interactive_engine.data_classes import ActionType
+
+TURN_PHASES = ('resolve', 'guards', 'action', 'clock', 'events')
+"""
+The phases of a profiled turn, in order: resolving the command to an action, starting the turn and
+checking the guards and action budget, running the action's on_action, running the scheduled events that
+are due, and reporting the turn's changes and end to the event listeners
+"""
+
+HISTOGRAM_BUCKETS = 32
+"""
+The number of buckets of a LatencyHistogram. Bucket 0 counts durations under a microsecond, bucket i
+durations under 2^i microseconds and the last bucket everything longer.
+"""
+
+class LatencyHistogram:
+    """
+    A histogram of durations with logarithmic buckets, so recording is constant time and constant memory
+    however many durations are recorded. Percentiles are accurate to within a factor of two.
+    """
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = [0] * HISTOGRAM_BUCKETS # type: list[int]
+        """The number of durations in each bucket"""
+
+        self.count = 0
+        """The number of recorded durations"""
+
+        self.total = 0.0
+        """The sum of the recorded durations in seconds"""
+
+        self.min = None # type: Optional[float]
+        """The shortest recorded duration in seconds"""
+
+        self.max = None # type: Optional[float]
+        """The longest recorded duration in seconds"""
+
+    def record(self, seconds: float) -> None:
+        """
+        Records a duration
+
+        Args:
+            seconds (float): The duration
+        """
+        bucket = int(seconds * 1_000_000).bit_length()
+        self.counts[bucket if bucket < HISTOGRAM_BUCKETS else HISTOGRAM_BUCKETS - 1] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        Estimates a percentile of the recorded durations
+
+        Args:
+            percent (float): The percentile, between 0 and 100
+
+        Returns:
+            seconds (Optional[float]): The upper bound of the bucket the percentile falls in, capped at the
+                longest duration, or None if nothing was recorded
+        """
+        if not self.count:
+            return None
+        rank = percent / 100 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min((1 << bucket) / 1_000_000, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        """
+        Gets the histogram as JSON serializable data
+
+        Returns:
+            histogram (dict): The count, total, min, max, mean and percentiles in seconds, and the bucket counts
+        """
+        return {
+            'count': self.count,
+            'total_s': self.total,
+            'min_s': self.min,
+            'max_s': self.max,
+            'mean_s': self.total / self.count if self.count else None,
+            'p50_s': self.percentile(50),
+            'p90_s': self.percentile(90),
+            'p99_s': self.percentile(99),
+            'buckets': list(self.counts),
+        }
+
+class TurnProfiler:
+    """
+    Opt-in timing of the turns of a session, set as InteractiveEngine.profiler. Keeps a latency histogram
+    of each turn phase (see TURN_PHASES) and of every action, keyed by its type and keyword, and counts how
+    many memory blocks each turn leaves allocated. Sessions without a profiler pay a single attribute check
+    per turn.
+    """
+    def __init__(self, trace_allocations: bool = False):
+        self.trace_allocations = trace_allocations
+        """
+        Whether to also measure the peak number of bytes allocated during each turn with tracemalloc. This
+        slows every allocation down considerably, so it is off by default.
+        """
+
+        self.turns = 0
+        """The number of profiled turns"""
+
+        self.failed = 0
+        """The number of profiled commands that couldn't be resolved to an action"""
+
+        self.turn_latency = LatencyHistogram()
+        """The durations of whole turns"""
+
+        self.phases = {phase: LatencyHistogram() for phase in TURN_PHASES} # type: dict[str, LatencyHistogram]
+        """The durations of each phase, including phases added through measure or wrap"""
+
+        self.actions = {} # type: dict[tuple[ActionType, Optional[str]], LatencyHistogram]
+        """The durations of the on_action of each action, keyed by action type and keyword"""
+
+        self.blocks = {'total': 0, 'max': 0} # type: dict[str, int]
+        """How many memory blocks the turns left allocated, in total and at most in a single turn"""
+
+        self.peak_bytes = {'total': 0, 'max': 0} # type: dict[str, int]
+        """The peak bytes allocated on top of what was allocated before each turn, in total and at most"""
+
+        self._started_tracing = False
+        """Whether this profiler started tracemalloc, and must stop it again"""
+
+    def start_turn(self) -> tuple[float, int, int]:
+        """
+        Marks the start of a turn
+
+        Returns:
+            start (tuple[float, int, int]): The start time, the allocated block count and the traced bytes,
+                passed to end_turn
+        """
+        traced = 0
+        if self.trace_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            traced = tracemalloc.get_traced_memory()[0]
+        return time.perf_counter(), sys.getallocatedblocks(), traced
+
+    def end_turn(
+            self,
+            start: tuple[float, int, int],
+            phases: Optional[tuple[float, ...]],
+            action_type: Optional[ActionType] = None,
+            keyword: Optional[str] = None
+        ) -> None:
+        """
+        Records a turn
+
+        Args:
+            start (tuple[float, int, int]): What start_turn returned
+            phases (Optional[tuple[float, ...]]): The times each phase ended, in the order of TURN_PHASES, or
+                None if the command couldn't be resolved to an action
+            action_type (Optional[ActionType]): The type of the action that ran, None if it was refused
+            keyword (Optional[str]): The keyword of the action that ran, None for actions triggered by their type
+        """
+        end = time.perf_counter()
+        blocks = sys.getallocatedblocks() - start[1]
+        self.turns += 1
+        self.turn_latency.record(end - start[0])
+        self.blocks['total'] += blocks
+        self.blocks['max'] = max(self.blocks['max'], blocks)
+        if self.trace_allocations and tracemalloc.is_tracing():
+            peak = tracemalloc.get_traced_memory()[1] - start[2]
+            self.peak_bytes['total'] += peak
+            self.peak_bytes['max'] = max(self.peak_bytes['max'], peak)
+
+        if phases is None:
+            self.failed += 1
+            self.phases['resolve'].record(end - start[0])
+            return
+
+        previous = start[0]
+        for phase, phase_end in zip(TURN_PHASES, phases):
+            self.phases[phase].record(phase_end - previous)
+            previous = phase_end
+
+        if action_type is None:
+            return
+        histogram = self.actions.get((action_type, keyword))
+        if histogram is None:
+            histogram = self.actions[(action_type, keyword)] = LatencyHistogram()
+        action_index = TURN_PHASES.index('action')
+        histogram.record(phases[action_index] - phases[action_index - 1])
+
+    def record_phase(self, phase: str, seconds: float) -> None:
+        """
+        Records the duration of a phase, e.g. of work done outside of the engine such as redrawing the console
+
+        Args:
+            phase (str): The name of the phase
+            seconds (float): The duration
+        """
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            histogram = self.phases[phase] = LatencyHistogram()
+        histogram.record(seconds)
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        """
+        Times the body of a with statement as a phase, e.g. with profiler.measure('render'): ...
+
+        Args:
+            phase (str): The name of the phase
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_phase(phase, time.perf_counter() - start)
+
+    def wrap(self, phase: str, function: Callable) -> Callable:
+        """
+        Wraps a function so every call to it is timed as a phase
+
+        Args:
+            phase (str): The name of the phase
+            function (Callable): The function to time
+
+        Returns:
+            wrapped (Callable): The timed function
+        """
+        @wraps(function)
+        def timed(*args, **kwargs):
+            with self.measure(phase):
+                return function(*args, **kwargs)
+        return timed
+
+    def snapshot(self) -> dict:
+        """
+        Gets everything recorded so far as JSON serializable data. The data is a copy, so it doesn't
+        change as more turns are recorded.
+
+        Returns:
+            snapshot (dict): The turn counts, the histograms of the turns, phases and actions, and the
+                allocation counts. Actions are keyed by their command, e.g. "take hat" or "inventory".
+        """
+        return {
+            'turns': self.turns,
+            'failed': self.failed,
+            'turn': self.turn_latency.to_dict(),
+            'phases': {phase: histogram.to_dict() for phase, histogram in self.phases.items()},
+            'actions': {
+                action_type.value if keyword is None else f"{action_type.value} {keyword}": histogram.to_dict()
+                for (action_type, keyword), histogram in self.actions.items()
+            },
+            'blocks': dict(self.blocks),
+            'peak_bytes': dict(self.peak_bytes) if self.trace_allocations else None,
+        }
+
+    def reset(self) -> None:
+        """Discards everything recorded so far, and stops tracemalloc if this profiler started it"""
+        self.turns = 0
+        self.failed = 0
+        self.turn_latency = LatencyHistogram()
+        self.phases = {phase: LatencyHistogram() for phase in TURN_PHASES}
+        self.actions = {}
+        self.blocks = {'total': 0, 'max': 0}
+        self.peak_bytes = {'total': 0, 'max': 0}
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def export_json(self, path: str) -> None:
+        """
+        Writes a snapshot to a JSON file
+
+        Args:
+            path (str): The path of the file
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+            f.write('\n')
@@ -0,0 +1,334 @@
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator, Optional
+
+from interactive_engine.events import ActionFailedEvent, EventType, TurnEvent
+from interactive_engine.instrumentation import HISTOGRAM_BUCKETS, LatencyHistogram
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+"""The content type of the Prometheus text exposition format"""
+
+gauge_callback_def = Callable[[], Optional[float]]
+"""
+Type alias for the callable signature used to read a gauge when metrics are scraped
+
+Returns:
+    Optional[float]: The value of the gauge, or None to leave it out
+"""
+
+def _format_labels(label_names: tuple[str, ...], label_values: tuple[str, ...]) -> str:
+    """Formats the labels of a sample, e.g. {reason="refused"}"""
+    if not label_names:
+        return ''
+    escaped = (
+        str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in label_values
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(label_names, escaped)) + '}'
+
+class _Sharded:
+    """
+    Base class of metrics that every thread updates in its own shard, so updates need no lock. The shards
+    are only added up when the metrics are scraped.
+    """
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        """The name of the metric"""
+
+        self.help_text = help_text
+        """The description of the metric"""
+
+        self._local = threading.local()
+        """The shard of the current thread"""
+
+        self._shards = [] # type: list
+        """Every thread's shard"""
+
+        self._shards_lock = threading.Lock()
+        """Guards adding shards, which happens once per thread"""
+
+    def _new_shard(self):
+        """Creates the shard of a thread"""
+        raise NotImplementedError()
+
+    def _shard(self):
+        """Gets the shard of the current thread, creating it the first time"""
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = self._new_shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _all_shards(self) -> list:
+        """Gets every thread's shard"""
+        with self._shards_lock:
+            return list(self._shards)
+
+class Counter(_Sharded):
+    """A monotonically increasing count, optionally split by labels"""
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...] = ()):
+        super().__init__(name, help_text)
+        self.label_names = label_names
+        """The names of the labels, the values are passed to inc"""
+
+    def _new_shard(self) -> dict:
+        return {}
+
+    def inc(self, label_values: tuple[str, ...] = (), amount: float = 1) -> None:
+        """
+        Increases the count
+
+        Args:
+            label_values (tuple[str, ...]): The values of the labels, in the order of the label names
+            amount (float): How much to increase it by
+        """
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._shard()
+        shard[label_values] = shard.get(label_values, 0) + amount
+
+    def values(self) -> dict[tuple[str, ...], float]:
+        """
+        Adds up the counts of every thread
+
+        Returns:
+            values (dict[tuple[str, ...], float]): The count of every combination of label values
+        """
+        totals = {} # type: dict[tuple[str, ...], float]
+        for shard in self._all_shards():
+            # Copying a dict is atomic, so the owning thread can keep counting meanwhile
+            for label_values, value in shard.copy().items():
+                totals[label_values] = totals.get(label_values, 0) + value
+        return totals
+
+    def expose(self) -> list[str]:
+        """Formats the metric in the Prometheus text format"""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {value}")
+        return lines
+
+class Histogram(_Sharded):
+    """A distribution of durations, kept in the logarithmic buckets of a LatencyHistogram per thread"""
+    def _new_shard(self) -> LatencyHistogram:
+        return LatencyHistogram()
+
+    def observe(self, seconds: float) -> None:
+        """
+        Records a duration
+
+        Args:
+            seconds (float): The duration
+        """
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._shard()
+        shard.record(seconds)
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Records how long the body of a with statement takes"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def expose(self) -> list[str]:
+        """Formats the metric in the Prometheus text format"""
+        counts = [0] * HISTOGRAM_BUCKETS
+        count = 0
+        total = 0.0
+        for shard in self._all_shards():
+            # A scrape may see a record half done, which is off by one at most
+            for bucket, bucket_count in enumerate(list(shard.counts)):
+                counts[bucket] += bucket_count
+            count += shard.count
+            total += shard.total
+
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bucket, bucket_count in enumerate(counts[:-1]):
+            cumulative += bucket_count
+            lines.append(f'{self.name}_bucket{{le="{(1 << bucket) / 1_000_000:.9g}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {count}')
+        lines.append(f"{self.name}_sum {total}")
+        lines.append(f"{self.name}_count {count}")
+        return lines
+
+class Gauge:
+    """A value that is read when the metrics are scraped, e.g. the number of open sessions"""
+    def __init__(self, name: str, help_text: str, callback: gauge_callback_def):
+        self.name = name
+        """The name of the metric"""
+
+        self.help_text = help_text
+        """The description of the metric"""
+
+        self.callback = callback
+        """Reads the value"""
+
+    def expose(self) -> list[str]:
+        """Formats the metric in the Prometheus text format, leaving the sample out if there's no value"""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        value = self.callback()
+        if value is not None:
+            lines.append(f"{self.name} {value}")
+        return lines
+
+def resident_memory_bytes() -> Optional[int]:
+    """
+    Gets the resident memory of the process
+
+    Returns:
+        memory (Optional[int]): The resident set size in bytes, or None where it can't be read
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+class EngineMetrics:
+    """
+    The metrics of the sessions of a process: turns and failed commands, turn and render durations, open
+    sessions and memory per session. Sessions report to it through their event buses once attached, and
+    every thread updates its own shard of each metric, so sessions served from many threads never contend
+    on a lock. Rates such as turns per second are left to the scraper, e.g. rate(interactive_engine_turns_total[1m]).
+    """
+    def __init__(self, session_count: Optional[Callable[[], int]] = None, prefix: str = 'interactive_engine'):
+        self.turns = Counter(f"{prefix}_turns_total", "Turns, including refused ones, by action type.", ('action_type',))
+        """The turns run, by action type"""
+
+        self.failed_actions = Counter(
+            f"{prefix}_failed_actions_total",
+            "Commands that didn't run, because they couldn't be resolved to an action or the action was refused.",
+            ('reason',)
+        )
+        """The commands that didn't run, by reason: unresolved or refused"""
+
+        self.turn_seconds = Histogram(f"{prefix}_turn_seconds", "Time from the start to the end of a turn.")
+        """How long turns take"""
+
+        self.render_seconds = Histogram(f"{prefix}_render_seconds", "Time spent rendering turn output.")
+        """How long rendering turn output takes, measured by the code that renders it"""
+
+        self.session_count = session_count
+        """Counts the open sessions, e.g. len of a SessionPool"""
+
+        self.gauges = [
+            Gauge(f"{prefix}_active_sessions", "Open sessions.", self._active_sessions),
+            Gauge("process_resident_memory_bytes", "Resident memory size in bytes.", resident_memory_bytes),
+            Gauge(f"{prefix}_memory_per_session_bytes", "Resident memory divided by the open sessions.", self._memory_per_session),
+        ] # type: list[Gauge]
+        """The metrics that are read when scraped"""
+
+        self._turn_starts = weakref.WeakKeyDictionary() # type: weakref.WeakKeyDictionary
+        """
+        When the turn in progress of every session started, by session. Keyed by the session rather than the
+        thread, since sessions run through run_async share their event loop's thread and their turns interleave.
+        """
+
+    def attach(self, engine) -> None:
+        """
+        Starts reporting the turns of a session. Pass it as the setup of a SessionPool to attach every
+        session the pool opens or forks.
+
+        Args:
+            engine (InteractiveEngine): The session
+        """
+        engine.events.subscribe(EventType.TURN_START, self._on_turn_start)
+        engine.events.subscribe(EventType.TURN_END, self._on_turn_end)
+        engine.events.subscribe(EventType.ACTION_FAILED, self._on_action_failed)
+
+    def _on_turn_start(self, event: TurnEvent) -> None:
+        self._turn_starts[event.engine] = time.perf_counter()
+
+    def _on_turn_end(self, event: TurnEvent) -> None:
+        self.turns.inc((event.action.action_type.value,))
+        start = self._turn_starts.pop(event.engine, None)
+        if start is not None:
+            self.turn_seconds.observe(time.perf_counter() - start)
+
+    def _on_action_failed(self, event: ActionFailedEvent) -> None:
+        self.failed_actions.inc(('unresolved' if event.action is None else 'refused',))
+
+    def _active_sessions(self) -> Optional[float]:
+        return self.session_count() if self.session_count is not None else None
+
+    def _memory_per_session(self) -> Optional[float]:
+        sessions = self._active_sessions()
+        memory = resident_memory_bytes()
+        if not sessions or memory is None:
+            return None
+        return memory / sessions
+
+    def expose(self) -> str:
+        """
+        Formats every metric in the Prometheus text format
+
+        Returns:
+            text (str): The metrics
+        """
+        lines = []
+        for metric in (self.turns, self.failed_actions, self.turn_seconds, self.render_seconds, *self.gauges):
+            lines.extend(metric.expose())
+        return '\n'.join(lines) + '\n'
+
+class MetricsServer:
+    """Serves the metrics in the Prometheus text format over HTTP at /metrics, from a background thread"""
+    def __init__(self, metrics: EngineMetrics, host: str = '127.0.0.1', port: int = 9464):
+        self.metrics = metrics
+        """The metrics to serve"""
+
+        handler = type('MetricsHandler', (_MetricsHandler,), {'metrics': metrics})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        """The HTTP server"""
+        self._server.daemon_threads = True
+
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True)
+        """The thread the server runs in"""
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """The host and port the server listens on, with the port the system picked if 0 was given"""
+        return self._server.server_address[:2]
+
+    def start(self) -> 'MetricsServer':
+        """
+        Starts serving
+
+        Returns:
+            server (MetricsServer): This server
+        """
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops serving and closes the socket"""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Answers scrapes of /metrics"""
+    metrics = None # type: Optional[EngineMetrics]
+
+    def do_GET(self) -> None:
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.metrics.expose().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        # Scrapes are too frequent to log
+        pass
@@ -0,0 +1,263 @@
+import marshal
+import mmap
+import os
+import struct
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Callable, Iterator, Optional
+
+from interactive_engine.data_classes import Scene
+
+SCENE_BUNDLE_MAGIC = b'IESB'
+"""Magic bytes at the start of every scene bundle"""
+
+SCENE_BUNDLE_FORMAT_VERSION = 1
+"""Version of the scene bundle layout"""
+
+_HEADER = struct.Struct('<4sBQQ')
+"""Scene bundle header: magic bytes, format version, and the offset and length of the index"""
+
+def write_scene_bundle(path: str, head: dict, scenes: dict[str, tuple]) -> None:
+    """
+    Writes a scene bundle: a header, one marshalled record per scene, and an index of where each record
+    is. Readers only ever need to load the header, the index and the records they use.
+
+    Args:
+        path (str): The path to write the bundle to
+        head (dict): Content-wide data that is always loaded, e.g. items and the start scene
+        scenes (dict[str, tuple]): The scene records, keyed by scene name. Records may only contain builtin
+            types.
+    """
+    # Write to a temporary file first so a crash never leaves a half written bundle behind
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(b'\0' * _HEADER.size)
+
+        def write_record(record) -> tuple[int, int]:
+            data = marshal.dumps(record)
+            offset = f.tell()
+            f.write(data)
+            return offset, len(data)
+
+        index = {
+            'head': write_record(head),
+            'scenes': {name: write_record(record) for name, record in scenes.items()},
+        }
+        index_offset, index_length = write_record(index)
+
+        f.seek(0)
+        f.write(_HEADER.pack(SCENE_BUNDLE_MAGIC, SCENE_BUNDLE_FORMAT_VERSION, index_offset, index_length))
+    os.replace(temp_path, path)
+
+class SceneBundleReader:
+    """
+    Reads records from a scene bundle through a memory map, so only the pages that are actually used are
+    ever read from disk.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        """The path of the bundle"""
+
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, index_offset, index_length = _HEADER.unpack_from(self._mmap)
+            if magic != SCENE_BUNDLE_MAGIC:
+                raise ValueError(f"{path}: not a scene bundle")
+            if version != SCENE_BUNDLE_FORMAT_VERSION:
+                raise ValueError(f"{path}: unsupported scene bundle format version: {version}")
+            index = self._load(index_offset, index_length)
+        except (struct.error, EOFError, TypeError) as e:
+            self.close()
+            raise ValueError(f"{path}: scene bundle is corrupted: {e}") from e
+        except ValueError:
+            self.close()
+            raise
+
+        self._head_location = index['head'] # type: tuple[int, int]
+        """Where the head record is"""
+
+        self._scene_locations = index['scenes'] # type: dict[str, tuple[int, int]]
+        """Where each scene record is, keyed by scene name"""
+
+    def read_head(self) -> dict:
+        """
+        Reads the content-wide data
+
+        Returns:
+            head (dict): The head record
+        """
+        return self._load(*self._head_location)
+
+    def read_scene(self, name: str) -> tuple:
+        """
+        Reads a scene record
+
+        Args:
+            name (str): The name of the scene
+
+        Returns:
+            record (tuple): The scene record, will throw an error if there is no such scene
+        """
+        return self._load(*self._scene_locations[name])
+
+    def scene_size(self, name: str) -> int:
+        """
+        Gets the size of a scene record in bytes
+
+        Args:
+            name (str): The name of the scene
+
+        Returns:
+            size (int): The size of the record
+        """
+        return self._scene_locations[name][1]
+
+    def scene_names(self) -> Iterator[str]:
+        """
+        Iterates over the names of every scene in the bundle, in the order they were written
+
+        Returns:
+            names (Iterator[str]): The scene names
+        """
+        return iter(self._scene_locations)
+
+    def has_scene(self, name: str) -> bool:
+        return name in self._scene_locations
+
+    def close(self) -> None:
+        """Closes the memory map. Records can no longer be read afterwards."""
+        self._mmap.close()
+
+    def _load(self, offset: int, length: int):
+        """Unmarshals the record at the given location"""
+        return marshal.loads(self._mmap[offset:offset + length])
+
+    def __len__(self) -> int:
+        return len(self._scene_locations)
+
+class LazySceneMap(Mapping):
+    """
+    A read-only mapping of scene names to scene templates that builds each scene from a scene bundle the
+    first time it is looked up. The least recently used scenes are evicted once the records of the
+    loaded scenes add up to more than max_bytes, and are simply rebuilt if they are needed again.
+
+    Sessions work on their own copies of the templates, so evicting a template never affects a game in
+    progress. Scenes added with add_scene are kept in memory for good.
+    """
+    def __init__(
+            self,
+            reader: SceneBundleReader,
+            build_scene: Callable[[tuple], Scene],
+            max_bytes: Optional[int] = None,
+            fingerprint: str = ''
+        ):
+        self.reader = reader
+        """The bundle scenes are read from"""
+
+        self.build_scene = build_scene
+        """Callable that builds a scene template from a scene record"""
+
+        self.max_bytes = max_bytes
+        """Evict scenes once the loaded records add up to more than this many bytes, None for no limit"""
+
+        self.bundle_fingerprint = fingerprint
+        """Identifies the bundle contents"""
+
+        self._loaded = OrderedDict() # type: OrderedDict[str, Scene]
+        """The loaded scenes, least recently used first"""
+
+        self._loaded_bytes = 0
+        """The combined record size of the loaded scenes"""
+
+        self._pinned = {} # type: dict[str, Scene]
+        """Scenes that were added in memory rather than read from the bundle"""
+
+        self.loads = 0
+        """How many times a scene was read from the bundle, including reloads after eviction"""
+
+    def __getitem__(self, name: str) -> Scene:
+        scene = self._pinned.get(name)
+        if scene is not None:
+            return scene
+
+        scene = self._loaded.get(name)
+        if scene is not None:
+            self._loaded.move_to_end(name)
+            return scene
+
+        if not self.reader.has_scene(name):
+            raise KeyError(name)
+
+        scene = self.build_scene(self.reader.read_scene(name))
+        self.loads += 1
+        self._loaded[name] = scene
+        self._loaded_bytes += self.reader.scene_size(name)
+        self._evict()
+        return scene
+
+    def add_scene(self, scene: Scene) -> None:
+        """
+        Adds a scene that is kept in memory, replacing any bundle scene with the same name
+
+        Args:
+            scene (Scene): The scene to add
+        """
+        self._pinned[scene.name] = scene
+
+    def is_loaded(self, name: str) -> bool:
+        """
+        Checks if a scene is currently in memory, without loading it
+
+        Args:
+            name (str): The name of the scene
+
+        Returns:
+            loaded (bool): True if the scene is in memory
+        """
+        return name in self._pinned or name in self._loaded
+
+    def read_record(self, name: str) -> tuple:
+        """
+        Reads a scene record without building or caching the scene
+
+        Args:
+            name (str): The name of the scene
+
+        Returns:
+            record (tuple): The scene record
+        """
+        return self.reader.read_scene(name)
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies the scenes without loading any of them, used by EngineContent.fingerprint"""
+        return ','.join([self.bundle_fingerprint, *sorted(self._pinned)])
+
+    @property
+    def loaded_bytes(self) -> int:
+        """The combined record size of the scenes loaded from the bundle"""
+        return self._loaded_bytes
+
+    def _evict(self) -> None:
+        """Evicts the least recently used scenes until the loaded scenes fit in max_bytes"""
+        if self.max_bytes is None:
+            return
+
+        # The scene that was just loaded is never evicted, even if it alone is larger than the limit
+        while self._loaded_bytes > self.max_bytes and len(self._loaded) > 1:
+            name, _ = self._loaded.popitem(last=False)
+            self._loaded_bytes -= self.reader.scene_size(name)
+
+    def __contains__(self, name) -> bool:
+        return name in self._pinned or self.reader.has_scene(name)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._pinned
+        for name in self.reader.scene_names():
+            if name not in self._pinned:
+                yield name
+
+    def __len__(self) -> int:
+        return len(self.reader) + sum(1 for name in self._pinned if not self.reader.has_scene(name))
@@ -0,0 +1,206 @@
+import heapq
+from collections import namedtuple
+from typing import Callable, Iterable, Iterator, Optional
+
+from utils.observable_dict import MISSING
+
+timer_callback_def = Callable[[object], Optional[str]]
+"""
+Type alias for the callable signature used for scheduled events. Returns text to show after the text of
+the turn the event is due in, or None.
+
+Args:
+    object: The engine instance (not typed to avoid circular imports)
+"""
+
+ScheduledEvent = namedtuple('ScheduledEvent', ['due', 'order', 'event_id', 'callback', 'interval'])
+"""
+A tuple representing a scheduled event. The event is due once the turn counter reaches due, and recurring
+events are scheduled again interval turns later (interval is None for events that only happen once).
+The order is unique to every time an event is queued, so events that are due in the same turn happen in
+the order they were queued.
+"""
+
+class TurnScheduler:
+    """
+    Queue of delayed and recurring events, e.g. "in 5 turns the guard returns", kept in a heap ordered by
+    the turn they are due in. Finding out that nothing is due is a single comparison, and handling the
+    events that are due costs O(log n) each, no matter how many other events are waiting.
+
+    Cancelled and rescheduled events are not removed from the heap, they are skipped once they come up.
+    Every change is reported to the change listener before it is made, so the engine can undo them.
+    """
+    def __init__(self):
+        self._heap = [] # type: list[ScheduledEvent]
+        """The queued events, including ones that were cancelled or rescheduled since"""
+
+        self._live = {} # type: dict[int, ScheduledEvent]
+        """The queued entry that is current for each scheduled event id"""
+
+        self._next_order = 0
+        """The order of the next queued entry"""
+
+        self._next_id = 0
+        """The id of the next scheduled event"""
+
+        self._change_listener = None # type: Optional[Callable[[object, str, object, object], None]]
+        """Callable notified before an event is scheduled, cancelled or happens, see change_listener_def"""
+
+    @property
+    def next_due(self) -> Optional[int]:
+        """
+        Gets the turn the next event is due in
+
+        Returns:
+            next_due (Optional[int]): The turn, or None if no events are scheduled. Can be earlier than the
+                actual next event if that event was cancelled.
+        """
+        return self._heap[0].due if self._heap else None
+
+    def set_change_listener(self, listener: Optional[Callable[[object, str, object, object], None]]) -> None:
+        """
+        Sets the callable notified before the scheduled events change
+
+        Args:
+            listener (Optional[change_listener_def]): The listener, or None to stop observing changes
+        """
+        self._change_listener = listener
+
+    def schedule(self, due: int, callback: timer_callback_def, interval: Optional[int] = None) -> int:
+        """
+        Schedules an event
+
+        Args:
+            due (int): The turn the event is due in
+            callback (timer_callback_def): What happens when the event is due
+            interval (Optional[int]): The number of turns between recurrences, None for a one-off event
+
+        Returns:
+            event_id (int): The id of the event, e.g. to cancel it
+        """
+        if interval is not None and interval < 1:
+            raise ValueError(f"The interval of a recurring event must be at least 1 turn, got {interval}")
+
+        event_id = self._next_id
+        self._next_id += 1
+        if self._change_listener is not None:
+            self._change_listener(self, 'timer', event_id, MISSING)
+        self._queue(due, event_id, callback, interval)
+        return event_id
+
+    def cancel(self, event_id: int) -> bool:
+        """
+        Cancels a scheduled event
+
+        Args:
+            event_id (int): The id of the event
+
+        Returns:
+            cancelled (bool): True if the event was still scheduled
+        """
+        entry = self._live.get(event_id)
+        if entry is None:
+            return False
+
+        if self._change_listener is not None:
+            self._change_listener(self, 'timer', event_id, entry)
+        del self._live[event_id]
+        return True
+
+    def pop_due(self, turn: int) -> Iterator[ScheduledEvent]:
+        """
+        Takes the events that are due by a turn out of the queue, scheduling recurring events again
+
+        Args:
+            turn (int): The current turn
+
+        Returns:
+            events (Iterator[ScheduledEvent]): The due events, in the order they are due
+        """
+        heap = self._heap
+        while heap and heap[0].due <= turn:
+            entry = heapq.heappop(heap)
+            if self._live.get(entry.event_id) is not entry:
+                continue
+
+            if self._change_listener is not None:
+                self._change_listener(self, 'timer', entry.event_id, entry)
+            if entry.interval is None:
+                del self._live[entry.event_id]
+            else:
+                self._queue(entry.due + entry.interval, entry.event_id, entry.callback, entry.interval)
+            yield entry
+
+    def pending(self) -> list[ScheduledEvent]:
+        """
+        Gets the events that are still scheduled
+
+        Returns:
+            events (list[ScheduledEvent]): The events, in the order they are due
+        """
+        return sorted(self._live.values())
+
+    def replace(self, events: Iterable[tuple[int, int, timer_callback_def, Optional[int]]]) -> None:
+        """
+        Replaces every scheduled event, e.g. when a snapshot is restored. The events keep their ids.
+
+        Args:
+            events (Iterable[tuple[int, int, timer_callback_def, Optional[int]]]): The due turn, id, callback
+                and interval of every event, in the order they are due
+        """
+        self.clear()
+        for due, event_id, callback, interval in events:
+            self._queue(due, event_id, callback, interval)
+            # Ids of events scheduled later on must not collide with the replaced ones
+            self._next_id = max(self._next_id, event_id + 1)
+
+    def clear(self) -> None:
+        """Cancels every scheduled event"""
+        if self._change_listener is not None:
+            self._change_listener(self, 'timers', None, (list(self._heap), dict(self._live)))
+        self._heap = []
+        self._live = {}
+
+    def revert_change(self, kind: str, key, old) -> None:
+        """
+        Reverts a change previously reported to the change listener
+
+        Args:
+            kind (str): The kind of change
+            key (object): What changed within that kind
+            old (object): The value to restore, or MISSING to remove it
+        """
+        if kind == 'timers':
+            heap, live = old
+            self._heap = list(heap)
+            self._live = dict(live)
+        elif old is MISSING:
+            self._live.pop(key, None)
+        else:
+            # The entry may still be in the heap, but whichever copy comes up first stops being live
+            self._live[key] = old
+            heapq.heappush(self._heap, old)
+
+    def copy(self) -> 'TurnScheduler':
+        """
+        Creates an independent copy of the scheduled events, without the change listener
+
+        Returns:
+            scheduler (TurnScheduler): The copy
+        """
+        scheduler = TurnScheduler()
+        scheduler._heap = list(self._heap)
+        scheduler._live = dict(self._live)
+        scheduler._next_order = self._next_order
+        scheduler._next_id = self._next_id
+        return scheduler
+
+    def _queue(self, due: int, event_id: int, callback: timer_callback_def, interval: Optional[int]) -> None:
+        """Queues a new entry for an event and makes it the live entry of the event"""
+        entry = ScheduledEvent(due, self._next_order, event_id, callback, interval)
+        self._next_order += 1
+        self._live[event_id] = entry
+        heapq.heappush(self._heap, entry)
+
+    def __len__(self) -> int:
+        return len(self._live)
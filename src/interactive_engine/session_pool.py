@@ -0,0 +1,172 @@
+from typing import Callable, Iterable, Iterator, Optional
+
+from interactive_engine.content import EngineContent
+from interactive_engine.engine import InteractiveEngine, TurnResult
+from interactive_engine.strings import SystemStrings
+
+class SessionPool:
+    """
+    Hosts many independent game sessions that all share the same EngineContent. Each session is a
+    lightweight InteractiveEngine with its own player, current scene and copies of the scenes it has
+    visited, so one process can serve many players at once.
+    """
+    def __init__(self, content: EngineContent, setup: Optional[Callable[[InteractiveEngine], None]] = None):
+        self.content = content
+        """The content shared by every session in the pool"""
+
+        self.setup = setup
+        """
+        Called with every session the pool opens before it starts, e.g. EngineMetrics.attach. Forked
+        sessions copy the listeners of the session they branch from instead.
+        """
+
+        self._sessions = {} # type: dict[str, InteractiveEngine]
+        """The open sessions, keyed by session id"""
+
+        self._next_id = 0
+        """Counter used to generate session ids"""
+
+    def open_session(self, session_id: Optional[str] = None) -> tuple[str, InteractiveEngine, str]:
+        """
+        Opens a new session and starts it in the content's start scene
+
+        Args:
+            session_id (Optional[str]): The id of the new session, one is generated if not provided
+
+        Returns:
+            session (tuple[str, InteractiveEngine, str]): The session id, the session itself and the text
+                to display upon entering the start scene
+        """
+        if session_id is None:
+            session_id = self._generate_id()
+        if session_id in self._sessions:
+            raise ValueError(f"Session already exists: {session_id}")
+
+        session = InteractiveEngine(self.content)
+        if self.setup is not None:
+            self.setup(session)
+        start_text = session.start()
+        self._sessions[session_id] = session
+        return session_id, session, start_text
+
+    def get_session(self, session_id: str) -> InteractiveEngine:
+        """
+        Gets an open session
+
+        Args:
+            session_id (str): The id of the session
+
+        Returns:
+            session (InteractiveEngine): The session, will throw an error if it doesn't exist
+        """
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise KeyError(f"No session with id: {session_id}")
+        return session
+
+    def fork_session(self, session_id: str, branch_id: Optional[str] = None) -> tuple[str, InteractiveEngine]:
+        """
+        Opens a "what-if" branch of a session that continues independently from its current state. The
+        branch is set up like a new session, it doesn't share the listeners of the session it branches from.
+
+        Args:
+            session_id (str): The id of the session to branch from
+            branch_id (Optional[str]): The id of the new session, one is generated if not provided
+
+        Returns:
+            branch (tuple[str, InteractiveEngine]): The id of the new session and the session itself
+        """
+        if branch_id is None:
+            branch_id = self._generate_id()
+        if branch_id in self._sessions:
+            raise ValueError(f"Session already exists: {branch_id}")
+
+        branch = self.get_session(session_id).fork()
+        if self.setup is not None:
+            self.setup(branch)
+        self._sessions[branch_id] = branch
+        return branch_id, branch
+
+    def close_session(self, session_id: str) -> None:
+        """
+        Closes a session, releasing everything it holds. Closing an unknown session does nothing.
+
+        Args:
+            session_id (str): The id of the session to close
+        """
+        self._sessions.pop(session_id, None)
+
+    def run(self, session_id: str, run_str: str) -> str:
+        """
+        Runs an action string through one of the sessions
+
+        Args:
+            session_id (str): The id of the session
+            run_str (str): The action string to run
+
+        Returns:
+            out (str): The resulting text
+        """
+        session = self._sessions.get(session_id)
+        if session is None:
+            return SystemStrings.MISSING_SESSION_TEXT
+        return session.run(run_str)
+
+    async def run_async(self, session_id: str, run_str: str, timeout: Optional[float] = None) -> str:
+        """
+        Runs an action string through one of the sessions without blocking the event loop
+
+        Args:
+            session_id (str): The id of the session
+            run_str (str): The action string to run
+            timeout (Optional[float]): Maximum number of seconds the turn may take
+
+        Returns:
+            out (str): The resulting text
+        """
+        session = self._sessions.get(session_id)
+        if session is None:
+            return SystemStrings.MISSING_SESSION_TEXT
+        return await session.run_async(run_str, timeout)
+
+    def replay(self, scripts: Iterable[Iterable[str]], output: bool = False) -> list[list[TurnResult]]:
+        """
+        Bulk replay mode. Plays every script in its own fresh session, started in the content's start
+        scene, and returns the per-turn results. Replay sessions are never added to the pool.
+
+        Args:
+            scripts (Iterable[Iterable[str]]): The command sequences to replay
+            output (bool): If True, the text of each turn is kept in the results
+
+        Returns:
+            results (list[list[TurnResult]]): The turn results of each script, in order
+        """
+        results = []
+        for script in scripts:
+            session = InteractiveEngine(self.content)
+            session.start()
+            results.append(session.run_many(script, output=output))
+        return results
+
+    def session_ids(self) -> Iterator[str]:
+        """
+        Iterates over the ids of every open session
+
+        Returns:
+            session_ids (Iterator[str]): The session ids
+        """
+        return iter(list(self._sessions))
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def _generate_id(self) -> str:
+        """Generates a session id that isn't in use yet"""
+        while True:
+            self._next_id += 1
+            session_id = f"session-{self._next_id}"
+            if session_id not in self._sessions:
+                return session_id
@@ -0,0 +1,344 @@
+import hashlib
+import json
+import os
+import struct
+import zlib
+from typing import Optional
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Scene
+from utils.observable_dict import MISSING
+
+SNAPSHOT_MAGIC = b'IESV'
+"""Magic bytes at the start of every snapshot"""
+
+SNAPSHOT_FORMAT_VERSION = 2
+"""Version of the snapshot format, bumped whenever the payload layout changes"""
+
+_HEADER = struct.Struct('<4sBI')
+"""Snapshot header: magic bytes, format version and content fingerprint"""
+
+def create_snapshot(engine) -> bytes:
+    """
+    Creates a compact snapshot of a session. Only what changed from the initial content is recorded: the
+    current scene, the turn counter, the scheduled events, the inventory, and for each visited scene its
+    text, state and action changes. Scene state values must be JSON serializable, actions added at runtime
+    must either come from a scene template or be registered with EngineContent.register_action, and the
+    callbacks of scheduled events must be registered with EngineContent.register_timer.
+
+    Args:
+        engine (InteractiveEngine): The session to snapshot
+
+    Returns:
+        snapshot (bytes): The snapshot
+    """
+    content = engine.content # type: EngineContent
+    if engine.current_scene is None or not engine.is_session_scene(engine.current_scene):
+        raise ValueError("Only sessions in a content scene can be saved")
+
+    scenes = {}
+    for name, scene in engine.session_scenes().items():
+        scene_diff = _diff_scene(content, content.get_scene(name), scene)
+        if scene_diff:
+            scenes[name] = scene_diff
+
+    inventory = []
+    for item, quantity in engine.player.inventory.stacks():
+        if content.items.get(item.code) is not item:
+            raise ValueError(f"Item is not part of the content and cannot be saved: {item.code}")
+        inventory.append(item.code if quantity == 1 else [item.code, quantity])
+
+    events = []
+    for event in engine.scheduler.pending():
+        code = content.find_timer_code(event.callback)
+        if code is None:
+            raise ValueError(
+                f"Scheduled event {event.event_id} is not part of the content and cannot be saved. "
+                "Register its callback with EngineContent.register_timer."
+            )
+        # Due turns are saved relative to the turn counter, so equal states in different turns match
+        events.append([event.due - engine.turn, event.event_id, code, event.interval])
+
+    payload = {'c': engine.current_scene.name}
+    if engine.turn:
+        payload['t'] = engine.turn
+    if events:
+        payload['e'] = events
+    if inventory:
+        payload['i'] = inventory
+    if scenes:
+        payload['s'] = scenes
+
+    data = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, content.fingerprint())
+    return header + zlib.compress(data)
+
+def restore_snapshot(engine, snapshot: bytes) -> None:
+    """
+    Restores a session from a snapshot created by create_snapshot for the same content. Scenes that were
+    not recorded in the snapshot are reset to their initial state, and the turn counter and scheduled
+    events are restored along with them.
+
+    Args:
+        engine (InteractiveEngine): The session to restore
+        snapshot (bytes): The snapshot to restore
+    """
+    content = engine.content # type: EngineContent
+    if len(snapshot) < _HEADER.size:
+        raise ValueError("Snapshot is truncated")
+
+    magic, version, fingerprint = _HEADER.unpack_from(snapshot)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Data is not a snapshot")
+    if version != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format version: {version}")
+    if fingerprint != content.fingerprint():
+        raise ValueError("Snapshot was created for different content")
+
+    try:
+        payload = json.loads(zlib.decompress(snapshot[_HEADER.size:]).decode('utf-8'))
+    except (zlib.error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Snapshot is corrupted: {e}") from e
+
+    scenes = {}
+    for name, scene_diff in payload.get('s', {}).items():
+        scenes[name] = _apply_scene_diff(content, content.get_scene(name).copy(), scene_diff)
+
+    player = content.new_player()
+    for stack in payload.get('i', []):
+        code, quantity = (stack, 1) if isinstance(stack, str) else stack
+        player.add_inventory_items([content.items[code]], quantity)
+
+    turn = payload.get('t', 0)
+    events = [(turn + delay, event_id, content.timers[code], interval) for delay, event_id, code, interval in payload.get('e', [])]
+
+    engine.turn = turn
+    engine.scheduler.replace(events)
+    engine.replace_world(scenes, player, payload['c'])
+
+def state_digest(snapshot: bytes) -> bytes:
+    """
+    Hashes the world state recorded in a snapshot. Snapshots of the same state can differ in the order
+    items were picked up or actions were changed in, so the state is brought into a canonical form first.
+    The turn counter is left out, so the same state reached in a different number of turns is equal.
+
+    Args:
+        snapshot (bytes): A snapshot created by create_snapshot
+
+    Returns:
+        digest (bytes): A 16 byte digest that is equal for equal states
+    """
+    payload = json.loads(zlib.decompress(snapshot[_HEADER.size:]))
+    payload.pop('t', None)
+    if 'i' in payload:
+        payload['i'] = sorted(payload['i'], key=lambda stack: stack if isinstance(stack, str) else stack[0])
+    for scene_diff in payload.get('s', {}).values():
+        for key in ('u', 'a', 'r'):
+            if key in scene_diff:
+                scene_diff[key] = sorted(scene_diff[key])
+    data = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+def _diff_scene(content: EngineContent, template: Scene, scene: Scene) -> dict:
+    """
+    Records the differences between a session's scene and its template
+
+    Args:
+        content (EngineContent): The content the scene belongs to
+        template (Scene): The scene template
+        scene (Scene): The session's copy of the scene
+
+    Returns:
+        scene_diff (dict): The differences, empty if the scene is unchanged
+    """
+    scene_diff = {}
+    if scene.text_source != template.text_source:
+        if not isinstance(scene.text_source, str):
+            raise ValueError(f"Scene text rules set during a session cannot be saved: {scene.name}")
+        scene_diff['t'] = scene.text_source
+
+    changed_state = {key: value for key, value in scene.state.items() if template.state.get(key, MISSING) != value}
+    if changed_state:
+        scene_diff['s'] = changed_state
+    unset_state = [key for key in template.state if key not in scene.state]
+    if unset_state:
+        scene_diff['u'] = unset_state
+
+    added = []
+    removed = []
+    for action_type in set(template.actions) | set(scene.actions):
+        template_actions = template.actions.get(action_type, {})
+        scene_actions = scene.actions.get(action_type, {})
+        for keyword, action in scene_actions.items():
+            if not _same_action(template_actions.get(keyword), action):
+                added.append([action_type.value, keyword, _action_ref(content, action)])
+        for keyword in template_actions:
+            if keyword not in scene_actions:
+                removed.append([action_type.value, keyword])
+    if added:
+        scene_diff['a'] = added
+    if removed:
+        scene_diff['r'] = removed
+
+    return scene_diff
+
+def _apply_scene_diff(content: EngineContent, scene: Scene, scene_diff: dict) -> Scene:
+    """
+    Applies recorded differences to a fresh copy of a scene template
+
+    Args:
+        content (EngineContent): The content the scene belongs to
+        scene (Scene): A fresh copy of the scene template
+        scene_diff (dict): The differences recorded by _diff_scene
+
+    Returns:
+        scene (Scene): The updated scene
+    """
+    if 't' in scene_diff:
+        scene.text = scene_diff['t']
+    scene.state.update(scene_diff.get('s', {}))
+    for key in scene_diff.get('u', []):
+        scene.state.pop(key, None)
+
+    for action_type_value, keyword in scene_diff.get('r', []):
+        scene.remove_action(ActionType(action_type_value), keyword)
+    for action_type_value, keyword, ref in scene_diff.get('a', []):
+        scene.add_action(ActionType(action_type_value), keyword, _resolve_action_ref(content, ref))
+
+    return scene
+
+def _same_action(template_action: Optional[Action], action: Action) -> bool:
+    """
+    Checks if a session's action is the template's action. Lazily loaded templates may have been rebuilt
+    with new action objects since the session copied them, so their references are compared as well.
+
+    Args:
+        template_action (Optional[Action]): The template's action, if any
+        action (Action): The session's action
+
+    Returns:
+        same (bool): True if both are the same action
+    """
+    if template_action is action:
+        return True
+    if template_action is None:
+        return False
+    ref = getattr(action.on_action, 'action_ref', None)
+    return ref is not None and ref == getattr(template_action.on_action, 'action_ref', None)
+
+def _action_ref(content: EngineContent, action: Action) -> list:
+    """
+    Gets a serializable reference to an action
+
+    Args:
+        content (EngineContent): The content the action belongs to
+        action (Action): The action to reference
+
+    Returns:
+        ref (list): Either ["r", code] for registered actions, or ["s", scene, type, keyword] for actions
+            that appear in a scene template
+    """
+    ref = content.find_action_ref(action)
+    if ref is None:
+        raise ValueError(
+            f"{action} is not part of the content and cannot be saved. "
+            "Register it with EngineContent.register_action."
+        )
+    return list(ref)
+
+def _resolve_action_ref(content: EngineContent, ref: list) -> Action:
+    """
+    Resolves a reference created by _action_ref
+
+    Args:
+        content (EngineContent): The content the action belongs to
+        ref (list): The reference
+
+    Returns:
+        action (Action): The referenced action
+    """
+    if ref[0] == 'r':
+        return content.actions[ref[1]]
+
+    _, scene_name, action_type_value, keyword = ref
+    return content.get_scene(scene_name).actions[ActionType(action_type_value)][keyword]
+
+class SnapshotStore:
+    """
+    Stores snapshots in named slots, either in memory or as files in a directory.
+    """
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        """Directory snapshots are written to, or None to keep them in memory"""
+
+        self._slots = {} # type: dict[str, bytes]
+        """In-memory snapshots, keyed by slot"""
+
+        self.latest_slot = None # type: Optional[str]
+        """The slot that was saved to most recently"""
+
+    def save(self, slot: str, snapshot: bytes) -> None:
+        """
+        Saves a snapshot to a slot, replacing any snapshot already in it
+
+        Args:
+            slot (str): The slot to save to
+            snapshot (bytes): The snapshot
+        """
+        if self.directory is None:
+            self._slots[slot] = snapshot
+        else:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(slot)
+
+            # Write to a temporary file first so a crash never leaves a half written save behind
+            temp_path = path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(snapshot)
+            os.replace(temp_path, path)
+
+        self.latest_slot = slot
+
+    def load(self, slot: str) -> Optional[bytes]:
+        """
+        Loads the snapshot in a slot
+
+        Args:
+            slot (str): The slot to load from
+
+        Returns:
+            snapshot (Optional[bytes]): The snapshot, or None if the slot is empty
+        """
+        if self.directory is None:
+            return self._slots.get(slot)
+
+        try:
+            with open(self._path(slot), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def latest(self) -> Optional[str]:
+        """
+        Gets the slot that was saved to most recently, including saves made by earlier runs when the
+        store is backed by a directory
+
+        Returns:
+            slot (Optional[str]): The most recent slot, or None if nothing was saved yet
+        """
+        if self.latest_slot is not None or self.directory is None:
+            return self.latest_slot
+
+        try:
+            paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.sav')]
+        except FileNotFoundError:
+            return None
+        if not paths:
+            return None
+        return os.path.basename(max(paths, key=os.path.getmtime))[:-len('.sav')]
+
+    def _path(self, slot: str) -> str:
+        """Gets the file path of a slot"""
+        if not slot or os.sep in slot or (os.altsep and os.altsep in slot) or slot.startswith('.'):
+            raise ValueError(f"Invalid save slot: {slot}")
+        return os.path.join(self.directory or '', f"{slot}.sav")
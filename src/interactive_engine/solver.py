@@ -0,0 +1,260 @@
+from array import array
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Iterator, Optional
+
+from interactive_engine.content import EngineContent
+from interactive_engine.engine import UNTIMED_ACTION_TYPES, InteractiveEngine
+from interactive_engine.snapshots import create_snapshot, restore_snapshot, state_digest
+
+goal_def = Callable[[InteractiveEngine], bool]
+"""
+Type alias for the callable signature used to recognize winning states. It must be picklable, e.g. a
+module level function or a SceneGoal, so it can be sent to the worker processes.
+
+Args:
+    InteractiveEngine: A session in the state to check
+"""
+
+SolverResult = namedtuple('SolverResult', ['solution', 'dead_ends', 'states', 'complete'])
+"""
+A tuple representing the outcome of solving a game. The solution is the shortest tuple of commands that
+wins the game, or None if no winning state was found. The dead ends are the shortest command sequences
+leading to each state from which no winning state can be reached anymore, i.e. the soft-locks, shortest
+first. States is the number of distinct states found, and complete is False if the search stopped at
+max_states before exploring all of them.
+"""
+
+class SceneGoal:
+    """A goal that is reached by entering one of a set of scenes, e.g. the ending scene of a game"""
+    def __init__(self, *scene_names: str):
+        self.scene_names = frozenset(scene_names)
+        """The names of the winning scenes"""
+
+    def __call__(self, engine: InteractiveEngine) -> bool:
+        return engine.current_scene is not None and engine.current_scene.name in self.scene_names
+
+def playable_commands(engine: InteractiveEngine) -> Iterator[str]:
+    """
+    Gets the commands that can change the world in a session's current state, i.e. every available action
+    except the system actions
+
+    Args:
+        engine (InteractiveEngine): The session
+
+    Returns:
+        commands (Iterator[str]): The commands
+    """
+    for action_type, keyword, _ in engine.available_actions():
+        if action_type not in UNTIMED_ACTION_TYPES:
+            yield action_type.value if keyword is None else f"{action_type.value} {keyword}"
+
+class _Expander:
+    """Runs every playable command in a state, in the main process or in a worker process"""
+    def __init__(self, content: EngineContent, goal: goal_def):
+        self.content = content
+        """The content being solved"""
+
+        self.goal = goal
+        """Recognizes winning states"""
+
+    def start(self) -> tuple[bytes, bool]:
+        """
+        Gets the state every session starts in
+
+        Returns:
+            state (tuple[bytes, bool]): The snapshot of the state and whether it is a winning state
+        """
+        engine = InteractiveEngine(self.content, max_undo=0)
+        engine.start()
+        return create_snapshot(engine), self.goal(engine)
+
+    def expand(self, snapshots: list[bytes]) -> list[list[tuple[str, bytes, bytes, bool]]]:
+        """
+        Runs every playable command in each of a list of states
+
+        Args:
+            snapshots (list[bytes]): The snapshots of the states
+
+        Returns:
+            successors (list[list[tuple[str, bytes, bytes, bool]]]): For each state, the command, snapshot,
+                digest and whether it is a winning state of the state each command leads to
+        """
+        results = []
+        engine = InteractiveEngine(self.content, max_undo=0)
+        for snapshot in snapshots:
+            restore_snapshot(engine, snapshot)
+            successors = []
+            for command in list(playable_commands(engine)):
+                branch = engine.fork()
+                branch.run(command)
+                child = create_snapshot(branch)
+                successors.append((command, child, state_digest(child), self.goal(branch)))
+            results.append(successors)
+        return results
+
+_worker_expander = None # type: Optional[_Expander]
+"""The expander of a worker process, created by _init_worker"""
+
+def _init_worker(content_factory: Callable[[], EngineContent], goal: goal_def) -> None:
+    """Builds the content once per worker process"""
+    global _worker_expander
+    _worker_expander = _Expander(content_factory(), goal)
+
+def _expand_in_worker(snapshots: list[bytes]) -> list[list[tuple[str, bytes, bytes, bool]]]:
+    """Expands states in a worker process, see _Expander.expand"""
+    return _worker_expander.expand(snapshots)
+
+def _chunks(items: list, size: int) -> Iterator[list]:
+    """Splits a list into consecutive chunks"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def solve(
+        content_factory: Callable[[], EngineContent],
+        goal: goal_def,
+        workers: int = 0,
+        max_states: Optional[int] = None,
+        max_dead_ends: int = 10,
+        chunk_size: int = 64
+    ) -> SolverResult:
+    """
+    Proves that a game can be won by exploring every world state reachable from its start scene, breadth
+    first, so the first winning state found has the shortest solution. States are identified by a digest
+    of their snapshot, so each distinct state is only explored once. Only the digests, a parent link and the
+    moves between states are kept, and the snapshots of the states still to explore, so millions of states
+    fit in memory. Once every state is explored, the moves are followed backwards from the winning states,
+    and the states they don't lead back to are the dead ends.
+
+    The turn counter is not part of the state digest, so games that depend on it, e.g. through an action
+    budget, can't be solved this way. Every action added at runtime and every scheduled event callback must
+    be registered with the content.
+
+    Args:
+        content_factory (Callable[[], EngineContent]): Builds the content, e.g. wizard_emergency.build_content.
+            Must be picklable when workers are used, since every worker process builds its own content.
+        goal (goal_def): Recognizes winning states, e.g. SceneGoal("Ending")
+        workers (int): The number of worker processes to explore states in, 0 to explore them in this process
+        max_states (Optional[int]): Stop once this many distinct states have been found
+        max_dead_ends (int): The maximum number of dead ends to report
+        chunk_size (int): The number of states sent to a worker at once
+
+    Returns:
+        result (SolverResult): The shortest solution and the dead ends that were found
+    """
+    expander = _Expander(content_factory(), goal)
+    start, start_won = expander.start()
+
+    commands = [] # type: list[str]
+    command_ids = {} # type: dict[str, int]
+    state_ids = {state_digest(start): 0} # type: dict[bytes, int]
+    parents = array('q', [-1])
+    moves = array('l', [-1])
+    edge_sources = array('q')
+    edge_targets = array('q')
+    winning = [0] if start_won else [] # type: list[int]
+
+    def path(state_id: int) -> tuple[str, ...]:
+        steps = []
+        while parents[state_id] >= 0:
+            steps.append(commands[moves[state_id]])
+            state_id = parents[state_id]
+        return tuple(reversed(steps))
+
+    solution = () if start_won else None
+    complete = True
+    frontier = [] if start_won else [(0, start)] # type: list[tuple[int, bytes]]
+
+    executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(content_factory, goal)) if workers else None
+    try:
+        while frontier:
+            snapshots = [snapshot for _, snapshot in frontier]
+            if executor is not None and len(frontier) > chunk_size:
+                expanded = (
+                    successors
+                    for chunk in executor.map(_expand_in_worker, _chunks(snapshots, chunk_size))
+                    for successors in chunk
+                )
+            else:
+                expanded = iter(expander.expand(snapshots))
+
+            next_frontier = []
+            for (state_id, _), successors in zip(frontier, expanded):
+                for command, child, digest, won in successors:
+                    child_id = state_ids.get(digest)
+                    if child_id is not None:
+                        if child_id != state_id:
+                            edge_sources.append(state_id)
+                            edge_targets.append(child_id)
+                        continue
+                    if max_states is not None and len(state_ids) >= max_states:
+                        # The state may lead to a win through the states that weren't found
+                        complete = False
+                        winning.append(state_id)
+                        continue
+
+                    child_id = state_ids[digest] = len(parents)
+                    edge_sources.append(state_id)
+                    edge_targets.append(child_id)
+                    parents.append(state_id)
+                    command_id = command_ids.get(command)
+                    if command_id is None:
+                        command_id = command_ids[command] = len(commands)
+                        commands.append(command)
+                    moves.append(command_id)
+
+                    if won:
+                        winning.append(child_id)
+                        if solution is None:
+                            solution = path(child_id)
+                    else:
+                        next_frontier.append((child_id, child))
+            frontier = next_frontier
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    # State ids are numbered breadth first, so the dead ends come out shortest first
+    can_win = _can_reach(len(parents), edge_sources, edge_targets, winning)
+    dead_ends = tuple(islice((path(state_id) for state_id, reached in enumerate(can_win) if not reached), max_dead_ends))
+    return SolverResult(solution, dead_ends, len(state_ids), complete)
+
+def _can_reach(state_count: int, edge_sources: array, edge_targets: array, targets: list[int]) -> bytearray:
+    """
+    Finds the states some of the target states can be reached from, following the moves backwards
+
+    Args:
+        state_count (int): The number of states
+        edge_sources (array): The state every move starts in
+        edge_targets (array): The state every move leads to
+        targets (list[int]): The ids of the target states
+
+    Returns:
+        reached (bytearray): 1 for every state a target state can be reached from, by state id
+    """
+    # The moves into every state, as offsets into one array of sources, instead of a list per state
+    offsets = array('q', bytes(8 * (state_count + 1)))
+    for target in edge_targets:
+        offsets[target + 1] += 1
+    for state_id in range(state_count):
+        offsets[state_id + 1] += offsets[state_id]
+    filled = array('q', offsets)
+    sources = array('q', bytes(8 * len(edge_sources)))
+    for source, target in zip(edge_sources, edge_targets):
+        sources[filled[target]] = source
+        filled[target] += 1
+
+    reached = bytearray(state_count)
+    stack = []
+    for target in targets:
+        if not reached[target]:
+            reached[target] = 1
+            stack.append(target)
+    while stack:
+        state_id = stack.pop()
+        for source in sources[offsets[state_id]:offsets[state_id + 1]]:
+            if not reached[source]:
+                reached[source] = 1
+                stack.append(source)
+    return reached
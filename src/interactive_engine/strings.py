@@ -5,6 +5,8 @@ from console.console_styles import Colors
 class ActionStrings:
     EMPTY_ACTION_TEXT = "You could do that, but not in this case."
 
+    GUARD_FAILED_TEXT = "You can't do that right now."
+
 class PlayerStrings:
     DEFAULT_NAME: ClassVar[str] = "The player"
 
@@ -14,6 +16,8 @@ class PlayerStrings:
 
     INVENTORY_LIST_TEXT: ClassVar[str] = "You are carrying:\n- {items}"
 
+    INVENTORY_STACK_TEXT: ClassVar[str] = "{name} (x{quantity})"
+
 class SceneStrings:
     SCENE_DESCRIPTION_TRANSITION: ClassVar[str] = "\n\nTaking a look around you see...\n\n"
 
@@ -33,16 +37,55 @@ class SystemStrings:
         # f"- {Colors.GREEN}speak <target>{Colors.RESET}: Speak to or with the target.\n"
         # f"- {Colors.GREEN}touch <target>{Colors.RESET}: Touch or interact with the target.\n"
         f"- {Colors.GREEN}take <item>{Colors.RESET}: Pick up the specified item.\n"
-        f"- {Colors.GREEN}use <item> [<target>]{Colors.RESET}: Use the specified item, optionally on a target.\n"
+        f"- {Colors.GREEN}use <item> [on <target>]{Colors.RESET}: Use the specified item, optionally on a target.\n"
         "\n"
         "Player actions:\n"
         f"- {Colors.GREEN}inventory{Colors.RESET}: Describe your current inventory.\n"
-        # f"- {Colors.GREEN}combine <item_a> <item_b>{Colors.RESET}: Combine two items in your inventory.\n"
+        # f"- {Colors.GREEN}combine <item_a> with <item_b>{Colors.RESET}: Combine two items in your inventory.\n"
         "\n"
         "System actions:\n"
         f"- {Colors.GREEN}help{Colors.RESET}: Show this help message!\n"
+        f"- {Colors.GREEN}save{Colors.RESET}: Save your progress.\n"
+        f"- {Colors.GREEN}load{Colors.RESET}: Go back to where you last saved.\n"
+        f"- {Colors.GREEN}continue{Colors.RESET}: Continue from your most recent save.\n"
+        f"- {Colors.GREEN}undo{Colors.RESET}: Take back your last action.\n"
+        f"- {Colors.GREEN}restart{Colors.RESET}: Start over from the beginning.\n"
         f"- {Colors.GREEN}exit{Colors.RESET}: Exit the game.\n"
-        f"- {Colors.GREEN}list actions{Colors.RESET}: List all currently available actions."
+        f"- {Colors.GREEN}list actions{Colors.RESET}: List all currently available actions.\n"
+        "\n"
+        f"Commands can be shortened as long as they are unambiguous, e.g. {Colors.GREEN}inv{Colors.RESET} "
+        f"or {Colors.GREEN}ta hat{Colors.RESET}. {Colors.GREEN}x{Colors.RESET}, {Colors.GREEN}get{Colors.RESET} "
+        f"and {Colors.GREEN}go{Colors.RESET} work as well."
     )
 
     MISSING_ACTION_TEXT: ClassVar[str] = "You cannot do that."
+
+    MISSING_SESSION_TEXT: ClassVar[str] = "Your game session has ended. Start a new game to keep playing."
+
+    ACTION_TIMEOUT_TEXT: ClassVar[str] = "That is taking too long. Nothing happens."
+
+    ACTION_ERROR_TEXT: ClassVar[str] = "Something went wrong. Nothing happens."
+
+    SERVER_FULL_TEXT: ClassVar[str] = "The server is full. Please try again later."
+
+    IDLE_TIMEOUT_TEXT: ClassVar[str] = "You have been idle for too long. Goodbye!"
+
+    OUT_OF_ACTIONS_TEXT: ClassVar[str] = "You have no actions left. You can still undo, load or restart."
+
+    SAVE_TEXT: ClassVar[str] = "Game saved."
+
+    SAVE_FAILED_TEXT: ClassVar[str] = "The game can't be saved right now."
+
+    LOAD_TEXT: ClassVar[str] = "Game loaded."
+
+    LOAD_FAILED_TEXT: ClassVar[str] = "The saved game is damaged or belongs to another game, and can't be loaded."
+
+    NO_SAVE_TEXT: ClassVar[str] = "There is no saved game to load."
+
+    RESTART_FAILED_TEXT: ClassVar[str] = "The game can't be restarted."
+
+    UNDO_TEXT: ClassVar[str] = "You turn back time."
+
+    NOTHING_TO_UNDO_TEXT: ClassVar[str] = "There is nothing to undo."
+
+    AMBIGUOUS_ACTION_TEXT: ClassVar[str] = "Could you be more specific? Did you mean: {options}"
@@ -0,0 +1,361 @@
+import asyncio
+import contextlib
+from typing import Optional
+
+from console.text_renderer import TextRenderer
+from interactive_engine.events import EventType
+from interactive_engine.metrics import EngineMetrics
+from interactive_engine.session_pool import SessionPool
+from interactive_engine.strings import SystemStrings
+
+IAC = 255
+"""Telnet: interpret the next byte as a command"""
+DONT = 254
+DO = 253
+WONT = 252
+WILL = 251
+SB = 250
+"""Telnet: start of a subnegotiation, ended by IAC SE"""
+SE = 240
+NAWS = 31
+"""Telnet option: negotiate about window size (RFC 1073)"""
+
+MIN_WIDTH = 20
+"""The narrowest terminal output is wrapped to, whatever the client reports"""
+MAX_WIDTH = 200
+"""The widest terminal output is wrapped to, whatever the client reports"""
+
+READ_SIZE = 4096
+"""The maximum number of bytes read from a connection at once"""
+
+# The states of the TelnetDecoder
+_DATA, _COMMAND, _OPTION, _SUBNEGOTIATION, _SUBNEGOTIATION_COMMAND = range(5)
+
+class TelnetDecoder:
+    """
+    Turns the bytes a telnet client sends into lines of input. Telnet commands and option negotiations
+    are stripped, window size reports (NAWS) are kept, line endings may be CR LF, CR NUL, CR or LF, and
+    backspaces are applied, since telnet clients send lines as they are typed.
+    """
+    def __init__(self, max_line_length: int = 1024):
+        self.max_line_length = max_line_length
+        """The maximum number of bytes of a line, the rest is dropped"""
+
+        self.width = None # type: Optional[int]
+        """The number of columns the client last reported, None until it does"""
+
+        self._state = _DATA
+        """Where the decoder is in the byte stream"""
+
+        self._line = bytearray()
+        """The bytes of the line in progress"""
+
+        self._subnegotiation = bytearray()
+        """The bytes of the subnegotiation in progress"""
+
+        self._after_cr = False
+        """Whether the last data byte was a CR, so that a following LF or NUL doesn't end another line"""
+
+    def feed(self, data: bytes) -> list[str]:
+        """
+        Decodes bytes received from the client
+
+        Args:
+            data (bytes): The bytes
+
+        Returns:
+            lines (list[str]): The lines completed by the bytes, without their line endings
+        """
+        lines = []
+        for byte in data:
+            state = self._state
+            if state == _DATA:
+                if byte == IAC:
+                    self._state = _COMMAND
+                    continue
+                after_cr, self._after_cr = self._after_cr, byte == 13
+                if byte == 13 or (byte == 10 and not after_cr):
+                    lines.append(self._line.decode('utf-8', errors='replace'))
+                    self._line.clear()
+                elif byte in (8, 127):
+                    self._backspace()
+                elif byte >= 32 or byte == 9:
+                    self._append(byte)
+            elif state == _COMMAND:
+                if byte == IAC:
+                    # An escaped 255 data byte
+                    self._after_cr = False
+                    self._append(byte)
+                    self._state = _DATA
+                elif byte in (WILL, WONT, DO, DONT):
+                    self._state = _OPTION
+                elif byte == SB:
+                    self._subnegotiation.clear()
+                    self._state = _SUBNEGOTIATION
+                else:
+                    # Commands such as NOP or "are you there" don't affect the input
+                    self._state = _DATA
+            elif state == _OPTION:
+                # Options are never accepted, so the client's answers need no reply
+                self._state = _DATA
+            elif state == _SUBNEGOTIATION:
+                if byte == IAC:
+                    self._state = _SUBNEGOTIATION_COMMAND
+                elif len(self._subnegotiation) < 64:
+                    self._subnegotiation.append(byte)
+            else:
+                if byte == SE:
+                    self._end_subnegotiation()
+                    self._state = _DATA
+                elif byte == IAC:
+                    self._subnegotiation.append(byte)
+                    self._state = _SUBNEGOTIATION
+                else:
+                    self._state = _DATA
+        return lines
+
+    def _append(self, byte: int) -> None:
+        """Adds a byte to the line in progress, unless it is full"""
+        if len(self._line) < self.max_line_length:
+            self._line.append(byte)
+
+    def _backspace(self) -> None:
+        """Removes the last character of the line in progress, along with every byte of it if it is multibyte"""
+        line = self._line
+        while line and line[-1] & 0xC0 == 0x80:
+            line.pop()
+        if line:
+            line.pop()
+
+    def _end_subnegotiation(self) -> None:
+        """Handles a complete subnegotiation, only window size reports matter"""
+        sub = self._subnegotiation
+        if len(sub) >= 5 and sub[0] == NAWS:
+            width = sub[1] << 8 | sub[2]
+            # 0 means the client doesn't know
+            if width:
+                self.width = width
+
+class _SlowClient(ConnectionError):
+    """Raised when a client doesn't read its output in time"""
+
+class TelnetServer:
+    """
+    Serves the sessions of a SessionPool over TCP to telnet clients, from one asyncio event loop. Every
+    connection opens its own session and gets its own TextRenderer, wrapped to the width the client
+    reports. A connection only holds its session, a decoder and a few buffers, so one process can keep
+    thousands of mostly idle connections open.
+
+    Slow clients are handled with backpressure: the output of a turn is written, and no more input is
+    read from that connection until its output buffer has drained below the output buffer limit. The
+    buffer of a connection therefore never holds more than the limit plus the output of one turn, and a
+    client that doesn't read for drain_timeout seconds is disconnected and its output discarded.
+
+    A command whose action raises is answered with an error text and the exception is reported to the
+    event loop's exception handler, the connection and its session are kept.
+    """
+    def __init__(
+            self,
+            pool: SessionPool,
+            host: str = '127.0.0.1',
+            port: int = 2323,
+            welcome_text: Optional[str] = None,
+            prompt: str = '> ',
+            output_buffer_limit: int = 64 * 1024,
+            drain_timeout: float = 30.0,
+            idle_timeout: Optional[float] = None,
+            max_connections: int = 10_000,
+            max_line_length: int = 1024,
+            turn_timeout: Optional[float] = 5.0,
+            colors: bool = True,
+            metrics: Optional[EngineMetrics] = None
+        ):
+        if output_buffer_limit <= 0:
+            raise ValueError(f"The output buffer limit must be positive: {output_buffer_limit}")
+
+        self.pool = pool
+        """The pool the sessions of the connections are opened in"""
+
+        self.host = host
+        """The interface to listen on"""
+
+        self.port = port
+        """The port to listen on, 0 to let the system pick one"""
+
+        self.welcome_text = welcome_text
+        """Shown to every new connection before the start scene, followed by a dinkus"""
+
+        self.prompt = prompt
+        """Shown whenever the server waits for a command"""
+
+        self.output_buffer_limit = output_buffer_limit
+        """The number of bytes of unsent output above which a connection's input isn't read"""
+
+        self.drain_timeout = drain_timeout
+        """The number of seconds a client may take to read its output before it is disconnected"""
+
+        self.idle_timeout = idle_timeout
+        """The number of seconds a client may send nothing before it is disconnected, None for no limit"""
+
+        self.max_connections = max_connections
+        """The number of connections above which new connections are turned away"""
+
+        self.max_line_length = max_line_length
+        """The maximum number of bytes of a command, the rest is dropped"""
+
+        self.turn_timeout = turn_timeout
+        """The maximum number of seconds a turn may take"""
+
+        self.colors = colors
+        """Whether ANSI styles are sent to the clients"""
+
+        self.metrics = metrics
+        """Where render durations are reported. Sessions are attached through the pool's setup."""
+
+        self.slow_client_disconnects = 0
+        """The number of clients disconnected because they didn't read their output"""
+
+        self._server = None # type: Optional[asyncio.AbstractServer]
+        """The listening server, while started"""
+
+        self._connections = {} # type: dict[asyncio.StreamWriter, asyncio.Task]
+        """The open connections and the tasks serving them"""
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """The host and port the server listens on, with the port the system picked if 0 was given"""
+        if self._server is None:
+            raise ValueError("The server isn't started")
+        return self._server.sockets[0].getsockname()[:2]
+
+    @property
+    def connection_count(self) -> int:
+        """The number of open connections"""
+        return len(self._connections)
+
+    async def start(self) -> 'TelnetServer':
+        """
+        Starts listening
+
+        Returns:
+            server (TelnetServer): This server
+        """
+        self._server = await asyncio.start_server(self._serve_connection, self.host, self.port)
+        return self
+
+    async def serve_forever(self) -> None:
+        """Starts listening if it hasn't yet, and serves until cancelled"""
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Stops listening, disconnects every client and closes their sessions"""
+        if self._server is None:
+            return
+        server, self._server = self._server, None
+        server.close()
+        for writer in list(self._connections):
+            writer.close()
+        await asyncio.gather(*self._connections.values(), return_exceptions=True)
+        await server.wait_closed()
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serves one connection from connect to disconnect"""
+        renderer = TextRenderer(colors=self.colors)
+        if len(self._connections) >= self.max_connections:
+            writer.write(self._render(renderer, SystemStrings.SERVER_FULL_TEXT).encode('utf-8'))
+            writer.close()
+            return
+
+        task = asyncio.current_task()
+        assert task is not None
+        self._connections[writer] = task
+        writer.transport.set_write_buffer_limits(high=self.output_buffer_limit)
+        session_id = None
+        try:
+            session_id, session, start_text = self.pool.open_session()
+            exited = False
+            def on_exit(event) -> None:
+                nonlocal exited
+                exited = True
+            session.events.subscribe(EventType.EXIT, on_exit)
+
+            # Ask the client to report its window size, the answer arrives with the first input
+            writer.write(bytes((IAC, DO, NAWS)))
+            greeting = ''
+            if self.welcome_text is not None:
+                greeting = self._render(renderer, self.welcome_text) + renderer.render_dinkus()
+            await self._send(writer, greeting + self._render(renderer, start_text) + self.prompt)
+
+            decoder = TelnetDecoder(self.max_line_length)
+            while not exited:
+                try:
+                    data = await asyncio.wait_for(reader.read(READ_SIZE), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    await self._send(writer, renderer.newline + self._render(renderer, SystemStrings.IDLE_TIMEOUT_TEXT))
+                    break
+                if not data:
+                    break
+
+                lines = decoder.feed(data)
+                if decoder.width is not None:
+                    renderer.width = min(max(decoder.width, MIN_WIDTH), MAX_WIDTH)
+                for line in lines:
+                    command = line.strip()
+                    if not command:
+                        # An empty command shows the prompt again
+                        await self._send(writer, self.prompt)
+                        continue
+                    try:
+                        output = await self.pool.run_async(session_id, command, self.turn_timeout)
+                    except Exception as e:
+                        # A broken action fails its own turn, the client keeps its connection and session
+                        asyncio.get_running_loop().call_exception_handler({
+                            'message': f"Error running the command {command!r}", 'exception': e,
+                        })
+                        output = SystemStrings.ACTION_ERROR_TEXT
+                    rendered = renderer.newline + self._render(renderer, output) + renderer.newline
+                    if exited:
+                        await self._send(writer, rendered)
+                        break
+                    await self._send(writer, rendered + self.prompt)
+        except ConnectionError:
+            # The client went away or was too slow, there is nobody left to tell
+            pass
+        finally:
+            del self._connections[writer]
+            if session_id is not None:
+                self.pool.close_session(session_id)
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    def _render(self, renderer: TextRenderer, text: str) -> str:
+        """Renders output, timing it if there are metrics"""
+        if self.metrics is None:
+            return renderer.render(text)
+        with self.metrics.render_seconds.time():
+            return renderer.render(text)
+
+    async def _send(self, writer: asyncio.StreamWriter, text: str) -> None:
+        """
+        Writes output and waits until the connection's buffer has drained below the output buffer limit.
+        UTF-8 never contains a 255 byte, so the output needs no telnet escaping.
+
+        Args:
+            writer (asyncio.StreamWriter): The connection
+            text (str): The output
+        """
+        writer.write(text.encode('utf-8'))
+        try:
+            await asyncio.wait_for(writer.drain(), self.drain_timeout)
+        except asyncio.TimeoutError:
+            self.slow_client_disconnects += 1
+            # Closing would wait for the buffer to be sent, so drop it instead
+            writer.transport.abort()
+            raise _SlowClient()
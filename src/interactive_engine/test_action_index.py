@@ -0,0 +1,155 @@
+import unittest
+
+from interactive_engine.action_index import ActionIndex
+from interactive_engine.data_classes import Action, ActionType, Player, Scene
+from interactive_engine.engine import InteractiveEngine
+from interactive_engine.strings import SystemStrings
+from interactive_engine.utils.get_action import get_action
+from utils.deep_merge import deep_merge
+
+class TestActionIndex(unittest.TestCase):
+    """Unit tests for the ActionIndex dispatch index."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.scene = Scene(name="Test Scene", text="A test scene.")
+        self.look_door_action = Action(on_action=lambda e,a,s,p: "A door.")
+        self.scene.add_action(ActionType.LOOK, "door", self.look_door_action)
+
+        self.player = Player()
+        self.help_action = Action(ActionType.HELP, lambda e,a,s,p: SystemStrings.HELP_TEXT)
+        self.system_actions = {ActionType.HELP: self.help_action}
+
+        self.index = ActionIndex([self.scene.actions, self.player.actions, self.system_actions])
+        self.scene.add_action_listener(self.index.invalidate)
+        self.player.add_action_listener(self.index.invalidate)
+
+    def assertMatchesDeepMerge(self):
+        """Assert that every lookup through the index matches a lookup through deep_merge."""
+        merged = deep_merge(self.scene.actions, self.player.actions, self.system_actions)
+        for action_type in ActionType:
+            value = merged.get(action_type)
+            self.assertEqual(self.index.has_type(action_type), bool(value))
+            if isinstance(value, dict):
+                self.assertEqual(self.index.keywords(action_type), frozenset(value.keys()))
+                for keyword, action in value.items():
+                    self.assertIs(self.index.get(action_type, keyword), action)
+            elif value is not None:
+                self.assertIs(self.index.get(action_type, "anything"), value)
+
+    def test_initial_index_matches_deep_merge(self):
+        """Test that a freshly built index matches deep_merge."""
+        self.assertMatchesDeepMerge()
+
+    def test_scene_and_player_dictionaries_are_merged(self):
+        """Test that targeted actions from different layers are merged together."""
+        self.assertIs(self.index.get(ActionType.LOOK, "door"), self.look_door_action)
+        self.assertIsNotNone(self.index.get(ActionType.LOOK, "scene"))
+        self.assertIsNotNone(self.index.get(ActionType.LOOK, "player"))
+
+    def test_add_action_patches_index(self):
+        """Test that adding a scene action patches the index."""
+        version = self.index.version
+        window_action = self.scene.add_action(ActionType.LOOK, "window", Action())
+
+        self.assertIs(self.index.get(ActionType.LOOK, "window"), window_action)
+        self.assertGreater(self.index.version, version)
+        self.assertMatchesDeepMerge()
+
+    def test_remove_action_by_keyword_patches_index(self):
+        """Test that removing a scene action by keyword patches the index."""
+        self.scene.remove_action(ActionType.LOOK, "door")
+
+        self.assertIsNone(self.index.get(ActionType.LOOK, "door"))
+        self.assertMatchesDeepMerge()
+
+    def test_remove_action_by_instance_patches_index(self):
+        """Test that removing a scene action by instance patches the index."""
+        self.scene.remove_action(self.look_door_action)
+
+        self.assertIsNone(self.index.get(ActionType.LOOK, "door"))
+        self.assertMatchesDeepMerge()
+
+    def test_removing_last_keyword_removes_type(self):
+        """Test that an action type with no keywords left is no longer available."""
+        take_action = self.scene.add_action(ActionType.TAKE, "key", Action())
+        self.assertTrue(self.index.has_type(ActionType.TAKE))
+
+        self.scene.remove_action(take_action)
+        self.assertFalse(self.index.has_type(ActionType.TAKE))
+
+    def test_player_action_changes_patch_index(self):
+        """Test that player action changes patch the index."""
+        combine_action = self.player.add_action(ActionType.COMBINE, None, Action())
+        self.assertIs(self.index.get(ActionType.COMBINE, ""), combine_action)
+        self.assertMatchesDeepMerge()
+
+        self.player.remove_action(ActionType.COMBINE)
+        self.assertFalse(self.index.has_type(ActionType.COMBINE))
+        self.assertMatchesDeepMerge()
+
+    def test_direct_action_overrides_lower_dictionaries(self):
+        """Test that a direct action in a higher layer shadows keywords in lower layers."""
+        self.scene.add_action(ActionType.USE, "key", Action())
+        use_action = Action(ActionType.USE)
+        self.system_actions[ActionType.USE] = use_action
+        self.index.invalidate(ActionType.USE)
+
+        self.assertTrue(self.index.is_direct(ActionType.USE))
+        self.assertIs(self.index.get(ActionType.USE, "key"), use_action)
+
+        # Adding a shadowed keyword must not leak past the direct action
+        self.scene.add_action(ActionType.USE, "door", Action())
+        self.assertIs(self.index.get(ActionType.USE, "door"), use_action)
+        self.assertMatchesDeepMerge()
+
+    def test_get_action_with_index_matches_error_messages(self):
+        """Test that get_action reports the same errors for indexes and dictionaries."""
+        merged = deep_merge(self.scene.actions, self.player.actions, self.system_actions)
+        for in_text in ["listen door", "look nonexistent", "invalid door", ""]:
+            with self.assertRaises(ValueError) as dict_context:
+                get_action(in_text, merged)
+            with self.assertRaises(ValueError) as index_context:
+                get_action(in_text, self.index)
+            self.assertEqual(str(dict_context.exception), str(index_context.exception))
+
+class TestEngineActionIndex(unittest.TestCase):
+    """Unit tests for how the InteractiveEngine keeps its dispatch index up to date."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.engine = InteractiveEngine()
+        self.engine.player = Player()
+        self.scene = Scene(name="Test Scene", text="A test scene.")
+        self.engine.set_current_scene(self.scene)
+
+    def test_run_sees_actions_added_after_entering_scene(self):
+        """Test that actions added to the current scene are immediately available."""
+        self.scene.add_action(ActionType.TAKE, "key", Action(on_action=lambda e,a,s,p: "Taken."))
+        self.assertEqual(self.engine.run("take key"), "Taken.")
+
+    def test_run_forgets_actions_from_previous_scene(self):
+        """Test that switching scenes swaps the indexed actions."""
+        self.scene.add_action(ActionType.TAKE, "key", Action(on_action=lambda e,a,s,p: "Taken."))
+        self.engine.set_current_scene(Scene(name="Other Scene", text="Another scene."))
+
+        self.assertIn(SystemStrings.MISSING_ACTION_TEXT, self.engine.run("take key"))
+
+        # Changes to the old scene must no longer affect the index
+        self.scene.add_action(ActionType.TAKE, "hat", Action())
+        self.assertIn(SystemStrings.MISSING_ACTION_TEXT, self.engine.run("take hat"))
+
+    def test_replacing_player_reindexes(self):
+        """Test that assigning a new player re-indexes the player actions."""
+        player = Player(description="A brand new player.")
+        self.engine.player = player
+        self.assertEqual(self.engine.run("look player"), "A brand new player.")
+
+    def test_set_system_action_reindexes(self):
+        """Test that setting a system action updates the index."""
+        self.engine.set_system_action(Action(ActionType.HELP, lambda e,a,s,p: "Custom help."))
+        self.assertEqual(self.engine.run("help"), "Custom help.")
+
+
+if __name__ == '__main__':
+    unittest.main()
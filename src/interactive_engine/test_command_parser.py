@@ -0,0 +1,216 @@
+import unittest
+
+from interactive_engine.action_index import ActionIndex
+from interactive_engine.command_parser import CommandParser, ParseStatus
+from interactive_engine.data_classes import Action, ActionType, Scene
+from interactive_engine.grammar import DEFAULT_GRAMMAR, GrammarPhrase, pair_keyword
+from interactive_engine.strings import SystemStrings
+
+class TestCommandParser(unittest.TestCase):
+    """Unit tests for the trie based CommandParser."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.scene = Scene(name="Test Scene", text="A test scene.")
+        self.look_door_action = self.scene.add_action(ActionType.LOOK, "door", Action())
+        self.look_doormat_action = self.scene.add_action(ActionType.LOOK, "doormat", Action())
+        self.look_window_action = self.scene.add_action(ActionType.LOOK, "window", Action())
+        self.take_hat_action = self.scene.add_action(ActionType.TAKE, "hat", Action())
+        self.use_key_door_action = self.scene.add_action(ActionType.USE, "key door", Action())
+
+        self.inventory_action = Action(ActionType.INVENTORY)
+        self.system_actions = {ActionType.INVENTORY: self.inventory_action}
+
+        self.index = ActionIndex([self.scene.actions, self.system_actions])
+        self.scene.add_action_listener(self.index.invalidate)
+        self.parser = CommandParser(self.index)
+
+    def test_exact_command(self):
+        """Test that exact verbs and keywords resolve."""
+        self.assertIs(self.parser.get_action("look door"), self.look_door_action)
+
+    def test_case_and_whitespace_are_ignored(self):
+        """Test that case and extra whitespace are ignored, including inside multi-word keywords."""
+        self.assertIs(self.parser.get_action("  USE   Key    DOOR  "), self.use_key_door_action)
+
+    def test_verb_aliases(self):
+        """Test that verb aliases resolve to their action type."""
+        self.assertIs(self.parser.get_action("x window"), self.look_window_action)
+        self.assertIs(self.parser.get_action("examine window"), self.look_window_action)
+        self.assertIs(self.parser.get_action("get hat"), self.take_hat_action)
+
+    def test_verb_prefix(self):
+        """Test that unambiguous verb prefixes resolve."""
+        self.assertIs(self.parser.get_action("inv"), self.inventory_action)
+        self.assertIs(self.parser.get_action("ta hat"), self.take_hat_action)
+
+    def test_verb_prefix_prefers_available_action_types(self):
+        """Test that a prefix shared by several verbs resolves to the only available one."""
+        # "ta" could be "take" or "talk", but there is nothing to speak to
+        result = self.parser.parse("ta hat")
+        self.assertEqual(result.action_type, ActionType.TAKE)
+
+    def test_ambiguous_verb_prefix(self):
+        """Test that an ambiguous verb prefix reports the candidates."""
+        self.scene.add_action(ActionType.SPEAK, "guard", Action())
+        result = self.parser.parse("ta hat")
+
+        self.assertEqual(result.status, ParseStatus.AMBIGUOUS_ACTION)
+        self.assertIn("take", result.candidates)
+        self.assertIn("speak", result.candidates)
+
+    def test_target_prefix(self):
+        """Test that unambiguous keyword prefixes resolve."""
+        self.assertIs(self.parser.get_action("look win"), self.look_window_action)
+        self.assertIs(self.parser.get_action("use key d"), self.use_key_door_action)
+
+    def test_exact_keyword_beats_longer_keyword(self):
+        """Test that an exact keyword is preferred over keywords it is a prefix of."""
+        self.assertIs(self.parser.get_action("look door"), self.look_door_action)
+
+    def test_ambiguous_target_prefix(self):
+        """Test that an ambiguous keyword prefix reports the candidates."""
+        result = self.parser.parse("look do")
+
+        self.assertEqual(result.status, ParseStatus.AMBIGUOUS_TARGET)
+        self.assertEqual(set(result.candidates), {"look door", "look doormat"})
+        with self.assertRaises(ValueError) as context:
+            self.parser.get_action("look do")
+        self.assertIn("look doormat", str(context.exception))
+
+    def test_direct_action_ignores_target(self):
+        """Test that direct actions ignore the target."""
+        self.assertIs(self.parser.get_action("inventory something"), self.inventory_action)
+
+    def test_error_messages(self):
+        """Test that failures keep the same messages as get_action."""
+        cases = {
+            "dance": "Unknown action: dance",
+            "listen door": "No actions of type: listen",
+            "look nonexistent": "No action found for target: nonexistent",
+            "": "Unknown action: ",
+        }
+        for in_text, detail in cases.items():
+            with self.assertRaises(ValueError) as context:
+                self.parser.get_action(in_text)
+            self.assertIn(SystemStrings.MISSING_ACTION_TEXT, str(context.exception))
+            self.assertIn(detail, str(context.exception))
+
+    def test_empty_target_does_not_complete(self):
+        """Test that a missing target never auto-completes to the only keyword."""
+        result = self.parser.parse("take")
+        self.assertEqual(result.status, ParseStatus.UNKNOWN_TARGET)
+
+    def test_keyword_tries_follow_action_changes(self):
+        """Test that keyword tries are rebuilt when the keywords of an action type change."""
+        self.assertEqual(self.parser.parse("take ke").status, ParseStatus.UNKNOWN_TARGET)
+
+        take_key_action = self.scene.add_action(ActionType.TAKE, "key", Action())
+        self.assertIs(self.parser.get_action("take ke"), take_key_action)
+
+        self.scene.remove_action(take_key_action)
+        self.assertEqual(self.parser.parse("take ke").status, ParseStatus.UNKNOWN_TARGET)
+
+    def test_keyword_tries_are_only_rebuilt_for_changed_types(self):
+        """Test that changing one action type leaves the other keyword tries alone."""
+        self.parser.get_action("look door")
+        self.parser.get_action("take hat")
+        look_trie = self.parser._get_targets(ActionType.LOOK)
+
+        self.scene.add_action(ActionType.TAKE, "key", Action())
+
+        self.assertIs(self.parser._get_targets(ActionType.LOOK), look_trie)
+
+    def test_typos_are_corrected(self):
+        """Test that verbs and targets a typo or two away from a single known one are corrected."""
+        self.assertIs(self.parser.get_action("tkae hatt"), self.take_hat_action)
+        self.assertIs(self.parser.get_action("use kye dor"), self.use_key_door_action)
+        self.assertIs(self.parser.get_action("lookk windw"), self.look_window_action)
+        self.assertEqual(self.parser.parse("look windw").target, "window")
+
+    def test_ambiguous_typos(self):
+        """Test that typos equally close to several keywords are reported as ambiguous, not guessed."""
+        self.scene.add_action(ActionType.TAKE, "cat", Action())
+        self.scene.add_action(ActionType.TAKE, "car", Action())
+
+        result = self.parser.parse("take cax")
+        self.assertEqual(result.status, ParseStatus.AMBIGUOUS_TARGET)
+        self.assertEqual(result.candidates, ("take car", "take cat"))
+
+    def test_system_verbs_are_only_suggested(self):
+        """Test that mistyped and shortened system verbs are suggested instead of run, so a slip can't restart or end the game."""
+        for command, verb in (("resart", "restart"), ("exot", "exit"), ("hepl", "help"), ("r", "restart"), ("sav", "save")):
+            with self.subTest(command):
+                result = self.parser.parse(command)
+                self.assertEqual(result.status, ParseStatus.AMBIGUOUS_ACTION)
+                self.assertEqual(result.candidates, (verb,))
+        self.assertIs(self.parser.get_action("inventroy"), self.inventory_action)
+        self.assertIs(self.parser.get_action("inv"), self.inventory_action)
+        for command, action_type in (("restart", ActionType.RESTART), ("q", ActionType.EXIT)):
+            with self.subTest(command):
+                self.assertEqual(self.parser.parse(command).action_type, action_type)
+
+    def test_typo_correction_follows_action_changes(self):
+        """Test that typo correction only ever picks keywords that are currently available."""
+        take_lantern_action = self.scene.add_action(ActionType.TAKE, "lantern", Action())
+        self.assertIs(self.parser.get_action("take lantren"), take_lantern_action)
+
+        self.scene.remove_action(take_lantern_action)
+        self.assertEqual(self.parser.parse("take lantren").status, ParseStatus.UNKNOWN_TARGET)
+
+    def test_typo_correction_can_be_disabled(self):
+        """Test that parsers can be created without typo correction."""
+        parser = CommandParser(self.index, correct_typos=False)
+        self.assertEqual(parser.parse("tkae hat").status, ParseStatus.UNKNOWN_ACTION)
+        self.assertEqual(parser.parse("take hatt").status, ParseStatus.UNKNOWN_TARGET)
+
+    def test_grammar(self):
+        """Test that targets are split into direct and indirect objects without function words."""
+        cases = {
+            "the rusty key on the old door": GrammarPhrase("rusty key", "on", "old door"),
+            "at the window": GrammarPhrase("window", None, None),
+            "key on": GrammarPhrase("key", None, None),
+            "rope with hook in bag": GrammarPhrase("rope", "with", "hook bag"),
+        }
+        for target, phrase in cases.items():
+            with self.subTest(target):
+                self.assertEqual(DEFAULT_GRAMMAR.parse(target.split()), phrase)
+
+    def test_pair_keywords(self):
+        """Test that any phrasing of an item and target pair resolves to its action."""
+        use_key_chest_action = self.scene.add_action(ActionType.USE, pair_keyword("key", "chest"), Action())
+
+        for in_text in (
+                "use key on chest", "use the key with the chest", "use rusty key on the old chest", "use key chest",
+                "use the rusty key the old chest"
+            ):
+            with self.subTest(in_text):
+                result = self.parser.parse(in_text)
+                self.assertIs(result.action, use_key_chest_action)
+                self.assertEqual((result.direct_object, result.indirect_object), ("key", "chest"))
+
+        self.assertEqual(self.parser.parse("use chest on key").status, ParseStatus.UNKNOWN_TARGET)
+        self.assertEqual(self.parser.parse("use key on window").status, ParseStatus.UNKNOWN_TARGET)
+
+    def test_function_words_are_ignored(self):
+        """Test that articles and leading prepositions are ignored, even with prefixes."""
+        self.assertIs(self.parser.get_action("look at the window"), self.look_window_action)
+        self.assertIs(self.parser.get_action("take the ha"), self.take_hat_action)
+
+    def test_symmetric_pairs(self):
+        """Test that combining items works in either order."""
+        combine_action = Action()
+        self.system_actions[ActionType.COMBINE] = {pair_keyword("rope", "hook", "with"): combine_action}
+        self.index.rebuild()
+
+        self.assertIs(self.parser.get_action("combine the hook with the rope"), combine_action)
+        self.assertIs(self.parser.get_action("combine rope with hook"), combine_action)
+
+    def test_add_verb_alias(self):
+        """Test that custom verb aliases can be added."""
+        self.parser.add_verb_alias("snatch", ActionType.TAKE)
+        self.assertIs(self.parser.get_action("snatch hat"), self.take_hat_action)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import os
+import re
+import tempfile
+import unittest
+from unittest import mock
+
+from interactive_engine import content_pack
+from interactive_engine.content_pack import compile_content_pack, load_content_pack
+from interactive_engine.engine import InteractiveEngine
+
+PACK_YAML = """
+start: cell
+player: {name: Wizard, description: A sleepy wizard.}
+items:
+  key: {name: Key, description: A rusty key.}
+actions:
+  stool: {type: take, keyword: stool, text: You leave the stool.}
+scenes:
+  cell:
+    text: A dusty cell with a key.
+    start_text: You wake up.
+    text_rules:
+      - {when: {state: {door_open: true}}, text: A dusty cell with an open door.}
+      - {when: {state: {key_taken: true}}, text: A dusty cell.}
+    actions:
+      - type: take
+        keyword: key
+        text: You take the key.
+        give: [key]
+        set: {key_taken: true}
+        remove_self: true
+        add_actions: [stool]
+      - type: use
+        keyword: key on door
+        outcomes:
+          - {when: {lacks: [key]}, text: You have no key.}
+          - {text: The door opens., take: [key], set: {door_open: true}, remove_self: true}
+      - type: move
+        keyword: door
+        outcomes:
+          - {when: {state: {door_open: false}}, text: The door is locked.}
+          - {move: hall}
+  hall:
+    text: A long hall.
+"""
+
+PACK_TOML = """
+start = "cell"
+
+[items.key]
+name = "Key"
+description = "A rusty key."
+
+[scenes.cell]
+text = "A dusty cell with a key."
+
+[[scenes.cell.actions]]
+type = "take"
+keyword = "key"
+text = "You take the key."
+give = ["key"]
+remove_self = true
+"""
+
+class TestContentPack(unittest.TestCase):
+    """Unit tests for loading declarative content packs."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_pack(self, name: str, text: str) -> str:
+        """Write a content pack to the temporary directory and return its path."""
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def test_play_yaml_pack(self):
+        """Test playing through a YAML pack, including outcomes, text rules and library actions."""
+        engine = InteractiveEngine(load_content_pack(self.write_pack("game.yaml", PACK_YAML)))
+
+        self.assertEqual(engine.start(), "You wake up.\n\nTaking a look around you see...\n\nA dusty cell with a key.")
+        self.assertEqual(engine.player.name, "Wizard")
+        self.assertEqual(engine.run("move door"), "The door is locked.")
+        self.assertEqual(engine.run("use key on door"), "You have no key.")
+        self.assertEqual(engine.run("take key"), "You take the key.")
+        self.assertEqual(engine.run("look scene"), "A dusty cell.")
+        self.assertEqual(engine.run("take stool"), "You leave the stool.")
+        self.assertEqual(engine.run("use key on door"), "The door opens.")
+        self.assertEqual(engine.run("look scene"), "A dusty cell with an open door.")
+        self.assertEqual(engine.run("move door"), "A long hall.")
+        self.assertEqual(engine.current_scene.name, "hall")
+
+        # Library actions are registered, so the session can be saved
+        engine.run("undo")
+        self.assertEqual(engine.run("save"), "Game saved.")
+
+    def test_toml_pack(self):
+        """Test that TOML packs are supported."""
+        engine = InteractiveEngine(load_content_pack(self.write_pack("game.toml", PACK_TOML)))
+        engine.start()
+        self.assertEqual(engine.run("take key"), "You take the key.")
+        self.assertEqual(engine.player.inventory.get("key").name, "Key")
+
+    def test_bundle_is_cached(self):
+        """Test that an unchanged pack is loaded from the cache and a changed one is recompiled."""
+        path = self.write_pack("game.yaml", PACK_YAML)
+        load_content_pack(path)
+        cache_dir = os.path.join(self.directory.name, content_pack.PACK_CACHE_DIR)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+        with mock.patch.object(content_pack, 'compile_content_pack', side_effect=AssertionError("compiled")):
+            content = load_content_pack(path)
+        self.assertIn("cell", content.scenes)
+
+        self.write_pack("game.yaml", PACK_YAML.replace("A long hall.", "A short hall."))
+        content = load_content_pack(path)
+        self.assertEqual(content.scenes["hall"].text, "A short hall.")
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+    def test_validation_errors(self):
+        """Test that invalid packs raise errors that point at the problem."""
+        invalid_packs = {
+            "unknown item": ({'scenes': {'a': {'text': 'A.', 'actions': [{'type': 'take', 'keyword': 'x', 'give': ['gem']}]}}}, "scenes.a.actions[0].give"),
+            "unknown type": ({'scenes': {'a': {'text': 'A.', 'actions': [{'type': 'dance', 'keyword': 'x'}]}}}, "scenes.a.actions[0].type"),
+            "unknown removed type": ({'scenes': {'a': {'text': 'A.', 'actions': [{'type': 'take', 'keyword': 'x', 'remove_actions': [['foo', 'x']]}]}}}, "scenes.a.actions[0].remove_actions[0]"),
+            "inventory text rule": ({'scenes': {'a': {'text': 'A.', 'text_rules': [{'when': {'has': []}, 'text': 'B.'}]}}}, "scenes.a.text_rules[0].when"),
+            "unknown scene": ({'scenes': {'a': {'text': 'A.', 'actions': [{'type': 'move', 'keyword': 'x', 'move': 'b'}]}}}, "scenes.a.actions[0].move"),
+            "typo": ({'scenes': {'a': {'txt': 'A.'}}}, "scenes.a"),
+            "missing text": ({'scenes': {'a': {}}}, "scenes.a.text"),
+            "bad start": ({'start': 'b', 'scenes': {'a': {'text': 'A.'}}}, "start"),
+        }
+        for name, (pack, where) in invalid_packs.items():
+            with self.subTest(name):
+                with self.assertRaisesRegex(ValueError, "pack: " + re.escape(where) + ":"):
+                    compile_content_pack(pack, "pack")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+
+from interactive_engine.data_classes import (
+    Action, ActionType, Inventory, Item, Player, Scene, SceneText, TextRule, inventory_action,
+    look_scene_action
+)
+
+class TestDataClasses(unittest.TestCase):
+    """Unit tests for the compact data classes."""
+
+    def test_instances_have_no_dict(self):
+        """Test that data class instances only store their slots."""
+        for instance in (Action(), Item("Gem", "gem", "A gem."), Player(), Scene("room", "A room.")):
+            with self.subTest(type(instance).__name__):
+                self.assertFalse(hasattr(instance, '__dict__'))
+
+    def test_scene_actions_are_created_lazily(self):
+        """Test that scenes only hold dictionaries for the action types they use."""
+        scene = Scene("room", "A room.")
+        self.assertEqual(scene.actions, {ActionType.LOOK: {'scene': look_scene_action}})
+
+        scene.remove_action(ActionType.TAKE, "gem")
+        take_gem = scene.add_action(ActionType.TAKE, "gem", Action())
+        self.assertEqual(scene.actions[ActionType.TAKE], {"gem": take_gem})
+
+        scene.remove_action(take_gem)
+        self.assertEqual(scene.actions[ActionType.TAKE], {})
+
+    def test_shared_actions_cant_be_changed(self):
+        """Test that the default actions shared by every scene and player can't be changed through one of them."""
+        scene = Scene("room", "A room.")
+        scene.add_action(ActionType.LOOK, "around", look_scene_action)
+        with self.assertRaises(ValueError):
+            scene.add_action(ActionType.TOUCH, "scene", look_scene_action)
+        with self.assertRaises(ValueError):
+            Player().add_action(ActionType.HELP, None, inventory_action)
+        self.assertIs(look_scene_action.action_type, ActionType.LOOK)
+        self.assertIs(inventory_action.action_type, ActionType.INVENTORY)
+        self.assertNotIn(ActionType.TOUCH, scene.actions)
+
+    def test_copies_are_independent(self):
+        """Test that lazily created state and actions are never shared between copies."""
+        scene = Scene("room", "A room.")
+        copy = scene.copy()
+        copy.state["lit"] = True
+        copy.add_action(ActionType.MOVE, "north", Action())
+
+        self.assertEqual(dict(scene.state), {})
+        self.assertNotIn(ActionType.MOVE, scene.actions)
+
+        changes = []
+        copy.set_change_listener(lambda owner, kind, key, old: changes.append((kind, key, old)))
+        copy.copy().state["lit"] = False
+        self.assertEqual(changes, [])
+
+        copy.state["lit"] = False
+        copy.revert_change(*changes[0])
+        self.assertTrue(copy.state["lit"])
+
+    def test_inventory_stacks(self):
+        """Test that the inventory counts stacks, indexes items by code and keeps the order they were added."""
+        coin, gem = Item("Coin", "coin", "A coin."), Item("Gem", "gem", "A gem.")
+        inventory = Inventory([coin, gem])
+        inventory.add(coin, 2)
+
+        self.assertEqual(list(inventory.stacks()), [(coin, 3), (gem, 1)])
+        self.assertEqual(len(inventory), 4)
+        self.assertIs(inventory.get("gem"), gem)
+
+        self.assertEqual(inventory.remove(gem, 5), 1)
+        self.assertNotIn(gem, inventory)
+        self.assertIsNone(inventory.get("gem"))
+        self.assertEqual(list(inventory), [coin, coin, coin])
+
+    def test_player_inventory_changes_can_be_reverted(self):
+        """Test that inventory changes are reported per item so they can be undone."""
+        coin = Item("Coin", "coin", "A coin.")
+        player = Player()
+        changes = []
+        player.set_change_listener(lambda owner, kind, key, old: changes.append((kind, key, old)))
+
+        player.add_inventory_items([coin], 5)
+        player.remove_inventory_items([coin], 2)
+        player.remove_inventory_items([Item("Gem", "gem", "A gem.")])
+        self.assertEqual(changes, [('inventory', coin, 0), ('inventory', coin, 5)])
+        self.assertTrue(player.inventory_contains([coin]))
+
+        player.revert_change(*changes.pop())
+        self.assertEqual(player.inventory.count(coin), 5)
+        player.revert_change(*changes.pop())
+        self.assertEqual(len(player.inventory), 0)
+
+    def test_scene_text_follows_state(self):
+        """Test that scene text is rendered from the state and only again when a dependency changes."""
+        renders = []
+
+        class CountingSceneText(SceneText):
+            __slots__ = ()
+
+            def render(self, state):
+                renders.append(dict(state))
+                return super().render(state)
+
+        scene = Scene("cell", CountingSceneText(
+            "A cell.",
+            [TextRule({'door_open': True}, "The door is open.")],
+            [TextRule({'lamp': 'lit'}, "It is bright."), TextRule({}, "It is dark.")],
+        ))
+        self.assertEqual(scene.text, "A cell. It is dark.")
+        self.assertEqual(scene.text, "A cell. It is dark.")
+        self.assertEqual(len(renders), 1)
+
+        scene.state['visited'] = True
+        self.assertEqual(scene.text, "A cell. It is dark.")
+        self.assertEqual(len(renders), 1)
+
+        scene.state['door_open'] = True
+        scene.state['lamp'] = 'lit'
+        self.assertEqual(scene.text, "A cell. The door is open. It is bright.")
+        self.assertEqual(len(renders), 2)
+
+        copy = scene.copy()
+        copy.state['door_open'] = False
+        self.assertEqual(copy.text, "A cell. It is bright.")
+        self.assertEqual(scene.text, "A cell. The door is open. It is bright.")
+
+
+if __name__ == '__main__':
+    unittest.main()
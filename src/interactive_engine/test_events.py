@@ -0,0 +1,111 @@
+import asyncio
+import unittest
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Item, Player, Scene, state_guard
+from interactive_engine.engine import InteractiveEngine
+from interactive_engine.events import EventBus, EventType
+from utils.observable_dict import MISSING
+
+def build_content() -> EngineContent:
+    """Build a two scene game with a coin to take and a locked gate."""
+    content = EngineContent()
+    coin = content.add_item(Item(name="Coin", code="coin", description="A shiny coin."))
+    hall = content.add_scene(Scene(name="Hall", text="A hall."))
+    yard = content.add_scene(Scene(name="Yard", text="A yard."))
+
+    def on_take_coin(e, a: Action, s: Scene, p: Player) -> str:
+        p.add_inventory_items([coin], 3)
+        p.remove_inventory_items([coin])
+        s.state['coin_taken'] = True
+        return "You take the coins."
+
+    hall.add_action(ActionType.TAKE, "coin", Action(on_action=on_take_coin))
+    hall.add_action(ActionType.MOVE, "gate", Action(
+        on_action=lambda e,a,s,p: e.set_current_scene(yard),
+        guards=[state_guard('coin_taken', fail_text="The gate wants a coin.")]
+    ))
+    return content
+
+class TestEvents(unittest.TestCase):
+    """Unit tests for the session event bus."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.engine = InteractiveEngine(build_content())
+        self.events = []
+        for event_type in EventType:
+            self.engine.events.subscribe(event_type, lambda event, t=event_type: self.events.append((t, event)))
+
+    def event_types(self) -> list[EventType]:
+        """Get the types of the events reported so far and forget them."""
+        event_types = [event_type for event_type, _ in self.events]
+        self.events.clear()
+        return event_types
+
+    def test_turn_events(self):
+        """Test that turns report their net item and state changes, failed actions and scene changes."""
+        self.engine.start()
+        self.assertEqual(self.event_types(), [EventType.SCENE_ENTER])
+
+        self.engine.run("move gate")
+        self.assertEqual(self.event_types(), [EventType.TURN_START, EventType.ACTION_FAILED, EventType.TURN_END])
+
+        self.engine.run("take coin")
+        item_event, state_event = self.events[1][1], self.events[2][1]
+        self.assertEqual(self.event_types(), [
+            EventType.TURN_START, EventType.ITEM_ADDED, EventType.STATE_CHANGED, EventType.TURN_END
+        ])
+        self.assertEqual((item_event.item.code, item_event.quantity), ("coin", 2))
+        self.assertEqual((state_event.key, state_event.old, state_event.new), ('coin_taken', MISSING, True))
+
+        self.engine.run("move gate")
+        leave, enter = self.events[1][1], self.events[2][1]
+        self.assertEqual(self.event_types(), [
+            EventType.TURN_START, EventType.SCENE_LEAVE, EventType.SCENE_ENTER, EventType.TURN_END
+        ])
+        self.assertEqual((leave.scene.name, enter.scene.name), ("Hall", "Yard"))
+
+        failed = self.engine.run_many(["dance"])[0]
+        self.assertEqual(self.events[0][1].text, failed.text)
+        self.assertEqual(self.event_types(), [EventType.ACTION_FAILED])
+
+    def test_world_changes_without_undo_history(self):
+        """Test that item and state changes are reported when the session keeps no undo history."""
+        engine = InteractiveEngine(build_content(), max_undo=0)
+        event_types = []
+        for event_type in (EventType.ITEM_ADDED, EventType.ITEM_REMOVED, EventType.STATE_CHANGED):
+            engine.events.subscribe(event_type, lambda event, t=event_type: event_types.append(t))
+
+        engine.start()
+        engine.run("take coin")
+        self.assertEqual(event_types, [EventType.ITEM_ADDED, EventType.STATE_CHANGED])
+
+    def test_exit_listeners(self):
+        """Test that on_exit replaces its own listener only and coroutine listeners are awaited."""
+        exits = []
+        self.engine.on_exit(lambda: exits.append("first"))
+        self.engine.on_exit(lambda: exits.append("second"))
+
+        async def on_exit_async(event):
+            exits.append(event.command)
+        self.engine.events.subscribe(EventType.EXIT, on_exit_async)
+
+        self.engine.start()
+        asyncio.run(self.engine.run_async("exit"))
+        self.assertEqual(exits, ["second", "exit"])
+
+    def test_unsubscribe(self):
+        """Test that removing listeners leaves event types without listeners empty."""
+        bus = EventBus()
+        listener = bus.subscribe(EventType.TURN_END, print)
+        copy = bus.copy()
+        bus.unsubscribe(EventType.TURN_END, listener)
+        bus.unsubscribe(EventType.TURN_END, listener)
+
+        self.assertEqual(bus.listeners[EventType.TURN_END], ())
+        self.assertEqual(copy.listeners[EventType.TURN_END], (print,))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import random
+import unittest
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Player, Scene
+from interactive_engine.engine import InteractiveEngine
+from interactive_engine.fuzzer import CommandGenerator, FailureKind, fuzz
+
+def build_bell_content() -> EngineContent:
+    """Build a game with a bell that breaks the game when rung three times, and a clock that hangs it"""
+    content = EngineContent()
+    tower = content.add_scene(Scene(name="Tower", text="A bell tower."))
+
+    def on_ring(e, a: Action, s: Scene, p: Player) -> str:
+        s.state['rings'] = s.state.get('rings', 0) + 1
+        if s.state['rings'] >= 3:
+            raise RuntimeError("The bell cracked")
+        return "Dong."
+
+    tower.add_action(ActionType.TOUCH, "bell", Action(on_action=on_ring))
+    tower.add_action(ActionType.LOOK, "window", Action(on_action=lambda e,a,s,p: "Fields."))
+    tower.add_action(ActionType.LISTEN, "wind", Action(on_action=lambda e,a,s,p: "Whoosh."))
+    return content
+
+def build_clock_content() -> EngineContent:
+    """Build a game with a clock that never stops ticking"""
+    content = build_bell_content()
+
+    def on_wind(e, a: Action, s: Scene, p: Player) -> str:
+        while True:
+            pass
+
+    content.get_scene("Tower").add_action(ActionType.USE, "clock", Action(on_action=on_wind))
+    return content
+
+def rings_invariant(engine: InteractiveEngine):
+    """An invariant that fails once the bell has been rung twice"""
+    return "Rung twice" if engine.current_scene.state.get('rings', 0) >= 2 else None
+
+class TestFuzzer(unittest.TestCase):
+    """Unit tests for the playtest fuzzer."""
+
+    def test_commands_are_deterministic(self):
+        """Test that sessions with the same seed get the same commands."""
+        sequences = []
+        for _ in range(2):
+            engine = InteractiveEngine(build_bell_content())
+            engine.start()
+            generator = CommandGenerator(random.Random("seed"), junk_rate=0.5)
+            sequences.append([generator.next_command(engine) for _ in range(50)])
+        self.assertEqual(sequences[0], sequences[1])
+
+    def test_exception_is_minimized(self):
+        """Test that a crash is found, reported once and minimized to the commands that cause it."""
+        report = fuzz(build_bell_content, sessions=5, turns=100)
+        self.assertEqual(len(report.failures), 1)
+        failure = report.failures[0]
+        self.assertEqual(failure.kind, FailureKind.EXCEPTION)
+        self.assertTrue(failure.signature.startswith("RuntimeError at "))
+        self.assertEqual(len(failure.commands), 3)
+        self.assertTrue(all(command.strip().lower().startswith("t") for command in failure.commands))
+
+    def test_timeouts_and_invariants(self):
+        """Test that hanging turns are interrupted and custom invariants are checked."""
+        report = fuzz(build_clock_content, sessions=2, turns=100, invariants=[], turn_timeout=0.1)
+        self.assertIn(FailureKind.TIMEOUT, [failure.kind for failure in report.failures])
+
+        report = fuzz(build_bell_content, sessions=2, turns=100, invariants=[rings_invariant])
+        self.assertEqual([failure.kind for failure in report.failures], [FailureKind.INVARIANT])
+        self.assertEqual(len(report.failures[0].commands), 2)
+
+    def test_worker_processes(self):
+        """Test that worker processes play the same sessions as this process."""
+        local = fuzz(build_bell_content, sessions=4, turns=50)
+        pooled = fuzz(build_bell_content, sessions=4, turns=50, workers=2)
+        self.assertEqual(pooled.turns, local.turns)
+        self.assertEqual(pooled.failures, local.failures)
+
+
+if __name__ == '__main__':
+    unittest.main()
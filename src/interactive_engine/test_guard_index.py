@@ -0,0 +1,124 @@
+import asyncio
+import unittest
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Item, Player, Scene, item_guard, state_guard
+from interactive_engine.engine import InteractiveEngine
+from interactive_engine.guard_index import GuardIndex
+from interactive_engine.strings import ActionStrings
+
+class TestGuardIndex(unittest.TestCase):
+    """Unit tests for guarded actions and the index of their availability."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.lamp = Item(name="Lamp", code="lamp", description="An oil lamp.")
+        self.scene = Scene(name="Cellar", text="A dark cellar.")
+        self.player = Player()
+        self.read = Action(
+            on_action=lambda e,a,s,p: "You read the scroll.",
+            guards=[state_guard('lit', fail_text="It is too dark."), item_guard(self.lamp)]
+        )
+
+    def test_guards_are_checked_before_running(self):
+        """Test that the first failed guard's text replaces the action text."""
+        self.assertEqual(self.read.run_action(None, self.scene, self.player), "It is too dark.")
+
+        self.scene.state['lit'] = True
+        self.assertEqual(self.read.run_action(None, self.scene, self.player), ActionStrings.GUARD_FAILED_TEXT)
+
+        self.player.add_inventory_items([self.lamp])
+        self.assertEqual(self.read.run_action(None, self.scene, self.player), "You read the scroll.")
+
+    def test_only_gated_actions_are_evaluated_again(self):
+        """Test that a change only re-evaluates the actions gated by the changed key or item."""
+        evaluations = []
+
+        class CountingAction(Action):
+            __slots__ = ()
+
+            def failed_guard(self, scene, player):
+                evaluations.append(self)
+                return super().failed_guard(scene, player)
+
+        read = CountingAction(guards=self.read.guards)
+        drop = CountingAction(guards=[item_guard(self.lamp, held=False)])
+        index = GuardIndex()
+        index.set_world(self.scene, self.player)
+
+        self.assertFalse(index.is_available(read))
+        self.assertTrue(index.is_available(drop))
+        self.assertEqual(len(evaluations), 2)
+
+        index.invalidate('state', 'lit')
+        self.scene.state['lit'] = True
+        self.assertFalse(index.is_available(read))
+        self.assertTrue(index.is_available(drop))
+        self.assertEqual(evaluations[2:], [read])
+
+        index.invalidate('inventory', self.lamp)
+        self.player.add_inventory_items([self.lamp])
+        self.assertTrue(index.is_available(read))
+        self.assertFalse(index.is_available(drop))
+        self.assertEqual(len(evaluations), 5)
+
+        index.invalidate('state', None)
+        self.assertTrue(index.is_available(read))
+        self.assertFalse(index.is_available(drop))
+        self.assertEqual(len(evaluations), 6)
+
+    def test_turns_check_guards_once(self):
+        """Test that the engine checks a guarded action's guards once per turn, however the turn is run."""
+        checks = []
+
+        class CountingAction(Action):
+            __slots__ = ()
+
+            def guard_text(self, scene, player):
+                checks.append(self)
+                return super().guard_text(scene, player)
+
+        content = EngineContent()
+        cellar = content.add_scene(self.scene)
+        cellar.add_action(ActionType.USE, "scroll", CountingAction(on_action=self.read.on_action, guards=self.read.guards))
+        engine = InteractiveEngine(content)
+        engine.start()
+
+        self.assertEqual(engine.run("use scroll"), "It is too dark.")
+        engine.current_scene.state['lit'] = True
+        engine.player.add_inventory_items([self.lamp])
+        self.assertEqual(engine.run("use scroll"), "You read the scroll.")
+        engine.run_many(["use scroll"], output=False)
+        self.assertEqual(asyncio.run(engine.run_async("use scroll")), "You read the scroll.")
+        self.assertEqual(len(checks), 4)
+
+    def test_list_actions_hides_unavailable_actions(self):
+        """Test that listing actions follows the guards as the world changes and changes are undone."""
+        content = EngineContent()
+        lamp = content.add_item(self.lamp)
+        cellar = content.add_scene(self.scene)
+
+        def on_take_lamp(e, a: Action, s: Scene, p: Player) -> str:
+            p.add_inventory_items([lamp])
+            s.state['lit'] = True
+            return "You light the lamp."
+
+        cellar.add_action(ActionType.TAKE, "lamp", Action(on_action=on_take_lamp, guards=[item_guard(lamp, held=False)]))
+        cellar.add_action(ActionType.USE, "scroll", self.read)
+
+        engine = InteractiveEngine(content)
+        engine.start()
+        self.assertIn("take lamp", engine.list_actions())
+        self.assertNotIn("use scroll", engine.list_actions())
+
+        engine.run("take lamp")
+        self.assertNotIn("take lamp", engine.list_actions())
+        self.assertIn("use scroll", engine.list_actions())
+
+        engine.run("undo")
+        self.assertIn("take lamp", engine.list_actions())
+        self.assertNotIn("use scroll", engine.list_actions())
+
+
+if __name__ == '__main__':
+    unittest.main()
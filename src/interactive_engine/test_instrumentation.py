@@ -0,0 +1,88 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Scene, state_guard
+from interactive_engine.engine import InteractiveEngine
+from interactive_engine.instrumentation import LatencyHistogram, TurnProfiler
+
+def build_content() -> EngineContent:
+    """Build a room with a lamp and a locked chest"""
+    content = EngineContent()
+    room = content.add_scene(Scene(name="Room", text="A room."))
+    room.add_action(ActionType.TOUCH, "lamp", Action(on_action=lambda e,a,s,p: "Click."))
+    room.add_action(ActionType.TOUCH, "chest", Action(on_action=lambda e,a,s,p: "Creak.", guards=[state_guard("unlocked")]))
+    return content
+
+class TestInstrumentation(unittest.TestCase):
+    """Unit tests for turn profiling."""
+
+    def test_histogram(self):
+        """Test that durations land in logarithmic buckets and percentiles are bucket bounds."""
+        histogram = LatencyHistogram()
+        for seconds in (0.0000005, 0.000003, 0.000003, 0.000003, 0.002):
+            histogram.record(seconds)
+        self.assertEqual(histogram.counts[0], 1)
+        self.assertEqual(histogram.counts[2], 3)
+        self.assertEqual(histogram.percentile(50), 0.000004)
+        self.assertEqual(histogram.percentile(100), 0.002)
+        self.assertIsNone(LatencyHistogram().percentile(50))
+
+    def test_profiled_turns(self):
+        """Test that phases, actions, refusals and failed commands are recorded."""
+        engine = InteractiveEngine(build_content())
+        engine.start()
+        engine.profiler = TurnProfiler()
+        for command in ("touch lamp", "touch lamp", "touch chest", "dance", "inventory"):
+            engine.run(command)
+
+        snapshot = engine.profiler.snapshot()
+        self.assertEqual((snapshot['turns'], snapshot['failed']), (5, 1))
+        self.assertEqual(snapshot['phases']['action']['count'], 4)
+        self.assertEqual(snapshot['phases']['resolve']['count'], 5)
+        # The refused chest isn't counted as an action
+        self.assertEqual({command: histogram['count'] for command, histogram in snapshot['actions'].items()}, {
+            "touch lamp": 2, "inventory": 1
+        })
+
+        with engine.profiler.measure('render'):
+            pass
+        self.assertEqual(engine.profiler.snapshot()['phases']['render']['count'], 1)
+
+    def test_every_way_of_running_turns_is_profiled(self):
+        """Test that turns run through run_many and run_async are profiled like turns run through run."""
+        engine = InteractiveEngine(build_content())
+        engine.start()
+        engine.profiler = TurnProfiler()
+        engine.run_many(["touch lamp", "touch chest", "dance"])
+        asyncio.run(engine.run_async("touch lamp"))
+
+        snapshot = engine.profiler.snapshot()
+        self.assertEqual((snapshot['turns'], snapshot['failed']), (4, 1))
+        self.assertEqual(snapshot['phases']['events']['count'], 3)
+        self.assertEqual({command: histogram['count'] for command, histogram in snapshot['actions'].items()}, {"touch lamp": 2})
+
+    def test_reset_and_export(self):
+        """Test that profiles can be exported and reset, with allocations traced."""
+        engine = InteractiveEngine(build_content())
+        engine.start()
+        engine.profiler = TurnProfiler(trace_allocations=True)
+        engine.run("touch lamp")
+        self.assertGreater(engine.profiler.peak_bytes['max'], 0)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'profile.json')
+            engine.profiler.export_json(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['turns'], 1)
+
+        engine.profiler.reset()
+        self.assertEqual(engine.profiler.snapshot()['turns'], 0)
+        self.assertEqual(engine.profiler.snapshot()['actions'], {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import unittest
+import urllib.error
+import urllib.request
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Scene, state_guard
+from interactive_engine.metrics import Counter, EngineMetrics, MetricsServer
+from interactive_engine.session_pool import SessionPool
+
+def build_content() -> EngineContent:
+    """Build a room with a lamp and a locked chest"""
+    content = EngineContent()
+    room = content.add_scene(Scene(name="Room", text="A room."), start=True)
+    room.add_action(ActionType.TOUCH, "lamp", Action(on_action=lambda e,a,s,p: "Click."))
+    room.add_action(ActionType.TOUCH, "chest", Action(guards=[state_guard("unlocked")]))
+
+    async def on_wait(e, a, s, p):
+        await asyncio.sleep(0.01)
+        return "Tick."
+    room.add_action(ActionType.USE, "clock", Action(on_action=on_wait))
+    return content
+
+def samples(text: str) -> dict[str, float]:
+    """Parses the samples of the Prometheus text format"""
+    return {
+        line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+        for line in text.splitlines() if line and not line.startswith('#')
+    }
+
+class TestMetrics(unittest.TestCase):
+    """Unit tests for the Prometheus metrics."""
+
+    def test_session_metrics(self):
+        """Test that turns, failures and sessions of a pool are counted."""
+        metrics = EngineMetrics()
+        pool = SessionPool(build_content(), setup=metrics.attach)
+        metrics.session_count = lambda: len(pool)
+        session_id, _, _ = pool.open_session()
+        pool.open_session()
+        for command in ("touch lamp", "touch lamp", "touch chest", "dance"):
+            pool.run(session_id, command)
+        with metrics.render_seconds.time():
+            pass
+
+        values = samples(metrics.expose())
+        self.assertEqual(values['interactive_engine_turns_total{action_type="touch"}'], 3)
+        self.assertEqual(values['interactive_engine_failed_actions_total{reason="refused"}'], 1)
+        self.assertEqual(values['interactive_engine_failed_actions_total{reason="unresolved"}'], 1)
+        self.assertEqual(values['interactive_engine_turn_seconds_count'], 3)
+        self.assertEqual(values['interactive_engine_turn_seconds_bucket{le="+Inf"}'], 3)
+        self.assertEqual(values['interactive_engine_render_seconds_count'], 1)
+        self.assertEqual(values['interactive_engine_active_sessions'], 2)
+
+    def test_concurrent_async_turns(self):
+        """Test that turns of sessions run concurrently on one event loop are all timed."""
+        metrics = EngineMetrics()
+        pool = SessionPool(build_content(), setup=metrics.attach)
+        session_ids = [pool.open_session()[0] for _ in range(2)]
+
+        async def play():
+            return await asyncio.gather(*(pool.run_async(session_id, "use clock") for session_id in session_ids))
+
+        self.assertEqual(asyncio.run(play()), ["Tick.", "Tick."])
+        values = samples(metrics.expose())
+        self.assertEqual(values['interactive_engine_turns_total{action_type="use"}'], 2)
+        self.assertEqual(values['interactive_engine_turn_seconds_count'], 2)
+
+    def test_threads_count_in_their_own_shards(self):
+        """Test that counts from many threads add up."""
+        counter = Counter("test_total", "Test.", ('thread',))
+        def count():
+            for _ in range(1000):
+                counter.inc(('any',))
+        threads = [threading.Thread(target=count) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counter.values(), {('any',): 4000})
+        self.assertEqual(len(counter._shards), 4)
+
+    def test_server(self):
+        """Test that the metrics are served over HTTP."""
+        server = MetricsServer(EngineMetrics(), port=0).start()
+        try:
+            host, port = server.address
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+                self.assertTrue(response.headers['Content-Type'].startswith('text/plain; version=0.0.4'))
+                self.assertIn("# TYPE interactive_engine_turns_total counter", response.read().decode('utf-8'))
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"http://{host}:{port}/other")
+        finally:
+            server.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import asyncio
+import time
+import unittest
+
+from interactive_engine.data_classes import Action, ActionType, Scene
+from interactive_engine.engine import InteractiveEngine
+from interactive_engine.strings import SystemStrings
+
+class TestRunAsync(unittest.IsolatedAsyncioTestCase):
+    """Unit tests for running actions through InteractiveEngine.run_async."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.engine = InteractiveEngine()
+        self.scene = Scene(name="Test Scene", text="A test scene.")
+        self.engine.set_current_scene(self.scene)
+
+    async def test_plain_action(self):
+        """Test that plain on_action callables work asynchronously."""
+        self.assertEqual(await self.engine.run_async("look scene"), "A test scene.")
+
+    async def test_coroutine_action(self):
+        """Test that coroutine on_action callables are awaited."""
+        async def on_listen(e, a, s, p):
+            await asyncio.sleep(0)
+            return "You hear a distant bell."
+
+        self.scene.add_action(ActionType.LISTEN, "bell", Action(on_action=on_listen))
+        self.assertEqual(await self.engine.run_async("listen bell"), "You hear a distant bell.")
+
+    async def test_errors_are_returned_as_text(self):
+        """Test that unknown commands return the same text as run."""
+        self.assertEqual(await self.engine.run_async("dance"), self.engine.run("dance"))
+
+    async def test_blocking_action_does_not_block_the_event_loop(self):
+        """Test that blocking actions run in a worker thread."""
+        def on_touch(e, a, s, p):
+            time.sleep(0.05)
+            return "It is cold."
+
+        self.scene.add_action(ActionType.TOUCH, "wall", Action(on_action=on_touch, blocking=True))
+
+        ticks = 0
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        ticker_task = asyncio.create_task(ticker())
+        result = await self.engine.run_async("touch wall")
+        ticker_task.cancel()
+
+        self.assertEqual(result, "It is cold.")
+        self.assertGreater(ticks, 2)
+
+    async def test_timeout(self):
+        """Test that a turn exceeding its timeout returns the timeout text."""
+        async def on_speak(e, a, s, p):
+            await asyncio.sleep(10)
+            return "Hello."
+
+        self.scene.add_action(ActionType.SPEAK, "oracle", Action(on_action=on_speak))
+        result = await self.engine.run_async("speak oracle", timeout=0.01)
+        self.assertEqual(result, SystemStrings.ACTION_TIMEOUT_TEXT)
+
+    async def test_cancellation(self):
+        """Test that cancelling the calling task cancels the turn."""
+        started = asyncio.Event()
+        async def on_speak(e, a, s, p):
+            started.set()
+            await asyncio.sleep(10)
+            return "Hello."
+
+        self.scene.add_action(ActionType.SPEAK, "oracle", Action(on_action=on_speak))
+        task = asyncio.create_task(self.engine.run_async("speak oracle"))
+        await started.wait()
+        task.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        # The session is usable again after the cancelled turn
+        self.assertEqual(await self.engine.run_async("look scene"), "A test scene.")
+
+    async def test_turns_of_one_session_do_not_overlap(self):
+        """Test that concurrent turns of the same session run one after another."""
+        order = []
+        async def on_speak(e, a, s, p):
+            order.append("start")
+            await asyncio.sleep(0.01)
+            order.append("end")
+            return "Hello."
+
+        self.scene.add_action(ActionType.SPEAK, "oracle", Action(on_action=on_speak))
+        await asyncio.gather(self.engine.run_async("speak oracle"), self.engine.run_async("speak oracle"))
+        self.assertEqual(order, ["start", "end", "start", "end"])
+
+    async def test_timed_out_blocking_action_finishes_before_the_next_turn(self):
+        """Test that a blocking action that timed out still finishes within its own, undoable turn."""
+        order = []
+        def on_touch(e, a, s, p):
+            order.append("slow start")
+            time.sleep(0.1)
+            s.state['x'] = 1
+            order.append("slow end")
+            return "It is cold."
+
+        def on_listen(e, a, s, p):
+            order.append("fast")
+            return "Silence."
+
+        self.scene.add_action(ActionType.TOUCH, "wall", Action(on_action=on_touch, blocking=True))
+        self.scene.add_action(ActionType.LISTEN, "wall", Action(on_action=on_listen))
+        self.assertEqual(await self.engine.run_async("touch wall", timeout=0.02), SystemStrings.ACTION_TIMEOUT_TEXT)
+        self.assertEqual(await self.engine.run_async("listen wall"), "Silence.")
+        self.assertEqual(order, ["slow start", "slow end", "fast"])
+
+        self.assertNotEqual(await self.engine.run_async("undo"), SystemStrings.NOTHING_TO_UNDO_TEXT)
+        self.assertNotIn('x', self.engine.current_scene.state)
+
+    def test_sync_run_rejects_coroutine_actions(self):
+        """Test that the synchronous run refuses to run coroutine actions."""
+        async def on_listen(e, a, s, p):
+            return "You hear a distant bell."
+
+        self.scene.add_action(ActionType.LISTEN, "bell", Action(on_action=on_listen))
+        with self.assertRaises(TypeError):
+            self.engine.run("listen bell")
+
+
+if __name__ == '__main__':
+    unittest.main()
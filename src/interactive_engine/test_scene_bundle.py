@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+
+import yaml
+
+from interactive_engine.content_pack import load_content_pack
+from interactive_engine.engine import InteractiveEngine
+from interactive_engine.scene_bundle import SceneBundleReader, write_scene_bundle
+from interactive_engine.snapshots import create_snapshot, restore_snapshot
+
+def generate_pack(scene_count: int) -> dict:
+    """Generate a ring of rooms, each with a gem to take."""
+    scenes = {}
+    for i in range(scene_count):
+        scenes[f"room{i}"] = {
+            'text': f"Room {i}.",
+            'text_rules': [{'when': {'state': {'gem_taken': True}}, 'text': f"Room {i}, without a gem."}],
+            'actions': [
+                {'type': 'take', 'keyword': 'gem', 'text': "You take the gem.", 'set': {'gem_taken': True}, 'remove_self': True},
+                {'type': 'move', 'keyword': 'north', 'move': f"room{(i + 1) % scene_count}"},
+            ],
+        }
+    return {'scenes': scenes}
+
+class TestSceneBundle(unittest.TestCase):
+    """Unit tests for lazily loading scenes from scene bundles."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+        self.path = os.path.join(self.directory, "world.yaml")
+        with open(self.path, 'w', encoding='utf-8') as f:
+            yaml.safe_dump(generate_pack(50), f)
+
+    def test_scenes_load_on_demand(self):
+        """Test that only the scenes that are used are loaded."""
+        content = load_content_pack(self.path, lazy=True)
+        self.assertEqual(len(content.scenes), 50)
+        self.assertEqual(content.scenes.loads, 0)
+
+        engine = InteractiveEngine(content)
+        self.assertEqual(engine.start(), "Room 0.")
+        engine.run_many(["take gem", "go north", "go north"])
+
+        self.assertEqual(content.scenes.loads, 3)
+        self.assertTrue(content.scenes.is_loaded("room2"))
+        self.assertFalse(content.scenes.is_loaded("room3"))
+
+    def test_eviction_keeps_sessions_intact(self):
+        """Test that evicted scenes are rebuilt on demand and never affect sessions in progress."""
+        content = load_content_pack(self.path, lazy=True, max_scene_bytes=1)
+        engine = InteractiveEngine(content)
+        engine.start()
+        engine.run_many(["take gem"] + ["go north"] * 50)
+
+        self.assertFalse(content.scenes.is_loaded("room1"))
+        self.assertEqual(engine.current_scene.name, "room0")
+        self.assertEqual(engine.run("look scene"), "Room 0, without a gem.")
+        self.assertEqual(engine.run("go north"), "Room 1.")
+
+    def test_snapshot_across_eviction(self):
+        """Test that sessions on lazily loaded content can be saved and restored after eviction."""
+        content = load_content_pack(self.path, lazy=True, max_scene_bytes=1)
+        engine = InteractiveEngine(content)
+        engine.start()
+        engine.run_many(["take gem", "go north", "take gem", "go north"])
+        snapshot = create_snapshot(engine)
+
+        # Only the state changes and the removed actions are recorded, not the rebuilt template actions
+        self.assertLess(len(snapshot), 150)
+
+        restored = InteractiveEngine(load_content_pack(self.path, lazy=True))
+        restored.start()
+        restore_snapshot(restored, snapshot)
+        self.assertEqual(restored.current_scene.name, "room2")
+        self.assertEqual(restored.get_scene("room1").text, "Room 1, without a gem.")
+        self.assertEqual(restored.run("undo"), "There is nothing to undo.")
+
+    def test_eager_and_lazy_loads_match(self):
+        """Test that the same content is produced whether scenes are loaded eagerly or lazily."""
+        eager = load_content_pack(self.path)
+        lazy = load_content_pack(self.path, lazy=True)
+
+        self.assertEqual(sorted(eager.scenes), sorted(lazy.scenes))
+        self.assertEqual(eager.scenes["room7"].text, lazy.scenes["room7"].text)
+
+    def test_rejects_invalid_bundles(self):
+        """Test that files that aren't scene bundles raise errors."""
+        path = os.path.join(self.directory, "world.bundle")
+        write_scene_bundle(path, {'version': 1}, {'a': ('a',)})
+        reader = SceneBundleReader(path)
+        self.assertEqual(reader.read_scene('a'), ('a',))
+        reader.close()
+
+        with open(path, 'r+b') as f:
+            f.write(b'NOPE')
+        with self.assertRaises(ValueError):
+            SceneBundleReader(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
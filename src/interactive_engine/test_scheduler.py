@@ -0,0 +1,82 @@
+import unittest
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Scene
+from interactive_engine.engine import InteractiveEngine
+from interactive_engine.scheduler import TurnScheduler
+from interactive_engine.strings import SystemStrings
+
+def build_content() -> EngineContent:
+    """Build a single scene game with a bell that rings the guard back in after two turns."""
+    content = EngineContent()
+    hall = content.add_scene(Scene(name="Hall", text="A hall."))
+
+    def guard_returns(e) -> str:
+        e.current_scene.state['guard'] = True
+        return "The guard returns."
+
+    def on_ring_bell(e, a: Action, s: Scene, p) -> str:
+        e.schedule(2, guard_returns)
+        return "You ring the bell."
+
+    hall.add_action(ActionType.TOUCH, "bell", Action(on_action=on_ring_bell))
+    hall.add_action(ActionType.LISTEN, "hall", Action(on_action=lambda e,a,s,p: "It is quiet."))
+    return content
+
+class TestScheduler(unittest.TestCase):
+    """Unit tests for the turn counter, action budget and scheduled events."""
+
+    def test_events_happen_in_order(self):
+        """Test that due events happen in the order they are due and recurring events come back."""
+        scheduler = TurnScheduler()
+        scheduler.schedule(3, "third")
+        scheduler.schedule(1, "first")
+        tick = scheduler.schedule(2, "tick", interval=2)
+        scheduler.cancel(scheduler.schedule(1, "cancelled"))
+
+        self.assertEqual([event.callback for event in scheduler.pop_due(3)], ["first", "tick", "third"])
+        self.assertEqual(scheduler.next_due, 4)
+        self.assertEqual(len(scheduler), 1)
+
+        self.assertTrue(scheduler.cancel(tick))
+        self.assertFalse(scheduler.cancel(tick))
+        self.assertEqual(list(scheduler.pop_due(10)), [])
+
+    def test_scheduled_events_follow_turns(self):
+        """Test that events happen after the action text of the turn they are due in and can be undone."""
+        engine = InteractiveEngine(build_content())
+        engine.start()
+
+        self.assertEqual(engine.run("touch bell"), "You ring the bell.")
+        self.assertEqual(engine.run("help").split("\n")[0], "Available commands:")
+        self.assertEqual(engine.turn, 1)
+        self.assertEqual(engine.run("listen hall"), "It is quiet.\n\nThe guard returns.")
+        self.assertTrue(engine.current_scene.state['guard'])
+
+        engine.run("undo")
+        self.assertEqual(engine.turn, 1)
+        self.assertNotIn('guard', engine.current_scene.state)
+        self.assertEqual(engine.run("listen hall"), "It is quiet.\n\nThe guard returns.")
+
+        engine.run("undo")
+        engine.run("undo")
+        self.assertEqual(engine.turn, 0)
+        self.assertEqual(len(engine.scheduler), 0)
+
+    def test_action_budget(self):
+        """Test that only actions that take a turn count against the budget."""
+        engine = InteractiveEngine(build_content(), action_budget=1)
+        engine.start()
+
+        engine.run("touch bell")
+        self.assertEqual(engine.actions_remaining, 0)
+        self.assertEqual(engine.run("listen hall"), SystemStrings.OUT_OF_ACTIONS_TEXT)
+        self.assertEqual(engine.turn, 1)
+
+        engine.run("restart")
+        self.assertEqual((engine.actions_remaining, len(engine.scheduler)), (1, 0))
+        self.assertEqual(engine.run("listen hall"), "It is quiet.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import unittest
+
+from interactive_engine.content import EngineContent
+from interactive_engine.command_parser import ParseStatus
+from interactive_engine.data_classes import Action, ActionType, Item, Player, Scene
+from interactive_engine.engine import InteractiveEngine
+from interactive_engine.session_pool import SessionPool
+from interactive_engine.strings import SystemStrings
+
+def build_content() -> EngineContent:
+    """Build a small two scene game where taking a coin changes the scene."""
+    content = EngineContent(player_factory=lambda: Player(description="A test player."))
+    coin_item = content.add_item(Item(name="Coin", code="coin", description="A shiny coin."))
+
+    hall = content.add_scene(Scene(name="Hall", text="A hall with a coin.", start_text="You arrive."))
+    vault = content.add_scene(Scene(name="Vault", text="An empty vault."))
+
+    def on_take_coin(e, a: Action, s: Scene, p: Player) -> str:
+        p.add_inventory_items([coin_item])
+        s.state['coin_taken'] = True
+        s.text = "An empty hall."
+        s.remove_action(a)
+        return "You take the coin."
+
+    hall.add_action(ActionType.TAKE, "coin", Action(on_action=on_take_coin))
+    hall.add_action(ActionType.MOVE, "vault", Action(on_action=lambda e,a,s,p: e.set_current_scene(vault)))
+    return content
+
+class TestSessionPool(unittest.TestCase):
+    """Unit tests for hosting many sessions on shared content."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.content = build_content()
+        self.pool = SessionPool(self.content)
+
+    def test_open_session_starts_in_start_scene(self):
+        """Test that new sessions start in the content's start scene."""
+        session_id, session, start_text = self.pool.open_session()
+
+        self.assertIn(session_id, self.pool)
+        self.assertEqual(session.current_scene.name, "Hall")
+        self.assertIn("You arrive.", start_text)
+        self.assertEqual(session.player.description, "A test player.")
+
+    def test_sessions_do_not_share_state(self):
+        """Test that changes made in one session are invisible to the others."""
+        self.pool.open_session("a")
+        self.pool.open_session("b")
+
+        self.assertEqual(self.pool.run("a", "take coin"), "You take the coin.")
+
+        self.assertEqual(self.pool.run("a", "look scene"), "An empty hall.")
+        self.assertEqual(self.pool.run("b", "look scene"), "A hall with a coin.")
+        self.assertEqual(self.pool.run("b", "take coin"), "You take the coin.")
+        self.assertEqual(len(self.pool.get_session("a").player.inventory), 1)
+
+    def test_templates_are_never_modified(self):
+        """Test that playing a session leaves the content templates untouched."""
+        self.pool.open_session("a")
+        self.pool.run("a", "take coin")
+
+        hall = self.content.get_scene("Hall")
+        self.assertEqual(hall.text, "A hall with a coin.")
+        self.assertEqual(hall.state, {})
+        self.assertIn("coin", hall.actions[ActionType.TAKE])
+
+    def test_moving_to_a_template_uses_the_session_copy(self):
+        """Test that actions referencing a scene template move to the session's copy of it."""
+        session_id, session, _ = self.pool.open_session()
+        self.pool.run(session_id, "move vault")
+
+        self.assertIsNot(session.current_scene, self.content.get_scene("Vault"))
+        self.assertIs(session.current_scene, session.get_scene("Vault"))
+
+    def test_scenes_are_copied_lazily(self):
+        """Test that sessions only copy the scenes they actually visit."""
+        _, session, _ = self.pool.open_session()
+        self.assertEqual(set(session._scenes), {"Hall"})
+
+    def test_duplicate_session_id(self):
+        """Test that opening a session with an existing id raises an error."""
+        self.pool.open_session("a")
+        with self.assertRaises(ValueError):
+            self.pool.open_session("a")
+
+    def test_close_session(self):
+        """Test that closed sessions are removed from the pool."""
+        self.pool.open_session("a")
+        self.pool.close_session("a")
+
+        self.assertNotIn("a", self.pool)
+        self.assertEqual(self.pool.run("a", "look scene"), SystemStrings.MISSING_SESSION_TEXT)
+
+    def test_system_action_changes_reach_every_session(self):
+        """Test that replacing a system action through one session updates the others."""
+        _, session_a, _ = self.pool.open_session("a")
+        self.pool.open_session("b")
+        self.pool.run("b", "help")
+
+        session_a.set_system_action(Action(ActionType.HELP, lambda e,a,s,p: "Custom help."))
+        self.assertEqual(self.pool.run("b", "help"), "Custom help.")
+
+    def test_engines_are_not_singletons(self):
+        """Test that every InteractiveEngine is an independent session."""
+        self.assertIsNot(InteractiveEngine(), InteractiveEngine())
+
+class TestRunMany(unittest.TestCase):
+    """Unit tests for batch command execution and bulk replay."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.content = build_content()
+        self.pool = SessionPool(self.content)
+
+    def test_run_many_matches_run(self):
+        """Test that run_many produces the same text as running each command on its own."""
+        commands = ["look scene", "take coin", "take coin", "dance", "inv", "move vault", "look scene"]
+
+        _, single, _ = self.pool.open_session()
+        expected = [single.run(command) for command in commands]
+
+        _, batch, _ = self.pool.open_session()
+        results = batch.run_many(commands)
+
+        self.assertEqual([result.text for result in results], expected)
+
+    def test_run_many_statuses(self):
+        """Test that each turn reports its status and action type."""
+        _, session, _ = self.pool.open_session()
+        results = session.run_many(["take coin", "take coin", "dance"])
+
+        self.assertEqual(results[0].status, ParseStatus.OK)
+        self.assertEqual(results[0].action_type, ActionType.TAKE)
+        self.assertEqual(results[1].status, ParseStatus.NO_ACTIONS_OF_TYPE)
+        self.assertEqual(results[2].status, ParseStatus.UNKNOWN_ACTION)
+
+    def test_run_many_without_output(self):
+        """Test that no text is kept when output is not requested, but the turns still run."""
+        _, session, _ = self.pool.open_session()
+        results = session.run_many(["take coin", "dance"], output=False)
+
+        self.assertEqual([result.text for result in results], [None, None])
+        self.assertEqual(len(session.player.inventory), 1)
+
+    def test_replay(self):
+        """Test that every script is replayed in its own fresh session."""
+        results = self.pool.replay([["take coin", "take coin"], ["take coin"]])
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual([result.status for result in results[0]], [ParseStatus.OK, ParseStatus.NO_ACTIONS_OF_TYPE])
+        self.assertEqual([result.status for result in results[1]], [ParseStatus.OK])
+        self.assertEqual(len(self.pool), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+import os
+import tempfile
+import unittest
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Item, Player, Scene, SceneText, TextRule
+from interactive_engine.engine import InteractiveEngine
+from interactive_engine.snapshots import SnapshotStore, create_snapshot, restore_snapshot
+from interactive_engine.strings import SystemStrings
+
+def build_content() -> EngineContent:
+    """Build a small two scene game where taking a coin changes the scene and reveals a chest."""
+    content = EngineContent(player_factory=lambda: Player(description="A test player."))
+    coin_item = content.add_item(Item(name="Coin", code="coin", description="A shiny coin."))
+    open_chest_action = content.register_action("chest", Action(on_action=lambda e,a,s,p: "It is locked."))
+
+    hall = content.add_scene(Scene(name="Hall", text="A hall with a coin."))
+    vault = content.add_scene(Scene(name="Vault", text="An empty vault."))
+
+    def on_take_coin(e, a: Action, s: Scene, p: Player) -> str:
+        p.add_inventory_items([coin_item])
+        s.state['coin_taken'] = True
+        s.text = "An empty hall with a chest."
+        s.remove_action(a)
+        s.add_action(ActionType.USE, "chest", open_chest_action)
+        return "You take the coin."
+
+    hall.add_action(ActionType.TAKE, "coin", Action(on_action=on_take_coin))
+    hall.add_action(ActionType.MOVE, "vault", Action(on_action=lambda e,a,s,p: e.set_current_scene(vault)))
+    vault.add_action(ActionType.MOVE, "hall", Action(on_action=lambda e,a,s,p: e.set_current_scene(hall)))
+    return content
+
+class TestSnapshots(unittest.TestCase):
+    """Unit tests for saving and restoring sessions."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.content = build_content()
+        self.engine = InteractiveEngine(self.content)
+        self.engine.start()
+
+    def test_round_trip(self):
+        """Test that restoring a snapshot brings back the scene, state, actions and inventory."""
+        self.engine.run_many(["take coin", "move vault"])
+        snapshot = create_snapshot(self.engine)
+
+        restored = InteractiveEngine(self.content)
+        restored.start()
+        restore_snapshot(restored, snapshot)
+
+        self.assertEqual(restored.current_scene.name, "Vault")
+        self.assertEqual([item.code for item in restored.player.inventory], ["coin"])
+        self.assertEqual(restored.run("move hall"), "An empty hall with a chest.")
+        self.assertEqual(restored.current_scene.state, {'coin_taken': True})
+        self.assertEqual(restored.run("use chest"), "It is locked.")
+        self.assertIn("(No actions of type: take)", restored.run("take coin"))
+
+    def test_round_trip_item_stacks(self):
+        """Test that item stacks are saved as a code and a quantity and restored in order."""
+        gem_item = self.content.add_item(Item(name="Gem", code="gem", description="A gem."))
+        self.engine.player.add_inventory_items([self.content.items["coin"]], 1000)
+        self.engine.player.add_inventory_items([gem_item])
+        snapshot = create_snapshot(self.engine)
+        self.assertLess(len(snapshot), 64)
+
+        restore_snapshot(self.engine, snapshot)
+        self.assertEqual(
+            [(item.code, quantity) for item, quantity in self.engine.player.inventory.stacks()],
+            [("coin", 1000), ("gem", 1)]
+        )
+
+    def test_scene_text_rules(self):
+        """Test that text rendered from state follows undo and restored snapshots without being saved."""
+        cellar = self.content.add_scene(Scene(name="Cellar", text=SceneText(
+            "A cellar.", [TextRule({'lit': True}, "A lamp burns."), TextRule({}, "It is dark.")]
+        )))
+        cellar.add_action(ActionType.USE, "lamp", Action(on_action=lambda e,a,s,p: s.state.update(lit=True) or "Lit."))
+        self.engine.set_current_scene(self.engine.get_scene("Cellar"))
+
+        self.engine.run("use lamp")
+        self.assertEqual(self.engine.run("look scene"), "A cellar. A lamp burns.")
+        snapshot = create_snapshot(self.engine)
+
+        self.engine.run("undo")
+        self.assertEqual(self.engine.run("look scene"), "A cellar. It is dark.")
+
+        restore_snapshot(self.engine, snapshot)
+        self.assertEqual(self.engine.run("look scene"), "A cellar. A lamp burns.")
+
+    def test_unchanged_scenes_are_not_recorded(self):
+        """Test that a fresh session produces a tiny snapshot."""
+        self.assertLess(len(create_snapshot(self.engine)), 40)
+
+    def test_save_and_load_actions(self):
+        """Test the save, load, continue and restart system actions."""
+        self.assertEqual(self.engine.run("load"), SystemStrings.NO_SAVE_TEXT)
+        self.engine.run("take coin")
+        self.assertEqual(self.engine.run("save"), SystemStrings.SAVE_TEXT)
+
+        self.engine.run("restart")
+        self.assertEqual(self.engine.run("look scene"), "A hall with a coin.")
+        self.assertEqual(len(self.engine.player.inventory), 0)
+
+        self.assertIn(SystemStrings.LOAD_TEXT, self.engine.run("continue"))
+        self.assertEqual(self.engine.run("look scene"), "An empty hall with a chest.")
+        self.assertEqual(len(self.engine.player.inventory), 1)
+
+    def test_turn_and_scheduled_events(self):
+        """Test that the turn counter and scheduled events are restored, so loading gives back spent actions."""
+        def coin_tarnishes(e) -> str:
+            return "The coin tarnishes."
+        self.content.register_timer("tarnish", coin_tarnishes)
+        self.engine.action_budget = 3
+
+        self.engine.run("take coin")
+        self.engine.schedule(2, coin_tarnishes)
+        self.engine.run("save")
+        self.engine.run_many(["move vault", "move hall"])
+        self.assertEqual(self.engine.run("move vault"), SystemStrings.OUT_OF_ACTIONS_TEXT)
+
+        self.engine.run("load")
+        self.assertEqual(self.engine.turn, 1)
+        self.assertEqual(self.engine.run("move vault"), "An empty vault.")
+        self.assertEqual(self.engine.run("move hall"), "An empty hall with a chest.\n\nThe coin tarnishes.")
+
+        self.engine.schedule(1, lambda e: None)
+        with self.assertRaises(ValueError):
+            create_snapshot(self.engine)
+
+    def test_failing_system_actions_return_text(self):
+        """Test that saves, loads and restarts that aren't possible are reported instead of raising."""
+        self.engine.snapshot_store.save("quicksave", b'XXXX')
+        self.assertEqual(self.engine.run("load"), SystemStrings.LOAD_FAILED_TEXT)
+
+        self.engine.set_current_scene(Scene(name="Dream", text="A dream."))
+        self.assertEqual(self.engine.run("save"), SystemStrings.SAVE_FAILED_TEXT)
+
+        self.content.start_scene_name = None
+        self.assertEqual(self.engine.run("restart"), SystemStrings.RESTART_FAILED_TEXT)
+        self.assertEqual(self.engine.current_scene.name, "Dream")
+
+    def test_rejects_invalid_snapshots(self):
+        """Test that truncated, foreign, corrupted or mismatched snapshots raise errors."""
+        snapshot = create_snapshot(self.engine)
+
+        for data in (b'', b'XXXX' + snapshot[4:], snapshot[:-4] + b'\x00\x00\x00\x00'):
+            with self.assertRaises(ValueError):
+                restore_snapshot(self.engine, data)
+
+        other_content = build_content()
+        other_content.add_scene(Scene(name="Attic", text="A dusty attic."))
+        other = InteractiveEngine(other_content)
+        other.start()
+        with self.assertRaises(ValueError):
+            restore_snapshot(other, snapshot)
+
+    def test_unregistered_actions_cannot_be_saved(self):
+        """Test that actions unknown to the content raise an error instead of being lost."""
+        self.engine.current_scene.add_action(ActionType.LOOK, "rug", Action(on_action=lambda e,a,s,p: "A rug."))
+        with self.assertRaises(ValueError):
+            create_snapshot(self.engine)
+
+    def test_file_store(self):
+        """Test that snapshots saved to a directory can be loaded by a new store."""
+        with tempfile.TemporaryDirectory() as directory:
+            store = SnapshotStore(directory)
+            store.save("slot1", b'one')
+            store.save("slot2", b'two')
+            os.utime(os.path.join(directory, "slot1.sav"), (0, 0))
+
+            new_store = SnapshotStore(directory)
+            self.assertEqual(new_store.load("slot1"), b'one')
+            self.assertIsNone(new_store.load("missing"))
+            self.assertEqual(new_store.latest(), "slot2")
+            self.assertEqual(os.listdir(directory).count("slot1.sav.tmp"), 0)
+
+            with self.assertRaises(ValueError):
+                store.save("../escape", b'')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Item, Player, Scene, item_guard, state_guard
+from interactive_engine.engine import InteractiveEngine
+from interactive_engine.snapshots import create_snapshot, state_digest
+from interactive_engine.solver import SceneGoal, solve
+
+LEVERS = 4
+
+def build_lever_content() -> EngineContent:
+    """Build a game with levers that must all be pulled down to open the door to the exit."""
+    content = EngineContent()
+    hall = content.add_scene(Scene(name="Hall", text="A hall with levers."))
+    exit_scene = content.add_scene(Scene(name="Exit", text="You are out."))
+
+    def toggle(key: str):
+        def on_toggle(e, a: Action, s: Scene, p: Player) -> str:
+            if s.state.pop(key, False) is False:
+                s.state[key] = True
+            return "Clunk."
+        return on_toggle
+
+    for lever in range(LEVERS):
+        hall.add_action(ActionType.TOUCH, f"lever {lever}", Action(on_action=toggle(f"lever_{lever}")))
+    hall.add_action(ActionType.MOVE, "door", Action(
+        on_action=lambda e,a,s,p: e.set_current_scene(exit_scene),
+        guards=[state_guard(f"lever_{lever}") for lever in range(LEVERS)]
+    ))
+    return content
+
+def build_well_content(bucket: bool = False) -> EngineContent:
+    """Build a game that can't be won once the only key is dropped down the well, optionally with a bucket to play with."""
+    content = EngineContent()
+    key = content.add_item(Item(name="Key", code="key", description="A key."))
+    yard = content.add_scene(Scene(name="Yard", text="A yard with a well and a gate."))
+    content.add_scene(Scene(name="Road", text="The road home."))
+
+    def on_take_key(e, a: Action, s: Scene, p: Player) -> str:
+        p.add_inventory_items([key])
+        s.remove_action(a)
+        return "You take the key."
+
+    def on_drop_key(e, a: Action, s: Scene, p: Player) -> str:
+        p.remove_inventory_items([key])
+        return "Splash."
+
+    yard.add_action(ActionType.TAKE, "key", Action(on_action=on_take_key))
+    yard.add_action(ActionType.USE, "key on well", Action(on_action=on_drop_key, guards=[item_guard(key)]))
+    yard.add_action(ActionType.MOVE, "gate", Action(
+        on_action=lambda e,a,s,p: e.set_current_scene("Road"),
+        guards=[item_guard(key)]
+    ))
+    if bucket:
+        def on_touch_bucket(e, a: Action, s: Scene, p: Player) -> str:
+            if s.state.pop('bucket_down', False) is False:
+                s.state['bucket_down'] = True
+            return "Creak."
+        yard.add_action(ActionType.TOUCH, "bucket", Action(on_action=on_touch_bucket))
+    return content
+
+def build_well_content_with_bucket() -> EngineContent:
+    """Build the well game with a bucket, which can still be moved once the game can't be won."""
+    return build_well_content(bucket=True)
+
+class TestSolver(unittest.TestCase):
+    """Unit tests for the state space solver."""
+
+    def test_state_digest_is_canonical(self):
+        """Test that the order changes were made in doesn't change the digest of a state."""
+        content = build_lever_content()
+        digests = []
+        for commands in (["touch lever 0", "touch lever 1"], ["touch lever 1", "touch lever 0"]):
+            engine = InteractiveEngine(content)
+            engine.start()
+            engine.run_many(commands, output=False)
+            digests.append(state_digest(create_snapshot(engine)))
+        self.assertEqual(digests[0], digests[1])
+
+    def test_solves_every_state(self):
+        """Test that every lever combination is explored and the shortest solution is found."""
+        result = solve(build_lever_content, SceneGoal("Exit"))
+        self.assertEqual(result.states, 2 ** LEVERS + 1)
+        self.assertTrue(result.complete)
+        self.assertEqual(result.solution, tuple(f"touch lever {lever}" for lever in range(LEVERS)) + ("move door",))
+        self.assertEqual(result.dead_ends, ())
+
+    def test_worker_processes(self):
+        """Test that exploring in worker processes finds the same states."""
+        result = solve(build_lever_content, SceneGoal("Exit"), workers=2, chunk_size=2)
+        self.assertEqual((result.states, len(result.solution)), (2 ** LEVERS + 1, LEVERS + 1))
+
+    def test_dead_ends_and_limits(self):
+        """Test that dead ends are reported and the search can be limited."""
+        result = solve(build_well_content, SceneGoal("Road"))
+        self.assertEqual(result.solution, ("take key", "move gate"))
+        self.assertEqual(result.dead_ends, (("take key", "use key on well"),))
+
+        result = solve(build_well_content_with_bucket, SceneGoal("Road"), max_dead_ends=1)
+        self.assertEqual(result.dead_ends, (("take key", "use key on well"),))
+        result = solve(build_well_content_with_bucket, SceneGoal("Road"))
+        self.assertEqual(len(result.dead_ends), 2)
+
+        result = solve(build_lever_content, SceneGoal("Exit"), max_states=3)
+        self.assertEqual((result.states, result.complete, result.dead_ends), (3, False, ()))
+
+
+if __name__ == '__main__':
+    unittest.main()
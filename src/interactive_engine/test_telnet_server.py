@@ -0,0 +1,99 @@
+import asyncio
+import socket
+import unittest
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Scene
+from interactive_engine.session_pool import SessionPool
+from interactive_engine.strings import SystemStrings
+from interactive_engine.telnet_server import DO, IAC, NAWS, SB, SE, WILL, TelnetDecoder, TelnetServer
+
+def build_content() -> EngineContent:
+    """Build a room with a counter and a very long book"""
+    content = EngineContent()
+    room = content.add_scene(Scene(name="Room", text="A room."), start=True)
+
+    def on_touch(e, a, s, p):
+        s.state['count'] = s.state.get('count', 0) + 1
+        return f"Count: {s.state['count']}"
+
+    room.add_action(ActionType.TOUCH, "counter", Action(on_action=on_touch))
+    room.add_action(ActionType.LOOK, "book", Action(on_action=lambda e,a,s,p: "word " * 100_000))
+    room.add_action(ActionType.TOUCH, "wire", Action(on_action=lambda e,a,s,p: 1 / 0))
+    return content
+
+class TestTelnetServer(unittest.IsolatedAsyncioTestCase):
+    """Unit tests for the telnet server."""
+
+    def test_decoder(self):
+        """Test that telnet commands are stripped, window sizes kept and line endings and backspaces applied."""
+        decoder = TelnetDecoder(max_line_length=8)
+        naws = bytes((IAC, WILL, NAWS, IAC, SB, NAWS, 0, 100, 0, 30, IAC, SE))
+        lines = decoder.feed(naws + b"look\r\nta")
+        lines += decoder.feed(b"kx\x08e hat\r\0inv\rx\ny\xff\xff\n" + b"a" * 20 + b"\n")
+        self.assertEqual(lines, ["look", "take hat", "inv", "x", "y�", "a" * 8])
+        self.assertEqual(decoder.width, 100)
+
+    async def test_concurrent_sessions(self):
+        """Test that every connection plays its own session, and that exiting closes it."""
+        pool = SessionPool(build_content())
+        server = await TelnetServer(pool, port=0, welcome_text="Welcome!").start()
+        try:
+            host, port = server.address
+
+            async def play(touches: int) -> bytes:
+                reader, writer = await asyncio.open_connection(host, port)
+                writer.write(b"touch counter\r\n" * touches + b"exit\r\n")
+                output = await reader.read()
+                writer.close()
+                return output
+
+            outputs = await asyncio.gather(*(play(touches) for touches in range(1, 51)))
+            for touches, output in enumerate(outputs, 1):
+                self.assertTrue(output.startswith(bytes((IAC, DO, NAWS)) + b"Welcome!\r\n"))
+                self.assertIn(f"Count: {touches}\r\n".encode(), output)
+                self.assertNotIn(f"Count: {touches + 1}\r\n".encode(), output)
+            self.assertEqual(len(pool), 0)
+            self.assertEqual(server.connection_count, 0)
+        finally:
+            await server.close()
+
+    async def test_action_errors_keep_the_connection(self):
+        """Test that an action that raises fails its turn, and the session keeps playing."""
+        pool = SessionPool(build_content())
+        server = await TelnetServer(pool, port=0).start()
+        try:
+            reported = []
+            asyncio.get_running_loop().set_exception_handler(lambda loop, context: reported.append(context['exception']))
+            reader, writer = await asyncio.open_connection(*server.address)
+            writer.write(b"touch counter\r\ntouch wire\r\ntouch counter\r\nexit\r\n")
+            output = await reader.read()
+            writer.close()
+            self.assertIn(f"{SystemStrings.ACTION_ERROR_TEXT}\r\n".encode(), output)
+            self.assertIn(b"Count: 2\r\n", output)
+            self.assertIsInstance(reported[0], ZeroDivisionError)
+        finally:
+            await server.close()
+
+    async def test_slow_client_is_disconnected(self):
+        """Test that a client that doesn't read its output is disconnected instead of buffering it all."""
+        pool = SessionPool(build_content())
+        server = await TelnetServer(pool, port=0, output_buffer_limit=1024, drain_timeout=0.2).start()
+        try:
+            client = socket.socket()
+            client.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+            client.connect(server.address)
+            client.sendall(b"look book\r\n" * 50)
+            for _ in range(100):
+                if server.slow_client_disconnects:
+                    break
+                await asyncio.sleep(0.1)
+            self.assertEqual(server.slow_client_disconnects, 1)
+            self.assertEqual(len(pool), 0)
+            client.close()
+        finally:
+            await server.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
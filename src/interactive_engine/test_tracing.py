@@ -0,0 +1,92 @@
+import io
+import json
+import threading
+import unittest
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Item, Scene, state_guard
+from interactive_engine.engine import InteractiveEngine
+from interactive_engine.tracing import TraceWriter, TurnTracer
+
+def build_content() -> EngineContent:
+    """Build a room with a coin to take, a locked chest and a door to a hall"""
+    content = EngineContent()
+    coin = content.add_item(Item(name="Coin", code="coin", description="A coin."))
+    room = content.add_scene(Scene(name="Room", text="A room."))
+    content.add_scene(Scene(name="Hall", text="A hall."))
+
+    def on_take(e, a, s, p):
+        p.add_inventory_items([coin])
+        s.state['coin_taken'] = True
+        return "Taken."
+
+    room.add_action(ActionType.TAKE, "coin", Action(on_action=on_take))
+    room.add_action(ActionType.TOUCH, "chest", Action(guards=[state_guard("unlocked")]))
+    room.add_action(ActionType.MOVE, "door", Action(on_action=lambda e,a,s,p: e.set_current_scene("Hall")))
+    return content
+
+class BlockingStream(io.StringIO):
+    """A stream that blocks writes until it is released, like a stalled disk"""
+    def __init__(self):
+        super().__init__()
+        self.released = threading.Event()
+
+    def write(self, text: str) -> int:
+        self.released.wait()
+        return super().write(text)
+
+class BrokenStream(io.StringIO):
+    """A stream on a full disk"""
+    def write(self, text: str) -> int:
+        raise OSError("No space left on device")
+
+class TestTracing(unittest.TestCase):
+    """Unit tests for JSON lines turn tracing."""
+
+    def test_turn_records(self):
+        """Test that turns, refusals and unresolved commands are traced with their changes."""
+        stream = io.StringIO()
+        writer = TraceWriter(stream)
+        engine = InteractiveEngine(build_content())
+        engine.start()
+        TurnTracer(engine, writer, "session-1")
+        engine.run_many(["take coin", "touch chest", "dance", "move door"], output=False)
+        writer.close()
+
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual([record['input'] for record in records], ["take coin", "touch chest", "dance", "move door"])
+        self.assertTrue(all(record['session'] == "session-1" for record in records))
+
+        take, touch, dance, move = records
+        self.assertEqual((take['action'], take['keyword'], take['scene']), ("take", "coin", "Room"))
+        self.assertEqual(take['items'], {"coin": 1})
+        self.assertEqual(take['state'], [["Room", "coin_taken", None, True]])
+        self.assertEqual(take['output_length'], len("Taken."))
+        self.assertTrue(touch['refused'])
+        self.assertIsNone(dance['action'])
+        self.assertEqual(move['to_scene'], "Hall")
+        self.assertEqual(writer.written, 4)
+
+    def test_full_queue_drops_records(self):
+        """Test that records are dropped and counted instead of waiting for a stalled disk."""
+        stream = BlockingStream()
+        writer = TraceWriter(stream, max_queue=2, batch_size=1, flush_interval=0)
+        results = [writer.write({'n': n}) for n in range(20)]
+        self.assertIn(False, results)
+        self.assertEqual(writer.dropped, results.count(False))
+
+        stream.released.set()
+        writer.close()
+        self.assertEqual(writer.written, results.count(True))
+        self.assertFalse(writer.write({'n': 20}))
+
+    def test_write_errors_are_counted(self):
+        """Test that a failing disk doesn't stop the writer."""
+        writer = TraceWriter(BrokenStream())
+        writer.write({'n': 1})
+        writer.close()
+        self.assertEqual((writer.written, writer.failed), (0, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
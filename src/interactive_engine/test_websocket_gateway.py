@@ -0,0 +1,101 @@
+import asyncio
+import json
+import unittest
+
+from websockets.asyncio.client import connect
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Scene
+from interactive_engine.session_pool import SessionPool
+from interactive_engine.websocket_gateway import WebSocketGateway
+
+def build_content() -> EngineContent:
+    """Build a room with a counter"""
+    content = EngineContent()
+    room = content.add_scene(Scene(name="Room", text="A room."), start=True)
+
+    def on_touch(e, a, s, p):
+        s.state['count'] = s.state.get('count', 0) + 1
+        return f"Count: \033[1m{s.state['count']}\033[0m"
+
+    room.add_action(ActionType.TOUCH, "counter", Action(on_action=on_touch))
+    room.add_action(ActionType.TOUCH, "wire", Action(on_action=lambda e,a,s,p: 1 / 0))
+    return content
+
+async def request(connection, message: dict) -> dict:
+    """Sends a message and receives the reply"""
+    await connection.send(json.dumps(message))
+    return json.loads(await connection.recv())
+
+class TestWebSocketGateway(unittest.IsolatedAsyncioTestCase):
+    """Unit tests for the WebSocket gateway."""
+
+    async def asyncSetUp(self):
+        self.pool = SessionPool(build_content())
+        self.gateway = await WebSocketGateway(self.pool, port=0, resume_timeout=0.2).start()
+        host, port = self.gateway.address
+        self.url = f"ws://{host}:{port}"
+
+    async def asyncTearDown(self):
+        await self.gateway.close()
+
+    async def test_sessions_are_multiplexed(self):
+        """Test that one connection plays several independent sessions with structured output."""
+        async with connect(self.url) as connection:
+            first = await request(connection, {'type': 'open', 'seq': 1})
+            second = await request(connection, {'type': 'open', 'seq': 2})
+            self.assertEqual((first['type'], first['seq'], first['text']), ('opened', 1, "A room."))
+            self.assertNotEqual(first['session'], second['session'])
+
+            await request(connection, {'type': 'run', 'session': first['session'], 'command': "touch counter"})
+            output = await request(connection, {'type': 'run', 'session': first['session'], 'command': "touch counter"})
+            self.assertEqual((output['text'], output['spans']), ("Count: 2", [[7, 8, ['bold']]]))
+            output = await request(connection, {'type': 'run', 'session': second['session'], 'command': "touch counter"})
+            self.assertEqual(output['text'], "Count: 1")
+
+            await request(connection, {'type': 'run', 'session': second['session'], 'command': "exit"})
+            self.assertEqual(json.loads(await connection.recv()), {'type': 'closed', 'session': second['session']})
+            self.assertEqual(len(self.pool), 1)
+
+    async def test_errors(self):
+        """Test that bad messages and other connections' sessions are refused."""
+        async with connect(self.url) as connection, connect(self.url) as other:
+            opened = await request(connection, {'type': 'open'})
+            self.assertEqual(await request(connection, {'type': 'dance'}), {'type': 'error', 'error': 'bad_message'})
+            await connection.send("not json")
+            self.assertEqual(json.loads(await connection.recv())['error'], 'bad_message')
+            stolen = await request(other, {'type': 'run', 'session': opened['session'], 'command': "touch counter"})
+            self.assertEqual(stolen['error'], 'unknown_session')
+
+            # An action that raises fails its request, and the connection and session keep working
+            reported = []
+            asyncio.get_running_loop().set_exception_handler(lambda loop, context: reported.append(context['exception']))
+            broken = await request(connection, {'type': 'run', 'session': opened['session'], 'command': "touch wire", 'seq': 3})
+            self.assertEqual(broken, {'type': 'error', 'error': 'internal', 'seq': 3})
+            self.assertIsInstance(reported[0], ZeroDivisionError)
+            output = await request(connection, {'type': 'run', 'session': opened['session'], 'command': "touch counter"})
+            self.assertEqual(output['text'], "Count: 1")
+
+    async def test_resume(self):
+        """Test that a session can be resumed with its token after reconnecting, until the resume timeout."""
+        async with connect(self.url) as connection:
+            opened = await request(connection, {'type': 'open'})
+            await request(connection, {'type': 'run', 'session': opened['session'], 'command': "touch counter"})
+
+        async with connect(self.url) as connection:
+            wrong = await request(connection, {'type': 'resume', 'session': opened['session'], 'token': "guess"})
+            self.assertEqual(wrong['error'], 'unknown_session')
+            resumed = await request(connection, {'type': 'resume', 'session': opened['session'], 'token': opened['token']})
+            self.assertEqual((resumed['type'], resumed['text']), ('resumed', "Count: 1"))
+            output = await request(connection, {'type': 'run', 'session': opened['session'], 'command': "touch counter"})
+            self.assertEqual(output['text'], "Count: 2")
+
+        for _ in range(50):
+            if not self.gateway.session_count:
+                break
+            await asyncio.sleep(0.05)
+        self.assertEqual((self.gateway.session_count, len(self.pool)), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+
+from interactive_engine.content import EngineContent
+from interactive_engine.data_classes import Action, ActionType, Item, Player, Scene
+from interactive_engine.engine import InteractiveEngine
+from interactive_engine.events import EventType
+from interactive_engine.session_pool import SessionPool
+from interactive_engine.strings import SystemStrings
+
+def build_content() -> EngineContent:
+    """Build a small two scene game with a counter that every push increments."""
+    content = EngineContent()
+    coin_item = content.add_item(Item(name="Coin", code="coin", description="A shiny coin."))
+
+    hall = content.add_scene(Scene(name="Hall", text="A hall with a coin."))
+    vault = content.add_scene(Scene(name="Vault", text="An empty vault."))
+
+    def on_take_coin(e, a: Action, s: Scene, p: Player) -> str:
+        p.add_inventory_items([coin_item])
+        s.state['coin_taken'] = True
+        s.text = "An empty hall."
+        s.remove_action(a)
+        return "You take the coin."
+
+    def on_push_button(e, a: Action, s: Scene, p: Player) -> str:
+        s.state['pushes'] = s.state.get('pushes', 0) + 1
+        return f"Pushed {s.state['pushes']} times."
+
+    hall.add_action(ActionType.TAKE, "coin", Action(on_action=on_take_coin))
+    hall.add_action(ActionType.TOUCH, "button", Action(on_action=on_push_button))
+    hall.add_action(ActionType.MOVE, "vault", Action(on_action=lambda e,a,s,p: e.set_current_scene(vault)))
+    vault.add_action(ActionType.MOVE, "hall", Action(on_action=lambda e,a,s,p: e.set_current_scene(hall)))
+    return content
+
+class TestWorldHistory(unittest.TestCase):
+    """Unit tests for undoing turns, restarting and forking sessions."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.content = build_content()
+        self.engine = InteractiveEngine(self.content)
+        self.engine.start()
+
+    def test_undo_reverts_scene_and_player(self):
+        """Test that undo reverts text, state, actions, inventory and the current scene."""
+        self.engine.run_many(["take coin", "move vault"])
+
+        self.engine.run("undo")
+        self.assertEqual(self.engine.current_scene.name, "Hall")
+        self.assertEqual(len(self.engine.player.inventory), 1)
+
+        self.engine.run("undo")
+        self.assertEqual(self.engine.run("look scene"), "A hall with a coin.")
+        self.assertEqual(self.engine.current_scene.state, {})
+        self.assertEqual(len(self.engine.player.inventory), 0)
+        self.assertEqual(self.engine.run("take coin"), "You take the coin.")
+
+    def test_turns_without_changes_are_not_recorded(self):
+        """Test that looking around or failed commands leave nothing to undo."""
+        self.engine.run_many(["look scene", "dance", "inventory"])
+        self.assertEqual(self.engine.run("undo"), SystemStrings.NOTHING_TO_UNDO_TEXT)
+
+    def test_undo_is_limited(self):
+        """Test that only the most recent turns are kept."""
+        engine = InteractiveEngine(self.content, max_undo=3)
+        engine.start()
+        engine.run_many(["touch button"] * 10)
+
+        for _ in range(5):
+            engine.run("undo")
+        self.assertEqual(engine.current_scene.state['pushes'], 7)
+        self.assertEqual(len(engine.history), 0)
+
+    def test_restart_can_be_undone(self):
+        """Test that restart resets the world and that undo brings it back."""
+        self.engine.run_many(["take coin", "move vault", "restart"])
+        self.assertEqual(self.engine.current_scene.name, "Hall")
+        self.assertEqual(self.engine.run("look scene"), "A hall with a coin.")
+
+        self.engine.run("undo")
+        self.assertEqual(self.engine.current_scene.name, "Vault")
+        self.assertEqual(len(self.engine.player.inventory), 1)
+
+    def test_fork_is_independent(self):
+        """Test that a fork and its parent no longer affect each other."""
+        self.engine.run("touch button")
+        branch = self.engine.fork()
+
+        self.assertEqual(branch.run("touch button"), "Pushed 2 times.")
+        self.assertEqual(branch.run("take coin"), "You take the coin.")
+        self.assertEqual(self.engine.run("touch button"), "Pushed 2 times.")
+        self.assertEqual(self.engine.run("look scene"), "A hall with a coin.")
+        self.assertEqual(len(self.engine.player.inventory), 0)
+
+        # Both keep the shared part of the history
+        branch.run_many(["undo", "undo", "undo"])
+        self.assertEqual(branch.current_scene.state, {})
+        self.assertEqual(self.engine.current_scene.state['pushes'], 2)
+
+    def test_fork_session(self):
+        """Test that the session pool can branch sessions, setting the branches up as their own sessions."""
+        turns = [] # type: list[tuple[InteractiveEngine, str]]
+        def setup(session: InteractiveEngine) -> None:
+            session.events.subscribe(EventType.TURN_END, lambda event: turns.append((session, event.command)))
+
+        pool = SessionPool(self.content, setup=setup)
+        _, session, _ = pool.open_session("a")
+        pool.run("a", "take coin")
+
+        branch_id, branch = pool.fork_session("a")
+        self.assertEqual(pool.run(branch_id, "look scene"), "An empty hall.")
+        pool.run(branch_id, "undo")
+        self.assertEqual(pool.run(branch_id, "look scene"), "A hall with a coin.")
+        pool.run(branch_id, "move vault")
+        self.assertEqual(pool.run("a", "look scene"), "An empty hall.")
+
+        # The branch's turns are only reported to its own listeners
+        self.assertEqual(turns, [
+            (session, "take coin"),
+            (branch, "look scene"),
+            (branch, "undo"),
+            (branch, "look scene"),
+            (branch, "move vault"),
+            (session, "look scene"),
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
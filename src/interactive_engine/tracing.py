@@ -0,0 +1,224 @@
+import json
+import queue
+import threading
+import time
+from typing import Optional, TextIO
+
+from interactive_engine.events import ActionFailedEvent, EventType, ItemEvent, SceneEvent, StateEvent, TurnEvent
+from utils.observable_dict import MISSING
+
+class TraceWriter:
+    """
+    Appends records to a JSON lines file from a background thread. Records are queued without blocking and
+    written in batches, so tracing adds no I/O latency to the thread that produces the records. When the
+    queue is full, e.g. because the disk is slow, new records are dropped and counted instead of waiting.
+    """
+    def __init__(
+            self,
+            target: str|TextIO,
+            max_queue: int = 10_000,
+            batch_size: int = 256,
+            flush_interval: float = 0.5
+        ):
+        self._stream = open(target, 'a', encoding='utf-8') if isinstance(target, str) else target # type: TextIO
+        """The stream the records are written to, the target itself unless the target is a path to append to"""
+
+        self._owns_stream = isinstance(target, str)
+        """Whether the stream was opened by the writer and must be closed by it"""
+
+        self._queue = queue.Queue(max_queue) # type: queue.Queue[Optional[dict]]
+        """The records waiting to be written, None to stop the writer thread"""
+
+        self.batch_size = batch_size
+        """The maximum number of records written at once"""
+
+        self.flush_interval = flush_interval
+        """The maximum number of seconds a record waits before it is flushed"""
+
+        self.written = 0
+        """The number of records written. Only updated by the writer thread."""
+
+        self.dropped = 0
+        """The number of records dropped because the queue was full. Only updated by the producing thread."""
+
+        self.failed = 0
+        """The number of records that couldn't be written, e.g. because the disk is full"""
+
+        self._closed = False
+        """Whether close was called"""
+
+        self._thread = threading.Thread(target=self._write_loop, name="TraceWriter", daemon=True)
+        """The writer thread"""
+        self._thread.start()
+
+    def write(self, record: dict) -> bool:
+        """
+        Queues a record to be written. Never blocks. The record must not be changed afterwards, and values
+        that aren't JSON serializable are written as their repr.
+
+        Args:
+            record (dict): The record
+
+        Returns:
+            queued (bool): False if the record was dropped because the queue is full or the writer is closed
+        """
+        if self._closed:
+            self.dropped += 1
+            return False
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Writes the queued records and stops the writer thread
+
+        Args:
+            timeout (Optional[float]): The maximum number of seconds to wait for the queued records
+        """
+        if self._closed:
+            return
+        self._closed = True
+        # The stop marker must get in even when the queue is full, so wait for room
+        start = time.monotonic()
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(None if timeout is None else max(0, timeout - (time.monotonic() - start)))
+        if self._owns_stream and not self._thread.is_alive():
+            self._stream.close()
+
+    def _write_loop(self) -> None:
+        """Writes batches of records until stopped"""
+        stopping = False
+        while not stopping:
+            record = self._queue.get()
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while record is not None:
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    record = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            stopping = record is None
+            if batch:
+                self._write_batch(batch)
+
+    def _write_batch(self, batch: list[dict]) -> None:
+        """Writes and flushes a batch of records, counting them as failed if that isn't possible"""
+        try:
+            lines = ''.join(json.dumps(record, ensure_ascii=False, default=repr) + '\n' for record in batch)
+            self._stream.write(lines)
+            self._stream.flush()
+            self.written += len(batch)
+        except (OSError, ValueError, TypeError):
+            self.failed += len(batch)
+
+class TurnTracer:
+    """
+    Traces every turn of a session to a TraceWriter as a record with the session id, the scene, the raw
+    input, the resolved action, the scene, item and state changes, the output length and how long the turn
+    took. Commands that can't be resolved to an action are traced as well. Subscribes to the session's
+    event bus, so it only sees turns that report events, and the record is built in the session's thread
+    while serializing and writing it happen in the writer's thread.
+    """
+    def __init__(self, engine, writer: TraceWriter, session_id: str):
+        self.engine = engine
+        """The traced session"""
+
+        self.writer = writer
+        """Where the records are written"""
+
+        self.session_id = session_id
+        """The id of the session, written with every record"""
+
+        self._record = None # type: Optional[dict]
+        """The record of the turn in progress"""
+
+        self._start = 0.0
+        """When the turn in progress started"""
+
+        self._listeners = (
+            (EventType.TURN_START, self._on_turn_start),
+            (EventType.SCENE_ENTER, self._on_scene_enter),
+            (EventType.ITEM_ADDED, self._on_item_added),
+            (EventType.ITEM_REMOVED, self._on_item_removed),
+            (EventType.STATE_CHANGED, self._on_state_changed),
+            (EventType.ACTION_FAILED, self._on_action_failed),
+            (EventType.TURN_END, self._on_turn_end),
+        )
+        """The listeners subscribed to the session's event bus"""
+
+        for event_type, listener in self._listeners:
+            engine.events.subscribe(event_type, listener)
+
+    def detach(self) -> None:
+        """Stops tracing the session. The writer is left open."""
+        for event_type, listener in self._listeners:
+            self.engine.events.unsubscribe(event_type, listener)
+
+    def _on_turn_start(self, event: TurnEvent) -> None:
+        self._start = time.perf_counter()
+        self._record = {
+            'ts': time.time(),
+            'session': self.session_id,
+            'turn': self.engine.turn,
+            'scene': self.engine.current_scene.name,
+            'input': event.command,
+        }
+
+    def _on_scene_enter(self, event: SceneEvent) -> None:
+        if self._record is not None:
+            self._record['to_scene'] = event.scene.name
+
+    def _on_item_added(self, event: ItemEvent) -> None:
+        if self._record is not None:
+            self._record.setdefault('items', {})[event.item.code] = event.quantity
+
+    def _on_item_removed(self, event: ItemEvent) -> None:
+        if self._record is not None:
+            self._record.setdefault('items', {})[event.item.code] = -event.quantity
+
+    def _on_state_changed(self, event: StateEvent) -> None:
+        if self._record is not None:
+            self._record.setdefault('state', []).append([
+                event.scene.name,
+                event.key,
+                None if event.old is MISSING else event.old,
+                None if event.new is MISSING else event.new,
+            ])
+
+    def _on_action_failed(self, event: ActionFailedEvent) -> None:
+        if event.action is not None:
+            # Refused actions still end their turn
+            if self._record is not None:
+                self._record['refused'] = True
+            return
+        self.writer.write({
+            'ts': time.time(),
+            'session': self.session_id,
+            'turn': self.engine.turn,
+            'scene': self.engine.current_scene.name if self.engine.current_scene else None,
+            'input': event.command,
+            'action': None,
+            'output_length': len(event.text) if event.text is not None else None,
+        })
+
+    def _on_turn_end(self, event: TurnEvent) -> None:
+        record = self._record
+        if record is None:
+            return
+        self._record = None
+        record['action'] = event.action.action_type.value
+        if event.keyword is not None:
+            record['keyword'] = event.keyword
+        record['output_length'] = len(event.text) if event.text is not None else 0
+        record['ms'] = round((time.perf_counter() - self._start) * 1000, 3)
+        self.writer.write(record)
@@ -1,13 +1,14 @@
+from interactive_engine.action_index import ActionIndex
 from interactive_engine.data_classes import Action, ActionType
 from interactive_engine.strings import SystemStrings
 
-def get_action(in_text: str, action_dict: dict) -> Action:
+def get_action(in_text: str, action_dict: dict|ActionIndex) -> Action:
     """
     Utility function to get an Action from an input string and action dictionary.
 
     Args:
         in_text (str): The input text to match against action keywords
-        action_dict (dict): The dictionary of actions to search
+        action_dict (dict|ActionIndex): The dictionary of actions to search, or a compiled ActionIndex
     Returns:
         action (Action): The matched Action, will throw an error if no action is found
     """
@@ -21,6 +22,17 @@ def get_action(in_text: str, action_dict: dict) -> Action:
     if (not action_type):
         raise ValueError(SystemStrings.MISSING_ACTION_TEXT + f" (Unknown action: {action_str})")
 
+    # Compiled indexes resolve the type and target with a single probe
+    if isinstance(action_dict, ActionIndex):
+        if not action_dict.has_type(action_type):
+            raise ValueError(SystemStrings.MISSING_ACTION_TEXT + f" (No actions of type: {action_type.value})")
+
+        action = action_dict.get(action_type, target_str.lower())
+        if not action:
+            raise ValueError(SystemStrings.MISSING_ACTION_TEXT + f" (No action found for target: {target_str})")
+
+        return action
+
     # Get the action dictionary for the action type, or any direct action of that type (if there is no target)
     action_or_dict = action_dict.get(action_type)
     if (not action_or_dict):
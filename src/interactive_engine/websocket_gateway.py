@@ -0,0 +1,304 @@
+import asyncio
+import json
+import secrets
+import time
+from typing import Optional
+
+from websockets.asyncio.server import Server, ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+from console.style_spans import to_style_spans
+from interactive_engine.events import EventType
+from interactive_engine.metrics import EngineMetrics
+from interactive_engine.session_pool import SessionPool
+
+class _TableEntry:
+    """A session in the gateway's session table"""
+    __slots__ = ('session_id', 'token', 'connection', 'detached_at', 'last_output', 'exited')
+
+    def __init__(self, session_id: str, token: str):
+        self.session_id = session_id
+        """The id of the session in the pool"""
+
+        self.token = token
+        """The secret a client must present to resume the session"""
+
+        self.connection = None # type: Optional[ServerConnection]
+        """The connection the session is attached to, None while detached"""
+
+        self.detached_at = 0.0
+        """When the session was detached from its last connection"""
+
+        self.last_output = {} # type: dict
+        """The text and spans of the session's last output, sent again when it is resumed"""
+
+        self.exited = False
+        """Whether the session ran an EXIT action"""
+
+class WebSocketGateway:
+    """
+    Serves the sessions of a SessionPool to browser clients over WebSocket, from one asyncio event loop.
+    Messages are JSON objects with a type, and a seq that is echoed in the reply when given:
+
+    - {"type": "open"} opens a session and replies {"type": "opened", "session", "token", "text", "spans"}
+    - {"type": "run", "session", "command"} runs a turn and replies {"type": "output", "session", "text", "spans"},
+      followed by {"type": "closed", "session"} when the command exits the game
+    - {"type": "resume", "session", "token"} attaches a session to the connection and replies
+      {"type": "resumed", "session", "text", "spans"} with the session's last output
+    - {"type": "close", "session"} closes a session and replies {"type": "closed", "session"}
+    - Anything else replies {"type": "error", "error"}, with the error one of bad_message, unknown_session
+      and too_many_sessions, or internal when handling the message raised, which is reported to the event
+      loop's exception handler. The connection and its sessions are kept.
+
+    Output is plain text with the spans of it that are styled, see to_style_spans, so the client renders
+    it instead of an ANSI screen. A connection may hold several sessions, e.g. one per browser tab, and
+    its messages are handled one at a time. When a connection drops, its sessions stay in the session
+    table for resume_timeout seconds so the client can reconnect and resume them with their tokens.
+    """
+    def __init__(
+            self,
+            pool: SessionPool,
+            host: str = '127.0.0.1',
+            port: int = 8765,
+            welcome_text: Optional[str] = None,
+            resume_timeout: float = 300.0,
+            max_sessions_per_connection: int = 8,
+            max_message_size: int = 4096,
+            turn_timeout: Optional[float] = 5.0,
+            metrics: Optional[EngineMetrics] = None
+        ):
+        if resume_timeout < 0:
+            raise ValueError(f"The resume timeout can't be negative: {resume_timeout}")
+
+        self.pool = pool
+        """The pool the sessions are opened in"""
+
+        self.host = host
+        """The interface to listen on"""
+
+        self.port = port
+        """The port to listen on, 0 to let the system pick one"""
+
+        self.welcome_text = welcome_text
+        """Shown before the start scene of every new session"""
+
+        self.resume_timeout = resume_timeout
+        """The number of seconds a session outlives its connection, waiting to be resumed"""
+
+        self.max_sessions_per_connection = max_sessions_per_connection
+        """The maximum number of sessions a connection may hold at once"""
+
+        self.max_message_size = max_message_size
+        """The maximum number of bytes of a client message, larger ones close the connection"""
+
+        self.turn_timeout = turn_timeout
+        """The maximum number of seconds a turn may take"""
+
+        self.metrics = metrics
+        """Where render durations are reported. Sessions are attached through the pool's setup."""
+
+        self._table = {} # type: dict[str, _TableEntry]
+        """The session table: every session of the gateway, attached or waiting to be resumed, by id"""
+
+        self._attached = {} # type: dict[ServerConnection, set[str]]
+        """The ids of the sessions attached to every open connection"""
+
+        self._server = None # type: Optional[Server]
+        """The listening server, while started"""
+
+        self._reaper = None # type: Optional[asyncio.Task]
+        """The task that closes sessions that weren't resumed in time"""
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """The host and port the gateway listens on, with the port the system picked if 0 was given"""
+        if self._server is None:
+            raise ValueError("The gateway isn't started")
+        return next(iter(self._server.sockets)).getsockname()[:2]
+
+    @property
+    def connection_count(self) -> int:
+        """The number of open connections"""
+        return len(self._attached)
+
+    @property
+    def session_count(self) -> int:
+        """The number of sessions in the session table, including detached ones"""
+        return len(self._table)
+
+    async def start(self) -> 'WebSocketGateway':
+        """
+        Starts listening
+
+        Returns:
+            gateway (WebSocketGateway): This gateway
+        """
+        # Messages are short, and a compression context per connection would cost more memory than it saves
+        self._server = await serve(
+            self._serve_connection, self.host, self.port, compression=None, max_size=self.max_message_size
+        )
+        self._reaper = asyncio.create_task(self._reap_detached())
+        return self
+
+    async def serve_forever(self) -> None:
+        """Starts listening if it hasn't yet, and serves until cancelled"""
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Stops listening, disconnects every client and closes every session"""
+        if self._server is None:
+            return
+        server, self._server = self._server, None
+        if self._reaper is not None:
+            self._reaper.cancel()
+        server.close()
+        await server.wait_closed()
+        for session_id in list(self._table):
+            self._close_session(session_id)
+
+    async def _serve_connection(self, connection: ServerConnection) -> None:
+        """Serves one connection from connect to disconnect"""
+        attached = self._attached[connection] = set() # type: set[str]
+        try:
+            async for message in connection:
+                for reply in await self._handle(connection, attached, message):
+                    await connection.send(json.dumps(reply, ensure_ascii=False))
+        except ConnectionClosed:
+            pass
+        finally:
+            del self._attached[connection]
+            detached_at = time.monotonic()
+            for session_id in attached:
+                entry = self._table.get(session_id)
+                if entry is not None and entry.connection is connection:
+                    entry.connection = None
+                    entry.detached_at = detached_at
+
+    async def _handle(self, connection: ServerConnection, attached: set[str], message: str|bytes) -> list[dict]:
+        """
+        Handles a client message
+
+        Args:
+            connection (ServerConnection): The connection the message came from
+            attached (set[str]): The ids of the sessions attached to the connection
+            message (str|bytes): The message
+
+        Returns:
+            replies (list[dict]): The messages to send back, in order
+        """
+        try:
+            request = json.loads(message)
+        except ValueError:
+            request = None
+        if not isinstance(request, dict):
+            return [{'type': 'error', 'error': 'bad_message'}]
+
+        request_type = request.get('type')
+        session_id = request.get('session')
+        try:
+            if request_type == 'open':
+                replies = self._open(connection, attached)
+            elif request_type == 'resume':
+                replies = self._resume(connection, attached, session_id, request.get('token'))
+            elif request_type not in ('run', 'close'):
+                replies = [{'type': 'error', 'error': 'bad_message'}]
+            elif not isinstance(session_id, str) or session_id not in attached:
+                replies = [{'type': 'error', 'error': 'unknown_session'}]
+            elif request_type == 'close':
+                attached.discard(session_id)
+                self._close_session(session_id)
+                replies = [{'type': 'closed', 'session': session_id}]
+            elif isinstance(request.get('command'), str):
+                replies = await self._run(attached, session_id, request['command'])
+            else:
+                replies = [{'type': 'error', 'error': 'bad_message'}]
+        except Exception as e:
+            # A broken action fails its own request, not the connection and the other sessions on it
+            asyncio.get_running_loop().call_exception_handler({
+                'message': f"Error handling a {request_type} message", 'exception': e,
+            })
+            replies = [{'type': 'error', 'error': 'internal'}]
+
+        if 'seq' in request:
+            for reply in replies:
+                reply['seq'] = request['seq']
+        return replies
+
+    def _open(self, connection: ServerConnection, attached: set[str]) -> list[dict]:
+        """Opens a session and attaches it to the connection"""
+        if len(attached) >= self.max_sessions_per_connection:
+            return [{'type': 'error', 'error': 'too_many_sessions'}]
+
+        session_id, session, start_text = self.pool.open_session()
+        entry = _TableEntry(session_id, secrets.token_urlsafe(16))
+        def on_exit(event) -> None:
+            entry.exited = True
+        session.events.subscribe(EventType.EXIT, on_exit)
+        self._table[session_id] = entry
+        self._attach(entry, connection, attached)
+
+        text = start_text if self.welcome_text is None else f"{self.welcome_text}\n\n{start_text}"
+        entry.last_output = self._render(text)
+        return [{'type': 'opened', 'session': session_id, 'token': entry.token, **entry.last_output}]
+
+    def _resume(self, connection: ServerConnection, attached: set[str], session_id, token) -> list[dict]:
+        """Attaches a session from the session table to the connection, if the token matches"""
+        entry = self._table.get(session_id) if isinstance(session_id, str) else None
+        # Unknown sessions and wrong tokens get the same answer, so session ids can't be probed
+        if entry is None or not isinstance(token, str) or not secrets.compare_digest(entry.token, token):
+            return [{'type': 'error', 'error': 'unknown_session'}]
+        if session_id not in attached and len(attached) >= self.max_sessions_per_connection:
+            return [{'type': 'error', 'error': 'too_many_sessions'}]
+
+        self._attach(entry, connection, attached)
+        return [{'type': 'resumed', 'session': session_id, **entry.last_output}]
+
+    async def _run(self, attached: set[str], session_id: str, command: str) -> list[dict]:
+        """Runs a turn of a session"""
+        entry = self._table[session_id]
+        text = await self.pool.run_async(session_id, command, self.turn_timeout)
+        entry.last_output = self._render(text)
+        replies = [{'type': 'output', 'session': session_id, **entry.last_output}]
+        if entry.exited:
+            attached.discard(session_id)
+            self._close_session(session_id)
+            replies.append({'type': 'closed', 'session': session_id})
+        return replies
+
+    def _attach(self, entry: _TableEntry, connection: ServerConnection, attached: set[str]) -> None:
+        """Attaches a session to a connection, taking it from the connection it was attached to"""
+        if entry.connection is not None and entry.connection is not connection:
+            # The client reconnected before the old connection was noticed to be gone
+            self._attached.get(entry.connection, set()).discard(entry.session_id)
+        entry.connection = connection
+        attached.add(entry.session_id)
+
+    def _close_session(self, session_id: str) -> None:
+        """Removes a session from the session table and closes it"""
+        self._table.pop(session_id, None)
+        self.pool.close_session(session_id)
+
+    def _render(self, text: str) -> dict:
+        """Splits output into text and style spans, timing it if there are metrics"""
+        if self.metrics is None:
+            plain, spans = to_style_spans(text)
+        else:
+            with self.metrics.render_seconds.time():
+                plain, spans = to_style_spans(text)
+        return {'text': plain, 'spans': spans}
+
+    async def _reap_detached(self) -> None:
+        """Closes the sessions that weren't resumed within the resume timeout, checking a few times per timeout"""
+        interval = min(max(self.resume_timeout / 4, 0.05), 30.0)
+        while True:
+            await asyncio.sleep(interval)
+            expired = time.monotonic() - self.resume_timeout
+            for session_id, entry in list(self._table.items()):
+                if entry.connection is None and entry.detached_at <= expired:
+                    self._close_session(session_id)
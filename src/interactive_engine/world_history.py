@@ -0,0 +1,125 @@
+from collections import deque, namedtuple
+from typing import Optional
+
+WorldChange = namedtuple('WorldChange', ['target', 'kind', 'key', 'old'])
+"""
+A single recorded change to the world. The target is the name of a session scene, the Scene object itself
+for scenes that are not part of the content, None for the player, WORLD_TARGET when the whole world
+was replaced, or CLOCK_TARGET for the scheduled events. The old value is what the change overwrote.
+"""
+
+TurnRecord = namedtuple('TurnRecord', ['scene_name', 'changes', 'turn'])
+"""
+The changes made during a single turn, along with the name of the scene the turn started in and the value
+of the turn counter before it
+"""
+
+WORLD_TARGET = '*world*'
+"""Change target used when a session's whole world is replaced, e.g. on load or restart"""
+
+CLOCK_TARGET = '*clock*'
+"""Change target used for changes to a session's scheduled events"""
+
+class WorldHistory:
+    """
+    Records the changes each turn makes to a session's world so they can be undone. Only the changes are
+    kept, never copies of the world, and at most max_turns turns are remembered, so memory use stays flat
+    no matter how long a session runs or how often it undoes.
+    """
+    def __init__(self, max_turns: int = 100):
+        self.max_turns = max_turns
+        """How many turns can be undone"""
+
+        self._turns = deque(maxlen=max_turns) # type: deque[TurnRecord]
+        """The recorded turns, oldest first"""
+
+        self._scene_name = None # type: Optional[str]
+        """The scene the turn being recorded started in"""
+
+        self._turn = 0
+        """The turn counter before the turn being recorded"""
+
+        self._changes = None # type: Optional[list[WorldChange]]
+        """The changes of the turn being recorded, or None if no turn is being recorded"""
+
+    @property
+    def recording(self) -> bool:
+        """
+        Checks if a turn is being recorded
+
+        Returns:
+            recording (bool): True between begin_turn and end_turn
+        """
+        return self._changes is not None
+
+    def begin_turn(self, scene_name: Optional[str], turn: int = 0) -> None:
+        """
+        Starts recording a turn
+
+        Args:
+            scene_name (Optional[str]): The name of the scene the turn starts in
+            turn (int): The turn counter before the turn
+        """
+        if self.max_turns > 0:
+            self._scene_name = scene_name
+            self._turn = turn
+            self._changes = []
+
+    def record(self, target, kind: str, key, old) -> None:
+        """
+        Records a change made during the current turn. Does nothing when no turn is being recorded.
+
+        Args:
+            target (object): What changed, see WorldChange
+            kind (str): The kind of change
+            key (object): What changed within that kind
+            old (object): The value before the change
+        """
+        if self._changes is not None:
+            self._changes.append(WorldChange(target, kind, key, old))
+
+    def end_turn(self, scene_name: Optional[str]) -> None:
+        """
+        Stops recording the current turn. Turns that changed nothing are not remembered.
+
+        Args:
+            scene_name (Optional[str]): The name of the scene the turn ended in
+        """
+        if self._changes is None:
+            return
+
+        if self._changes or scene_name != self._scene_name:
+            self._turns.append(TurnRecord(self._scene_name, tuple(self._changes), self._turn))
+        self._changes = None
+
+    def cancel_turn(self) -> None:
+        """Stops recording the current turn without remembering it"""
+        self._changes = None
+
+    def pop(self) -> Optional[TurnRecord]:
+        """
+        Removes the most recent turn
+
+        Returns:
+            turn (Optional[TurnRecord]): The turn, or None if there is nothing to undo
+        """
+        return self._turns.pop() if self._turns else None
+
+    def clear(self) -> None:
+        """Forgets every recorded turn"""
+        self._turns.clear()
+        self._changes = None
+
+    def copy(self) -> 'WorldHistory':
+        """
+        Creates a copy of the history. Turn records are immutable, so they are shared.
+
+        Returns:
+            history (WorldHistory): The copy
+        """
+        history = WorldHistory(self.max_turns)
+        history._turns.extend(self._turns)
+        return history
+
+    def __len__(self) -> int:
+        return len(self._turns)
@@ -0,0 +1,150 @@
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+
+def osa_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Computes the optimal string alignment distance between two strings: the number of insertions,
+    deletions, substitutions and transpositions of adjacent characters needed to turn one into the other.
+    Gives up early once the distance is known to be larger than max_distance.
+
+    Args:
+        a (str): The first string
+        b (str): The second string
+        max_distance (int): The largest distance of interest
+
+    Returns:
+        distance (int): The distance, or max_distance + 1 if it is larger than max_distance
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous_previous = None # type: Optional[list[int]]
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (
+                previous_previous is not None and j > 1
+                and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]
+            ):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+
+        if row_min > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+
+    return min(previous[len(b)], max_distance + 1)
+
+def _deletes(term: str, max_distance: int) -> list[set[str]]:
+    """Gets the strings that can be made by deleting characters from a term, grouped by how many were deleted"""
+    levels = [{term}]
+    for _ in range(max_distance):
+        levels.append({word[:i] + word[i + 1:] for word in levels[-1] for i in range(len(word))})
+    return levels
+
+class FuzzyIndex:
+    """
+    Typo tolerant index of short string keys such as words, using a deletion dictionary (as in SymSpell):
+    every key is stored under each string that can be made by deleting up to max_distance of its
+    characters. A lookup only needs to generate the deletions of the query, so its cost barely depends on
+    how many keys the index holds. Candidates are verified with the optimal string alignment distance, and
+    lookups are memoized. Keys should be short, the number of deletions grows quickly with their length.
+    """
+    def __init__(self, items: Iterable[tuple[str, Any]] = (), max_distance: int = 2, cache_size: int = 256):
+        self.max_distance = max_distance
+        """The largest edit distance lookups can match"""
+
+        self.cache_size = cache_size
+        """The maximum number of memoized lookups"""
+
+        self._values = {} # type: dict[str, Any]
+        """The value of each key"""
+
+        self._deletes = [{} for _ in range(max_distance + 1)] # type: list[dict[str, list[str]]]
+        """Keys stored under each of their deletions, for each number of deleted characters"""
+
+        self._cache = OrderedDict() # type: OrderedDict[tuple[str, int], tuple[tuple[int, str, Any], ...]]
+        """Memoized lookups, least recently used first"""
+
+        for key, value in items:
+            self.insert(key, value)
+
+    def insert(self, key: str, value: Any) -> None:
+        """
+        Inserts a key into the index, replacing the value if the key already exists
+
+        Args:
+            key (str): The key to insert
+            value (Any): The value to store for the key
+        """
+        if key not in self._values:
+            seen = set() # type: set[str]
+            for deletes, level in zip(self._deletes, _deletes(key, self.max_distance)):
+                for delete in level - seen:
+                    deletes.setdefault(delete, []).append(key)
+                seen |= level
+        self._values[key] = value
+        self._cache.clear()
+
+    def lookup(self, term: str, max_distance: Optional[int] = None) -> tuple[tuple[int, str, Any], ...]:
+        """
+        Finds the keys closest to a term
+
+        Args:
+            term (str): The term to look up
+            max_distance (Optional[int]): The largest edit distance to match, at most the index's
+                max_distance. Defaults to the index's max_distance.
+
+        Returns:
+            matches (tuple[tuple[int, str, Any], ...]): The distance, key and value of every key at the
+                smallest distance found, sorted by key. Empty if there is no key within max_distance.
+        """
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        cache_key = (term, max_distance)
+        matches = self._cache.get(cache_key)
+        if matches is not None:
+            self._cache.move_to_end(cache_key)
+            return matches
+
+        best = max_distance + 1
+        closest = [] # type: list[str]
+        checked = set() # type: set[str]
+        key_deletes = self._deletes[:max_distance + 1]
+        for term_deleted, level in enumerate(_deletes(term, max_distance)):
+            # Every key within a distance is found by deleting at most that many characters from the term,
+            # so once the closest keys are closer than the deletions, every tie has been found as well
+            if term_deleted > best:
+                break
+
+            for delete in level:
+                for deletes in key_deletes:
+                    for key in deletes.get(delete, ()):
+                        if key in checked:
+                            continue
+                        checked.add(key)
+
+                        distance = osa_distance(term, key, best)
+                        if distance < best:
+                            best = distance
+                            closest = [key]
+                        elif distance == best and distance <= max_distance:
+                            closest.append(key)
+
+        matches = tuple((best, key, self._values[key]) for key in sorted(closest))
+        self._cache[cache_key] = matches
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return matches
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
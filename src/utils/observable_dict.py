@@ -0,0 +1,80 @@
+from typing import Any, Callable, Optional
+
+class _Missing:
+    """Sentinel type for keys that are not set"""
+    def __repr__(self):
+        return 'MISSING'
+
+MISSING = _Missing()
+"""Sentinel passed as the previous value when a key was not set before a change"""
+
+change_listener_def = Callable[[Any, Any], None]
+"""
+Type alias for the callable signature used to observe changes to an ObservableDict.
+
+Args:
+    Any: The key that is about to change
+    Any: The value of the key before the change, or MISSING if it was not set
+"""
+
+class ObservableDict(dict):
+    """
+    A dictionary that reports every change to a listener before it is made, e.g. so the change can be
+    undone later. Reading is exactly as fast as a regular dictionary.
+    """
+    __slots__ = ('on_change',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_change = None # type: Optional[change_listener_def]
+
+    def __setitem__(self, key, value):
+        if self.on_change is not None:
+            self.on_change(key, self.get(key, MISSING))
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        if self.on_change is not None and key in self:
+            self.on_change(key, self[key])
+        super().__delitem__(key)
+
+    def pop(self, key, *default):
+        if self.on_change is not None and key in self:
+            self.on_change(key, self[key])
+        return super().pop(key, *default)
+
+    def popitem(self):
+        key, value = super().popitem()
+        if self.on_change is not None:
+            self.on_change(key, value)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        for key in list(self):
+            del self[key]
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __reduce__(self):
+        # Copies and pickles never carry the listener along
+        return (ObservableDict, (dict(self),))
+
+    def copy(self) -> 'ObservableDict':
+        """
+        Creates a shallow copy without the listener
+
+        Returns:
+            copy (ObservableDict): The copy
+        """
+        return ObservableDict(self)
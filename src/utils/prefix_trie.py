@@ -0,0 +1,119 @@
+from typing import Any, Iterable, Iterator, Optional
+
+class TrieNode:
+    """A single node in a PrefixTrie."""
+    __slots__ = ('children', 'key', 'value', 'count')
+
+    def __init__(self):
+        self.children = {} # type: dict[str, TrieNode]
+        """Child nodes, keyed by the next character"""
+
+        self.key = None # type: Optional[str]
+        """The full key that ends at this node, or None if no key ends here"""
+
+        self.value = None # type: Any
+        """The value stored for the key that ends at this node"""
+
+        self.count = 0
+        """The number of keys that end at or below this node"""
+
+class PrefixTrie:
+    """
+    Character trie mapping string keys to values. Every node tracks how many keys live below it, so
+    checking whether a prefix is unambiguous costs the same no matter how many keys the trie holds.
+    """
+    def __init__(self, items: Iterable[tuple[str, Any]] = ()):
+        self.root = TrieNode()
+        """The root node of the trie, which represents the empty prefix"""
+
+        for key, value in items:
+            self.insert(key, value)
+
+    def insert(self, key: str, value: Any) -> None:
+        """
+        Inserts a key into the trie, replacing the value if the key already exists
+
+        Args:
+            key (str): The key to insert
+            value (Any): The value to store for the key
+        """
+        # Walk the path first so counts are only updated for brand new keys
+        path = [self.root]
+        node = self.root
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = TrieNode()
+            node = child
+            path.append(node)
+
+        if node.key is None:
+            for path_node in path:
+                path_node.count += 1
+
+        node.key = key
+        node.value = value
+
+    def find(self, prefix: str) -> Optional[TrieNode]:
+        """
+        Finds the node for a prefix
+
+        Args:
+            prefix (str): The prefix to find
+
+        Returns:
+            node (Optional[TrieNode]): The node at the end of the prefix, or None if no key starts with it
+        """
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def complete(self, node: TrieNode) -> Optional[TrieNode]:
+        """
+        Gets the node of the only key below a node
+
+        Args:
+            node (TrieNode): The node to complete from
+
+        Returns:
+            node (Optional[TrieNode]): The node holding the only key at or below the given node, or None
+                if there are zero or multiple keys
+        """
+        if node.count != 1:
+            return None
+
+        while node.key is None:
+            node = next(iter(node.children.values()))
+        return node
+
+    def items(self, node: Optional[TrieNode] = None, limit: Optional[int] = None) -> Iterator[tuple[str, Any]]:
+        """
+        Iterates over the keys and values at or below a node, in insertion order of each branch
+
+        Args:
+            node (Optional[TrieNode]): The node to start from, defaults to the root
+            limit (Optional[int]): The maximum number of items to yield
+
+        Returns:
+            items (Iterator[tuple[str, Any]]): The keys and values below the node
+        """
+        stack = [node or self.root]
+        yielded = 0
+        while stack:
+            current = stack.pop()
+            if current.key is not None:
+                yield current.key, current.value
+                yielded += 1
+                if limit is not None and yielded >= limit:
+                    return
+            stack.extend(reversed(list(current.children.values())))
+
+    def __contains__(self, key: str) -> bool:
+        node = self.find(key)
+        return node is not None and node.key is not None
+
+    def __len__(self) -> int:
+        return self.root.count
@@ -50,8 +50,6 @@ class ActionStrings:
         )
 
     class UseCellDoorKeyOnDoor:
-        CODE = "key door"
-
         TEXT = (
             "You insert the rusty key into the cell door's lock and turn it. "
             "With a satisfying click, the door unlocks and creaks open, revealing a strange mist beyond - "
@@ -136,12 +134,6 @@ class SceneStrings:
             "You have woken up in stranger predicaments, so you aren't actually that worried. At least nothing is exploding. Yet."
         )
 
-        INITIAL_TEXT = f"{Snippets.BASE_DESCRIPTION} {Snippets.KEY_NOT_TAKEN} {Snippets.HAT_NOT_TAKEN}"
-        HAT_TAKEN_TEXT = f"{Snippets.BASE_DESCRIPTION} {Snippets.KEY_NOT_TAKEN} {Snippets.HAT_TAKEN}"
-        KEY_TAKEN_TEXT = f"{Snippets.BASE_DESCRIPTION} {Snippets.KEY_TAKEN} {Snippets.HAT_NOT_TAKEN}"
-        KEY_HAT_TAKEN_TEXT = f"{Snippets.BASE_DESCRIPTION} {Snippets.KEY_TAKEN} {Snippets.HAT_TAKEN}"
-        DOOR_OPEN_TEXT = f"{Snippets.BASE_DESCRIPTION} {Snippets.DOOR_OPEN} {Snippets.KEY_TAKEN} {Snippets.HAT_NOT_TAKEN}"
-        DOOR_OPEN_HAT_TAKEN_TEXT = f"{Snippets.BASE_DESCRIPTION} {Snippets.DOOR_OPEN} {Snippets.KEY_TAKEN} {Snippets.HAT_TAKEN}"
 
     class MistyExpanse:
         NAME = "Misty Expanse"
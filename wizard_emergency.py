@@ -1,12 +1,21 @@
 import sys
 import time
+import uuid
+from contextlib import nullcontext
 from typing import Optional
 
 from console.console_manager import ConsoleManager
 from console.console_styles import BrightColors
 
+from interactive_engine.content import EngineContent
 from interactive_engine.engine import InteractiveEngine
-from interactive_engine.data_classes import ActionType, Action, Item, Player, Scene
+from interactive_engine.events import EventType
+from interactive_engine.data_classes import (
+    ActionType, Action, Item, Player, Scene, SceneText, TextRule, item_guard, state_guard
+)
+from interactive_engine.grammar import pair_keyword
+from interactive_engine.instrumentation import TurnProfiler
+from interactive_engine.tracing import TraceWriter, TurnTracer
 from utils.get_version import get_version
 
 # Import all the strings
@@ -14,11 +23,20 @@ from wizard_emergency_utils.strings import GameStrings, StateKeys
 from wizard_emergency_utils.strings import ActionStrings, ItemStrings, PlayerStrings, SceneStrings
 
 # Global references to the core libraries
-engine = InteractiveEngine()
+engine: Optional[InteractiveEngine] = None
 console: Optional[ConsoleManager] = None
 
-# Temporary. TODO: Add a proper action limit system that integrates with the engine itself
-actions_remaining: str|int = "∞"
+# How many actions the player may take, None for no limit
+ACTION_BUDGET: Optional[int] = None
+
+# Where to write a profile of the turns and console redraws when the game exits, None to not profile
+PROFILE_PATH: Optional[str] = None
+
+# The JSON lines file every turn is traced to, None to not trace
+TRACE_PATH: Optional[str] = None
+
+# The writer of the turn traces, while tracing
+trace_writer: Optional[TraceWriter] = None
 
 def graceful_exit(pause_time_seconds: float = 1) -> None:
     """
@@ -30,32 +48,46 @@ def graceful_exit(pause_time_seconds: float = 1) -> None:
     global console
     if console:
         console.write(GameStrings.EXIT_TEXT)
+    if engine is not None and engine.profiler is not None and PROFILE_PATH is not None:
+        engine.profiler.export_json(PROFILE_PATH)
+    if trace_writer is not None:
+        trace_writer.close(timeout=pause_time_seconds + 1)
 
     time.sleep(pause_time_seconds)
     sys.exit(0)
 
-def start_game(console: ConsoleManager) -> None:
-    console.write(GameStrings.WELCOME_TEXT)
-    console.draw_dinkus()
-
-    #* Update default system hooks
-    # Custom exit action text
-    engine._system_actions[ActionType.EXIT].on_action=lambda e,a,s,p: GameStrings.EXIT_TEXT
-
-    engine.on_exit(graceful_exit)
+def build_content() -> EngineContent:
+    """
+    Build the shared Wizard Emergency content. Every game session plays through its own copy of these
+    scenes, so actions must only modify the scene, player and engine they are given.
 
+    Returns:
+        content (EngineContent): The game content
+    """
     #* Define the player
-    engine.player = Player(
-        name=PlayerStrings.NAME,
-        description=PlayerStrings.DESCRIPTION
+    content = EngineContent(
+        player_factory=lambda: Player(
+            name=PlayerStrings.NAME,
+            description=PlayerStrings.DESCRIPTION
+        )
     )
 
+    #* Update default system hooks
+    # Custom exit action text
+    content.system_actions[ActionType.EXIT].on_action=lambda e,a,s,p: GameStrings.EXIT_TEXT
+
     #* Define the scenes
-    # The dusty cell (the starting scene)
+    # The dusty cell (the starting scene). Its description follows from what has been taken and opened.
+    snippets = SceneStrings.DustyCell.Snippets
     dusty_cell = Scene(
         name=SceneStrings.DustyCell.NAME,
         start_text=SceneStrings.DustyCell.START_TEXT,
-        text=SceneStrings.DustyCell.INITIAL_TEXT
+        text=SceneText(
+            snippets.BASE_DESCRIPTION,
+            [TextRule({StateKeys.DOOR_OPEN: True}, snippets.DOOR_OPEN)],
+            [TextRule({StateKeys.KEY_TAKEN: True}, snippets.KEY_TAKEN), TextRule({}, snippets.KEY_NOT_TAKEN)],
+            [TextRule({StateKeys.HAT_TAKEN: True}, snippets.HAT_TAKEN), TextRule({}, snippets.HAT_NOT_TAKEN)],
+        )
     )
 
     # A mysterious misty expanse (the ending scene)
@@ -65,41 +97,39 @@ def start_game(console: ConsoleManager) -> None:
         text=SceneStrings.MistyExpanse.TEXT
     )
 
+    content.add_scene(dusty_cell, start=True)
+    content.add_scene(misty_expanse)
+
     #* Define items that are in the dusty cell
-    wizard_hat_item = Item(
+    wizard_hat_item = content.add_item(Item(
         name=ItemStrings.WizardHat.NAME,
         code=ItemStrings.WizardHat.CODE,
         description=ItemStrings.WizardHat.DESCRIPTION
-    )
-    door_key_item = Item(
+    ))
+    door_key_item = content.add_item(Item(
         name=ItemStrings.CellDoorKey.NAME,
         code=ItemStrings.CellDoorKey.CODE,
         description=ItemStrings.CellDoorKey.DESCRIPTION
-    )
+    ))
 
     #* Add actions to the dusty cell scene
+    # Taking the stool only becomes possible once the hat is taken. The action is registered with the content
+    # so saved games can refer to it.
+    take_stool_action = content.register_action(ActionStrings.TakeStool.CODE, Action(
+        on_action=lambda e,a,s,p: ActionStrings.TakeStool.TEXT
+    ))
+
     # Take the wizard hat
     def on_take_hat(e,a:Action,s:Scene,p:Player) -> str:
         p.add_inventory_items([wizard_hat_item])
         s.state[StateKeys.HAT_TAKEN] = True
         s.remove_action(a)
 
-        if s.state.get(StateKeys.KEY_TAKEN, False):
-            s.text = SceneStrings.DustyCell.KEY_HAT_TAKEN_TEXT
-        else:
-            s.text = SceneStrings.DustyCell.HAT_TAKEN_TEXT
-
-        # Handle taking the hat after the door is open
-        if s.state.get(StateKeys.DOOR_OPEN, False):
-            s.text = SceneStrings.DustyCell.DOOR_OPEN_HAT_TAKEN_TEXT
-
         # Now that the hat is taken, maybe take the stool too? (Not actually)
-        dusty_cell.add_action(
+        s.add_action(
             action_type=ActionType.TAKE,
             keyword=ActionStrings.TakeStool.CODE,
-            action=Action(
-                on_action=lambda e,a,s,p: ActionStrings.TakeStool.TEXT
-            ),
+            action=take_stool_action,
         )
 
         return ActionStrings.TakeWizardHat.TEXT
@@ -117,11 +147,6 @@ def start_game(console: ConsoleManager) -> None:
         p.add_inventory_items([door_key_item])
         s.state[StateKeys.KEY_TAKEN] = True
         s.remove_action(a)
-
-        if s.state.get(StateKeys.HAT_TAKEN, False):
-            s.text = SceneStrings.DustyCell.KEY_HAT_TAKEN_TEXT
-        else:
-            s.text = SceneStrings.DustyCell.KEY_TAKEN_TEXT
         return ActionStrings.TakeCellDoorKey.TEXT
 
     dusty_cell.add_action(
@@ -134,37 +159,24 @@ def start_game(console: ConsoleManager) -> None:
 
     # Use the cell door key on the door
     def on_use_key_on_door(e,a:Action,s:Scene,p:Player) -> str:
-        if not p.inventory_contains([door_key_item]):
-            return ActionStrings.UseCellDoorKeyOnDoor.FAIL_TEXT
-
         s.state[StateKeys.DOOR_OPEN] = True
         p.remove_inventory_items([door_key_item])
         s.remove_action(a)
-
-        if s.state.get(StateKeys.HAT_TAKEN, False):
-            s.text = SceneStrings.DustyCell.DOOR_OPEN_HAT_TAKEN_TEXT
-        else:
-            s.text = SceneStrings.DustyCell.DOOR_OPEN_TEXT
         return ActionStrings.UseCellDoorKeyOnDoor.TEXT
 
     dusty_cell.add_action(
         action_type=ActionType.USE,
-        keyword=ActionStrings.UseCellDoorKeyOnDoor.CODE,
+        keyword=pair_keyword(ItemStrings.CellDoorKey.CODE, ActionStrings.MoveDoor.CODE),
         action=Action(
-            on_action=on_use_key_on_door
+            on_action=on_use_key_on_door,
+            guards=[item_guard(door_key_item, fail_text=ActionStrings.UseCellDoorKeyOnDoor.FAIL_TEXT)]
         ),
     )
 
     # Move through the open door an end the game!
     def on_move_door(e,a:Action,s:Scene,p:Player) -> str:
-        if not s.state.get(StateKeys.DOOR_OPEN, False):
-            return ActionStrings.MoveDoor.FAIL_NOT_OPEN_TEXT
-
-        if not p.inventory_contains([wizard_hat_item]):
-            return ActionStrings.MoveDoor.FAIL_NO_HAT_TEXT
-
         # Move to the misty expanse
-        engine.set_current_scene(misty_expanse)
+        e.set_current_scene(misty_expanse)
 
         # Return only the start text since this is the end of the game!
         return f"{ActionStrings.MoveDoor.TEXT}\n\n{misty_expanse.start_text}"
@@ -173,14 +185,48 @@ def start_game(console: ConsoleManager) -> None:
         action_type=ActionType.MOVE,
         keyword=ActionStrings.MoveDoor.CODE,
         action=Action(
-            on_action=on_move_door
+            on_action=on_move_door,
+            # The door has to be open, and no wizard leaves without their hat
+            guards=[
+                state_guard(StateKeys.DOOR_OPEN, fail_text=ActionStrings.MoveDoor.FAIL_NOT_OPEN_TEXT),
+                item_guard(wizard_hat_item, fail_text=ActionStrings.MoveDoor.FAIL_NO_HAT_TEXT),
+            ]
         ),
     )
 
+    return content
+
+def update_actions_remaining(console: ConsoleManager) -> None:
+    """
+    Shows the number of actions the player has left in the bottom border.
+
+    Args:
+        console (ConsoleManager): The console to update.
+    """
+    assert engine is not None
+    actions_remaining = engine.actions_remaining
+    console.update_bottom_border_text(GameStrings.ACTIONS_REMAINING_TEXT.format(
+        actions_remaining="∞" if actions_remaining is None else actions_remaining
+    ))
+
+def start_game(console: ConsoleManager) -> None:
+    global engine, trace_writer
+    console.write(GameStrings.WELCOME_TEXT)
+    console.draw_dinkus()
+
+    engine = InteractiveEngine(build_content(), action_budget=ACTION_BUDGET)
+    engine.on_exit(graceful_exit)
+    if PROFILE_PATH is not None:
+        engine.profiler = TurnProfiler()
+    if TRACE_PATH is not None:
+        trace_writer = TraceWriter(TRACE_PATH)
+        TurnTracer(engine, trace_writer, uuid.uuid4().hex)
+
     console.top_border_text = GameStrings.GAME_TITLE_TEXT.format(version=get_version())
-    console.bottom_border_text = GameStrings.ACTIONS_REMAINING_TEXT.format(actions_remaining=actions_remaining)
+    update_actions_remaining(console)
+    engine.events.subscribe(EventType.TURN_END, lambda event: update_actions_remaining(console))
 
-    start_text = engine.set_current_scene(dusty_cell)
+    start_text = engine.start()
     console.write(start_text)
 
 def main():
@@ -190,8 +236,13 @@ def main():
 
     # Game loop
     while True:
+        # Draw the console, timing it along with the turns when profiling
+        assert engine is not None
+        with engine.profiler.measure('render') if engine.profiler is not None else nullcontext():
+            console.render()
+
         # Wait for the user enter a command
-        user_input = console.input("> ")
+        user_input = console.input("> ", render=False)
 
         # Detect Refresh
         if user_input.lower() == '':